@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.event_executor
+@file mi/core/event_executor.py
+@brief Runs events on one worker thread in the order they were submitted
+"""
+# Without this the mi.core.time module is imported instead of time
+from __future__ import absolute_import
+
+__license__ = 'Apache 2.0'
+
+import time
+from collections import deque
+from threading import Condition
+from threading import Thread
+
+from mi.core.common import BaseEnum
+from mi.core.latency import LatencyHistogram
+from mi.core.log import get_logger ; log = get_logger()
+
+# Seconds an idle worker waits for another event before exiting
+DEFAULT_IDLE_TIMEOUT = 5
+
+
+class EventExecutorKey(BaseEnum):
+    """
+    Keys in the dict produced by SerialEventExecutor.get_stats
+    """
+    DEPTH = 'depth'
+    MAX_DEPTH = 'max_depth'
+    SUBMITTED = 'submitted'
+    COALESCED = 'coalesced'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    WAIT_LATENCY = 'wait_latency'
+    RUN_LATENCY = 'run_latency'
+
+
+class SerialEventExecutor(object):
+    """
+    Calls a handler for each submitted event, one at a time on a single
+    worker thread, in the order the events were submitted. Submitting an
+    event that is already waiting with the same arguments is a no-op when
+    coalescing is on.
+
+    The worker starts with the first event and exits once it has been idle
+    for idle_timeout seconds, so an executor that is no longer used doesn't
+    keep a thread.
+    """
+    def __init__(self, handler, error_callback=None, coalesce=True,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, name='SerialEventExecutor'):
+        """
+        @param handler Called with each event and its arguments
+        @param error_callback Called with the exception when the handler
+           raises one, or None to only log it
+        @param coalesce True to drop events equal to one already waiting
+        @param idle_timeout Seconds the worker waits for more events
+        @param name The name of the worker thread
+        """
+        self._handler = handler
+        self._error_callback = error_callback
+        self._coalesce = coalesce
+        self._idle_timeout = idle_timeout
+        self._name = name
+
+        self._condition = Condition()
+        # (event, args, kwargs, submit time)
+        self._pending = deque()
+        self._worker = None
+
+        self._wait_latency = LatencyHistogram()
+        self._run_latency = LatencyHistogram()
+        self._reset_counts()
+
+    def _reset_counts(self):
+        self._max_depth = 0
+        self._submitted = 0
+        self._coalesced = 0
+        self._completed = 0
+        self._failed = 0
+
+    def submit(self, event, *args, **kwargs):
+        """
+        Queue an event for the handler
+        @param event The event
+        @retval True if the event was queued, False if it was coalesced
+           with one already waiting
+        """
+        with self._condition:
+            self._submitted += 1
+            if self._coalesce:
+                for (pending_event, pending_args, pending_kwargs, _) in self._pending:
+                    if pending_event == event and pending_args == args and pending_kwargs == kwargs:
+                        self._coalesced += 1
+                        log.debug('%s: coalesced event %s', self._name, event)
+                        return False
+
+            self._pending.append((event, args, kwargs, time.time()))
+            self._max_depth = max(self._max_depth, len(self._pending))
+
+            if self._worker is None:
+                self._worker = Thread(target=self._run, name=self._name)
+                self._worker.daemon = True
+                self._worker.start()
+            else:
+                self._condition.notify()
+        return True
+
+    def _next(self):
+        """
+        @retval The next pending event, or None once the worker has been
+           idle for the idle timeout, in which case the worker is released
+        """
+        with self._condition:
+            if not self._pending:
+                self._condition.wait(self._idle_timeout)
+            if not self._pending:
+                self._worker = None
+                return None
+            return self._pending.popleft()
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+
+            (event, args, kwargs, submitted) = item
+            start = time.time()
+            self._wait_latency.record(start - submitted)
+            try:
+                self._handler(event, *args, **kwargs)
+                failed = False
+            except Exception as e:
+                failed = True
+                log.error('%s: exception raising event %s: %r', self._name, event, e)
+                if self._error_callback:
+                    self._error_callback(e)
+            self._run_latency.record(time.time() - start)
+
+            with self._condition:
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._condition.notify_all()
+
+    def depth(self):
+        """
+        @retval The number of events waiting, not counting a running one
+        """
+        return len(self._pending)
+
+    def wait_idle(self, timeout=None):
+        """
+        Wait until every submitted event has been handled
+        @param timeout Seconds to wait, or None to wait forever
+        @retval True if the executor is idle
+        """
+        end = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while self._pending or self._completed + self._failed + self._coalesced < self._submitted:
+                remaining = end - time.time() if end is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def get_stats(self):
+        """
+        @retval A dict of the queue depth, the counts of events and the
+           histograms of the time events waited in the queue and the time
+           the handler took, as produced by LatencyHistogram.as_dict
+        """
+        with self._condition:
+            return {
+                EventExecutorKey.DEPTH: len(self._pending),
+                EventExecutorKey.MAX_DEPTH: self._max_depth,
+                EventExecutorKey.SUBMITTED: self._submitted,
+                EventExecutorKey.COALESCED: self._coalesced,
+                EventExecutorKey.COMPLETED: self._completed,
+                EventExecutorKey.FAILED: self._failed,
+                EventExecutorKey.WAIT_LATENCY: self._wait_latency.as_dict(),
+                EventExecutorKey.RUN_LATENCY: self._run_latency.as_dict(),
+            }
+
+    def reset_stats(self):
+        """
+        Clear the counts and latency histograms. Waiting events are kept.
+        """
+        with self._condition:
+            self._reset_counts()
+            self._submitted = len(self._pending)
+            self._max_depth = len(self._pending)
+        self._wait_latency.reset()
+        self._run_latency.reset()
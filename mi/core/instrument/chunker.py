@@ -11,10 +11,171 @@
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import re
+from bisect import bisect_right
+from collections import deque
+
 from mi.core.log import get_logger ; log = get_logger()
 
 from mi.core.exceptions import SampleException
 
+# Regex sieves built by Chunker.regex_sieve_function, keyed on the regex list
+_regex_sieve_cache = {}
+_REGEX_SIEVE_CACHE_MAX = 100
+
+# Patterns using these can not have their groups stripped or be put in an
+# alternation with other patterns, so they are always scanned on their own
+_STANDALONE_PATTERN = re.compile(r'\\[1-9]|\(\?P=|\(\?\(|\(\?[iLmsux]+\)')
+
+
+class RegexSieve(object):
+    """
+    A sieve function built from a list of compiled regexes. Regexes sharing
+    the same flags are merged into a single alternation so the data is
+    scanned once per flag set instead of once per regex. Each alternative is
+    wrapped in one capturing group (all groups inside it are made
+    non-capturing) so the regex that matched is known from match.lastindex.
+
+    As long as the regexes do not produce overlapping matches the spans found
+    are identical to running each regex's finditer over the data in turn.
+    Regexes using backreferences, conditionals, inline flags or verbose mode
+    are scanned on their own.
+
+    Use an instance anywhere a sieve function is expected:
+    StringChunker(RegexSieve([regex_1, regex_2]))
+    """
+    def __init__(self, regex_list):
+        """
+        @param regex_list A list of pre-compiled regexes, in the order they
+            should be tried when more than one matches at the same place
+        """
+        self.regex_list = list(regex_list)
+
+        # list of (combined regex, list of indexes into regex_list by group)
+        self._scanners = []
+        combined = {}
+
+        for (index, regex) in enumerate(self.regex_list):
+            if regex.flags & re.VERBOSE or _STANDALONE_PATTERN.search(regex.pattern):
+                self._scanners.append((regex, None, [index]))
+            else:
+                combined.setdefault(regex.flags, []).append(index)
+
+        for (flags, indexes) in combined.items():
+            pattern = '|'.join('(%s)' % self._strip_groups(self.regex_list[i].pattern)
+                               for i in indexes)
+            try:
+                scanner = re.compile(pattern, flags)
+            except (re.error, AssertionError, OverflowError):
+                log.debug("Unable to combine sieve regexes, scanning separately")
+                for i in indexes:
+                    self._scanners.append((self.regex_list[i], None, [i]))
+            else:
+                # group number n + 1 holds regex_list[indexes[n]]
+                self._scanners.append((scanner, [None] + indexes, indexes))
+
+        # try scanners in the order of their first regex
+        self._scanners.sort(key=lambda scanner: scanner[2][0])
+
+    def __call__(self, raw_data):
+        """
+        The sieve function interface
+        @param raw_data The raw data to run through this sieve
+        @retval A list of (start, end) tuples, in order
+        """
+        return [(start, end) for (start, end, index) in self.find_chunks(raw_data)]
+
+    def find_chunks(self, raw_data):
+        """
+        Find all matches in the data along with the regex that matched
+        @param raw_data The raw data to run through this sieve
+        @retval A list of (start, end, index) tuples in order, where index is
+            the position of the matching regex in regex_list
+        """
+        return_list = []
+
+        for (scanner, group_index, indexes) in self._scanners:
+            if group_index is None:
+                return_list.extend((match.start(), match.end(), indexes[0])
+                                   for match in scanner.finditer(raw_data))
+            else:
+                return_list.extend((match.start(), match.end(), group_index[match.lastindex])
+                                   for match in scanner.finditer(raw_data))
+
+        if len(self._scanners) > 1:
+            return_list.sort()
+
+        return return_list
+
+    def match(self, chunk):
+        """
+        Find the first regex in regex_list that matches the start of a chunk,
+        the same as trying regex.match(chunk) with each one in turn.
+        @param chunk A chunk produced by this sieve
+        @retval The index of the matching regex in regex_list, or None
+        """
+        found = None
+        for (scanner, group_index, indexes) in self._scanners:
+            if found is not None and found < indexes[0]:
+                break
+            match = scanner.match(chunk)
+            if match:
+                index = indexes[0] if group_index is None else group_index[match.lastindex]
+                if found is None or index < found:
+                    found = index
+
+        return found
+
+    @staticmethod
+    def _strip_groups(pattern):
+        """
+        Make all capturing groups in a pattern non-capturing
+        @param pattern A regex pattern without backreferences
+        @retval The pattern with every ( and (?P<name> replaced by (?:
+        """
+        result = []
+        i = 0
+        in_class = False
+        length = len(pattern)
+
+        while i < length:
+            c = pattern[i]
+            if c == '\\':
+                result.append(pattern[i:i+2])
+                i += 2
+                continue
+
+            if in_class:
+                if c == ']':
+                    in_class = False
+            elif c == '[':
+                in_class = True
+                result.append(c)
+                i += 1
+                # a ] at the start of a set is a literal
+                if pattern[i:i+1] == '^':
+                    result.append('^')
+                    i += 1
+                if pattern[i:i+1] == ']':
+                    result.append(']')
+                    i += 1
+                continue
+            elif c == '(':
+                if pattern.startswith('(?P<', i):
+                    result.append('(?:')
+                    i = pattern.index('>', i) + 1
+                    continue
+                if not pattern.startswith('(?', i):
+                    result.append('(?:')
+                    i += 1
+                    continue
+
+            result.append(c)
+            i += 1
+
+        return ''.join(result)
+
+
 class Chunker(object):
     """
     A great big buffer that ingests incoming data from an instrument, then
@@ -438,21 +599,22 @@ class Chunker(object):
         pre-complete the regex list and make this look like a normal sieve
         function interface. For example, create a chunker like so:
         StringChunker(partial(self._chunker.regex_sieve_function, regex_list=[regex]))
+        The regexes are merged into a RegexSieve the first time a list is seen.
         @param raw_data The raw data to run through this regex sieve
         @param regex_list a list of pre-compiled regexes that will identify some
         flavor of a pattern in the raw data for matching.
         @retval A list of (start, end) tuples for each match the regexs find
         @use
         """
-        return_list = []
-    
-        sieve_matchers = regex_list
-        
-        for matcher in sieve_matchers:
-            for match in matcher.finditer(raw_data):
-                return_list.append((match.start(), match.end()))
-    
-        return return_list
+        key = tuple(regex_list)
+        sieve = _regex_sieve_cache.get(key)
+        if sieve is None:
+            if len(_regex_sieve_cache) >= _REGEX_SIEVE_CACHE_MAX:
+                _regex_sieve_cache.clear()
+            sieve = RegexSieve(regex_list)
+            _regex_sieve_cache[key] = sieve
+
+        return sieve(raw_data)
 
     
 class StringChunker(Chunker):
@@ -473,4 +635,326 @@ class BinaryChunker(Chunker):
     def __init__(self, data_sieve_fn):
         Chunker.__init__(self, data_sieve_fn)
         self.buffer = []
-    
\ No newline at end of file
+    
+
+class StreamChunker(Chunker):
+    """
+    A drop-in replacement for StringChunker (and BinaryChunker for byte string
+    data) built for high rate instruments. Incoming data is appended to a
+    single bytearray and every chunk list is kept in absolute stream offsets,
+    so fetching a chunk only moves an offset pointer instead of slicing the
+    buffer and rebuilding the chunk lists. Consumed bytes are released from
+    the front of the bytearray once they make up half of it, which keeps the
+    copying amortized O(1) per byte.
+
+    The sieve is run from a scan cursor (the end of the last data block found)
+    rather than from the start of the buffer. If max_chunk_size is given, the
+    sieve is only handed the last max_chunk_size bytes before the new data
+    plus the new data itself, so a long run of non-data or a partial record
+    is not rescanned in full on every add. The sieve must then find the same
+    chunks no matter where in the non-data it is started, which holds for
+    any framed or header anchored record format, and no chunk may be longer
+    than max_chunk_size.
+
+    Indexes returned by the get_next_* methods and the chunk list properties
+    are relative to the current start of the buffer, exactly as they are for
+    StringChunker.
+    """
+    def __init__(self, data_sieve_fn, max_chunk_size=None):
+        """
+        Initialize the buffer and indexing structures. Chunk lists are not
+        shared with the Chunker base class as they are kept in absolute
+        stream offsets here.
+
+        @param data_sieve_fn A sieve function as described in Chunker
+        @param max_chunk_size The size of the largest chunk the sieve can
+            match, or None to always sieve from the end of the last data block
+        """
+        self.sieve = data_sieve_fn
+        self.max_chunk_size = max_chunk_size
+
+        self._buffer = bytearray()
+        # stream offset of self._buffer[0]
+        self._buffer_offset = 0
+        # stream offset of the first byte that has not been consumed
+        self._base = 0
+        # stream offset the next sieve pass starts from
+        self._scan_cursor = 0
+
+        # raw chunks are kept in parallel lists so timestamps can be found
+        # with a bisect, entries before _raw_head have been consumed
+        self._raw_starts = []
+        self._raw_ends = []
+        self._raw_times = []
+        self._raw_head = 0
+
+        self._data_chunks = deque()
+        self._nondata_chunks = deque()
+
+    @property
+    def buffer(self):
+        """
+        The unconsumed contents of the buffer as a string
+        """
+        return str(buffer(self._buffer, self._base - self._buffer_offset))
+
+    @property
+    def raw_chunk_list(self):
+        """
+        The raw chunk list in the (start, end, timestamp) format of Chunker
+        """
+        return [(self._raw_starts[i] - self._base,
+                 self._raw_ends[i] - self._base,
+                 self._raw_times[i])
+                for i in xrange(self._raw_head, len(self._raw_ends))]
+
+    @property
+    def data_chunk_list(self):
+        """
+        The data chunk list in the (start, end, timestamp) format of Chunker
+        """
+        return self._relative_chunk_list(self._data_chunks)
+
+    @property
+    def nondata_chunk_list(self):
+        """
+        The non-data chunk list in the (start, end, timestamp) format of Chunker
+        """
+        return self._relative_chunk_list(self._nondata_chunks)
+
+    def _relative_chunk_list(self, chunks):
+        """
+        Convert a list of chunks in stream offsets to buffer indexes
+        """
+        return [(s - self._base, e - self._base, t) for (s, e, t) in chunks]
+
+    def add_chunk(self, raw_data, timestamp):
+        """
+        Adds a chunk of data to the end of the buffer, then sieves the new
+        data for data and non-data blocks.
+
+        @param raw_data The bunch of raw data as a string
+        @param timestamp The time (in NTP4 float format) that the data was
+            collected at the port agent
+        """
+        assert isinstance(timestamp, float)
+        start_index = self._buffer_offset + len(self._buffer)
+        self._buffer.extend(raw_data)
+        end_index = self._buffer_offset + len(self._buffer)
+
+        self._raw_starts.append(start_index)
+        self._raw_ends.append(end_index)
+        self._raw_times.append(timestamp)
+
+        self._sieve_new_data(start_index, end_index, timestamp)
+
+    def _sieve_new_data(self, start_index, end_index, timestamp):
+        """
+        Run the sieve over the part of the buffer that can hold new chunks
+        and splice the results into the data and non-data chunk lists.
+
+        @param start_index Stream offset of the first byte just added
+        @param end_index Stream offset of the end of the buffer
+        @param timestamp The timestamp of the data just added
+        """
+        scan_start = max(self._scan_cursor, self._base)
+        sieve_start = scan_start
+        if self.max_chunk_size is not None:
+            sieve_start = max(scan_start, start_index - self.max_chunk_size)
+
+        # copy the window out of the bytearray once, sieves expect a string
+        result = self.sieve(str(buffer(self._buffer, sieve_start - self._buffer_offset)))
+        # assert no overlap!
+        if self.overlaps(result):
+            raise SampleException("Overlapping blocks in sieve list: %s" % result)
+        # sort to protect us from some sloppy sieve code
+        result.sort()
+
+        new_nondata = []
+        if not result:
+            new_nondata.append((scan_start, end_index, timestamp))
+
+        previous_end = scan_start
+        for (s, e) in result:
+            s += sieve_start
+            e += sieve_start
+            if s > previous_end:
+                new_nondata.append((previous_end, s, self._timestamp_at(previous_end)))
+            previous_end = e
+
+            self._data_chunks.append((s, e, self._timestamp_at(s)))
+            # a completed fragment is no longer non-data
+            self._discard_nondata_at(s)
+            self._scan_cursor = e
+
+        self._merge_nondata(new_nondata)
+
+    def _timestamp_at(self, index):
+        """
+        @param index A stream offset in the unconsumed part of the buffer
+        @retval The timestamp of the raw chunk holding this offset
+        """
+        i = bisect_right(self._raw_ends, index, self._raw_head)
+        return self._raw_times[i]
+
+    def _discard_nondata_at(self, index):
+        """
+        Remove the non-data chunk that starts at the given stream offset, if
+        any. Only the tail of the non-data list can start that late.
+        """
+        for i in xrange(len(self._nondata_chunks) - 1, -1, -1):
+            start = self._nondata_chunks[i][0]
+            if start == index:
+                del self._nondata_chunks[i]
+                return
+            if start < index:
+                return
+
+    def _merge_nondata(self, new_nondata):
+        """
+        Splice newly found non-data blocks onto the end of the non-data list,
+        extending the last existing block if the first new one touches it.
+        """
+        if not new_nondata:
+            return
+
+        (first_s, first_e, first_t) = new_nondata[0]
+        chunks = self._nondata_chunks
+        while len(chunks) > 1 and chunks[-2][1] >= first_s:
+            chunks.pop()
+        if chunks and chunks[-1][1] >= first_s:
+            (s, e, t) = chunks[-1]
+            chunks[-1] = (s, first_e, t)
+            new_nondata.pop(0)
+
+        chunks.extend(new_nondata)
+
+    def get_next_data_with_index(self, clean=True):
+        """
+        Get the next chunk of data from the buffer. By default, it clears all
+        that comes before it. This method returns the start and end indices in
+        the resulting tuple.
+
+        @param clean If set to false, do not clear the buffer when fetching the
+            data, but simply return the data block and make no further changes.
+        @return A tuple of (timestamp, data_chunk, start_index, end_index) where
+            timestamp is in NTP4 float format and data chunk is a section of
+            buffer with indices between (start, end). If no data, returns
+            (None, None, None, None)
+        """
+        return self._get_next_chunk(self._data_chunks, clean)
+
+    def get_next_non_data_with_index(self, clean=True):
+        """
+        Get the next chunk of non-data from the buffer, clearing all that comes
+        before it. Default behavior is to clear the buffer before and including
+        this data.
+
+        @param clean Remove the buffer contents before and including this data
+        @return A tuple of (timestamp, data_chunk, next_start, next_end)
+            where timestamp is in NTP4 float format and data chunk is a
+            (start, end) tuple, (None, None, None, None) if no data
+        """
+        return self._get_next_chunk(self._nondata_chunks, clean)
+
+    def _get_next_chunk(self, chunks, clean):
+        """
+        Fetch the first chunk of a chunk list, consuming the buffer up to its
+        end if clean is set.
+        """
+        if not chunks:
+            return (None, None, None, None)
+
+        (next_start, next_end, timestamp) = chunks[0]
+        next_block = self._slice(next_start, next_end)
+        result = (timestamp, next_block, next_start - self._base, next_end - self._base)
+
+        if clean:
+            chunks.popleft()
+            self._consume(next_end)
+
+        return result
+
+    def get_next_raw(self, clean=True):
+        """
+        Get the next chunk of raw characters from the buffer, clearing all
+        that comes before it. Default behavior is to clear the buffer before
+        and including this data. A data block torn by this is moved to the
+        non-data list.
+
+        @param clean Remove the buffer contents before and including this data
+        @return A tuple of (timestamp, data_chunk) where timestamp is in NTP4
+            float format and data chunk is a (start, end) tuple,
+            (None, None) if empty list
+        """
+        if self._raw_head == len(self._raw_ends):
+            return (None, None)
+
+        next_start = self._raw_starts[self._raw_head]
+        next_end = self._raw_ends[self._raw_head]
+        next_time = self._raw_times[self._raw_head]
+        next_block = self._slice(next_start, next_end)
+
+        if clean:
+            chunks = self._data_chunks
+            while chunks and chunks[0][1] <= next_end:
+                chunks.popleft()
+            if chunks and chunks[0][0] < next_end:
+                (s, e, t) = chunks.popleft()
+                self._nondata_chunks.appendleft((next_end, e, t))
+            self._consume(next_end)
+
+        return (next_time, next_block)
+
+    def clean_all_chunks(self):
+        """
+        Clean all data out of the non_data, raw, and data lists
+        """
+        self._data_chunks.clear()
+        self._nondata_chunks.clear()
+        self._consume(self._buffer_offset + len(self._buffer))
+
+    def _clean_buffer(self, end_index):
+        """
+        Consume the buffer up to the given index, along with any chunks in it
+        @param end_index the last index used...clean up to here
+        """
+        self._consume(self._base + end_index)
+
+    def _slice(self, start, end):
+        """
+        @retval The buffer contents between two stream offsets as a string
+        """
+        return str(buffer(self._buffer, start - self._buffer_offset, end - start))
+
+    def _consume(self, index):
+        """
+        Mark the buffer consumed up to a stream offset, dropping or trimming
+        chunks that end before it and releasing the front of the bytearray
+        once it is at least half consumed.
+
+        @param index Stream offset to consume up to
+        """
+        self._base = index
+
+        while self._raw_head < len(self._raw_ends) and self._raw_ends[self._raw_head] <= index:
+            self._raw_head += 1
+        if self._raw_head < len(self._raw_ends) and self._raw_starts[self._raw_head] < index:
+            self._raw_starts[self._raw_head] = index
+        if self._raw_head * 2 >= len(self._raw_ends):
+            del self._raw_starts[:self._raw_head]
+            del self._raw_ends[:self._raw_head]
+            del self._raw_times[:self._raw_head]
+            self._raw_head = 0
+
+        for chunks in (self._data_chunks, self._nondata_chunks):
+            while chunks and chunks[0][1] <= index:
+                chunks.popleft()
+            if chunks and chunks[0][0] < index:
+                (s, e, t) = chunks[0]
+                chunks[0] = (index, e, t)
+
+        released = index - self._buffer_offset
+        if released * 2 >= len(self._buffer):
+            del self._buffer[:released]
+            self._buffer_offset = index
@@ -23,6 +23,11 @@ except ImportError:
     warn("Failed to import simplejson; particle generation will be slower.")
     import json
 
+try:
+    from json.encoder import c_make_encoder, encode_basestring_ascii
+except ImportError:
+    c_make_encoder = None
+
 from mi.core.common import BaseEnum
 from mi.core.exceptions import SampleException, ReadOnlyException, NotImplementedException, InstrumentParameterException
 from mi.core.log import get_logger ; log = get_logger()
@@ -58,6 +63,111 @@ class DataParticleValue(BaseEnum):
     INVALID = "invalid"
     QUESTIONABLE = "questionable"
     
+class ParticleEncoder(object):
+    """
+    Encodes particle dicts to exactly the JSON json.dumps produces, faster.
+
+    One C encoder is reused for every particle instead of building one per
+    json.dumps call. The values list is encoded from a template of the
+    JSON around each value, cached per stream, so only the values themselves
+    go through the encoder. Anything the template can't reproduce exactly,
+    such as sorted keys, extra value keys or nested values, is encoded in
+    full. The templates need the C encoder of the standard json module, with
+    simplejson every particle goes through json.dumps.
+    """
+    # Stands in for the values list while encoding the rest of the particle
+    _VALUES_PLACEHOLDER = '\x00values\x00'
+
+    def __init__(self):
+        self._templates = {}
+        self._encoder = None
+        self._value_order = None
+
+        if c_make_encoder is not None and json.__name__ == 'json':
+            self._encoder = c_make_encoder(None, json.JSONEncoder().default, encode_basestring_ascii,
+                                           None, ': ', ', ', False, False, True)
+            self._placeholder_json = encode_basestring_ascii(self._VALUES_PLACEHOLDER)
+
+            # Value dicts can only be templated if their key order doesn't
+            # depend on how they were built
+            order = {DataParticleKey.VALUE_ID: None, DataParticleKey.VALUE: None}.keys()
+            if order == {DataParticleKey.VALUE: None, DataParticleKey.VALUE_ID: None}.keys():
+                self._value_order = order
+
+    def encode(self, particle_dict, sort_keys=False):
+        """
+        @param particle_dict A particle dict as returned by generate_dict
+        @param sort_keys Sort the keys of the JSON objects
+        @retval The same JSON string json.dumps would return
+        """
+        if self._encoder is None or sort_keys:
+            return json.dumps(particle_dict, sort_keys=sort_keys)
+
+        try:
+            values = particle_dict.get(DataParticleKey.VALUES)
+            values_json = self._encode_values(particle_dict.get(DataParticleKey.STREAM_NAME), values)
+            if values_json is None:
+                return ''.join(self._encoder(particle_dict, 0))
+
+            particle_dict[DataParticleKey.VALUES] = self._VALUES_PLACEHOLDER
+            try:
+                chunks = self._encoder(particle_dict, 0)
+            finally:
+                particle_dict[DataParticleKey.VALUES] = values
+            chunks[chunks.index(self._placeholder_json)] = values_json
+            return ''.join(chunks)
+        except Exception:
+            # let json.dumps raise its usual error for anything unencodable
+            return json.dumps(particle_dict)
+
+    def _encode_values(self, stream_name, values):
+        """
+        Encode a values list from its template
+        @retval The JSON of the values list or None if it can't be templated
+        """
+        if self._value_order is None or type(values) is not list or not values:
+            return None
+        if set(map(type, values)) != set([dict]) or set(map(len, values)) != set([2]):
+            return None
+
+        value_ids = [value[DataParticleKey.VALUE_ID] for value in values]
+        cached = self._templates.get(stream_name)
+        if cached is None or cached[0] != value_ids:
+            cached = (value_ids, self._build_template(value_ids))
+            self._templates[stream_name] = cached
+
+        # A flat list of n single chunk values encodes as 2n+1 chunks, any
+        # more and a value was a nested structure
+        chunks = self._encoder([value[DataParticleKey.VALUE] for value in values], 0)
+        if len(chunks) != 2 * len(values) + 1:
+            return None
+
+        template = cached[1]
+        result = [None] * len(chunks)
+        result[0::2] = template
+        result[1::2] = chunks[1::2]
+        return ''.join(result)
+
+    def _build_template(self, value_ids):
+        """
+        @retval The JSON before, between and after each value of a values
+        list with these value IDs
+        """
+        template = ['[']
+        for value_id in value_ids:
+            value_id_json = '"%s": %s' % (DataParticleKey.VALUE_ID, json.dumps(value_id))
+            if self._value_order[0] == DataParticleKey.VALUE_ID:
+                template[-1] += '{%s, "%s": ' % (value_id_json, DataParticleKey.VALUE)
+                template.append('}, ')
+            else:
+                template[-1] += '{"%s": ' % DataParticleKey.VALUE
+                template.append(', %s}, ' % value_id_json)
+        template[-1] = template[-1][:-2] + ']'
+        return template
+
+PARTICLE_ENCODER = ParticleEncoder()
+
+
 class DataParticle(object):
     """
     This class is responsible for storing and ultimately generating data
@@ -93,7 +203,8 @@ class DataParticle(object):
             DataParticleKey.PKT_VERSION: 1,
             DataParticleKey.PORT_TIMESTAMP: port_timestamp,
             DataParticleKey.INTERNAL_TIMESTAMP: internal_timestamp,
-            DataParticleKey.DRIVER_TIMESTAMP: ntplib.system_to_ntp_time(time.time()),
+            # read from the clock when the particle is generated
+            DataParticleKey.DRIVER_TIMESTAMP: None,
             DataParticleKey.PREFERRED_TIMESTAMP: preferred_timestamp,
             DataParticleKey.QUALITY_FLAG: quality_flag,
         }
@@ -103,6 +214,10 @@ class DataParticle(object):
 
         self.raw_data = raw_data
 
+        # The parsed values and the value_id to value mapping, built once
+        self._values = None
+        self._value_dict = None
+
     def __eq__(self, arg):
         """
         Quick equality check for testing purposes. If they have the same raw
@@ -171,6 +286,8 @@ class DataParticle(object):
         @raises NotImplementedException If there is an invalid id
         """
         if DataParticleKey.has(id):
+            if id == DataParticleKey.DRIVER_TIMESTAMP:
+                self._set_driver_timestamp()
             return self.contents[id]
         else:
             raise NotImplementedException("Value %s not available in particle!", id)
@@ -192,9 +309,19 @@ class DataParticle(object):
         going to JSON. This is useful for the times when JSON is not needed to
         go across an interface. There are times when particles are used
         internally to a component/process/module/etc.
-        @retval A python dictionary with the proper timestamps and data values
+        @retval A python dictionary with the proper timestamps and data values.
+           The value dicts are copies, see get_parsed_values.
         @throws InstrumentDriverException if there is a problem wtih the inputs
         """
+        return self._build_dict(self.get_parsed_values())
+
+    def _build_dict(self, values):
+        """
+        Build the particle dictionary around its values
+        @param values The list of value dicts
+        @retval A python dictionary with the proper timestamps and data values
+        @throws SampleException if the preferred timestamp is not set
+        """
         # Do we wan't downstream processes to check this?
         #for time in [DataParticleKey.INTERNAL_TIMESTAMP,
         #             DataParticleKey.DRIVER_TIMESTAMP,
@@ -207,8 +334,7 @@ class DataParticle(object):
             raise SampleException("Preferred timestamp not in particle!")
         
         # build response structure
-        self._encoding_errors = []
-        values = self._build_parsed_values()
+        self._set_driver_timestamp()
         result = self._build_base_structure()
         result[DataParticleKey.STREAM_NAME] = self.data_particle_type()
         result[DataParticleKey.VALUES] = values
@@ -216,6 +342,40 @@ class DataParticle(object):
         #log.debug("Serialize result: %s", result)
         return result
         
+    def get_parsed_values(self):
+        """
+        Get the parsed values of the particle. They are built the first time
+        they are needed and reused by generate_dict, generate and
+        get_value_dict after that.
+        @retval A new list of copies of the value dicts, as built by
+           _build_parsed_values. Values that are lists are not copied, don't
+           modify them.
+        @throws SampleException when parsed values can not be properly returned
+        """
+        return [dict(value) for value in self._kept_values()]
+
+    def _kept_values(self):
+        """
+        @retval The list of value dicts kept by the particle, which is shared
+        """
+        if self._values is None:
+            self._encoding_errors = []
+            self._values = self._build_parsed_values()
+        return self._values
+
+    def get_value_dict(self):
+        """
+        Get the parsed values by value_id, for driver code that checks a
+        few values of a sample without going through JSON.
+        @retval A dict of value_id to value. The dict is shared, don't
+           modify it.
+        @throws SampleException when parsed values can not be properly returned
+        """
+        if self._value_dict is None:
+            self._value_dict = dict((value[DataParticleKey.VALUE_ID], value[DataParticleKey.VALUE])
+                                    for value in self._kept_values())
+        return self._value_dict
+
     def generate(self, sorted=False):
         """
         Generates a JSON_parsed packet from a sample dictionary of sensor data and
@@ -229,9 +389,53 @@ class DataParticle(object):
            and driver timestamp
         @throws InstrumentDriverException If there is a problem with the inputs
         """
-        result = self.generate_dict()
-        json_result = json.dumps(result, sort_keys=sorted)
+        # the kept values are encoded without copying them
+        result = self._build_dict(self._kept_values())
+        json_result = PARTICLE_ENCODER.encode(result, sort_keys=sorted)
         return json_result
+
+    def _set_driver_timestamp(self, driver_timestamp=None):
+        """
+        Set the driver timestamp if the particle doesn't have one yet, so it
+        keeps the time it was first generated
+        @param driver_timestamp The NTP timestamp to set, or None to read the
+           clock
+        """
+        if self.contents[DataParticleKey.DRIVER_TIMESTAMP] is None:
+            if driver_timestamp is None:
+                driver_timestamp = ntplib.system_to_ntp_time(time.time())
+            self.contents[DataParticleKey.DRIVER_TIMESTAMP] = driver_timestamp
+
+    @staticmethod
+    def generate_many(particles, sorted=False):
+        """
+        Generate the JSON of a batch of particles. The clock is read once for
+        the batch and every particle without a driver timestamp gets that one.
+        @param particles A list of data particles
+        @param sorted Returned sorted json dicts
+        @return A list of JSON strings, the same as calling generate on each
+           particle
+        @throws InstrumentDriverException If there is a problem with the inputs
+        """
+        driver_timestamp = ntplib.system_to_ntp_time(time.time())
+
+        result = []
+        for particle in particles:
+            particle._set_driver_timestamp(driver_timestamp)
+            result.append(particle.generate(sorted))
+        return result
+
+    @staticmethod
+    def generate_batch(particles, sorted=False):
+        """
+        Generate a batch of particles as a single JSON array, with one driver
+        timestamp as in generate_many
+        @param particles A list of data particles
+        @param sorted Returned sorted json dicts
+        @return A JSON string of the list of particles
+        @throws InstrumentDriverException If there is a problem with the inputs
+        """
+        return '[' + ', '.join(DataParticle.generate_many(particles, sorted)) + ']'
         
     def _build_parsed_values(self):
         """
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.driver_codec
+@file mi/core/instrument/driver_codec.py
+@brief Codecs for the messages between a driver process and its client.
+Every encoded frame describes its own format, so either end decodes any
+frame and the codec negotiated at startup only selects how frames are
+encoded. Pickle frames are the format the transport always used. Sample
+events, which carry a particle already encoded as JSON, are sent as the JSON
+payload behind a small header instead of being wrapped again.
+"""
+
+__license__ = 'Apache 2.0'
+
+import struct
+import cPickle as pickle
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+
+# Pickle protocol 2 and up frames start with the PROTO opcode. The other
+# frame types start with a byte that isn't a pickle opcode.
+PICKLE_MARKER = '\x80'
+MSGPACK_MARKER = '\x01'
+SAMPLE_MARKER = '\x02'
+
+# The event time of a sample frame, after the marker
+SAMPLE_HEADER = struct.Struct('!d')
+
+# msgpack extension type holding a tuple, so tuples don't decode as lists
+TUPLE_EXT_TYPE = 1
+
+SAMPLE_EVENT_KEYS = frozenset(['type', 'value', 'time'])
+
+
+def _encode_sample(obj):
+    """
+    @retval The sample frame of a sample event holding a JSON particle, or
+       None if the object isn't one
+    """
+    if type(obj) is dict and len(obj) == 3 and obj.get('type') == DriverAsyncEvent.SAMPLE:
+        value = obj.get('value')
+        event_time = obj.get('time')
+        if type(value) is str and type(event_time) is float and frozenset(obj) == SAMPLE_EVENT_KEYS:
+            return SAMPLE_MARKER + SAMPLE_HEADER.pack(event_time) + value
+    return None
+
+
+def _decode_sample(frame):
+    (event_time, ) = SAMPLE_HEADER.unpack_from(frame, 1)
+    return {
+        'type': DriverAsyncEvent.SAMPLE,
+        'value': frame[1 + SAMPLE_HEADER.size:],
+        'time': event_time
+    }
+
+
+def _msgpack_default(obj):
+    if type(obj) is tuple:
+        return msgpack.ExtType(TUPLE_EXT_TYPE, _pack(list(obj)))
+    # anything else, such as an exception, goes in a pickle frame
+    raise TypeError("%s can't be encoded with msgpack" % type(obj).__name__)
+
+
+def _msgpack_ext_hook(code, data):
+    if code == TUPLE_EXT_TYPE:
+        return tuple(_unpack(data))
+    return msgpack.ExtType(code, data)
+
+
+def _pack(obj):
+    # str and unicode stay distinct, as bin and str types
+    return msgpack.packb(obj, use_bin_type=True, strict_types=True, default=_msgpack_default)
+
+
+def _unpack(data):
+    return msgpack.unpackb(data, raw=False, ext_hook=_msgpack_ext_hook)
+
+
+class PickleCodec(object):
+    """
+    Encodes every message with pickle, as send_pyobj does
+    """
+    name = 'pickle'
+
+    def encode(self, obj):
+        """
+        @param obj A command, reply or event
+        @retval The frame of the object
+        """
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, frame):
+        """
+        @param frame A frame encoded by any codec
+        @retval The object in the frame
+        """
+        return decode_frame(frame)
+
+
+class MsgpackCodec(PickleCodec):
+    """
+    Encodes messages with msgpack, and sample events holding a JSON particle
+    as the raw particle. Messages msgpack can't hold, such as exceptions, are
+    pickled.
+    """
+    name = 'msgpack'
+
+    def encode(self, obj):
+        frame = _encode_sample(obj)
+        if frame is not None:
+            return frame
+        try:
+            return MSGPACK_MARKER + _pack(obj)
+        except (TypeError, ValueError, OverflowError):
+            return PickleCodec.encode(self, obj)
+
+
+def decode_frame(frame):
+    """
+    Decode a frame of any codec
+    @param frame The frame
+    @retval The object in the frame
+    @throws ValueError if the frame format is unknown
+    """
+    marker = frame[:1]
+    if marker == PICKLE_MARKER:
+        return pickle.loads(frame)
+    elif marker == SAMPLE_MARKER:
+        return _decode_sample(frame)
+    elif marker == MSGPACK_MARKER:
+        if msgpack is None:
+            raise ValueError("msgpack frame received without msgpack installed")
+        return _unpack(frame[1:])
+    raise ValueError("Unknown driver message frame format %r" % marker)
+
+
+PICKLE_CODEC = PickleCodec()
+
+# Codecs in order of preference. msgpack is optional.
+CODECS = [PICKLE_CODEC]
+if msgpack is not None:
+    CODECS.insert(0, MsgpackCodec())
+
+
+def codec_names():
+    """
+    @retval The names of the available codecs in order of preference
+    """
+    return [codec.name for codec in CODECS]
+
+
+def get_codec(names):
+    """
+    Choose the codec for a peer
+    @param names The codec names the peer supports, in its order of
+       preference
+    @retval The first codec of the peer available here, or the pickle codec
+    """
+    available = dict((codec.name, codec) for codec in CODECS)
+    for name in names or []:
+        if name in available:
+            return available[name]
+    return PICKLE_CODEC
@@ -11,7 +11,9 @@ __author__ = 'Edward Hunter'
 __license__ = 'Apache 2.0'
 
 import logging
+from collections import deque
 from threading import Thread
+from threading import Event
 from subprocess import Popen
 from subprocess import PIPE
 import signal
@@ -23,6 +25,7 @@ from mi.core.exceptions import InstrumentException, InstrumentCommandException
 from mi.core.instrument.instrument_driver import DriverAsyncEvent
 
 from ooi.logging import log
+from mi.core.log import set_method_tracing, get_method_profile, reset_method_profile
 
 class DriverProcess(object):
     """
@@ -56,7 +59,8 @@ class DriverProcess(object):
         self.driver_class = driver_class
         self.ppid = ppid
         self.driver = None
-        self.events = []
+        self.events = deque()
+        self.events_ready = Event()
         self.messaging_started = False
         
     def construct_driver(self):
@@ -130,6 +134,10 @@ class DriverProcess(object):
         'stop_driver_process' - signal to close messaging and terminate.
         'test_events' - populate event queue with test data.
         'process_echo' - echos the message back.
+        'set_method_tracing' - switch method tracing, with the kwargs of
+            mi.core.log.set_method_tracing.
+        'get_method_profile' - return the method profile, and clear it if
+            the reset kwarg is True.
         If the command is not found in the driver, an echo message is
         replied to the client.
         @param msg A driver command message.
@@ -139,13 +147,14 @@ class DriverProcess(object):
         args = msg.get('args', None)
         kwargs = msg.get('kwargs', None)
         cmd_func = getattr(self.driver, cmd, None)
-        log.debug("DriverProcess.cmd_driver(): cmd=%s, cmd_func=%s" %(cmd, cmd_func))
+        log.debug("DriverProcess.cmd_driver(): cmd=%s, cmd_func=%s", cmd, cmd_func)
         if cmd == 'stop_driver_process':
             self.stop_messaging()
             return'stop_driver_process'
         elif cmd == 'test_events':
             events = kwargs['events']
-            self.events += events
+            self.events.extend(events)
+            self.events_ready.set()
             reply = 'test_events'
         elif cmd == 'process_echo':
             reply = 'ping from resource ppid:%s, resource:%s' % (str(self.ppid), str(self.driver))
@@ -154,6 +163,13 @@ class DriverProcess(object):
             #except IndexError:
             #    msg = 'no message to echo'
             # reply = 'process_echo: %s' % msg
+        elif cmd == 'set_method_tracing':
+            set_method_tracing(**(kwargs or {}))
+            reply = 'set_method_tracing'
+        elif cmd == 'get_method_profile':
+            reply = get_method_profile()
+            if (kwargs or {}).get('reset'):
+                reset_method_profile()
         elif cmd_func:
             try:
                 reply = cmd_func(*args, **kwargs)
@@ -187,9 +203,31 @@ class DriverProcess(object):
             
     def send_event(self, evt):
         """
-        Append an event to the list to be sent by the event threaed.
+        Append an event to the queue to be sent by the event thread and
+        wake the thread.
         """
         self.events.append(evt)
+        self.events_ready.set()
+
+    def next_events(self, max_events, timeout):
+        """
+        Take events from the front of the queue, waiting for one to be
+        sent if the queue is empty.
+        @param max_events The most events to take.
+        @param timeout Seconds to wait for an event.
+        @retval A list of events, empty if none were sent before the timeout.
+        """
+        if not self.events:
+            self.events_ready.wait(timeout)
+        self.events_ready.clear()
+
+        result = []
+        while len(result) < max_events:
+            try:
+                result.append(self.events.popleft())
+            except IndexError:
+                break
+        return result
             
     def run(self):
         """
@@ -43,6 +43,8 @@ class DriverConfigKey(BaseEnum):
     """
     PARAMETERS = 'parameters'
     SCHEDULER = 'scheduler'
+    RAW_STREAM = 'raw_stream'
+    BUFFER_LOG_INTERVAL = 'buffer_log_interval'
 
 # This is a copy since we can't import from pyon.
 class ResourceAgentState(BaseEnum):
@@ -178,6 +180,8 @@ class DriverAsyncEvent(BaseEnum):
     RESULT = 'DRIVER_ASYNC_RESULT'
     DIRECT_ACCESS = 'DRIVER_ASYNC_EVENT_DIRECT_ACCESS'
     AGENT_EVENT = 'DRIVER_ASYNC_EVENT_AGENT_EVENT'
+    # a binary frame of raw port agent packets, see mi.core.instrument.raw_publisher
+    RAW = 'DRIVER_ASYNC_EVENT_RAW'
 
 class DriverParameter(BaseEnum):
     """
@@ -387,6 +391,10 @@ class InstrumentDriver(object):
             event['value'] = val
             self._send_event(event)
 
+        elif type == DriverAsyncEvent.RAW:
+            event['value'] = val
+            self._send_event(event)
+
 
     ########################################################################
     # Test interface.
@@ -592,6 +600,17 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         if self._protocol:
             return self._protocol.get_cached_config()
                 
+    def get_command_latency(self, *args, **kwargs):
+        """
+        Return the command round trip latency histograms recorded by the
+        protocol.
+        @retval dict of latency histograms keyed by command, empty if there
+        is no protocol yet.
+        """
+        if self._protocol:
+            return self._protocol.get_command_latency()
+        return {}
+
     def get_config_metadata(self):
         """
         Return the configuration metadata object in JSON format
@@ -628,7 +647,7 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         for param in da_params:
             vals[param] = config[param]
 
-        log.debug("Restore DA Parameters: %s" % vals)
+        log.debug("Restore DA Parameters: %s", vals)
         self.set_resource(vals, True)
         
     #############################################################
@@ -906,7 +925,8 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
             self._connection.init_comms(self._protocol.got_data, 
                                         self._protocol.got_raw,
                                         self._got_exception,
-                                        self._lost_connection_callback)
+                                        self._lost_connection_callback,
+                                        user_callback_data_batch=self._protocol.got_data_batch)
             self._protocol._connection = self._connection
             next_state = DriverConnectionState.CONNECTED
         except InstrumentConnectionException as e:
@@ -1036,7 +1056,9 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         and also to self._protocol._connection upon entering in the
         DriverConnectionState.CONNECTED state.
 
-        @param config configuration dict
+        @param config configuration dict, with the port agent 'addr', 'port'
+                  and optional 'cmd_port', and 'buffered' True to read the
+                  port agent data in batches
 
         @retval a Connection instance, which will be assigned to
                   self._connection
@@ -1052,9 +1074,10 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
             addr = config['addr']
             port = config['port']
             cmd_port = config.get('cmd_port')
+            buffered = config.get('buffered', False)
 
             if isinstance(addr, str) and isinstance(port, int) and len(addr)>0:
-                return PortAgentClient(addr, port, cmd_port)
+                return PortAgentClient(addr, port, cmd_port, buffered=buffered)
             else:
                 raise InstrumentParameterException('Invalid comms config dict.')
 
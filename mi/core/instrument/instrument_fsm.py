@@ -112,7 +112,7 @@ class InstrumentFSM(object):
         if self.states.has(next_state):
             self._on_transition(next_state, *args, **kwargs)
         else:
-            log.debug("No next state'" + repr(next_state) + "', remaining in current_state.")
+            log.debug("No next state '%r', remaining in current_state.", next_state)
                 
         return result
             
@@ -18,16 +18,19 @@ import time
 import json
 from functools import partial
 
-from mi.core.log import get_logger ; log = get_logger()
+from mi.core.log import get_logger, lazy ; log = get_logger()
 
-from threading import Thread
+from threading import Condition
 
 from mi.core.instrument.protocol_param_dict import ParameterDictVisibility
 from mi.core.common import BaseEnum, InstErrorCode
-from mi.core.instrument.data_particle import RawDataParticle
+from mi.core.instrument.raw_publisher import RawPublisher
 from mi.core.instrument.instrument_driver import DriverConfigKey
 from mi.core.driver_scheduler import DriverScheduler
 from mi.core.driver_scheduler import DriverSchedulerConfigKey
+from mi.core.latency import LatencyHistogram
+from mi.core.event_executor import SerialEventExecutor
+from mi.core.ring_buffer import RingBuffer, match_width
 
 from mi.core.instrument.instrument_driver import DriverAsyncEvent
 from mi.core.instrument.instrument_driver import DriverProtocolState
@@ -47,6 +50,9 @@ from mi.core.exceptions import InstrumentParameterExpirationException
 MAX_BUFFER_SIZE=32768
 DEFAULT_CMD_TIMEOUT=20
 DEFAULT_WRITE_DELAY=0
+# Longest time a response waiter blocks before re-checking the buffers, in
+# case a subclass updates them without going through add_to_buffer
+BUFFER_POLL_INTERVAL=.1
 RE_PATTERN = type(re.compile(""))
 
 class InterfaceType(BaseEnum):
@@ -100,6 +106,17 @@ class InstrumentProtocol(object):
         # are applied at the first opertunity.
         self._init_type = InitializationType.STARTUP
 
+        # Command round trip latency histograms keyed by command
+        self._command_latency = {}
+
+        # Runs FSM events raised from the listener thread in order
+        self._fsm_event_executor = SerialEventExecutor(self._raise_async_fsm_event,
+                                                       error_callback=self._async_fsm_event_error,
+                                                       name='%s-fsm-events' % self.__class__.__name__)
+
+        # Publishes raw port agent packets as configured by the driver config
+        self._raw_publisher = RawPublisher(self._raw_event)
+
     ########################################################################
     # Common handlers
     ########################################################################
@@ -182,6 +199,24 @@ class InstrumentProtocol(object):
         log.error("base got_data.  Who called me?")
         pass
 
+    def got_data_batch(self, port_agent_packets):
+        """
+        Called by a buffered port agent client with the instrument data
+        packets it read together, in the order they were received. Calls
+        got_data with each packet; protocols that can handle a batch at
+        once override this.
+        @param port_agent_packets A list of port agent packets
+        """
+        for port_agent_packet in port_agent_packets:
+            self.got_data(port_agent_packet)
+
+    def _raw_event(self, event_type, value):
+        """
+        Send a raw data event from the raw publisher
+        """
+        if self._driver_event:
+            self._driver_event(event_type, value)
+
     def _get_param_result(self,param_list, expire_time):
         """
         return a dictionary of the parameters and values
@@ -244,22 +279,49 @@ class InstrumentProtocol(object):
                the other to notify parsed data.
 
         @retval dict of dicts {'parsed': parsed_sample, 'raw': raw_sample} if
-                the line can be parsed for a sample. Otherwise, None.
+                the line can be parsed for a sample. Otherwise, None. The
+                sample is decoded from the particle JSON, so it is the
+                caller's own copy with lists and unicode strings as before.
         @todo Figure out how the agent wants the results for a single poll
             and return them that way from here
         """
-        sample = None
-        if regex.match(line):
-        
-            particle = particle_class(line, port_timestamp=timestamp)
-            parsed_sample = particle.generate()
+        particle = self._extract_particle(particle_class, regex, line, timestamp, publish=False)
+        if particle is None:
+            return None
 
-            if publish and self._driver_event:
-                self._driver_event(DriverAsyncEvent.SAMPLE, parsed_sample)
-    
-            sample = json.loads(parsed_sample)
+        parsed_sample = particle.generate()
+        if publish and self._driver_event:
+            self._driver_event(DriverAsyncEvent.SAMPLE, parsed_sample)
 
-        return sample
+        return json.loads(parsed_sample)
+
+    def _extract_particle(self, particle_class, regex, line, timestamp, publish=True):
+        """
+        Extract a particle from a response line if present and publish it,
+        as _extract_sample does, returning the particle itself. Drivers
+        that check values of a sample use particle.get_value_dict(), which
+        reuses the values built for publishing. The JSON is only generated
+        when the particle is published.
+
+        @param particle_class The class to instantiate for this specific
+            data particle
+        @param regex The regular expression that matches a data sample
+        @param line string to match for sample.
+        @param timestamp port agent timestamp to include with the particle
+        @param publish boolean to publish samples (default True)
+
+        @retval The particle if the line can be parsed for a sample.
+                Otherwise, None.
+        """
+        if not regex.match(line):
+            return None
+
+        particle = particle_class(line, port_timestamp=timestamp)
+
+        if publish and self._driver_event:
+            self._driver_event(DriverAsyncEvent.SAMPLE, particle.generate())
+
+        return particle
 
     def get_current_state(self):
         """
@@ -297,30 +359,68 @@ class InstrumentProtocol(object):
 
     def _async_raise_fsm_event(self, event, *args, **kwargs):
         """
-        Spawn a new thread and raise an FSM event.  This is intended to be used from the listener
-        thread.  If not used the port agent client could be blocked when a FSM event is raised.
+        Queue an FSM event to be raised on the protocol's event worker thread.  This is intended
+        to be used from the listener thread.  If not used the port agent client could be blocked
+        when a FSM event is raised.  Events are raised one at a time in the order they were
+        queued, and an event already waiting with the same args is not queued again.
         @param event: event to raise
         @param args: args for the event
         @param kwargs: ignored
         """
-        log.info("_async_raise_fsm_event: starting new thread to raise event")
+        log.debug('_async_raise_fsm_event event: %s args: %r', event, args)
 
-        args = list(args)
+        self._fsm_event_executor.submit(event, *args)
 
-        log.debug('_async_raise_fsm_event event: %s args: %r', event, args)
+    def _raise_async_fsm_event(self, event, *args):
+        """
+        Raise a queued FSM event, called on the event worker thread.
+        """
+        self._protocol_fsm.on_event(event, *args)
+        log.debug('_async_raise_fsm_event: event complete. (%r)', event)
 
-        args.insert(0, event)
+    def _async_fsm_event_error(self, e):
+        """
+        Report an exception raised by an asynchronous FSM event.
+        """
+        log.error('Exception in asynchronous thread: %r', e)
+        self._driver_event(DriverAsyncEvent.ERROR, e)
 
-        def run():
-            try:
-                self._protocol_fsm.on_event(*args)
-            except Exception as e:
-                log.error('Exception in asynchronous thread: %r', e)
-                self._driver_event(DriverAsyncEvent.ERROR, e)
-            log.info('_async_raise_fsm_event: event complete. bub bye thread. (%r)', args)
+    def get_fsm_event_stats(self):
+        """
+        @retval A dict of the asynchronous FSM event queue depth, event counts
+            and wait and run time histograms, as produced by
+            SerialEventExecutor.get_stats
+        """
+        return self._fsm_event_executor.get_stats()
 
-        new_thread = Thread(target=run)
-        new_thread.start()
+    ########################################################################
+    # Command latency.
+    ########################################################################
+
+    def _record_command_latency(self, cmd, seconds):
+        """
+        Add a command round trip time to the latency histogram for the command
+        @param cmd The command sent
+        @param seconds Time from sending the command to matching its response
+        """
+        histogram = self._command_latency.get(cmd)
+        if histogram is None:
+            histogram = self._command_latency.setdefault(cmd, LatencyHistogram())
+        histogram.record(seconds)
+
+    def get_command_latency(self):
+        """
+        @retval A dict of command round trip latency histograms keyed by
+            command, as produced by LatencyHistogram.as_dict
+        """
+        return dict((str(cmd), histogram.as_dict())
+                    for (cmd, histogram) in self._command_latency.items())
+
+    def reset_command_latency(self):
+        """
+        Clear all command latency histograms
+        """
+        self._command_latency = {}
 
     ########################################################################
     # Scheduler interface.
@@ -334,7 +434,7 @@ class InstrumentProtocol(object):
         if(not self._scheduler_callback.get(name)):
             raise KeyError("scheduler does not exist for '%s'" % name)
 
-        log.debug("removing scheduler: %s" % name)
+        log.debug("removing scheduler: %s", name)
         callback = self._scheduler_callback.get(name)
         try:
             self._scheduler.remove_job(callback)
@@ -355,7 +455,7 @@ class InstrumentProtocol(object):
         if(self._scheduler_callback.get(name)):
             raise KeyError("duplicate scheduler exists for '%s'" % name)
 
-        log.debug("Add scheduler callback: %s" % name)
+        log.debug("Add scheduler callback: %s", name)
         self._scheduler_callback[name] = callback
         self._add_scheduler_job(name)
 
@@ -397,7 +497,7 @@ class InstrumentProtocol(object):
             raise KeyError("scheduler job already configured '%s'" % name)
 
         scheduler_config = self._get_scheduler_config()
-        log.debug("Scheduler config: %s" % scheduler_config)
+        log.debug("Scheduler config: %s", scheduler_config)
 
         # No config?  Nothing to do then.
         if(scheduler_config == None):
@@ -412,7 +512,7 @@ class InstrumentProtocol(object):
                 DriverSchedulerConfigKey.CALLBACK: callback
             }
             config = {name: self._scheduler_config[name]}
-            log.debug("Scheduler job with config: %s" % config)
+            log.debug("Scheduler job with config: %s", config)
 
             # start the job.  Note, this lazily starts the scheduler too :)
             self._scheduler.add_config(config)
@@ -440,11 +540,11 @@ class InstrumentProtocol(object):
         Activate all configured schedulers added using _add_scheduler.
         Timers start when the job is activated.
         """
-        log.debug("Scheduler config: %s" % self._get_scheduler_config())
-        log.debug("Scheduler callbacks: %s" % self._scheduler_callback)
+        log.debug("Scheduler config: %s", lazy(self._get_scheduler_config))
+        log.debug("Scheduler callbacks: %s", self._scheduler_callback)
         self._scheduler = DriverScheduler()
         for name in self._scheduler_callback.keys():
-            log.debug("Add job for callback: %s" % name)
+            log.debug("Add job for callback: %s", name)
             self._add_scheduler_job(name)
 
     #############################################################
@@ -535,7 +635,8 @@ class InstrumentProtocol(object):
             raise InstrumentParameterException("Invalid init config format")
 
         self._startup_config = config
-        
+        self._raw_publisher.configure(config.get(DriverConfigKey.RAW_STREAM))
+
         param_config = config.get(DriverConfigKey.PARAMETERS)
         if(param_config):
             for name in param_config.keys():
@@ -808,13 +909,18 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
     
         # Class of prompts used by device.
         self._prompts = prompts
-    
-        # Line buffer for input from device.
-        self._linebuf = ''
+
+        # Signalled by add_to_buffer so response waiters wake on new data.
+        # Guards the line and prompt buffers and the received byte count.
+        self._buffer_condition = Condition()
+        self._buffer_bytes_received = 0
+
+        # Line buffer for input from device, read and assigned as _linebuf.
+        self._linebuf_ring = RingBuffer(MAX_BUFFER_SIZE)
         
         # Short buffer to look for prompts from device in command-response
-        # mode.
-        self._promptbuf = ''
+        # mode, read and assigned as _promptbuf.
+        self._promptbuf_ring = RingBuffer(MAX_BUFFER_SIZE)
         
         # Lines of data awaiting further processing.
         self._datalines = []
@@ -827,6 +933,41 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
 
         self._last_data_receive_timestamp = None
 
+        # Seconds between debug dumps of the buffers in add_to_buffer, None
+        # disables them. Set by the buffer_log_interval driver config.
+        self._buffer_log_interval = None
+        self._buffer_log_time = 0
+
+    def set_init_params(self, config):
+        """
+        Set the initialization parameters, and the interval of the buffer
+        debug dumps from the buffer_log_interval driver config
+        @param config The driver config
+        @raise InstrumentParameterException If the config cannot be set
+        """
+        InstrumentProtocol.set_init_params(self, config)
+        self._buffer_log_interval = config.get(DriverConfigKey.BUFFER_LOG_INTERVAL)
+
+    def _get_linebuf(self):
+        return self._linebuf_ring.getvalue()
+
+    def _set_linebuf(self, value):
+        with self._buffer_condition:
+            self._linebuf_ring.clear()
+            self._linebuf_ring.write(value)
+
+    _linebuf = property(_get_linebuf, _set_linebuf)
+
+    def _get_promptbuf(self):
+        return self._promptbuf_ring.getvalue()
+
+    def _set_promptbuf(self, value):
+        with self._buffer_condition:
+            self._promptbuf_ring.clear()
+            self._promptbuf_ring.write(value)
+
+    _promptbuf = property(_get_promptbuf, _set_promptbuf)
+
     def _get_prompts(self):
         """
         Return a list of prompts order from longest to shortest.  The
@@ -887,24 +1028,34 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         else:
             pattern = response_regex.pattern
 
-        log.debug('_get_response: timeout=%s, prompt_list=%s, expected_prompt=%s, response_regex=%r, promptbuf=%s',
-                  timeout, prompt_list, expected_prompt, pattern, self._promptbuf)
-        while True:
-            if response_regex:
-                match = response_regex.search(self._linebuf)
-                if match:
-                    return match.groups()
-            else:
-                for item in prompt_list:
-                    index = self._promptbuf.find(item)
-                    if index >= 0:
-                        result = self._promptbuf[0:index+len(item)]
-                        return item, result
+        log.debug('_get_response: timeout=%s, prompt_list=%s, expected_prompt=%s, response_regex=%r',
+                  timeout, prompt_list, expected_prompt, pattern)
 
-            time.sleep(.1)
+        # Only the data written since the last check, plus enough of the old
+        # data to complete a prompt or a match of a bounded regex, is searched
+        since = None
+        width = match_width(response_regex) if response_regex else None
 
-            if time.time() > starttime + timeout:
-                raise InstrumentTimeoutException("in InstrumentProtocol._get_response()")
+        with self._buffer_condition:
+            while True:
+                if response_regex:
+                    ring = self._linebuf_ring
+                    match = ring.search(response_regex, since, width)
+                    if match:
+                        return match.groups()
+
+                    since = ring.end
+                else:
+                    ring = self._promptbuf_ring
+                    for item in prompt_list:
+                        index = ring.find(item, since)
+                        if index >= 0:
+                            result = ring.slice(ring.start, index+len(item))
+                            return item, result
+
+                    since = ring.end
+
+                self._wait_for_data(starttime, timeout, "in InstrumentProtocol._get_response()")
 
     def _get_raw_response(self, timeout=10, expected_prompt=None):
         """
@@ -928,15 +1079,29 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
             else:
                 prompt_list = expected_prompt
 
-        while True:
-            for item in prompt_list:
-                if self._promptbuf.rstrip(strip_chars).endswith(item.rstrip(strip_chars)):
-                    return (item, self._linebuf)
-                else:
-                    time.sleep(.1)
+        with self._buffer_condition:
+            while True:
+                # only the end of the prompt buffer is compared
+                for item in prompt_list:
+                    if self._promptbuf_ring.endswith(item.rstrip(strip_chars), strip_chars):
+                        return (item, self._linebuf)
 
-            if time.time() > starttime + timeout:
-                raise InstrumentTimeoutException("in InstrumentProtocol._get_raw_response()")
+                self._wait_for_data(starttime, timeout, "in InstrumentProtocol._get_raw_response()")
+
+    def _wait_for_data(self, starttime, timeout, message):
+        """
+        Block until add_to_buffer adds data or BUFFER_POLL_INTERVAL passes.
+        Must be called with the buffer condition held.
+        @param starttime The time the caller started waiting
+        @param timeout The timeout in seconds
+        @param message Message for the timeout exception
+        @throw InstrumentTimeoutException if the timeout has expired
+        """
+        remaining = starttime + timeout - time.time()
+        if remaining <= 0:
+            raise InstrumentTimeoutException(message)
+
+        self._buffer_condition.wait(min(remaining, BUFFER_POLL_INTERVAL))
 
     def _do_cmd_resp(self, cmd, *args, **kwargs):
         """
@@ -989,9 +1154,10 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         self._promptbuf = ''
 
         # Send command.
-        log.debug('_do_cmd_resp: %s, timeout=%s, write_delay=%s, expected_prompt=%s, response_regex=%s',
-                        repr(cmd_line), timeout, write_delay, expected_prompt, response_regex)
+        log.debug('_do_cmd_resp: %r, timeout=%s, write_delay=%s, expected_prompt=%s, response_regex=%s',
+                        cmd_line, timeout, write_delay, expected_prompt, response_regex)
 
+        sent_time = time.time()
         if (write_delay == 0):
             self._connection.send(cmd_line)
         else:
@@ -1010,6 +1176,8 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
             (prompt, result) = self._get_response(timeout,
                                                   expected_prompt=expected_prompt)
 
+        self._record_command_latency(cmd, time.time() - sent_time)
+
         resp_handler = self._response_handlers.get((self.get_current_state(), cmd), None) or \
             self._response_handlers.get(cmd, None)
         resp_result = None
@@ -1048,7 +1216,7 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         self._promptbuf = ''
 
         # Send command.
-        log.debug('_do_cmd_no_resp: %s, timeout=%s' % (repr(cmd_line), timeout))
+        log.debug('_do_cmd_no_resp: %r, timeout=%s', cmd_line, timeout)
         if (write_delay == 0):
             self._connection.send(cmd_line)
         else:
@@ -1065,7 +1233,7 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         """
 
         # Send command.
-        log.debug('_do_cmd_direct: <%s>' % cmd)
+        log.debug('_do_cmd_direct: <%s>', cmd)
         self._connection.send(cmd)
  
     ########################################################################
@@ -1084,8 +1252,8 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         data = port_agent_packet.get_data()
         timestamp = port_agent_packet.get_timestamp()
 
-        log.debug("Got Data: %r" % data)
-        log.debug("Add Port Agent Timestamp: %s" % timestamp)
+        log.debug("Got Data: %r", data)
+        log.debug("Add Port Agent Timestamp: %s", timestamp)
 
         if data_length > 0:
             if self.get_current_state() == DriverProtocolState.DIRECT_ACCESS:
@@ -1111,14 +1279,11 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
 
     def publish_raw(self, port_agent_packet):
         """
-        Publish raw data
+        Publish raw data as set by the raw_stream driver config, by default as
+        a raw data particle
         @param: port_agent_packet port agent packet containing raw
         """
-        particle = RawDataParticle(port_agent_packet.get_as_dict(),
-                                   port_timestamp=port_agent_packet.get_timestamp())
-
-        if self._driver_event:
-            self._driver_event(DriverAsyncEvent.SAMPLE, particle.generate())
+        self._raw_publisher.publish(port_agent_packet)
 
     def add_to_buffer(self, data):
         '''
@@ -1126,21 +1291,36 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         buffers implemented as lifo ring buffer
         @param data: bytes to add to the buffer
         '''
-        # Update the line and prompt buffers.
-        self._linebuf += data
-        self._promptbuf += data
-        self._last_data_timestamp = time.time()
-
-        # If our buffer exceeds the max allowable size then drop the leading
-        # characters on the floor.
-        if(len(self._linebuf) > self._max_buffer_size()):
-            self._linebuf = self._linebuf[self._max_buffer_size()*-1:]
+        with self._buffer_condition:
+            # Update the line and prompt buffers, if they exceed the max
+            # allowable size the leading characters are dropped on the floor.
+            max_size = self._max_buffer_size()
+            self._linebuf_ring.capacity = max_size
+            self._promptbuf_ring.capacity = max_size
+            self._linebuf_ring.write(data)
+            self._promptbuf_ring.write(data)
+            self._last_data_timestamp = time.time()
+
+            # Wake anything waiting on a response
+            self._buffer_bytes_received += len(data)
+            self._buffer_condition.notify_all()
+
+        self._log_buffers()
+
+    def _log_buffers(self):
+        '''
+        Dump the line and prompt buffers at debug level, at most once every
+        _buffer_log_interval seconds. Off unless buffer_log_interval is in
+        the driver config.
+        '''
+        if self._buffer_log_interval is None:
+            return
 
-        # If our buffer exceeds the max allowable size then drop the leading
-        # characters on the floor.
-        if(len(self._promptbuf) > self._max_buffer_size()):
-            self._promptbuf = self._linebuf[self._max_buffer_size()*-1:]
+        now = time.time()
+        if now - self._buffer_log_time < self._buffer_log_interval:
+            return
 
+        self._buffer_log_time = now
         log.debug("LINE BUF: %s", self._linebuf)
         log.debug("PROMPT BUF: %s", self._promptbuf)
 
@@ -1166,11 +1346,13 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
         @throw InstrumentTimeoutException if the device could not be woken.
         """
         # Clear the prompt buffer.
-        log.debug("clearing promptbuf: %s", self._promptbuf)
         self._promptbuf = ''
         
         # Grab time for timeout.
         starttime = time.time()
+
+        # Only search the prompt buffer written since the last attempt
+        since = None
         
         while True:
             # Send a line return and wait a sec.
@@ -1178,16 +1360,16 @@ class CommandResponseInstrumentProtocol(InstrumentProtocol):
             self._send_wakeup()
             time.sleep(delay)
 
-            log.debug("Prompts: %s", self._get_prompts())
+            prompts = self._get_prompts()
+            log.debug("Prompts: %s", prompts)
 
-            for item in self._get_prompts():
-                log.debug("buffer: %s", self._promptbuf)
-                log.debug("find prompt: %s", item)
-                index = self._promptbuf.find(item)
-                log.debug("Got prompt (index: %s): %s ", index, repr(self._promptbuf))
-                if index >= 0:
-                    log.trace('wakeup got prompt: %s', repr(item))
-                    return item
+            with self._buffer_condition:
+                for item in prompts:
+                    index = self._promptbuf_ring.find(item, since)
+                    if index >= 0:
+                        log.trace('wakeup got prompt: %r', item)
+                        return item
+                since = self._promptbuf_ring.end
             log.debug("Searched for all prompts")
 
             if time.time() > starttime + timeout:
@@ -1311,8 +1493,8 @@ class MenuInstrumentProtocol(CommandResponseInstrumentProtocol):
             except:
                 raise InstrumentProtocolException('MenuTree.get_directions(): node %s not in _node_directions dictionary'
                                                   %str(node))                
-            log.trace("MenuTree.get_directions(): _node_directions = %s, node = %s, d_list = %s" 
-                      %(str(self._node_directions), str(node), str(directions_list)))
+            log.trace("MenuTree.get_directions(): _node_directions = %s, node = %s, d_list = %s",
+                      self._node_directions, node, directions_list)
             directions = []
             for item in directions_list:
                 if not isinstance(item, self.Directions):
@@ -1408,7 +1590,7 @@ class MenuInstrumentProtocol(CommandResponseInstrumentProtocol):
         # iterate through the directions 
         directions_list = self._menu.get_directions(menu)
         for directions in directions_list:
-            log.debug('_navigate: directions: %s' %(directions))
+            log.debug('_navigate: directions: %s', directions)
             command = directions.get_command()
             response = directions.get_response()
             timeout = directions.get_timeout()
@@ -1437,10 +1619,10 @@ class MenuInstrumentProtocol(CommandResponseInstrumentProtocol):
         value = kwargs.pop('value', None)
         if cmd is None:
             cmd_line = self._build_simple_command(value) 
-            log.debug('_navigate_and_execute: sending value: %s to connection.send.' %(cmd_line))
+            log.debug('_navigate_and_execute: sending value: %s to connection.send.', cmd_line)
             self._connection.send(cmd_line)
         else:
-            log.debug('_navigate_and_execute: sending cmd: %s with kwargs: %s to _do_cmd_resp.' %(cmd, kwargs))
+            log.debug('_navigate_and_execute: sending cmd: %s with kwargs: %s to _do_cmd_resp.', cmd, kwargs)
             resp_result = self._do_cmd_resp(cmd, **kwargs)
  
         return resp_result
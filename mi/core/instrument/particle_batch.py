@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.particle_batch
+@file mi/core/instrument/particle_batch.py
+@brief Columnar batches of data particles. A batch holds the rows of a single
+stream as one array per parameter, with the particle metadata shared by every
+row, so parsers of large files don't have to build a particle object and a
+values list for every record.
+"""
+
+__license__ = 'Apache 2.0'
+
+import time
+import ntplib
+import numpy
+
+from mi.core.exceptions import SampleException
+from mi.core.instrument.data_particle import DataParticle, DataParticleKey, DataParticleValue
+from mi.core.instrument.data_particle import PARTICLE_ENCODER
+
+
+class ParticleBatch(object):
+    """
+    A batch of data particles of one stream stored by column. Each row
+    generates the same dict a DataParticle with those values would.
+    Missing values can be stored as None in a column with an object dtype.
+    """
+
+    def __init__(self, stream_name, columns,
+                 internal_timestamp=None,
+                 port_timestamp=None,
+                 preferred_timestamp=DataParticleKey.PORT_TIMESTAMP,
+                 quality_flag=DataParticleValue.OK,
+                 new_sequence=None,
+                 raw_data=None):
+        """
+        @param stream_name The stream (data particle type) of every row
+        @param columns A list of (value_id, values) pairs in the order the
+           values appear in each particle. The values are turned into arrays.
+        @param internal_timestamp A sequence of NTP internal timestamps, one
+           per row, or None
+        @param port_timestamp A sequence of NTP port timestamps, one per
+           row, or None
+        @param preferred_timestamp The preferred timestamp of every row
+        @param quality_flag The quality flag of every row
+        @param new_sequence The new sequence flag of the first row, the
+           other rows get False. None leaves the flag out of every row.
+        @param raw_data A sequence of the raw data of each row, or None
+        @throws SampleException if the columns aren't all the same length
+        """
+        if new_sequence is not None and not isinstance(new_sequence, bool):
+            raise TypeError("new_sequence is not a bool")
+        if preferred_timestamp is None:
+            raise SampleException("Missing preferred timestamp in particle batch")
+
+        self.stream_name = stream_name
+        self.preferred_timestamp = preferred_timestamp
+        self.quality_flag = quality_flag
+        self.new_sequence = new_sequence
+
+        self._parameters = []
+        self._columns = {}
+        for (value_id, values) in columns:
+            if value_id in self._columns:
+                raise SampleException("Duplicate parameter %s in particle batch" % value_id)
+            self._parameters.append(value_id)
+            self._columns[value_id] = numpy.asarray(values)
+
+        self.internal_timestamp = self._optional_column(internal_timestamp)
+        self.port_timestamp = self._optional_column(port_timestamp)
+        self.raw_data = raw_data
+
+        lengths = set(len(column) for column in self._columns.values())
+        for column in [self.internal_timestamp, self.port_timestamp, raw_data]:
+            if column is not None:
+                lengths.add(len(column))
+        if len(lengths) > 1:
+            raise SampleException("Particle batch columns have different lengths: %s" % sorted(lengths))
+        self._length = lengths.pop() if lengths else 0
+
+        # python lists of the columns, built once when rows are generated
+        self._values = None
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return "<ParticleBatch %s: %d rows of %s>" % (self.stream_name, self._length, self._parameters)
+
+    @staticmethod
+    def _optional_column(values):
+        if values is None:
+            return None
+        return numpy.asarray(values, dtype=float)
+
+    def parameters(self):
+        """
+        @retval The value IDs of the batch, in particle order
+        """
+        return list(self._parameters)
+
+    def rows(self, start, stop):
+        """
+        Take a run of rows out of the batch. Columns are sliced without
+        copying, and only a run starting at the first row keeps the new
+        sequence flag.
+        @param start The first row to take
+        @param stop The row to stop before
+        @retval A ParticleBatch of the rows
+        """
+        new_sequence = self.new_sequence
+        if new_sequence is not None and start > 0:
+            new_sequence = False
+
+        def sliced(values):
+            return values[start:stop] if values is not None else None
+
+        return ParticleBatch(self.stream_name,
+                             [(value_id, self._columns[value_id][start:stop]) for value_id in self._parameters],
+                             internal_timestamp=sliced(self.internal_timestamp),
+                             port_timestamp=sliced(self.port_timestamp),
+                             preferred_timestamp=self.preferred_timestamp,
+                             quality_flag=self.quality_flag,
+                             new_sequence=new_sequence,
+                             raw_data=sliced(self.raw_data))
+
+    def column(self, value_id):
+        """
+        @param value_id The value ID of the parameter
+        @retval The array of values of the parameter
+        @throws KeyError if the parameter isn't in the batch
+        """
+        return self._columns[value_id]
+
+    def _value_lists(self):
+        """
+        @retval The columns as lists of python values, so values encode the
+           same as the ones parsers put in particles
+        """
+        if self._values is None:
+            self._values = [self._columns[value_id].tolist() for value_id in self._parameters]
+        return self._values
+
+    def row_values(self, index):
+        """
+        @param index The row of the batch
+        @retval The values list of the row as DataParticle builds it
+        """
+        return [{DataParticleKey.VALUE_ID: value_id, DataParticleKey.VALUE: values[index]}
+                for (value_id, values) in zip(self._parameters, self._value_lists())]
+
+    def row_contents(self, index):
+        """
+        @param index The row of the batch
+        @retval The keyword arguments that build a DataParticle for the row
+        """
+        new_sequence = self.new_sequence
+        if new_sequence is not None and index > 0:
+            new_sequence = False
+        return {
+            'port_timestamp': self._timestamp(self.port_timestamp, index),
+            'internal_timestamp': self._timestamp(self.internal_timestamp, index),
+            'preferred_timestamp': self.preferred_timestamp,
+            'quality_flag': self.quality_flag,
+            'new_sequence': new_sequence,
+        }
+
+    @staticmethod
+    def _timestamp(timestamps, index):
+        if timestamps is None:
+            return None
+        return timestamps[index].item()
+
+    def generate_dicts(self):
+        """
+        Generate the particle dict of every row, the same as generate_dict
+        of the equivalent particles. The clock is read once for the batch.
+        @retval A list of particle dicts
+        """
+        base = {
+            DataParticleKey.PKT_FORMAT_ID: DataParticleValue.JSON_DATA,
+            DataParticleKey.PKT_VERSION: 1,
+            DataParticleKey.DRIVER_TIMESTAMP: ntplib.system_to_ntp_time(time.time()),
+            DataParticleKey.PREFERRED_TIMESTAMP: self.preferred_timestamp,
+            DataParticleKey.QUALITY_FLAG: self.quality_flag,
+            DataParticleKey.STREAM_NAME: self.stream_name,
+        }
+        if self.new_sequence is not None:
+            base[DataParticleKey.NEW_SEQUENCE] = False
+
+        internal = self.internal_timestamp.tolist() if self.internal_timestamp is not None else None
+        port = self.port_timestamp.tolist() if self.port_timestamp is not None else None
+        parameters = self._parameters
+
+        result = []
+        for (index, row) in enumerate(zip(*self._value_lists()) if parameters else [()] * self._length):
+            particle = dict(base)
+            # particles leave out timestamps that weren't set
+            if internal is not None and internal[index]:
+                particle[DataParticleKey.INTERNAL_TIMESTAMP] = internal[index]
+            if port is not None and port[index]:
+                particle[DataParticleKey.PORT_TIMESTAMP] = port[index]
+            particle[DataParticleKey.VALUES] = [{DataParticleKey.VALUE_ID: value_id, DataParticleKey.VALUE: value}
+                                                for (value_id, value) in zip(parameters, row)]
+            result.append(particle)
+
+        if result and self.new_sequence is not None:
+            result[0][DataParticleKey.NEW_SEQUENCE] = self.new_sequence
+        return result
+
+    def generate(self, sorted=False):
+        """
+        Generate the JSON of every row
+        @param sorted Returned sorted json dicts
+        @retval A list of JSON strings
+        """
+        return [PARTICLE_ENCODER.encode(particle, sort_keys=sorted) for particle in self.generate_dicts()]
+
+    def particles(self):
+        """
+        Expand the batch to classic data particles for consumers that need
+        them. Every particle gets the same driver timestamp.
+        @retval A list of BatchDataParticle, one per row
+        """
+        result = [BatchDataParticle(self, index) for index in range(self._length)]
+        driver_timestamp = ntplib.system_to_ntp_time(time.time())
+        for particle in result:
+            particle.contents[DataParticleKey.DRIVER_TIMESTAMP] = driver_timestamp
+        return result
+
+
+class BatchDataParticle(DataParticle):
+    """
+    A data particle for one row of a particle batch
+    """
+
+    def __init__(self, batch, index):
+        """
+        @param batch The ParticleBatch holding the row
+        @param index The row of the batch
+        """
+        raw_data = batch.raw_data[index] if batch.raw_data is not None else None
+        super(BatchDataParticle, self).__init__(raw_data, **batch.row_contents(index))
+        self._data_particle_type = batch.stream_name
+        self._batch = batch
+        self._index = index
+
+    def _build_parsed_values(self):
+        """
+        @retval The values of the row in the batch
+        """
+        return self._batch.row_values(self._index)
+
+
+def expand_particle_batches(samples):
+    """
+    Replace each particle batch in a list of samples with its particles
+    @param samples A list of data particles and particle batches
+    @retval A list of data particles
+    """
+    if not any(isinstance(sample, ParticleBatch) for sample in samples):
+        return samples
+
+    result = []
+    for sample in samples:
+        if isinstance(sample, ParticleBatch):
+            result.extend(sample.particles())
+        else:
+            result.append(sample)
+    return result
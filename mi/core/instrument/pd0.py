@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.pd0
+@file mi/core/instrument/pd0.py
+@brief Decoding of the Teledyne PD0 ensemble format shared by the ADCP
+instrument drivers and the PD0 dataset parsers. The per cell data types are
+mapped onto numpy structured arrays instead of being unpacked cell by cell,
+and the ensemble checksum is a vectorized byte sum.
+"""
+
+__license__ = 'Apache 2.0'
+
+import numpy
+
+from mi.core.exceptions import SampleException
+
+# The checksum is the sum of the ensemble bytes modulo 65536
+PD0_CHECKSUM_MASK = 0xFFFF
+PD0_CHECKSUM_BYTES = 2
+PD0_ID_BYTES = 2
+
+BEAMS = ('beam1', 'beam2', 'beam3', 'beam4')
+
+
+def cell_dtype(field_type):
+    """
+    @param field_type The numpy type of each beam value, with byte order
+    @retval A structured dtype for one depth cell of a four beam data type
+    """
+    return numpy.dtype([(beam, field_type) for beam in BEAMS])
+
+# velocities are signed little endian shorts, the other data types a byte
+# per beam
+VELOCITY_CELL = cell_dtype('<i2')
+BYTE_CELL = cell_dtype('u1')
+
+
+def pd0_checksum(data, start, end):
+    """
+    Calculate the checksum of part of an ensemble
+    @param data A string or buffer holding the ensemble
+    @param start The index of the first byte to sum
+    @param end The index after the last byte to sum
+    @retval The checksum as an int
+    """
+    if end <= start:
+        return 0
+    return int(numpy.frombuffer(data, dtype=numpy.uint8, count=end - start, offset=start).sum()) & PD0_CHECKSUM_MASK
+
+
+def pd0_checksum_valid(data, start, end):
+    """
+    Verify the checksum following an ensemble
+    @param data A string or buffer holding the ensemble and its checksum
+    @param start The index of the start of the ensemble
+    @param end The index of the checksum, after the last byte of the ensemble
+    @retval True if the checksum matches
+    """
+    if end + PD0_CHECKSUM_BYTES > len(data):
+        return False
+    stored = numpy.frombuffer(data, dtype='<u2', count=1, offset=end)[0]
+    return pd0_checksum(data, start, end) == stored
+
+
+def unpack_cells(data, dtype, num_cells, offset=PD0_ID_BYTES):
+    """
+    Decode the depth cells of a data type
+    @param data A string or buffer holding the data type
+    @param dtype The structured dtype of one cell, such as VELOCITY_CELL
+    @param num_cells The number of depth cells to decode
+    @param offset The index of the first cell, after the data type ID by default
+    @retval A list with a list of values per beam, in the order of the dtype
+       fields
+    @throws SampleException if the data is too short for the cells
+    """
+    if num_cells <= 0:
+        return [[] for _ in dtype.names]
+    if offset + num_cells * dtype.itemsize > len(data):
+        raise SampleException("PD0 data type too short for %d cells of %d bytes" % (num_cells, dtype.itemsize))
+
+    cells = numpy.frombuffer(data, dtype=dtype, count=num_cells, offset=offset)
+    return [cells[name].tolist() for name in dtype.names]
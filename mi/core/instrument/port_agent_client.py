@@ -12,6 +12,7 @@ __author__ = 'David Everett'
 __license__ = 'Apache 2.0'
 
 import socket
+import select
 import errno
 import threading
 import time
@@ -21,8 +22,12 @@ import array
 import binascii
 import ctypes
 import subprocess
+import bisect
 
-from mi.core.log import get_logger ; log = get_logger()
+import numpy
+
+from mi.core.common import BaseEnum
+from mi.core.log import get_logger, lazy ; log = get_logger()
 from mi.core.exceptions import InstrumentConnectionException
 
 HEADER_SIZE = 16 # BBBBHHLL = 1 + 1 + 1 + 1 + 2 + 2 + 4 + 4 = 16
@@ -31,6 +36,16 @@ HEADER_SIZE = 16 # BBBBHHLL = 1 + 1 + 1 + 1 + 2 + 2 + 4 + 4 = 16
 OFFSET_P_CHECKSUM_LOW = 6
 OFFSET_P_CHECKSUM_HIGH = 7
 
+# B = unsigned char size 1 bytes
+# H = unsigned short size 2 bytes
+# I = unsigned int size 4 bytes
+HEADER_STRUCT = struct.Struct('>BBBBHHII')
+
+# The sync bytes every header starts with, and the packet size field
+SYNC = '\xa3\x9d\x7a'
+LENGTH_STRUCT = struct.Struct('>H')
+OFFSET_P_LENGTH = 4
+
 """
 Offsets into the unpacked header fields
 """
@@ -47,6 +62,12 @@ SYSTEM_EPOCH = datetime.date(*time.gmtime(0)[0:3])
 NTP_EPOCH = datetime.date(1900, 1, 1)
 NTP_DELTA = (SYSTEM_EPOCH - NTP_EPOCH).days * 24 * 3600
 
+# The port agent timestamp is the upper word, a decimal point and the lower
+# word written out in decimal. These find the scale of the lower word without
+# formatting the timestamp as a string.
+DECIMAL_LIMITS = [10 ** digits for digits in range(1, 10)]
+DECIMAL_SCALES = [10.0 ** digits for digits in range(1, 11)]
+
 
 """
 NOTE!!! MAX_RECOVERY_ATTEMPTS must not be greater than 1; if we decide
@@ -58,10 +79,71 @@ MIN_RETRY_WINDOW = 2 # 2 seconds
 
 MAX_SEND_ATTEMPTS = 15              # Max number of times we can get EAGAIN
 
+# Size of the reusable read buffer of a buffered listener. A packet can be
+# up to 64k, the most the header length can hold.
+READ_BUFFER_SIZE = 256 * 1024
+
+# Seconds a buffered listener waits for data before checking if it is done
+READ_TIMEOUT = .1
+
+
+class ListenerStatKey(BaseEnum):
+    """
+    Keys in the dict produced by Listener.get_stats
+    """
+    PACKETS = 'packets'
+    BYTES = 'bytes'
+    BATCHES = 'batches'
+    ELAPSED = 'elapsed'
+    PACKETS_PER_SECOND = 'packets_per_second'
+    BYTES_PER_SECOND = 'bytes_per_second'
+
 
 class SocketClosed(Exception): pass
 
 
+def header_timestamp(upper, lower):
+    """
+    @param upper The upper word of a header timestamp
+    @param lower The lower word of a header timestamp
+    @retval The timestamp, the same as float("%s.%s" % (upper, lower))
+    """
+    return upper + lower / DECIMAL_SCALES[bisect.bisect_right(DECIMAL_LIMITS, lower)]
+
+
+def byte_values(data):
+    """
+    @param data A str, bytearray, memoryview or other buffer
+    @retval A numpy array of the bytes of the buffer, sharing its memory
+    """
+    if isinstance(data, memoryview):
+        return numpy.asarray(data)
+    return numpy.frombuffer(data, dtype=numpy.uint8)
+
+
+def xor_bytes(data):
+    """
+    XOR the bytes of a buffer together, without copying it
+    @param data A str, bytearray, memoryview or other buffer
+    @retval The XOR of every byte, 0 if the buffer is empty
+    """
+    return int(numpy.bitwise_xor.reduce(byte_values(data)))
+
+
+def packet_checksum(header, data):
+    """
+    The checksum of a port agent packet, the XOR of every byte of the header
+    except the checksum and every byte of the data
+    @param header The packet header
+    @param data The packet data
+    @retval The checksum
+    """
+    header = byte_values(header)
+    return (int(numpy.bitwise_xor.reduce(header[:OFFSET_P_CHECKSUM_LOW])) ^
+            int(numpy.bitwise_xor.reduce(header[OFFSET_P_CHECKSUM_HIGH + 1:HEADER_SIZE])) ^
+            xor_bytes(data))
+
+
 class PortAgentPacket():
     """
     An object that encapsulates the details packets that are sent to and
@@ -91,22 +173,24 @@ class PortAgentPacket():
         self.__recv_checksum  = None
         self.__checksum = None
         self.__isValid = False
+        # True once verify_checksum has checked the current header and data
+        self.__verified = False
 
     def unpack_header(self, header):
+        """
+        Decode a received header
+        @param header The header, a str or any buffer including a memoryview
+        """
         self.__header = header
+        self.__verified = False
         #@TODO may want to switch from big endian to network order '!' instead of '>' note network order is big endian.
-        # B = unsigned char size 1 bytes
-        # H = unsigned short size 2 bytes
-        # L = unsigned long size 4 bytes
-        # d = float size8 bytes
-        variable_tuple = struct.unpack_from('>BBBBHHII', header)
+        variable_tuple = HEADER_STRUCT.unpack_from(header)
         # change offset to index.
         self.__type = variable_tuple[TYPE_INDEX]
-        self.__length = int(variable_tuple[LENGTH_INDEX]) - HEADER_SIZE
-        self.__recv_checksum  = int(variable_tuple[CHECKSUM_INDEX])
-        upper = variable_tuple[TIMESTAMP_UPPER_INDEX]
-        lower = variable_tuple[TIMESTAMP_LOWER_INDEX]
-        self.__port_agent_timestamp = float("%s.%s" % (upper, lower))
+        self.__length = variable_tuple[LENGTH_INDEX] - HEADER_SIZE
+        self.__recv_checksum  = variable_tuple[CHECKSUM_INDEX]
+        self.__port_agent_timestamp = header_timestamp(variable_tuple[TIMESTAMP_UPPER_INDEX],
+                                                       variable_tuple[TIMESTAMP_LOWER_INDEX])
         #log.trace("port_timestamp: %f", self.__port_agent_timestamp)
 
     def pack_header(self):
@@ -162,33 +246,27 @@ class PortAgentPacket():
 
 
     def attach_data(self, data):
+        """
+        @param data The packet data, a str or a buffer such as the memoryview
+           it was received into, which is kept without copying it
+        """
         self.__data = data
+        self.__verified = False
 
     def calculate_checksum(self):
-        checksum = 0
-        for i in range(HEADER_SIZE):
-            if i < OFFSET_P_CHECKSUM_LOW or i > OFFSET_P_CHECKSUM_HIGH:
-                checksum ^= struct.unpack_from('B', str(self.__header[i]))[0]
-                
-        for i in range(self.__length):
-            checksum ^= struct.unpack_from('B', str(self.__data[i]))[0]
-            
-        return checksum
-            
-                                
+        data = self.__data
+        if len(data) != self.__length:
+            data = memoryview(data)[:self.__length]
+        return packet_checksum(self.__header, data)
+
     def verify_checksum(self):
-        checksum = 0
-        for i in range(HEADER_SIZE):
-            if i < OFFSET_P_CHECKSUM_LOW or i > OFFSET_P_CHECKSUM_HIGH:
-                checksum ^= struct.unpack_from('B', self.__header[i])[0]
-                
-        for i in range(self.__length):
-            checksum ^= struct.unpack_from('B', self.__data[i])[0]
-            
-        if checksum == self.__recv_checksum:
-            self.__isValid = True
-        else:
-            self.__isValid = False
+        """
+        Check the received checksum. The result is kept until the header or
+        data change, so verifying a packet again is free.
+        """
+        if not self.__verified:
+            self.__isValid = self.calculate_checksum() == self.__recv_checksum
+            self.__verified = True
             
         #log.debug('checksum: %i.' %(checksum))
 
@@ -202,10 +280,27 @@ class PortAgentPacket():
         this is one of the hoops we jump through to do that.
         """
         self.__header = header
+        self.__verified = False
 
     def get_data(self):
+        """
+        @retval The packet data as a str. Data attached as a buffer is copied
+           to a str the first time it is asked for.
+        """
+        if isinstance(self.__data, memoryview):
+            self.__data = self.__data.tobytes()
+        elif isinstance(self.__data, bytearray):
+            self.__data = str(self.__data)
         return self.__data
 
+    def get_data_buffer(self):
+        """
+        @retval A memoryview of the packet data, without copying it
+        """
+        if isinstance(self.__data, memoryview):
+            return self.__data
+        return memoryview(self.__data)
+
     def get_timestamp(self):
         return self.__port_agent_timestamp
 
@@ -220,6 +315,7 @@ class PortAgentPacket():
 
     def set_data_length(self, length):
         self.__length = length
+        self.__verified = False
 
     def get_header_type(self):
         return self.__type
@@ -238,7 +334,7 @@ class PortAgentPacket():
             'type': self.__type,
             'length': self.__length,
             'checksum': self.__checksum,
-            'raw': self.__data
+            'raw': self.get_data()
         }
 
     def is_valid(self):
@@ -257,9 +353,11 @@ class PortAgentClient(object):
     HEARTBEAT_INTERVAL_COMMAND = "heartbeat_interval "
     BREAK_COMMAND = "break "
     
-    def __init__(self, host, port, cmd_port, delim=None):
+    def __init__(self, host, port, cmd_port, delim=None, buffered=False):
         """
         PortAgentClient constructor.
+        @param buffered True for the listener to read as many packets as are
+        available at once and deliver the instrument data in batches.
         """
         self.host = host
         self.port = port
@@ -268,11 +366,13 @@ class PortAgentClient(object):
         self.listener_thread = None
         self.stop_event = None
         self.delim = delim
+        self.buffered = buffered
         self.heartbeat = 0
         self.max_missed_heartbeats = None
         self.send_attempts = MAX_SEND_ATTEMPTS
         self.recovery_attempts = 0
         self.user_callback_data = None
+        self.user_callback_data_batch = None
         self.user_callback_raw = None
         self.user_callback_error = None
         self.listener_callback_error = None
@@ -310,7 +410,9 @@ class PortAgentClient(object):
                                                 self.callback_raw,
                                                 self.listener_callback_error,
                                                 self.callback_error,
-                                                self.user_callback_error)
+                                                self.user_callback_error,
+                                                self.callback_data_batch,
+                                                self.buffered)
                 self.listener_thread.start()
 
             ###
@@ -320,8 +422,8 @@ class PortAgentClient(object):
             ###
             if (self.last_retry_time):
                 current_time = time.time()
-                log.debug(" Thread %s: current_time: %r; last_retry_time: %r", 
-                          str(threading.current_thread().name), current_time,  (self.last_retry_time))
+                log.debug(" Thread %s: current_time: %r; last_retry_time: %r",
+                          lazy(lambda: threading.current_thread().name), current_time,  (self.last_retry_time))
                 if current_time > (self.last_retry_time + MIN_RETRY_WINDOW):
                     log.debug("Outside min retry window: reseting retry counter")
                     self.recovery_attempts = 0
@@ -363,9 +465,16 @@ class PortAgentClient(object):
     def init_comms(self, user_callback_data = None, user_callback_raw = None,
                    listener_callback_error = None,
                    user_callback_error = None, heartbeat = 0,
-                   max_missed_heartbeats = None, start_listener = True):
+                   max_missed_heartbeats = None, start_listener = True,
+                   user_callback_data_batch = None):
+        """
+        @param user_callback_data_batch Called with a list of instrument
+        data packets by a buffered listener. Without it user_callback_data
+        is called with each packet of the batch.
+        """
         
         self.user_callback_data = user_callback_data        
+        self.user_callback_data_batch = user_callback_data_batch
         self.user_callback_raw = user_callback_raw
         self.listener_callback_error = listener_callback_error
         self.user_callback_error = user_callback_error
@@ -410,6 +519,31 @@ class PortAgentClient(object):
         else:
             log.error("No user_callback_data defined")
 
+    def callback_data_batch(self, paPackets):
+        """
+        A batch of instrument data packets has been received by a buffered
+        listener.
+        """
+        for paPacket in paPackets:
+            paPacket.verify_checksum()
+
+        if self.user_callback_data_batch:
+            self.user_callback_data_batch(paPackets)
+        elif self.user_callback_data:
+            for paPacket in paPackets:
+                self.user_callback_data(paPacket)
+        else:
+            log.error("No user_callback_data defined")
+
+    def get_stats(self):
+        """
+        @retval The packet and byte counts and rates of the listener, as
+        produced by Listener.get_stats, or None without a listener.
+        """
+        if self.listener_thread:
+            return self.listener_thread.get_stats()
+        return None
+
     def callback_raw(self, paPacket):
         """
         A packet has been received from the port agent.  The packet is 
@@ -470,7 +604,7 @@ class PortAgentClient(object):
         Send a configuration parameter to the port agent
         """
         command = parameter + value
-        log.debug("Sending config parameter: %s" % (command))
+        log.debug("Sending config parameter: %s", command)
         self._command_port_agent(command)
 
     def send_break(self, duration):
@@ -594,7 +728,9 @@ class Listener(threading.Thread):
                  callback_data = None, callback_raw = None,
                  default_callback_error = None,
                  local_callback_error = None,
-                 user_callback_error = None):
+                 user_callback_error = None,
+                 callback_data_batch = None,
+                 buffered = False):
         """
         Listener thread constructor.
         @param sock The socket to listen on.
@@ -609,6 +745,11 @@ class Listener(threading.Thread):
         @param default_callback_data A callback to handle non-network exceptions
         @param local_callback_data The local callback when error encountered.
         @param user_callback_data The user callback on error_encountered.
+        @param callback_data_batch The callback for a batch of instrument
+        data packets read together in buffered mode.
+        @param buffered True to read as many packets as are available at
+        once into a reusable buffer, instead of reading each packet's header
+        and data separately.
         """
         threading.Thread.__init__(self)
         self.sock = sock
@@ -618,6 +759,13 @@ class Listener(threading.Thread):
         self.delim = delim
         self.heartbeat_timer = None
         self.thread_name = None
+        self.buffered = buffered
+        self._read_buffer = bytearray(READ_BUFFER_SIZE) if buffered else None
+        self._read_view = memoryview(self._read_buffer) if buffered else None
+        self._read_start = 0
+        self._read_end = 0
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
         if (max_missed_heartbeats == None):
             self.max_missed_heartbeats = self.MAX_MISSED_HEARTBEATS
         else:
@@ -632,6 +780,13 @@ class Listener(threading.Thread):
             else:
                 log.error("No callback_data function has been registered")
 
+        def fn_callback_data_batch(paPackets):
+            if callback_data_batch:
+                callback_data_batch(paPackets)
+            else:
+                for paPacket in paPackets:
+                    fn_callback_data(paPacket)
+
         def fn_callback_raw(paPacket):
             if callback_raw:
                 callback_raw(paPacket)
@@ -678,6 +833,7 @@ class Listener(threading.Thread):
         Now that the callbacks have have been defined, assign them
         """                
         self.callback_data = fn_callback_data
+        self.callback_data_batch = fn_callback_data_batch
         self.callback_raw = fn_callback_raw
         self.local_callback_error = fn_local_callback_error
         self.user_callback_error = fn_user_callback_error
@@ -771,6 +927,202 @@ class Listener(threading.Thread):
             self.heartbeat_missed_count = self.max_missed_heartbeats
 
 
+    def _read_packet(self):
+        """
+        Receive one packet, reading its header and then its data, and
+        handle it.
+        """
+        log.debug('RX NEW PACKET')
+        header = bytearray(HEADER_SIZE)
+        headerview = memoryview(header)
+        bytes_left = HEADER_SIZE
+        while bytes_left and not self._done:
+            try:
+                bytesrx = self.sock.recv_into(headerview[HEADER_SIZE - bytes_left:], bytes_left)
+                log.debug('RX HEADER BYTES %d LEFT %d SOCK %r', bytesrx, bytes_left, self.sock)
+                if bytesrx <= 0:
+                    raise SocketClosed()
+                bytes_left -= bytesrx
+            except socket.error as e:
+                if e.errno == errno.EWOULDBLOCK:
+                    time.sleep(.1)
+                else:
+                    raise
+
+        """
+        Only do this if we've received the whole header, otherwise (ex. during shutdown)
+        we can have a completely invalid header, resulting in negative count exceptions.
+        """
+        if (bytes_left == 0):
+            paPacket = PortAgentPacket()
+            paPacket.unpack_header(headerview)
+            data_size = paPacket.get_data_length()
+            bytes_left = data_size
+            data = bytearray(data_size)
+            dataview = memoryview(data)
+            log.debug('Expecting DATA BYTES %d', data_size)
+
+        while bytes_left and not self._done:
+            try:
+                bytesrx = self.sock.recv_into(dataview[data_size - bytes_left:], bytes_left)
+                log.debug('RX DATA BYTES %d LEFT %d SOCK %r', bytesrx, bytes_left, self.sock)
+                if bytesrx <= 0:
+                    raise SocketClosed()
+                bytes_left -= bytesrx
+            except socket.error as e:
+                if e.errno == errno.EWOULDBLOCK:
+                    time.sleep(.1)
+                else:
+                    raise
+
+        if not self._done:
+            """
+            Should have complete port agent packet.
+            """
+            paPacket.attach_data(dataview)
+            log.debug("HANDLE PACKET")
+            self._count(1, HEADER_SIZE + data_size)
+            self.handle_packet(paPacket)
+
+    def _read_packets(self):
+        """
+        Read as much as is available into the read buffer and handle every
+        complete packet in it. The bytes of a partial packet are kept for
+        the next read.
+        """
+        if self._read_end == len(self._read_buffer):
+            self._compact_read_buffer()
+
+        readable, _, _ = select.select([self.sock], [], [], READ_TIMEOUT)
+        if not readable or self._done:
+            return
+
+        try:
+            bytesrx = self.sock.recv_into(self._read_view[self._read_end:])
+        except socket.error as e:
+            if e.errno == errno.EWOULDBLOCK:
+                return
+            raise
+        if bytesrx <= 0:
+            raise SocketClosed()
+        self._read_end += bytesrx
+
+        packets = []
+        packet_bytes = 0
+        buf = self._read_buffer
+        view = self._read_view
+        start = self._read_start
+        end = self._read_end
+        while end - start >= HEADER_SIZE:
+            length = LENGTH_STRUCT.unpack_from(buf, start + OFFSET_P_LENGTH)[0]
+            if length < HEADER_SIZE or buf[start:start + len(SYNC)] != SYNC:
+                start = self._resync(start, end)
+                continue
+            if end - start < length:
+                break
+
+            # the packets are copied out of the buffer, which is reused
+            paPacket = PortAgentPacket()
+            paPacket.unpack_header(view[start:start + HEADER_SIZE].tobytes())
+            paPacket.attach_data(view[start + HEADER_SIZE:start + length].tobytes())
+            packets.append(paPacket)
+            packet_bytes += length
+            start += length
+
+        if start == end:
+            self._read_start = self._read_end = 0
+        else:
+            self._read_start = start
+
+        self._count(len(packets), packet_bytes)
+        if packets:
+            self.handle_packets(packets)
+
+    def _resync(self, start, end):
+        """
+        Skip bytes that are not the start of a packet
+        @retval The offset of the next sync bytes, or of the last bytes of
+        the buffer that could start them
+        """
+        index = self._read_buffer.find(SYNC, start + 1, end)
+        if index < 0:
+            index = max(start + 1, end - len(SYNC) + 1)
+        log.error('Listener thread: %s skipped %d bytes that are not a port agent packet',
+                  self.thread_name, index - start)
+        return index
+
+    def _compact_read_buffer(self):
+        """
+        Make room in the full read buffer, by moving a partial packet to the
+        front or, if it already is at the front, growing the buffer.
+        """
+        if self._read_start:
+            size = self._read_end - self._read_start
+            self._read_buffer[:size] = self._read_view[self._read_start:self._read_end].tobytes()
+            self._read_start = 0
+            self._read_end = size
+        else:
+            self._read_view = None
+            self._read_buffer.extend(bytearray(len(self._read_buffer)))
+            self._read_view = memoryview(self._read_buffer)
+
+    def handle_packets(self, paPackets):
+        """
+        Handle packets read together. Consecutive instrument data packets
+        are delivered as one batch, after the raw callback of each. Any
+        other packet is handled after the data packets before it are
+        delivered, so packets are handled in the order they were read.
+        """
+        batch = []
+        for paPacket in paPackets:
+            packet_type = paPacket.get_header_type()
+            if packet_type == PortAgentPacket.DATA_FROM_INSTRUMENT or \
+                    packet_type == PortAgentPacket.PICKLED_DATA_FROM_INSTRUMENT:
+                self.callback_raw(paPacket)
+                batch.append(paPacket)
+            else:
+                if batch:
+                    self.callback_data_batch(batch)
+                    batch = []
+                self.handle_packet(paPacket)
+
+        if batch:
+            self.callback_data_batch(batch)
+
+    def _count(self, packets, packet_bytes):
+        with self._stats_lock:
+            self._packets += packets
+            self._bytes += packet_bytes
+            if packets:
+                self._batches += 1
+
+    def get_stats(self):
+        """
+        @retval A dict of the packets and bytes received since the listener
+        started or the stats were reset, the number of reads that returned
+        packets, and the packet and byte rates
+        """
+        with self._stats_lock:
+            elapsed = time.time() - self._stats_start
+            return {
+                ListenerStatKey.PACKETS: self._packets,
+                ListenerStatKey.BYTES: self._bytes,
+                ListenerStatKey.BATCHES: self._batches,
+                ListenerStatKey.ELAPSED: elapsed,
+                ListenerStatKey.PACKETS_PER_SECOND: self._packets / elapsed if elapsed > 0 else 0.0,
+                ListenerStatKey.BYTES_PER_SECOND: self._bytes / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def reset_stats(self):
+        """
+        Clear the counts and restart the rates
+        """
+        with self._stats_lock:
+            self._packets = 0
+            self._bytes = 0
+            self._batches = 0
+            self._stats_start = time.time()
+
     def run(self):
         """
         Listener thread processing loop. Block on receive from port agent.
@@ -786,58 +1138,10 @@ class Listener(threading.Thread):
 
         while not self._done:
             try:
-                log.debug('RX NEW PACKET')
-                header = bytearray(HEADER_SIZE)
-                headerview = memoryview(header)
-                bytes_left = HEADER_SIZE
-                while bytes_left and not self._done:
-                    try:
-                        bytesrx = self.sock.recv_into(headerview[HEADER_SIZE - bytes_left:], bytes_left)
-                        log.debug('RX HEADER BYTES %d LEFT %d SOCK %r' % (
-                                                    bytesrx, bytes_left, self.sock,))
-                        if bytesrx <= 0:
-                            raise SocketClosed()
-                        bytes_left -= bytesrx
-                    except socket.error as e:
-                        if e.errno == errno.EWOULDBLOCK:
-                            time.sleep(.1)
-                        else:
-                            raise
-
-                """
-                Only do this if we've received the whole header, otherwise (ex. during shutdown)
-                we can have a completely invalid header, resulting in negative count exceptions.
-                """
-                if (bytes_left == 0):
-                    paPacket = PortAgentPacket()
-                    paPacket.unpack_header(str(header))
-                    data_size = paPacket.get_data_length()
-                    bytes_left = data_size
-                    data = bytearray(data_size)
-                    dataview = memoryview(data)
-                    log.debug('Expecting DATA BYTES %d' % data_size)
-                    
-                while bytes_left and not self._done:
-                    try:
-                        bytesrx = self.sock.recv_into(dataview[data_size - bytes_left:], bytes_left)
-                        log.debug('RX DATA BYTES %d LEFT %d SOCK %r' % (
-                                                    bytesrx, bytes_left, self.sock,))
-                        if bytesrx <= 0:
-                            raise SocketClosed()
-                        bytes_left -= bytesrx
-                    except socket.error as e:
-                        if e.errno == errno.EWOULDBLOCK:
-                            time.sleep(.1)
-                        else:
-                            raise
-
-                if not self._done:
-                    """
-                    Should have complete port agent packet.
-                    """
-                    paPacket.attach_data(str(data))
-                    log.debug("HANDLE PACKET")
-                    self.handle_packet(paPacket)
+                if self.buffered:
+                    self._read_packets()
+                else:
+                    self._read_packet()
 
             except SocketClosed:
                 errorString = 'Listener thread: %s SocketClosed exception from port_agent socket' \
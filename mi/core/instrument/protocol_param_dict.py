@@ -22,7 +22,7 @@ from mi.core.exceptions import InstrumentParameterException
 from mi.core.exceptions import InstrumentParameterExpirationException
 from mi.core.instrument.instrument_dict import InstrumentDict
 
-from mi.core.log import get_logger ; log = get_logger()
+from mi.core.log import get_logger, lazy ; log = get_logger()
 
 EGG_PATH = "resource"
 DEFAULT_FILENAME = "strings.yml"
@@ -379,7 +379,7 @@ class FunctionParameter(Parameter):
         result = self.f_getval(input)
         if result != orig_value:
             self.value.set_value(result)
-            log.trace('Updated parameter %s=%s', self.name, self.value.get_value())
+            log.trace('Updated parameter %s=%s', self.name, lazy(self.value.get_value))
             return True
         else:
             return False
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.raw_publisher
+@file mi/core/instrument/raw_publisher.py
+@brief Publishing of the raw port agent packets of an instrument. By default
+each packet is published as a JSON raw data particle with its payload base64
+encoded, as protocols always did. The raw stream can instead be turned off,
+sampled, or batched into binary frames that carry the payload bytes as they
+are, published when a frame reaches a size or a time limit.
+"""
+
+__license__ = 'Apache 2.0'
+
+import struct
+import threading
+
+from mi.core.common import BaseEnum
+from mi.core.exceptions import InstrumentParameterException
+from mi.core.instrument.data_particle import RawDataParticle, RawDataParticleKey
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.log import get_logger ; log = get_logger()
+
+
+class RawStreamMode(BaseEnum):
+    # a raw data particle for every packet
+    PARTICLE = 'particle'
+    # no raw data
+    OFF = 'off'
+    # a raw data particle for one packet in every sample_every packets
+    SAMPLED = 'sampled'
+    # binary frames of the packets received within max_bytes or max_interval
+    BATCHED = 'batched'
+
+
+class RawStreamConfigKey(BaseEnum):
+    """
+    Keys of the 'raw_stream' driver config
+    """
+    MODE = 'mode'
+    SAMPLE_EVERY = 'sample_every'
+    # publish a frame once it holds this many payload bytes
+    MAX_BYTES = 'max_bytes'
+    # or this many seconds after its first packet
+    MAX_INTERVAL = 'max_interval'
+
+
+class RawStreamStatKey(BaseEnum):
+    PACKETS = 'packets'
+    BYTES = 'bytes'
+    PUBLISHED_PACKETS = 'published_packets'
+    FRAMES = 'frames'
+
+
+# The frame header: magic, version, packet count
+RAW_FRAME_MAGIC = 'RAW'
+RAW_FRAME_VERSION = 1
+RAW_FRAME_HEADER = struct.Struct('!3sBI')
+# The header of each packet in a frame, followed by its payload: port
+# timestamp, packet type, checksum, payload length
+RAW_PACKET_HEADER = struct.Struct('!dBHI')
+
+RAW_PORT_TIMESTAMP = 'port_timestamp'
+
+DEFAULT_SAMPLE_EVERY = 10
+DEFAULT_MAX_BYTES = 65536
+DEFAULT_MAX_INTERVAL = 1.0
+
+
+def _packet_checksum(port_agent_packet):
+    checksum = port_agent_packet.get_header_checksum()
+    if checksum is None:
+        checksum = port_agent_packet.get_header_recv_checksum()
+    return checksum or 0
+
+
+def encode_raw_frame(port_agent_packets):
+    """
+    @param port_agent_packets A list of port agent packets
+    @retval A binary frame of the packets
+    """
+    parts = [RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, len(port_agent_packets))]
+    for port_agent_packet in port_agent_packets:
+        data = port_agent_packet.get_data()
+        parts.append(RAW_PACKET_HEADER.pack(port_agent_packet.get_timestamp() or 0.0,
+                                            port_agent_packet.get_header_type() or 0,
+                                            _packet_checksum(port_agent_packet),
+                                            len(data)))
+        parts.append(data)
+    return ''.join(parts)
+
+
+def decode_raw_frame(frame):
+    """
+    @param frame A binary frame from encode_raw_frame
+    @retval A list of packet dicts with the RawDataParticleKey keys, the raw
+       payload bytes not base64 encoded, and the port timestamp
+    @throws ValueError if the frame is malformed
+    """
+    try:
+        (magic, version, count) = RAW_FRAME_HEADER.unpack_from(frame)
+    except struct.error:
+        raise ValueError("Raw frame is too short")
+    if magic != RAW_FRAME_MAGIC or version != RAW_FRAME_VERSION:
+        raise ValueError("Unknown raw frame format %r %r" % (magic, version))
+
+    packets = []
+    offset = RAW_FRAME_HEADER.size
+    for _ in xrange(count):
+        try:
+            (timestamp, packet_type, checksum, length) = RAW_PACKET_HEADER.unpack_from(frame, offset)
+        except struct.error:
+            raise ValueError("Raw frame is truncated")
+        offset += RAW_PACKET_HEADER.size
+        if offset + length > len(frame):
+            raise ValueError("Raw frame is truncated")
+        packets.append({
+            RawDataParticleKey.PAYLOAD: frame[offset:offset + length],
+            RawDataParticleKey.LENGTH: length,
+            RawDataParticleKey.TYPE: packet_type,
+            RawDataParticleKey.CHECKSUM: checksum,
+            RAW_PORT_TIMESTAMP: timestamp
+        })
+        offset += length
+
+    if offset != len(frame):
+        raise ValueError("Raw frame has %d extra bytes" % (len(frame) - offset))
+    return packets
+
+
+class RawPublisher(object):
+    """
+    Publishes the raw port agent packets of a protocol as configured by the
+    'raw_stream' driver config. Raw data particles are sent as SAMPLE events,
+    binary frames as RAW events.
+    """
+    def __init__(self, driver_event, config=None):
+        """
+        @param driver_event The callback for asynchronous driver events,
+           called with the event type and value
+        @param config The 'raw_stream' config, or None for a particle per
+           packet
+        """
+        self._driver_event = driver_event
+        self._lock = threading.Lock()
+        self._batch = []
+        self._batch_bytes = 0
+        self._timer = None
+        self._count = 0
+        self.reset_stats()
+        self.configure(config)
+
+    def configure(self, config):
+        """
+        @param config The 'raw_stream' config with RawStreamConfigKey keys,
+           or None for a particle per packet
+        @throws InstrumentParameterException if the config is invalid
+        """
+        config = config or {}
+        if not isinstance(config, dict):
+            raise InstrumentParameterException("Invalid raw stream config format")
+
+        mode = config.get(RawStreamConfigKey.MODE, RawStreamMode.PARTICLE)
+        if not RawStreamMode.has(mode):
+            raise InstrumentParameterException("Unknown raw stream mode: %s" % mode)
+
+        try:
+            sample_every = int(config.get(RawStreamConfigKey.SAMPLE_EVERY, DEFAULT_SAMPLE_EVERY))
+            max_bytes = int(config.get(RawStreamConfigKey.MAX_BYTES, DEFAULT_MAX_BYTES))
+            max_interval = float(config.get(RawStreamConfigKey.MAX_INTERVAL, DEFAULT_MAX_INTERVAL))
+        except (TypeError, ValueError) as e:
+            raise InstrumentParameterException("Invalid raw stream config: %s" % e)
+        if sample_every < 1:
+            raise InstrumentParameterException("Invalid raw stream sample_every: %s" % sample_every)
+
+        # publish what was batched under the previous config
+        self.flush()
+        self._mode = mode
+        self._sample_every = sample_every
+        self._max_bytes = max_bytes
+        self._max_interval = max_interval
+        self._count = 0
+        log.debug("raw stream mode %s", mode)
+
+    def get_mode(self):
+        return self._mode
+
+    def publish(self, port_agent_packet):
+        """
+        Publish a raw packet as configured
+        @param port_agent_packet The port agent packet
+        """
+        self._stats[RawStreamStatKey.PACKETS] += 1
+        self._stats[RawStreamStatKey.BYTES] += port_agent_packet.get_data_length() or 0
+
+        if self._mode == RawStreamMode.PARTICLE:
+            self._publish_particle(port_agent_packet)
+        elif self._mode == RawStreamMode.SAMPLED:
+            if self._count % self._sample_every == 0:
+                self._publish_particle(port_agent_packet)
+            self._count += 1
+        elif self._mode == RawStreamMode.BATCHED:
+            self._add_to_batch(port_agent_packet)
+
+    def _publish_particle(self, port_agent_packet):
+        particle = RawDataParticle(port_agent_packet.get_as_dict(),
+                                   port_timestamp=port_agent_packet.get_timestamp())
+        self._stats[RawStreamStatKey.PUBLISHED_PACKETS] += 1
+        self._driver_event(DriverAsyncEvent.SAMPLE, particle.generate())
+
+    def _add_to_batch(self, port_agent_packet):
+        with self._lock:
+            self._batch.append(port_agent_packet)
+            self._batch_bytes += port_agent_packet.get_data_length() or 0
+            if self._batch_bytes < self._max_bytes:
+                if self._timer is None:
+                    self._timer = threading.Timer(self._max_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            frame = self._take_batch()
+        self._publish_frame(frame)
+
+    def _take_batch(self):
+        """
+        Encode and clear the batch, holding the lock
+        @retval The frame, or None if the batch is empty
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._batch:
+            return None
+
+        frame = encode_raw_frame(self._batch)
+        self._stats[RawStreamStatKey.PUBLISHED_PACKETS] += len(self._batch)
+        self._stats[RawStreamStatKey.FRAMES] += 1
+        self._batch = []
+        self._batch_bytes = 0
+        return frame
+
+    def _publish_frame(self, frame):
+        if frame is not None:
+            self._driver_event(DriverAsyncEvent.RAW, frame)
+
+    def flush(self):
+        """
+        Publish the batched packets now
+        """
+        with self._lock:
+            frame = self._take_batch()
+        self._publish_frame(frame)
+
+    def get_stats(self):
+        """
+        @retval A dict of RawStreamStatKey counts
+        """
+        return dict(self._stats)
+
+    def reset_stats(self):
+        self._stats = dict((key, 0) for key in RawStreamStatKey.list())
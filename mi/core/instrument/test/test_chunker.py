@@ -10,6 +10,8 @@
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import os
+import time
 import unittest
 import re
 from functools import partial
@@ -19,7 +21,11 @@ from pyon.util.unit_test import IonUnitTestCase
 from ooi.logging import log
 
 from mi.core.exceptions import SampleException
+from mi.idk.config import Config
+from mi.core.instrument.chunker import Chunker
 from mi.core.instrument.chunker import StringChunker
+from mi.core.instrument.chunker import StreamChunker
+from mi.core.instrument.chunker import RegexSieve
 
 @attr('UNIT', group='mi')
 class UnitTestStringChunker(MiUnitTestCase):
@@ -42,6 +48,9 @@ class UnitTestStringChunker(MiUnitTestCase):
     TIMESTAMP_1 = 3569168821.102485
     TIMESTAMP_2 = 3569168822.202485
     TIMESTAMP_3 = 3569168823.302485
+
+    # The chunker class under test, overridden by subclasses
+    chunker_class = StringChunker
     
     @staticmethod
     def sieve_function(raw_data):
@@ -61,7 +70,7 @@ class UnitTestStringChunker(MiUnitTestCase):
     
     def setUp(self):
         """ Setup a chunker for use in tests """
-        self._chunker = StringChunker(UnitTestStringChunker.sieve_function)
+        self._chunker = self.chunker_class(UnitTestStringChunker.sieve_function)
         
     def _display_chunk_list(self, data, chunk_list):
         """ Display the data as viewed through the chunk list """
@@ -90,7 +99,7 @@ class UnitTestStringChunker(MiUnitTestCase):
         pattern = r'SATPAR(?P<sernum>\d{4}),(?P<timer>\d{1,7}.\d\d),(?P<counts>\d{10}),(?P<checksum>\d{1,3})'
         regex = re.compile(pattern)
 
-        self._chunker = StringChunker(partial(self._chunker.regex_sieve_function, regex_list=[regex]))
+        self._chunker = self.chunker_class(partial(self._chunker.regex_sieve_function, regex_list=[regex]))
         
         self.assertEquals([(0,31)],
                           self._chunker.regex_sieve_function(self.SAMPLE_1, [regex]))
@@ -308,7 +317,7 @@ class UnitTestStringChunker(MiUnitTestCase):
         def funky_sieve(data):
             return [(3,6),(0,3)]
 
-        self._chunker = StringChunker(funky_sieve)
+        self._chunker = self.chunker_class(funky_sieve)
         self._chunker.add_chunk("BarFoo", self.TIMESTAMP_1)
         (time, result) = self._chunker.get_next_data()
         self.assertEquals(result, "Bar")
@@ -327,10 +336,152 @@ class UnitTestStringChunker(MiUnitTestCase):
         def overlap_sieve(data):
             return [(0,3),(2,6)]
 
-        self._chunker = StringChunker(overlap_sieve)
+        self._chunker = self.chunker_class(overlap_sieve)
         self.assertRaises(SampleException,
                           self._chunker.add_chunk, "foobar", self.TIMESTAMP_1)
 
+@attr('UNIT', group='mi')
+class UnitTestStreamChunker(UnitTestStringChunker):
+    """
+    Run the string chunker tests against the stream chunker, plus a few tests
+    of its own buffer management
+    """
+    chunker_class = StreamChunker
+
+    def test_bounded_sieve(self):
+        """
+        Verify a max_chunk_size keeps the sieve from rescanning non-data, but
+        fragments split across adds are still stitched together
+        """
+        sieve_sizes = []
+        def sizing_sieve(raw_data):
+            sieve_sizes.append(len(raw_data))
+            return UnitTestStringChunker.sieve_function(raw_data)
+
+        self._chunker = StreamChunker(sizing_sieve, max_chunk_size=len(self.SAMPLE_1))
+        for i in range(100):
+            self._chunker.add_chunk("noise" * 10, self.TIMESTAMP_1)
+        self._chunker.add_chunk(self.FRAGMENT_1, self.TIMESTAMP_2)
+        self._chunker.add_chunk(self.FRAGMENT_2, self.TIMESTAMP_3)
+
+        self.assertTrue(max(sieve_sizes) <= 50 + len(self.SAMPLE_1))
+
+        (time, result) = self._chunker.get_next_non_data()
+        self.assertEquals(result, "noise" * 1000)
+        self.assertEquals(time, self.TIMESTAMP_1)
+        (time, result) = self._chunker.get_next_data()
+        self.assertEquals(result, self.FRAGMENT_SAMPLE)
+        self.assertEquals(time, self.TIMESTAMP_2)
+
+    def test_buffer_released(self):
+        """
+        Verify consumed data is released and indices stay relative to the
+        front of the buffer
+        """
+        for i in range(1000):
+            self._chunker.add_chunk(self.SAMPLE_1 + "\r\n", self.TIMESTAMP_1)
+            (time, result, start, end) = self._chunker.get_next_data_with_index()
+            self.assertEquals(result, self.SAMPLE_1)
+            self.assertEquals(time, self.TIMESTAMP_1)
+            self.assertEquals((start, end), (0, 31) if i == 0 else (2, 33))
+
+        self.assertTrue(len(self._chunker._buffer) < 2 * len(self.SAMPLE_1))
+        self.assertEquals(self._chunker.buffer, "\r\n")
+
+    def test_clean_all_chunks(self):
+        """
+        Verify everything is dropped by clean_all_chunks
+        """
+        self._chunker.add_chunk("Foo" + self.SAMPLE_1 + self.FRAGMENT_1, self.TIMESTAMP_1)
+        self._chunker.clean_all_chunks()
+        self.assertEquals(self._chunker.buffer, "")
+        self.assertEquals(self._chunker.raw_chunk_list, [])
+        self.assertEquals(self._chunker.data_chunk_list, [])
+        self.assertEquals(self._chunker.nondata_chunk_list, [])
+
+        self._chunker.add_chunk(self.SAMPLE_2, self.TIMESTAMP_2)
+        (time, result) = self._chunker.get_next_data()
+        self.assertEquals(result, self.SAMPLE_2)
+        self.assertEquals(time, self.TIMESTAMP_2)
+
+    def test_workhorse_pd0(self):
+        """
+        Verify the bounded workhorse chunker finds the same PD0 ensembles and
+        text dumps as a string chunker when fed port agent sized fragments
+        """
+        from mi.instrument.teledyne.workhorse.driver import WorkhorseProtocol, MAX_CHUNK_SIZE
+        with open(BenchmarkChunker.PD0_FILE, 'rb') as f:
+            # forty whole 446 byte ensembles
+            ensembles = f.read(17840)
+        dump = "Instrument S/N:  18444\r\n       Frequency:  307200 HZ\r\n>"
+        recording = "noise" + ensembles + "\r\n" + dump + ensembles
+
+        found = {}
+        for chunker in (StringChunker(WorkhorseProtocol.sieve_function),
+                        StreamChunker(WorkhorseProtocol.sieve_function, MAX_CHUNK_SIZE)):
+            chunks = found[chunker.__class__] = []
+            for i in range(0, len(recording), 512):
+                chunker.add_chunk(recording[i:i+512], self.TIMESTAMP_1 + i)
+                (time, result) = chunker.get_next_data()
+                while result is not None:
+                    chunks.append((time, result))
+                    (time, result) = chunker.get_next_data()
+
+        self.assertIn((self.TIMESTAMP_1 + 17408, dump), found[StreamChunker])
+        self.assertEquals(len(found[StreamChunker]), 81)
+        self.assertEquals(found[StringChunker], found[StreamChunker])
+
+@attr('UNIT', group='mi')
+class UnitTestRegexSieve(MiUnitTestCase):
+    """
+    Test the combined regex sieve
+    """
+    SAMPLE = "SATPAR0229,10.01,2206748111,111"
+    STATUS = "<Status>\nok\n</Status>"
+    PROMPT = "S>"
+
+    def setUp(self):
+        self.regex_list = [
+            re.compile(r'SATPAR(?P<sernum>\d{4}),(?P<timer>\d{1,7}.\d\d),(?P<counts>\d{10}),(?P<checksum>\d{1,3})'),
+            re.compile(r'<Status>(.*?)</Status>', re.DOTALL),
+            re.compile(r'(S)>'),
+            re.compile(r'(X)\1>')]
+        self.sieve = RegexSieve(self.regex_list)
+
+    def test_strip_groups(self):
+        self.assertEquals(RegexSieve._strip_groups(r'(?P<a>\d+)(\()[(]?(?:x)(?=y)'),
+                          r'(?:\d+)(?:\()[(]?(?:x)(?=y)')
+        self.assertEquals(RegexSieve._strip_groups(r'[]()]+'), r'[]()]+')
+
+    def test_scanners(self):
+        """
+        Regexes with the same flags are combined, backreferences are not
+        """
+        self.assertEquals(len(self.sieve._scanners), 3)
+
+    def test_find_chunks(self):
+        data = "%s\r\n%s%sXX>foo%s" % (self.SAMPLE, self.PROMPT, self.STATUS, self.SAMPLE)
+        result = self.sieve.find_chunks(data)
+        self.assertEquals(result, [(0, 31, 0), (33, 35, 2), (35, 56, 1), (56, 59, 3), (62, 93, 0)])
+        self.assertEquals(self.sieve(data), [(s, e) for (s, e, i) in result])
+        self.assertEquals(self.sieve(data), Chunker.regex_sieve_function(data, self.regex_list))
+
+    def test_match(self):
+        self.assertEquals(self.sieve.match(self.SAMPLE), 0)
+        self.assertEquals(self.sieve.match(self.STATUS), 1)
+        self.assertEquals(self.sieve.match(self.PROMPT), 2)
+        self.assertEquals(self.sieve.match("XX>"), 3)
+        self.assertEquals(self.sieve.match("foo"), None)
+
+    def test_chunker(self):
+        chunker = StringChunker(self.sieve)
+        chunker.add_chunk(self.SAMPLE[:10], 3569168821.102485)
+        chunker.add_chunk(self.SAMPLE[10:] + self.PROMPT, 3569168822.202485)
+        (time, result) = chunker.get_next_data()
+        self.assertEquals(result, self.SAMPLE)
+        (time, result) = chunker.get_next_data()
+        self.assertEquals(result, self.PROMPT)
+
 @unittest.skip("Write this when a binary chunker is needed")
 @attr('UNIT', group='mi')
 class UnitTestBinaryChunker(MiUnitTestCase):
@@ -380,3 +531,61 @@ class UnitTestBinaryChunker(MiUnitTestCase):
         """
         pass
     
+
+
+@attr('PERF', group='mi')
+class BenchmarkChunker(MiUnitTestCase):
+    """
+    Feed recorded SBE37 and PD0 traffic through the string and stream
+    chunkers in port agent sized fragments and report the throughput of each.
+    Data is drained after every BACKLOG fragments so the cost of a growing
+    buffer shows up.
+    """
+    TOTAL_BYTES = 100 * 1024 * 1024
+    FRAGMENT_SIZE = 1024
+    BACKLOG = 64
+
+    SBE37_SAMPLE = '#87.9140,5.42747, 556.864,   37.1829, 1506.961, 02 Jan 2001, 15:34:51\r\n'
+    PD0_FILE = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver', 'moas', 'gl',
+                            'adcpa', 'resource', 'LB180210.PD0')
+
+    def _run(self, chunker, recording):
+        """
+        Replay the recording until TOTAL_BYTES have been added to the chunker
+        @retval A tuple of (seconds, chunks found)
+        """
+        fragments = [recording[i:i+self.FRAGMENT_SIZE]
+                     for i in range(0, len(recording), self.FRAGMENT_SIZE)]
+        chunks = 0
+        added = 0
+        timestamp = 3569168821.102485
+        start = time.time()
+        while added < self.TOTAL_BYTES:
+            for (count, fragment) in enumerate(fragments):
+                chunker.add_chunk(fragment, timestamp)
+                added += len(fragment)
+                if count % self.BACKLOG == 0:
+                    (ts, data) = chunker.get_next_data()
+                    while data is not None:
+                        chunks += 1
+                        (ts, data) = chunker.get_next_data()
+        return (time.time() - start, chunks)
+
+    def _compare(self, name, sieve_fn, recording, max_chunk_size=None):
+        results = {}
+        for chunker in (StringChunker(sieve_fn), StreamChunker(sieve_fn, max_chunk_size)):
+            (seconds, chunks) = self._run(chunker, recording)
+            results[chunker.__class__] = chunks
+            log.info("%s %s: %d chunks in %.2fs, %.2f MB/s", name, chunker.__class__.__name__,
+                     chunks, seconds, self.TOTAL_BYTES / seconds / 1048576)
+        self.assertEquals(results[StringChunker], results[StreamChunker])
+
+    def test_sbe37(self):
+        from mi.instrument.seabird.sbe37smb.ooicore.driver import SBE37Protocol
+        self._compare('SBE37', SBE37Protocol.sieve_function, self.SBE37_SAMPLE * 10000)
+
+    def test_pd0(self):
+        from mi.instrument.teledyne.workhorse.driver import WorkhorseProtocol, MAX_CHUNK_SIZE
+        with open(self.PD0_FILE, 'rb') as f:
+            recording = f.read()
+        self._compare('PD0', WorkhorseProtocol.sieve_function, recording, MAX_CHUNK_SIZE)
@@ -12,6 +12,7 @@ __license__ = 'Apache 2.0'
 
 
 import json
+from mock import Mock, patch
 import base64
 import time
 import ntplib
@@ -23,6 +24,7 @@ from mi.core.log import get_logger ; log = get_logger()
 from mi.core.exceptions import SampleException, ReadOnlyException, NotImplementedException, InstrumentParameterException
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey, DataParticleValue
 from mi.core.instrument.data_particle import RawDataParticle, CommonDataParticleType
+from mi.core.instrument.data_particle import ParticleEncoder
 from mi.core.instrument.port_agent_client import PortAgentPacket
 
 TEST_PARTICLE_VERSION = 1
@@ -283,3 +285,111 @@ class TestUnitDataParticle(MiUnitTestCase):
 
         with self.assertRaises(NotImplementedException):
             particle.data_particle_type()
+
+    def test_value_dict(self):
+        """
+        Verify the parsed values are built once and shared by the value dict
+        and the generated particle
+        """
+        particle = self.TestDataParticle(self.sample_raw_data, port_timestamp=self.sample_port_timestamp)
+        particle._build_parsed_values = Mock(wraps=particle._build_parsed_values)
+
+        self.assertEqual(particle.get_value_dict(), {"temp": "23.45", "cond": "15.9", "depth": "305.16"})
+        self.assertIs(particle.get_value_dict(), particle.get_value_dict())
+        self.assertEqual(particle.generate_dict()[DataParticleKey.VALUES],
+                         self.sample_parsed_particle[DataParticleKey.VALUES])
+        particle.generate()
+        self.assertEqual(particle._build_parsed_values.call_count, 1)
+
+        # changing a generated values list doesn't change the particle
+        particle.generate_dict()[DataParticleKey.VALUES].append({})
+        self.assertEqual(len(particle.get_parsed_values()), 3)
+
+        # nor does changing a value dict
+        particle.generate_dict()[DataParticleKey.VALUES][0][DataParticleKey.VALUE] = 'changed'
+        particle.get_parsed_values()[1][DataParticleKey.VALUE] = 'changed'
+        self.assertEqual(particle.generate_dict()[DataParticleKey.VALUES],
+                         self.sample_parsed_particle[DataParticleKey.VALUES])
+        self.assertEqual(particle.get_value_dict(), {"temp": "23.45", "cond": "15.9", "depth": "305.16"})
+
+    def test_generate_many(self):
+        """
+        Verify a batch of particles generates the same JSON as each particle
+        with a single driver timestamp
+        """
+        particles = [self.parsed_test_particle, self.raw_test_particle,
+                     self.TestDataParticle(self.sample_raw_data,
+                                           internal_timestamp=self.sample_internal_timestamp,
+                                           preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP,
+                                           new_sequence=True)]
+
+        result = DataParticle.generate_many(particles)
+
+        driver_timestamps = set([particle.contents[DataParticleKey.DRIVER_TIMESTAMP] for particle in particles])
+        self.assertEqual(len(driver_timestamps), 1)
+        self.assertEqual(result, [particle.generate() for particle in particles])
+        self.assertEqual(result, [json.dumps(particle.generate_dict()) for particle in particles])
+
+        self.assertEqual(DataParticle.generate_many(particles, sorted=True),
+                         [json.dumps(particle.generate_dict(), sort_keys=True) for particle in particles])
+
+        batch = DataParticle.generate_batch(particles)
+        self.assertEqual(batch, json.dumps([particle.generate_dict() for particle in particles]))
+        self.assertEqual(DataParticle.generate_many([]), [])
+
+    def test_driver_timestamp(self):
+        """
+        Verify the clock is read when a particle is first generated, and once
+        for a batch of particles
+        """
+        clock = Mock(return_value=self.sample_driver_timestamp)
+        with patch('mi.core.instrument.data_particle.ntplib.system_to_ntp_time', clock):
+            particles = [self.TestDataParticle(self.sample_raw_data, port_timestamp=self.sample_port_timestamp)
+                         for _ in range(3)]
+            self.assertEqual(clock.call_count, 0)
+            self.assertIsNone(particles[0].contents[DataParticleKey.DRIVER_TIMESTAMP])
+
+            self.assertEqual(particles[0].generate_dict()[DataParticleKey.DRIVER_TIMESTAMP],
+                             self.sample_driver_timestamp)
+            self.assertEqual(clock.call_count, 1)
+
+            # a generated particle keeps its timestamp
+            clock.return_value = self.sample_driver_timestamp + 1
+            particles[0].generate()
+            self.assertEqual(particles[0].get_value(DataParticleKey.DRIVER_TIMESTAMP), self.sample_driver_timestamp)
+            self.assertEqual(clock.call_count, 1)
+
+            DataParticle.generate_many(particles)
+            self.assertEqual(clock.call_count, 2)
+            self.assertEqual([particle.get_value(DataParticleKey.DRIVER_TIMESTAMP) for particle in particles],
+                             [self.sample_driver_timestamp] + [self.sample_driver_timestamp + 1] * 2)
+
+    def test_encoder(self):
+        """
+        Verify the particle encoder matches json.dumps for all sorts of values
+        """
+        encoder = ParticleEncoder()
+        values = [1, -2L, 3.25, 1e100, float('nan'), float('inf'), True, False, None,
+                  'text', u'unicod\xe9', 'quote"\n', [], {}, [1, 2.5], {'a': [1, {'b': 2}]}]
+
+        particle = self.parsed_test_particle.generate_dict()
+        for index, value in enumerate(values):
+            particle[DataParticleKey.VALUES] = [{DataParticleKey.VALUE_ID: 'first', DataParticleKey.VALUE: 1.0},
+                                                {DataParticleKey.VALUE: value, DataParticleKey.VALUE_ID: index}]
+            self.assertEqual(encoder.encode(particle), json.dumps(particle))
+            self.assertEqual(encoder.encode(particle, sort_keys=True), json.dumps(particle, sort_keys=True))
+
+        # all the values at once, then extra keys and no values
+        particle[DataParticleKey.VALUES] = [{DataParticleKey.VALUE_ID: str(index), DataParticleKey.VALUE: value}
+                                            for index, value in enumerate(values)]
+        self.assertEqual(encoder.encode(particle), json.dumps(particle))
+        particle[DataParticleKey.VALUES][0][DataParticleKey.BINARY] = True
+        self.assertEqual(encoder.encode(particle), json.dumps(particle))
+        particle[DataParticleKey.VALUES] = []
+        self.assertEqual(encoder.encode(particle), json.dumps(particle))
+
+        # encoding errors are the ones json.dumps raises
+        particle[DataParticleKey.VALUES] = [{DataParticleKey.VALUE_ID: 'bad', DataParticleKey.VALUE: object()}]
+        self.assertRaises(TypeError, encoder.encode, particle)
+        self.assertEqual(encoder.encode(self.parsed_test_particle.generate_dict()),
+                         json.dumps(self.parsed_test_particle.generate_dict()))
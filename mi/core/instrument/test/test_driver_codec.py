@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_driver_codec
+@file mi/core/instrument/test/test_driver_codec.py
+@brief Test cases for the driver process message codecs
+"""
+
+__license__ = 'Apache 2.0'
+
+import cPickle as pickle
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import InstrumentCommandException
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.driver_codec import PickleCodec, MsgpackCodec, PICKLE_CODEC
+from mi.core.instrument.driver_codec import SAMPLE_MARKER, decode_frame, get_codec, codec_names, msgpack
+
+PARTICLE = '{"stream_name": "botpt_nano_sample", "values": [{"value_id": "bottom_pressure", "value": 13.888533}]}'
+
+MESSAGES = [
+    {'cmd': 'execute_resource', 'args': ('DRIVER_EVENT_ACQUIRE_SAMPLE', ), 'kwargs': {'timeout': 10}},
+    {'type': DriverAsyncEvent.STATE_CHANGE, 'value': 'DRIVER_STATE_COMMAND', 'time': 1381437296.25},
+    {'type': DriverAsyncEvent.CONFIG_CHANGE, 'value': {'a': 1, 'b': [1.5, None, True], u'c': u'\xb0C'},
+     'time': 1381437296.5},
+    (500, 'UnexpectedError: ValueError(\'failed\')', [('stack', ['line 1', 'line 2'])]),
+    'test_events',
+    None,
+    2 ** 40,
+]
+
+
+@attr('UNIT', group='mi')
+class DriverCodecUnitTestCase(MiUnitTest):
+    """
+    Verify every codec round trips driver messages
+    """
+    def codecs(self):
+        result = [PickleCodec()]
+        if msgpack is not None:
+            result.append(MsgpackCodec())
+        return result
+
+    def assertRoundTrip(self, codec, message):
+        result = codec.decode(codec.encode(message))
+        self.assertEqual(result, message)
+        self.assertEqual(type(result), type(message))
+
+    def test_round_trip(self):
+        for codec in self.codecs():
+            for message in MESSAGES:
+                self.assertRoundTrip(codec, message)
+
+            # strings keep their type
+            result = codec.decode(codec.encode(['str', u'unicode']))
+            self.assertEqual([type(value) for value in result], [str, unicode])
+
+            # exceptions are pickled
+            result = codec.decode(codec.encode({'value': InstrumentCommandException('failed')}))
+            self.assertIsInstance(result['value'], InstrumentCommandException)
+
+    def test_sample_events(self):
+        """
+        Verify sample events holding a particle are sent as the particle
+        """
+        event = {'type': DriverAsyncEvent.SAMPLE, 'value': PARTICLE, 'time': time.time()}
+        for codec in self.codecs():
+            self.assertRoundTrip(codec, event)
+
+        if msgpack is not None:
+            frame = MsgpackCodec().encode(event)
+            self.assertTrue(frame.startswith(SAMPLE_MARKER))
+            self.assertTrue(frame.endswith(PARTICLE))
+
+            # other events are not
+            for other in [dict(event, value=None), dict(event, extra=1), dict(event, time=1)]:
+                self.assertFalse(MsgpackCodec().encode(other).startswith(SAMPLE_MARKER))
+                self.assertRoundTrip(MsgpackCodec(), other)
+
+    def test_decode(self):
+        """
+        Verify frames of any codec decode, including send_pyobj frames
+        """
+        self.assertEqual(decode_frame(pickle.dumps(MESSAGES[0], 2)), MESSAGES[0])
+        for codec in self.codecs():
+            self.assertEqual(PICKLE_CODEC.decode(codec.encode(MESSAGES[1])), MESSAGES[1])
+        with self.assertRaises(ValueError):
+            decode_frame('\x7fdata')
+
+    def test_negotiation(self):
+        self.assertEqual(codec_names()[-1], 'pickle')
+        self.assertIs(get_codec(['unknown']), PICKLE_CODEC)
+        self.assertIs(get_codec(None), PICKLE_CODEC)
+        self.assertEqual(get_codec(['unknown'] + codec_names()).name, codec_names()[0])
+
+
+@attr('PERF', group='mi')
+class DriverCodecBenchmark(MiUnitTest):
+    """
+    Compare the time to encode and decode BOTPT NANO sample events
+    """
+    EVENTS = 100000
+
+    def test_benchmark(self):
+        from mi.instrument.noaa.botpt.ooicore.particles import NanoSampleParticle
+        particle = NanoSampleParticle('NANO,V,2013/08/22 22:48:36.013,13.888533,26.147947328',
+                                      port_timestamp=3586200516.0)
+        event = {'type': DriverAsyncEvent.SAMPLE, 'value': particle.generate(), 'time': time.time()}
+
+        for codec in [PickleCodec(), MsgpackCodec()]:
+            if codec.name == 'msgpack' and msgpack is None:
+                continue
+            start = time.time()
+            for _ in xrange(self.EVENTS):
+                codec.decode(codec.encode(event))
+            elapsed = time.time() - start
+            log.info('%s: %d NANO sample events in %.3fs: %.0f events/s',
+                     codec.name, self.EVENTS, elapsed, self.EVENTS / elapsed)
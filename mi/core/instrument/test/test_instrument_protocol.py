@@ -11,14 +11,17 @@ __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
 import re
+import json
 import time
 import ntplib
 import datetime
-from mock import Mock
+from threading import Timer
+from mock import Mock, patch
 from nose.plugins.attrib import attr
 from mi.core.log import get_logger ; log = get_logger()
 from mi.core.instrument.instrument_fsm import ThreadSafeFSM
 from mi.core.instrument.instrument_driver import DriverParameter
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
 from mi.core.instrument.instrument_protocol import InstrumentProtocol
 from mi.core.instrument.instrument_protocol import MenuInstrumentProtocol
 from mi.core.instrument.instrument_protocol import CommandResponseInstrumentProtocol
@@ -33,6 +36,8 @@ from mi.core.driver_scheduler import DriverScheduler
 from mi.core.instrument.instrument_driver import DriverConfigKey
 from mi.core.driver_scheduler import DriverSchedulerConfigKey
 from mi.core.driver_scheduler import TriggerType
+from mi.core.latency import LatencyHistogramKey
+from mi.core.event_executor import EventExecutorKey
 
 from mi.core.unit_test import MiUnitTestCase
 import unittest
@@ -41,6 +46,8 @@ from mi.core.exceptions import InstrumentProtocolException
 from mi.core.exceptions import InstrumentParameterException
 from mi.core.exceptions import NotImplementedException
 from mi.core.common import BaseEnum
+from mi.core.instrument.raw_publisher import RawStreamMode, RawStreamConfigKey
+from mi.core.instrument.test.test_raw_publisher import make_packet
 
 Directions = MenuInstrumentProtocol.MenuTree.Directions
 
@@ -118,6 +125,68 @@ class TestUnitInstrumentProtocol(MiUnitTestCase):
         # Test the format of the result in the individual driver tests. Here,
         # just tests that the result is there.
 
+    def test_extraction_copy(self):
+        """
+        Verify the extracted sample is decoded from the particle JSON and
+        changing it doesn't change the values kept by the particle
+        """
+        sample_line = "SATPAR0229,10.01,2206748544,234\r\n"
+        ntptime = ntplib.system_to_ntp_time(time.time())
+        particles = []
+
+        def particle_class(raw_data, port_timestamp=None):
+            particles.append(SatlanticPARDataParticle(raw_data, port_timestamp=port_timestamp))
+            return particles[-1]
+
+        result = self.protocol._extract_sample(particle_class, SAMPLE_REGEX, sample_line, ntptime, publish=False)
+        self.assertIsInstance(result['values'], list)
+        self.assertIsInstance(result['stream_name'], unicode)
+        self.assertEqual(result['values'], particles[0].generate_dict()['values'])
+
+        result['values'][0]['value'] = 'changed'
+        self.assertEqual(particles[0].get_parsed_values(), particles[0].generate_dict()['values'])
+        self.assertNotEqual(particles[0].get_parsed_values()[0]['value'], 'changed')
+
+    def test_extraction_publish(self):
+        """
+        Verify a published sample is generated once, and the sample returned
+        is decoded from the JSON that was published
+        """
+        sample_line = "SATPAR0229,10.01,2206748544,234\r\n"
+        ntptime = ntplib.system_to_ntp_time(time.time())
+        published = []
+        self.protocol._driver_event = lambda event, value=None: published.append((event, value))
+
+        with patch.object(SatlanticPARDataParticle, 'generate', autospec=True,
+                          side_effect=SatlanticPARDataParticle.generate) as generate:
+            result = self.protocol._extract_sample(SatlanticPARDataParticle, SAMPLE_REGEX, sample_line, ntptime)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(len(published), 1)
+        self.assertEqual(published[0][0], DriverAsyncEvent.SAMPLE)
+        self.assertEqual(json.loads(published[0][1]), result)
+
+    def test_extract_particle(self):
+        """
+        Verify the extracted particle is published and its values can be
+        read without going through JSON
+        """
+        sample_line = "SATPAR0229,10.01,2206748544,234\r\n"
+        ntptime = ntplib.system_to_ntp_time(time.time())
+        published = []
+        self.protocol._driver_event = lambda event, value=None: published.append((event, value))
+
+        particle = self.protocol._extract_particle(SatlanticPARDataParticle, SAMPLE_REGEX, sample_line, ntptime)
+        self.assertIsInstance(particle, SatlanticPARDataParticle)
+        self.assertEqual(published, [(DriverAsyncEvent.SAMPLE, particle.generate())])
+        self.assertEqual(particle.get_value_dict()['serial_number'], '0229')
+
+        self.assertIsNone(self.protocol._extract_particle(SatlanticPARDataParticle, SAMPLE_REGEX, 'junk', ntptime))
+
+        # nothing is published without publish
+        self.protocol._extract_particle(SatlanticPARDataParticle, SAMPLE_REGEX, sample_line, ntptime, publish=False)
+        self.assertEqual(len(published), 1)
+
     def test_get_param_list(self):
         """
         verify get_param_list returns correct parameter lists.
@@ -196,20 +265,52 @@ class TestUnitInstrumentProtocol(MiUnitTestCase):
         self.assertEqual(self.protocol._linebuf, "defgh")
         self.assertEqual(self.protocol._promptbuf, "defgh")
 
-    @unittest.skip('Not Written')
+    def test_ring_buffer_independent(self):
+        """
+        verify the prompt buffer rolls independently of the line buffer
+        """
+        prompts = ['aa', 'bbb', 'c', 'dddd']
+        self.protocol = CommandResponseInstrumentProtocol(prompts, '\r\n', self.event_callback)
+
+        self.protocol._max_buffer_size = Mock(return_value=5)
+
+        self.protocol.add_to_buffer("abc")
+        self.protocol._promptbuf = ''
+        self.protocol.add_to_buffer("def")
+
+        self.assertEqual(self.protocol._linebuf, "bcdef")
+        self.assertEqual(self.protocol._promptbuf, "def")
+
+        self.protocol._promptbuf += "x"
+        self.assertEqual(self.protocol._promptbuf, "defx")
+
+        self.protocol.add_to_buffer("ghi")
+        self.assertEqual(self.protocol._linebuf, "efghi")
+        self.assertEqual(self.protocol._promptbuf, "fxghi")
+
     def test_publish_raw(self):
         """
         Tests to see if raw data is appropriately published back out to
-        the InstrumentAgent via the event callback.
-        """
-        # build a packet
-        # have it published by the protocol (force state if needed)
-        # delay?
-        # catch it in the  callback
-        # confirm it came back
-        # compare response to original packet
-        
-        self.assertTrue(False)
+        the InstrumentAgent via the event callback, as set by the raw stream
+        driver config.
+        """
+        protocol = CommandResponseInstrumentProtocol(None, '\r\n', self.event_callback)
+        packet = make_packet('abc')
+
+        protocol.publish_raw(packet)
+        self.assertEqual(self._events, [DriverAsyncEvent.SAMPLE])
+
+        protocol.set_init_params({DriverConfigKey.RAW_STREAM: {RawStreamConfigKey.MODE: RawStreamMode.OFF}})
+        protocol.publish_raw(packet)
+        self.assertEqual(self._events, [DriverAsyncEvent.SAMPLE])
+
+        protocol.set_init_params({DriverConfigKey.RAW_STREAM: {RawStreamConfigKey.MODE: RawStreamMode.BATCHED,
+                                                               RawStreamConfigKey.MAX_BYTES: 0}})
+        protocol.publish_raw(packet)
+        self.assertEqual(self._events, [DriverAsyncEvent.SAMPLE, DriverAsyncEvent.RAW])
+
+        self.assertRaises(InstrumentParameterException, protocol.set_init_params,
+                          {DriverConfigKey.RAW_STREAM: {RawStreamConfigKey.MODE: 'unknown'}})
 
     @unittest.skip('Not Written')
     def test_publish_parsed_data(self):
@@ -439,6 +540,37 @@ class TestUnitInstrumentProtocol(MiUnitTestCase):
 
         ##### Integration tests for test_scheduler in the SBE37 integration suite
 
+    def test_async_raise_fsm_event(self):
+        """
+        Verify asynchronous FSM events are raised in order on one thread,
+        with duplicate waiting events coalesced and errors reported
+        """
+        raised = []
+        def on_event(event, *args):
+            time.sleep(.01)
+            if event == 'fail':
+                raise InstrumentProtocolException('failed')
+            raised.append((event, args))
+
+        self.protocol._protocol_fsm = Mock()
+        self.protocol._protocol_fsm.on_event.side_effect = on_event
+
+        self.protocol._async_raise_fsm_event('first', 1)
+        self.protocol._async_raise_fsm_event('level')
+        self.protocol._async_raise_fsm_event('level')
+        self.protocol._async_raise_fsm_event('fail')
+        self.protocol._async_raise_fsm_event('last')
+        self.assertTrue(self.protocol._fsm_event_executor.wait_idle(5))
+
+        self.assertEqual(raised, [('first', (1, )), ('level', ()), ('last', ())])
+        self.assertEqual(self._events, [DriverAsyncEvent.ERROR])
+
+        stats = self.protocol.get_fsm_event_stats()
+        self.assertEqual(stats[EventExecutorKey.SUBMITTED], 5)
+        self.assertEqual(stats[EventExecutorKey.COALESCED], 1)
+        self.assertEqual(stats[EventExecutorKey.FAILED], 1)
+        self.assertEqual(stats[EventExecutorKey.DEPTH], 0)
+
     def test_generate_config_metadata_json(self):
         """ Tests generate of the metadata structure """
         self.protocol._param_dict.add("foo", r'foo=(.*)',
@@ -612,6 +744,83 @@ class TestUnitCommandInstrumentProtocol(MiUnitTestCase):
                           self.protocol._do_cmd_resp,
                           self.TestEvent.TEST, expected_prompt=">", response_regex=regex1)
 
+    def test_response_wakes_on_data(self):
+        """
+        Verify a response waiter returns as soon as the prompt arrives, even
+        when the prompt is split across packets
+        """
+        self.protocol._linebuf = ''
+        self.protocol._promptbuf = ''
+        self.protocol.add_to_buffer("some response -")
+
+        start = time.time()
+        Timer(.5, self.protocol.add_to_buffer, ["->"]).start()
+        (prompt, result) = self.protocol._get_response(timeout=5, expected_prompt="-->")
+        elapsed = time.time() - start
+
+        self.assertEqual(prompt, "-->")
+        self.assertEqual(result, "some response -->")
+        self.assertTrue(elapsed < 1, "waited %s seconds" % elapsed)
+
+        # A prompt already in the buffer is found right away
+        (prompt, result) = self.protocol._get_raw_response(timeout=1, expected_prompt="-->")
+        self.assertEqual(prompt, "-->")
+
+    def test_raw_response(self):
+        """
+        Verify a raw response waiter finds a prompt at the end of the prompt
+        buffer, ignoring trailing tabs and spaces, and returns the line buffer
+        """
+        self.protocol._linebuf = ''
+        self.protocol._promptbuf = ''
+        self.protocol.add_to_buffer("line\r\n--> \t")
+        (prompt, result) = self.protocol._get_raw_response(timeout=1, expected_prompt="--> ")
+        self.assertEqual((prompt, result), ("--> ", "line\r\n--> \t"))
+
+        # a prompt that isn't at the end doesn't count
+        self.protocol.add_to_buffer("more")
+        with self.assertRaises(InstrumentTimeoutException):
+            self.protocol._get_raw_response(timeout=.2, expected_prompt="-->")
+
+    def test_response_regex_split(self):
+        """
+        Verify a response regex matching across packets is found, whether or
+        not its width is bounded
+        """
+        for regex in [re.compile(r'VALUE=(\d{4})'), re.compile(r'VALUE=(\d+)\r\n')]:
+            self.protocol._linebuf = ''
+            self.protocol.add_to_buffer("junk VAL")
+            Timer(.2, self.protocol.add_to_buffer, ["UE=12"]).start()
+            Timer(.4, self.protocol.add_to_buffer, ["34\r\n"]).start()
+            self.assertEqual(self.protocol._get_response(timeout=5, response_regex=regex), ('1234',))
+
+    def test_buffer_log_interval(self):
+        """
+        Verify the buffer debug dumps are set by the driver config
+        """
+        self.assertIsNone(self.protocol._buffer_log_interval)
+        self.protocol.set_init_params({DriverConfigKey.BUFFER_LOG_INTERVAL: 5})
+        self.assertEqual(self.protocol._buffer_log_interval, 5)
+        self.protocol.set_init_params({})
+        self.assertIsNone(self.protocol._buffer_log_interval)
+
+    def test_command_latency(self):
+        """
+        Verify command round trip times are recorded per command
+        """
+        self.assertEqual(self.protocol.get_command_latency(), {})
+
+        self.protocol._do_cmd_resp(self.TestEvent.TEST)
+        self.protocol._do_cmd_resp(self.TestEvent.TEST)
+
+        latency = self.protocol.get_command_latency()
+        self.assertEqual(latency.keys(), [self.TestEvent.TEST])
+        self.assertEqual(latency[self.TestEvent.TEST][LatencyHistogramKey.COUNT], 2)
+        self.assertEqual(sum(latency[self.TestEvent.TEST][LatencyHistogramKey.BUCKETS].values()), 2)
+
+        self.protocol.reset_command_latency()
+        self.assertEqual(self.protocol.get_command_latency(), {})
+
 
 @attr('UNIT', group='mi')
 class TestUnitMenuInstrumentProtocol(MiUnitTestCase):
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_particle_batch
+@file mi/core/instrument/test/test_particle_batch.py
+@brief Test cases for columnar particle batches
+"""
+
+__license__ = 'Apache 2.0'
+
+import json
+import numpy
+
+from nose.plugins.attrib import attr
+from mi.core.unit_test import MiUnitTestCase
+
+from mi.core.exceptions import SampleException
+from mi.core.instrument.data_particle import DataParticle, DataParticleKey
+from mi.core.instrument.particle_batch import ParticleBatch, BatchDataParticle, expand_particle_batches
+
+TEST_STREAM = 'test_batch_stream'
+
+
+class ClassicParticle(DataParticle):
+    """
+    The particle a parser would build for one row of the test batch
+    """
+    _data_particle_type = TEST_STREAM
+
+    def _build_parsed_values(self):
+        return [self._encode_value('temperature', self.raw_data[0], float),
+                self._encode_value('count', self.raw_data[1], int),
+                self._encode_value('name', self.raw_data[2], str)]
+
+
+@attr('UNIT', group='mi')
+class TestUnitParticleBatch(MiUnitTestCase):
+
+    def setUp(self):
+        self.rows = [(10.5, 1, 'a'), (11.25, 2, 'b'), (-3.0, 3, 'c')]
+        self.timestamps = [3583886463.0, 3583886464.5, 3583886466.0]
+        self.batch = ParticleBatch(TEST_STREAM,
+                                   [('temperature', numpy.array([row[0] for row in self.rows])),
+                                    ('count', numpy.array([row[1] for row in self.rows], dtype=numpy.int32)),
+                                    ('name', [row[2] for row in self.rows])],
+                                   internal_timestamp=self.timestamps,
+                                   preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP,
+                                   new_sequence=True,
+                                   raw_data=self.rows)
+
+    def classic_dicts(self, driver_timestamp):
+        """
+        @retval The dicts of the classic particles of the test rows
+        """
+        result = []
+        for (index, row) in enumerate(self.rows):
+            particle = ClassicParticle(row, internal_timestamp=self.timestamps[index],
+                                       preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP,
+                                       new_sequence=(index == 0))
+            particle.contents[DataParticleKey.DRIVER_TIMESTAMP] = driver_timestamp
+            result.append(particle.generate_dict())
+        return result
+
+    def test_generate(self):
+        """
+        Verify a batch generates the same dicts and JSON as classic particles
+        """
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch.parameters(), ['temperature', 'count', 'name'])
+        self.assertEqual(self.batch.column('count').tolist(), [1, 2, 3])
+
+        result = self.batch.generate_dicts()
+        driver_timestamp = result[0][DataParticleKey.DRIVER_TIMESTAMP]
+        self.assertEqual(set([particle[DataParticleKey.DRIVER_TIMESTAMP] for particle in result]),
+                         set([driver_timestamp]))
+        self.assertEqual(result, self.classic_dicts(driver_timestamp))
+
+        # values are python types, not numpy scalars
+        self.assertEqual(type(result[0][DataParticleKey.VALUES][1][DataParticleKey.VALUE]), int)
+
+        json_result = self.batch.generate()
+        self.assertEqual([json.loads(particle)[DataParticleKey.VALUES] for particle in json_result],
+                         [particle[DataParticleKey.VALUES] for particle in result])
+
+    def test_particles(self):
+        """
+        Verify the batch expands to particles matching the classic ones
+        """
+        particles = self.batch.particles()
+        self.assertEqual(len(particles), 3)
+        self.assertTrue(all(isinstance(particle, BatchDataParticle) for particle in particles))
+        self.assertEqual(particles[1].data_particle_type(), TEST_STREAM)
+        self.assertEqual(particles[1].raw_data, self.rows[1])
+
+        dicts = [particle.generate_dict() for particle in particles]
+        self.assertEqual(dicts, self.classic_dicts(dicts[0][DataParticleKey.DRIVER_TIMESTAMP]))
+
+    def test_expand(self):
+        """
+        Verify batches in a list of samples are replaced by their particles
+        """
+        classic = ClassicParticle(self.rows[0])
+        samples = [classic, self.batch]
+        result = expand_particle_batches(samples)
+
+        self.assertEqual(len(result), 4)
+        self.assertIs(result[0], classic)
+        self.assertEqual([particle.raw_data for particle in result[1:]], self.rows)
+
+        # lists without batches are passed through
+        samples = [classic]
+        self.assertIs(expand_particle_batches(samples), samples)
+        self.assertEqual(expand_particle_batches([]), [])
+
+    def test_rows(self):
+        """
+        Verify runs of rows are taken out of a batch with their own new
+        sequence flag, raw data and timestamps
+        """
+        head = self.batch.rows(0, 1)
+        tail = self.batch.rows(1, 3)
+        self.assertEqual(len(head), 1)
+        self.assertEqual(len(tail), 2)
+        self.assertEqual(head.new_sequence, True)
+        self.assertEqual(tail.new_sequence, False)
+        self.assertEqual(tail.raw_data, self.rows[1:])
+        self.assertEqual(tail.column('count').tolist(), [2, 3])
+
+        dicts = head.generate_dicts() + tail.generate_dicts()
+        for particle in dicts:
+            particle[DataParticleKey.DRIVER_TIMESTAMP] = 0.0
+        self.assertEqual(dicts, self.classic_dicts(0.0))
+
+    def test_missing_values(self):
+        """
+        Verify missing timestamps and values are handled like particles
+        """
+        batch = ParticleBatch(TEST_STREAM, [('value', numpy.array([1.5, None], dtype=object))])
+        result = batch.generate_dicts()
+
+        for particle in result:
+            self.assertNotIn(DataParticleKey.INTERNAL_TIMESTAMP, particle)
+            self.assertNotIn(DataParticleKey.PORT_TIMESTAMP, particle)
+            self.assertNotIn(DataParticleKey.NEW_SEQUENCE, particle)
+            self.assertEqual(particle[DataParticleKey.PREFERRED_TIMESTAMP], DataParticleKey.PORT_TIMESTAMP)
+        self.assertEqual(result[1][DataParticleKey.VALUES],
+                         [{DataParticleKey.VALUE_ID: 'value', DataParticleKey.VALUE: None}])
+
+        self.assertEqual(len(ParticleBatch(TEST_STREAM, [])), 0)
+        self.assertEqual(ParticleBatch(TEST_STREAM, []).generate_dicts(), [])
+
+    def test_bad_columns(self):
+        """
+        Verify columns of different lengths and repeated parameters are rejected
+        """
+        with self.assertRaises(SampleException):
+            ParticleBatch(TEST_STREAM, [('a', [1, 2]), ('b', [1, 2, 3])])
+        with self.assertRaises(SampleException):
+            ParticleBatch(TEST_STREAM, [('a', [1, 2])], internal_timestamp=[1.0])
+        with self.assertRaises(SampleException):
+            ParticleBatch(TEST_STREAM, [('a', [1, 2]), ('a', [1, 2])])
+        with self.assertRaises(TypeError):
+            ParticleBatch(TEST_STREAM, [('a', [1, 2])], new_sequence=1)
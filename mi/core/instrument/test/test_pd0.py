@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_pd0
+@file mi/core/instrument/test/test_pd0.py
+@brief Test code for the PD0 decoding engine, comparing it with per byte and
+per cell struct decoding on the adcps_jln test resources
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import re
+import struct
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import SampleException
+from mi.idk.config import Config
+
+from mi.core.instrument.pd0 import pd0_checksum, pd0_checksum_valid, unpack_cells, cell_dtype
+from mi.core.instrument.pd0 import VELOCITY_CELL, BYTE_CELL
+
+RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver', 'adcps_jln', 'stc', 'resource')
+
+PD0_RESOURCES = [
+    os.path.join(RESOURCE_PATH, 'ADCP_CCE1T_20.000'),
+    os.path.join(RESOURCE_PATH, 'ADCP_CCE1T_21_40.000'),
+    os.path.join(RESOURCE_PATH, 'ADCP_data_20130702.000'),
+]
+
+VELOCITY_ID = 256
+CELL_TYPE_IDS = [512, 768, 1024]  # correlation, echo intensity and percent good
+
+
+def byte_checksum(data, start, end):
+    """
+    The original checksum, one byte at a time
+    """
+    total = 0
+    for i in range(start, end):
+        total += ord(data[i])
+    return total & 65535
+
+
+def struct_cells(data, num_cells, offset, cell_format, cell_bytes):
+    """
+    The original cell decoding, one cell at a time
+    """
+    beams = ([], [], [], [])
+    for row in range(0, num_cells):
+        for (beam, value) in zip(beams, struct.unpack_from(cell_format, data, offset)):
+            beam.append(value)
+        offset += cell_bytes
+    return list(beams)
+
+
+def find_ensembles(data):
+    """
+    @retval A list of the (start, end) of each ensemble with a valid checksum,
+       not including the checksum
+    """
+    result = []
+    for match in re.finditer('\x7f\x7f', data):
+        start = match.start()
+        if start + 4 > len(data):
+            break
+        end = start + struct.unpack_from('<H', data, start + 2)[0]
+        if end + 2 <= len(data) and byte_checksum(data, start, end) == struct.unpack_from('<H', data, end)[0]:
+            result.append((start, end))
+    return result
+
+
+def data_types(data, start):
+    """
+    @retval The number of cells and a list of (offset, id) of the data types
+       of the ensemble at start
+    """
+    num_data_types = struct.unpack_from('<B', data, start + 5)[0]
+    offsets = struct.unpack_from('<%dH' % num_data_types, data, start + 6)
+    num_cells = struct.unpack_from('<B', data, start + offsets[0] + 9)[0]
+    return num_cells, [(start + offset, struct.unpack_from('<H', data, start + offset)[0]) for offset in offsets]
+
+
+def read_resource(path):
+    with open(path, 'rb') as resource:
+        return resource.read()
+
+
+@attr('UNIT', group='mi')
+class Pd0UnitTestCase(MiUnitTest):
+    """
+    Verify the PD0 engine decodes the same as the original code
+    """
+    def test_checksum(self):
+        data = ''.join(chr(value) for value in range(256)) * 600 + '\x01\x02'
+        self.assertEqual(pd0_checksum(data, 0, len(data)), byte_checksum(data, 0, len(data)))
+        self.assertEqual(pd0_checksum(data, 5, 700), byte_checksum(data, 5, 700))
+        self.assertEqual(pd0_checksum(data, 10, 10), 0)
+        self.assertEqual(pd0_checksum(buffer(data), 3, 90), byte_checksum(data, 3, 90))
+
+        checksum = struct.pack('<H', byte_checksum(data, 0, 1000))
+        record = data[:1000] + checksum
+        self.assertTrue(pd0_checksum_valid(record, 0, 1000))
+        self.assertFalse(pd0_checksum_valid(record, 2, 1000))
+        # the checksum bytes must be in the data
+        self.assertFalse(pd0_checksum_valid(record[:-1], 0, 1000))
+
+    def test_unpack_cells(self):
+        data = struct.pack('<H', VELOCITY_ID) + ''.join(chr(value) for value in range(256))
+        self.assertEqual(unpack_cells(data, VELOCITY_CELL, 32), struct_cells(data, 32, 2, '<4h', 8))
+        self.assertEqual(unpack_cells(data, BYTE_CELL, 64), struct_cells(data, 64, 2, '<4B', 4))
+        self.assertEqual(unpack_cells(data, cell_dtype('>u2'), 3, 10), struct_cells(data, 3, 10, '!HHHH', 8))
+        self.assertEqual(unpack_cells(data, VELOCITY_CELL, 0), [[], [], [], []])
+        self.assertEqual(unpack_cells(data, VELOCITY_CELL, -1), [[], [], [], []])
+
+        # values are python ints
+        self.assertEqual(type(unpack_cells(data, VELOCITY_CELL, 1)[0][0]), int)
+
+        with self.assertRaises(SampleException):
+            unpack_cells(data, VELOCITY_CELL, 33)
+
+    def test_resources(self):
+        """
+        Verify every ensemble of the adcps_jln resources decodes as before
+        """
+        for path in PD0_RESOURCES:
+            data = read_resource(path)
+            ensembles = find_ensembles(data)
+            self.assertTrue(ensembles)
+
+            for (start, end) in ensembles:
+                self.assertTrue(pd0_checksum_valid(data, start, end))
+                num_cells, types = data_types(data, start)
+                for (offset, type_id) in types:
+                    if type_id == VELOCITY_ID:
+                        self.assertEqual(unpack_cells(data, VELOCITY_CELL, num_cells, offset + 2),
+                                         struct_cells(data, num_cells, offset + 2, '<4h', 8))
+                    elif type_id in CELL_TYPE_IDS:
+                        self.assertEqual(unpack_cells(data, BYTE_CELL, num_cells, offset + 2),
+                                         struct_cells(data, num_cells, offset + 2, '<4B', 4))
+
+
+@attr('PERF', group='mi')
+class Pd0Benchmark(MiUnitTest):
+    """
+    Compare the time to checksum and decode the cells of every ensemble of
+    the adcps_jln test resources with the original and numpy decoding
+    """
+    def _time(self, function):
+        start = time.time()
+        result = function()
+        return time.time() - start, result
+
+    def _decode(self, data, ensembles, checksum, cells):
+        result = []
+        for (start, end) in ensembles:
+            result.append(checksum(data, start, end))
+            num_cells, types = data_types(data, start)
+            for (offset, type_id) in types:
+                if type_id == VELOCITY_ID:
+                    result.append(cells(data, num_cells, offset + 2, VELOCITY_CELL))
+                elif type_id in CELL_TYPE_IDS:
+                    result.append(cells(data, num_cells, offset + 2, BYTE_CELL))
+        return result
+
+    def test_benchmark(self):
+        def original_cells(data, num_cells, offset, dtype):
+            if dtype is VELOCITY_CELL:
+                return struct_cells(data, num_cells, offset, '<4h', 8)
+            return struct_cells(data, num_cells, offset, '<4B', 4)
+
+        def numpy_cells(data, num_cells, offset, dtype):
+            return unpack_cells(data, dtype, num_cells, offset)
+
+        for path in PD0_RESOURCES:
+            data = read_resource(path)
+            ensembles = find_ensembles(data)
+
+            original_time, expected = self._time(
+                lambda: self._decode(data, ensembles, byte_checksum, original_cells))
+            numpy_time, result = self._time(
+                lambda: self._decode(data, ensembles, pd0_checksum, numpy_cells))
+
+            self.assertEqual(result, expected)
+
+            log.info('%s: %d ensembles, %d bytes: original %.3fs, numpy %.3fs (%.1fx)',
+                     os.path.basename(path), len(ensembles), len(data),
+                     original_time, numpy_time, original_time / numpy_time)
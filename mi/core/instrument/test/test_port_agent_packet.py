@@ -0,0 +1,439 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_port_agent_packet
+@file mi/core/instrument/test/test_port_agent_packet.py
+@brief Test code for port agent packet decoding, comparing it with the per
+byte checksum and string timestamp decoding it replaced, and for the
+listener reading packets one at a time and buffered. Benchmarks decode
+streams of 1, 10 and 100 MB/s and compare the listener modes.
+"""
+
+__license__ = 'Apache 2.0'
+
+import random
+import socket
+import struct
+import threading
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+
+from mi.core.instrument.port_agent_client import PortAgentPacket, Listener, ListenerStatKey
+from mi.core.instrument.port_agent_client import HEADER_SIZE, HEADER_STRUCT
+from mi.core.instrument.port_agent_client import header_timestamp, xor_bytes, packet_checksum
+
+# an NTP time in 2013
+TIMESTAMP_UPPER = 3586200516
+
+# data rates of the benchmark in MB/s, and the data bytes in each packet
+RATES = [1, 10, 100]
+PACKET_SIZE = 10000
+
+# seconds to wait for the listener before failing a test
+TIMEOUT = 10
+
+# packets decoded the original way, which is too slow for a second of the
+# higher rates, before scaling the time up
+ORIGINAL_PACKETS = 100
+
+
+def byte_checksum(header, data):
+    """
+    The original checksum, one byte at a time
+    """
+    checksum = 0
+    for i in range(HEADER_SIZE):
+        if i < 6 or i > 7:
+            checksum ^= struct.unpack_from('B', header[i])[0]
+    for i in range(len(data)):
+        checksum ^= struct.unpack_from('B', data[i])[0]
+    return checksum
+
+
+def string_timestamp(upper, lower):
+    """
+    The original timestamp decoding
+    """
+    return float("%s.%s" % (upper, lower))
+
+
+def build_packet(data, lower=0, packet_type=PortAgentPacket.DATA_FROM_INSTRUMENT):
+    """
+    @retval The header and data of a packet with a valid checksum
+    """
+    values = [0xa3, 0x9d, 0x7a, packet_type, len(data) + HEADER_SIZE, 0, TIMESTAMP_UPPER, lower]
+    values[5] = packet_checksum(HEADER_STRUCT.pack(*values), data)
+    return HEADER_STRUCT.pack(*values), data
+
+
+def random_data(size):
+    return ''.join(chr(random.randint(0, 255)) for _ in xrange(size))
+
+
+def original_decode(header, data):
+    """
+    Decode a packet as the listener did before, copying the header and data
+    to strings
+    """
+    header = str(bytearray(header))
+    data = str(bytearray(data))
+    values = struct.unpack_from('>BBBBHHII', header)
+    timestamp = string_timestamp(values[6], values[7])
+    return byte_checksum(header, data) == values[5], timestamp, data
+
+
+def buffer_decode(header, data):
+    """
+    Decode a packet as the listener does, from the buffers it was received
+    into
+    """
+    packet = PortAgentPacket()
+    packet.unpack_header(header)
+    packet.attach_data(data)
+    packet.verify_checksum()
+    return packet.is_valid(), packet.get_timestamp(), packet.get_data_buffer()
+
+
+class LocalListener(object):
+    """
+    A listener reading from one end of a socket pair, recording the packets
+    it delivers
+    """
+    def __init__(self, buffered, batch=True):
+        """
+        @param buffered True for a buffered listener
+        @param batch True to give the listener a batch callback
+        """
+        (self.reader, self.writer) = socket.socketpair()
+        self.reader.setblocking(0)
+        self.data = []
+        self.raw = []
+        self.batches = []
+        self.errors = []
+        self.expected = None
+        self.received = threading.Event()
+
+        self.listener = Listener(self.reader, 0, None, 0, None,
+                                 self.got_data, self.got_raw, self.errors.append,
+                                 self.got_error, self.got_error,
+                                 self.got_data_batch if batch else None, buffered)
+        self.listener.start()
+
+    def got_data(self, packet):
+        self.data.append(packet)
+        self._check()
+
+    def got_data_batch(self, packets):
+        self.batches.append(len(packets))
+        self.data.extend(packets)
+        self._check()
+
+    def got_raw(self, packet):
+        self.raw.append(packet)
+
+    def got_error(self, error):
+        self.errors.append(error)
+        return False
+
+    def _check(self):
+        if self.expected is not None and len(self.data) >= self.expected:
+            self.received.set()
+
+    def expect(self, count):
+        self.expected = count
+        self.received.clear()
+        self._check()
+
+    def wait(self):
+        return self.received.wait(TIMEOUT) or self.received.is_set()
+
+    def stop(self):
+        self.listener.done()
+        self.listener.join(TIMEOUT)
+        self.writer.close()
+        self.reader.close()
+
+
+def valid_packet(packet):
+    packet.verify_checksum()
+    return packet.is_valid()
+
+
+def packet_stream(count, size=40, packet_type=PortAgentPacket.DATA_FROM_INSTRUMENT):
+    """
+    @retval The data of count packets and a str of all of them
+    """
+    data = ['%04d:%s' % (index, 'x' * (size - 5)) for index in xrange(count)]
+    return data, ''.join(''.join(build_packet(value, lower=index, packet_type=packet_type))
+                         for (index, value) in enumerate(data))
+
+
+@attr('UNIT', group='mi')
+class PortAgentPacketUnitTestCase(MiUnitTest):
+    """
+    Verify packets decode the same as with the original code
+    """
+    def test_timestamp(self):
+        lowers = [0, 1, 9, 10, 11, 99, 100, 999999999, 1000000000, 2 ** 32 - 1]
+        lowers.extend(random.randint(0, 2 ** 32 - 1) for _ in xrange(10000))
+        for lower in lowers:
+            self.assertEqual(header_timestamp(TIMESTAMP_UPPER, lower), string_timestamp(TIMESTAMP_UPPER, lower))
+        self.assertEqual(header_timestamp(0, 5), 0.5)
+
+    def test_checksum(self):
+        data = random_data(1000)
+        header = HEADER_STRUCT.pack(0xa3, 0x9d, 0x7a, 1, len(data) + HEADER_SIZE, 0xffff, TIMESTAMP_UPPER, 12345)
+        expected = byte_checksum(header, data)
+
+        self.assertEqual(packet_checksum(header, data), expected)
+        self.assertEqual(packet_checksum(bytearray(header), bytearray(data)), expected)
+        self.assertEqual(packet_checksum(memoryview(bytearray(header)), memoryview(bytearray(data))), expected)
+        self.assertEqual(packet_checksum(header, ''), byte_checksum(header, ''))
+
+        self.assertEqual(xor_bytes(''), 0)
+        self.assertEqual(xor_bytes('\x0f\xf0\x01'), 0xfe)
+        self.assertEqual(xor_bytes(memoryview(bytearray('\x0f\xf0\x01'))[1:]), 0xf1)
+
+    def test_decode(self):
+        for size in [0, 1, 100, 5000]:
+            (header, data) = build_packet(random_data(size), lower=random.randint(0, 2 ** 32 - 1))
+            header_view = memoryview(bytearray(header))
+            data_view = memoryview(bytearray(data))
+
+            (valid, timestamp, buf) = buffer_decode(header_view, data_view)
+            self.assertEqual((valid, timestamp, buf.tobytes()), original_decode(header, data))
+            self.assertTrue(valid)
+
+            packet = PortAgentPacket()
+            packet.unpack_header(header_view)
+            packet.attach_data(data_view)
+            self.assertEqual(packet.get_header_type(), PortAgentPacket.DATA_FROM_INSTRUMENT)
+            self.assertEqual(packet.get_data_length(), size)
+            self.assertEqual(packet.get_data(), data)
+            self.assertIsInstance(packet.get_data(), str)
+            self.assertEqual(packet.get_as_dict()['raw'], data)
+
+    def test_invalid_checksum(self):
+        (header, data) = build_packet('This tests the checksum algorithm.')
+        data = bytearray(data)
+
+        packet = PortAgentPacket()
+        packet.unpack_header(header)
+        packet.attach_data(memoryview(data))
+        packet.verify_checksum()
+        self.assertTrue(packet.is_valid())
+
+        data[0] ^= 1
+        packet.attach_data(memoryview(data))
+        packet.verify_checksum()
+        self.assertFalse(packet.is_valid())
+
+    def test_data_buffer(self):
+        """
+        Verify the data buffer shares the received memory until the data is
+        asked for as a str
+        """
+        data = bytearray('abcdef')
+        packet = PortAgentPacket()
+        packet.attach_data(memoryview(data))
+
+        data[0] = 'z'
+        self.assertEqual(packet.get_data_buffer().tobytes(), 'zbcdef')
+        self.assertEqual(packet.get_data(), 'zbcdef')
+
+        data[0] = 'y'
+        self.assertEqual(packet.get_data(), 'zbcdef')
+        self.assertEqual(packet.get_data_buffer().tobytes(), 'zbcdef')
+
+
+@attr('UNIT', group='mi')
+class PortAgentListenerUnitTestCase(MiUnitTest):
+    """
+    Verify both listener modes deliver the packets they read
+    """
+    def _listen(self, buffered, batch=True):
+        listener = LocalListener(buffered, batch)
+        self.addCleanup(listener.stop)
+        return listener
+
+    def test_buffered(self):
+        listener = self._listen(True)
+        (data, stream) = packet_stream(500)
+
+        listener.expect(len(data))
+        listener.writer.sendall(stream)
+        self.assertTrue(listener.wait())
+
+        self.assertEqual([packet.get_data() for packet in listener.data], data)
+        self.assertEqual([packet.get_data() for packet in listener.raw], data)
+        self.assertTrue(all(valid_packet(packet) for packet in listener.data))
+        self.assertEqual(sum(listener.batches), len(data))
+        # many packets are read at once
+        self.assertLess(len(listener.batches), len(data))
+
+        stats = listener.listener.get_stats()
+        self.assertEqual(stats[ListenerStatKey.PACKETS], len(data))
+        self.assertEqual(stats[ListenerStatKey.BYTES], len(stream))
+        self.assertEqual(stats[ListenerStatKey.BATCHES], len(listener.batches))
+        self.assertGreater(stats[ListenerStatKey.PACKETS_PER_SECOND], 0)
+        self.assertGreater(stats[ListenerStatKey.BYTES_PER_SECOND], 0)
+
+        listener.listener.reset_stats()
+        self.assertEqual(listener.listener.get_stats()[ListenerStatKey.PACKETS], 0)
+
+    def test_partial_packets(self):
+        """
+        Verify packets split across reads and larger than the read buffer
+        are framed, and bytes between packets are skipped
+        """
+        listener = self._listen(True)
+        (data, stream) = packet_stream(20)
+        (large, large_stream) = packet_stream(2, size=60000)
+        boundary = len(stream) / len(data) * 17
+        stream = 'garbage' + stream[:boundary] + '\xa3\x9d' + stream[boundary:] + large_stream * 10
+
+        listener.expect(len(data) + 20)
+        for index in xrange(0, len(stream), 777):
+            listener.writer.sendall(stream[index:index + 777])
+            time.sleep(.001)
+        self.assertTrue(listener.wait())
+
+        self.assertEqual([packet.get_data() for packet in listener.data], data + large * 10)
+        self.assertTrue(all(valid_packet(packet) for packet in listener.data))
+
+    def test_other_packets(self):
+        """
+        Verify packets that aren't instrument data only go to the raw
+        callback, in order
+        """
+        listener = self._listen(True)
+        (_, driver_stream) = packet_stream(3, packet_type=PortAgentPacket.DATA_FROM_DRIVER)
+        (data, stream) = packet_stream(2)
+
+        listener.expect(len(data))
+        listener.writer.sendall(driver_stream + stream)
+        self.assertTrue(listener.wait())
+        self.assertEqual([packet.get_header_type() for packet in listener.raw],
+                         [PortAgentPacket.DATA_FROM_DRIVER] * 3 + [PortAgentPacket.DATA_FROM_INSTRUMENT] * 2)
+        self.assertEqual([packet.get_data() for packet in listener.data], data)
+
+    def test_packet_order(self):
+        """
+        Verify data packets read before another packet are delivered before
+        it is handled
+        """
+        events = []
+        listener = Listener(None, 0, None, 0, None,
+                            lambda packet: events.append(('data', packet.get_data())),
+                            lambda packet: events.append(('raw', packet.get_data())),
+                            None, None, None,
+                            lambda packets: events.append(('batch', [packet.get_data() for packet in packets])),
+                            True)
+
+        packets = []
+        for (value, packet_type) in [('d1', PortAgentPacket.DATA_FROM_INSTRUMENT),
+                                     ('d2', PortAgentPacket.DATA_FROM_INSTRUMENT),
+                                     ('s1', PortAgentPacket.PORT_AGENT_STATUS),
+                                     ('d3', PortAgentPacket.DATA_FROM_INSTRUMENT)]:
+            packet = PortAgentPacket(packet_type)
+            packet.attach_data(value)
+            packets.append(packet)
+
+        listener.handle_packets(packets)
+        self.assertEqual(events, [('raw', 'd1'), ('raw', 'd2'), ('batch', ['d1', 'd2']),
+                                  ('raw', 's1'),
+                                  ('raw', 'd3'), ('batch', ['d3'])])
+
+    def test_without_batch_callback(self):
+        listener = self._listen(True, batch=False)
+        (data, stream) = packet_stream(50)
+
+        listener.expect(len(data))
+        listener.writer.sendall(stream)
+        self.assertTrue(listener.wait())
+        self.assertEqual([packet.get_data() for packet in listener.data], data)
+        self.assertEqual(listener.batches, [])
+
+    def test_unbuffered(self):
+        listener = self._listen(False)
+        (data, stream) = packet_stream(50)
+
+        listener.expect(len(data))
+        listener.writer.sendall(stream)
+        self.assertTrue(listener.wait())
+        self.assertEqual([packet.get_data() for packet in listener.data], data)
+        self.assertEqual(listener.batches, [])
+        self.assertEqual(listener.listener.get_stats()[ListenerStatKey.PACKETS], len(data))
+
+    def test_socket_closed(self):
+        listener = self._listen(True)
+        listener.writer.close()
+        listener.listener.join(TIMEOUT)
+        self.assertFalse(listener.listener.is_alive())
+        self.assertTrue(listener.errors)
+
+
+@attr('PERF', group='mi')
+class PortAgentPacketBenchmark(MiUnitTest):
+    """
+    Compare the time to decode one second of port agent packets at 1, 10 and
+    100 MB/s with the original and buffer decoding
+    """
+    def _time(self, function):
+        start = time.time()
+        result = function()
+        return time.time() - start, result
+
+    def _decode(self, decode, packets):
+        return [decode(header, data) for (header, data) in packets]
+
+    def test_benchmark(self):
+        (header, data) = build_packet(random_data(PACKET_SIZE), lower=123456789)
+        packet = (memoryview(bytearray(header)), memoryview(bytearray(data)))
+
+        original_time, expected = self._time(lambda: self._decode(original_decode, [packet] * ORIGINAL_PACKETS))
+        self.assertTrue(expected[0][0])
+
+        for rate in RATES:
+            packets = [packet] * (rate * 1000000 / PACKET_SIZE)
+            buffer_time, result = self._time(lambda: self._decode(buffer_decode, packets))
+            self.assertEqual([(valid, timestamp, buf.tobytes()) for (valid, timestamp, buf) in result[:1]],
+                             expected[:1])
+
+            rate_original_time = original_time * len(packets) / ORIGINAL_PACKETS
+            log.info('%d MB/s, %d packets of %d bytes: original %.3fs, buffer %.3fs (%.1fx) per second of data',
+                     rate, len(packets), PACKET_SIZE, rate_original_time, buffer_time,
+                     rate_original_time / buffer_time)
+
+
+@attr('PERF', group='mi')
+class PortAgentListenerBenchmark(MiUnitTest):
+    """
+    Compare the time for the listener modes to deliver a burst of small
+    packets, such as lines from a 20 Hz ASCII instrument
+    """
+    PACKETS = 20000
+    PACKET_SIZE = 40
+
+    def test_benchmark(self):
+        (data, stream) = packet_stream(self.PACKETS, self.PACKET_SIZE)
+        for buffered in [False, True]:
+            listener = LocalListener(buffered)
+            try:
+                listener.expect(self.PACKETS)
+                start = time.time()
+                listener.writer.sendall(stream)
+                self.assertTrue(listener.wait())
+                elapsed = time.time() - start
+                stats = listener.listener.get_stats()
+            finally:
+                listener.stop()
+
+            self.assertEqual(len(listener.data), self.PACKETS)
+            log.info('%s: %d packets of %d bytes in %.3fs: %.0f packets/s in %d batches',
+                     'buffered' if buffered else 'unbuffered', self.PACKETS, self.PACKET_SIZE,
+                     elapsed, self.PACKETS / elapsed, stats[ListenerStatKey.BATCHES])
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_raw_publisher
+@file mi/core/instrument/test/test_raw_publisher.py
+@brief Test code for the raw stream modes and binary raw frames, and a
+benchmark comparing publishing a raw data particle per packet with batching
+packets into binary frames
+"""
+
+__license__ = 'Apache 2.0'
+
+import base64
+import json
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import InstrumentParameterException
+from mi.core.instrument.data_particle import DataParticleKey, RawDataParticleKey
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.port_agent_client import PortAgentPacket
+from mi.core.instrument.raw_publisher import RawPublisher, RawStreamMode, RawStreamConfigKey, RawStreamStatKey
+from mi.core.instrument.raw_publisher import encode_raw_frame, decode_raw_frame, RAW_PORT_TIMESTAMP
+from mi.core.instrument.test.test_port_agent_packet import build_packet, random_data
+
+
+def make_packet(data, lower=0):
+    (header, data) = build_packet(data, lower)
+    packet = PortAgentPacket()
+    packet.unpack_header(header)
+    packet.attach_data(data)
+    return packet
+
+
+def particle_payload(event_value):
+    """
+    @retval The raw bytes of a raw data particle
+    """
+    values = json.loads(event_value)[DataParticleKey.VALUES]
+    for value in values:
+        if value[DataParticleKey.VALUE_ID] == RawDataParticleKey.PAYLOAD:
+            return base64.b64decode(value[DataParticleKey.VALUE])
+
+
+@attr('UNIT', group='mi')
+class RawPublisherUnitTestCase(MiUnitTest):
+    """
+    Verify raw packets are published as configured, and binary frames decode
+    to the packets
+    """
+    def setUp(self):
+        self.events = []
+        self.publisher = RawPublisher(lambda event_type, value: self.events.append((event_type, value)))
+        self.addCleanup(self.publisher.configure, None)
+
+    def test_frame(self):
+        packets = [make_packet('abc', 1), make_packet('', 2), make_packet('\x00\xff' * 100, 3)]
+        decoded = decode_raw_frame(encode_raw_frame(packets))
+        self.assertEqual([packet[RawDataParticleKey.PAYLOAD] for packet in decoded], ['abc', '', '\x00\xff' * 100])
+        self.assertEqual([packet[RawDataParticleKey.LENGTH] for packet in decoded], [3, 0, 200])
+        self.assertEqual([packet[RawDataParticleKey.TYPE] for packet in decoded],
+                         [PortAgentPacket.DATA_FROM_INSTRUMENT] * 3)
+        self.assertEqual([packet[RawDataParticleKey.CHECKSUM] for packet in decoded],
+                         [packet.get_header_recv_checksum() for packet in packets])
+        self.assertEqual([packet[RAW_PORT_TIMESTAMP] for packet in decoded],
+                         [packet.get_timestamp() for packet in packets])
+
+        frame = encode_raw_frame(packets)
+        self.assertRaises(ValueError, decode_raw_frame, frame[:-1])
+        self.assertRaises(ValueError, decode_raw_frame, frame + 'x')
+        self.assertRaises(ValueError, decode_raw_frame, 'XYZ' + frame[3:])
+        self.assertRaises(ValueError, decode_raw_frame, 'RA')
+
+    def test_particle(self):
+        self.publisher.publish(make_packet('abc'))
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0][0], DriverAsyncEvent.SAMPLE)
+        self.assertEqual(particle_payload(self.events[0][1]), 'abc')
+
+    def test_off(self):
+        self.publisher.configure({RawStreamConfigKey.MODE: RawStreamMode.OFF})
+        self.publisher.publish(make_packet('abc'))
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.publisher.get_stats()[RawStreamStatKey.PACKETS], 1)
+
+    def test_sampled(self):
+        self.publisher.configure({RawStreamConfigKey.MODE: RawStreamMode.SAMPLED,
+                                  RawStreamConfigKey.SAMPLE_EVERY: 3})
+        for index in range(7):
+            self.publisher.publish(make_packet(str(index)))
+        self.assertEqual([particle_payload(value) for (event_type, value) in self.events], ['0', '3', '6'])
+
+    def test_batched(self):
+        self.publisher.configure({RawStreamConfigKey.MODE: RawStreamMode.BATCHED,
+                                  RawStreamConfigKey.MAX_BYTES: 10,
+                                  RawStreamConfigKey.MAX_INTERVAL: 0.1})
+        for data in ['abcd', 'efgh', 'ijkl', 'mn']:
+            self.publisher.publish(make_packet(data))
+
+        # the first frame is published when it reaches max_bytes
+        self.assertEqual(len(self.events), 1)
+        (event_type, frame) = self.events[0]
+        self.assertEqual(event_type, DriverAsyncEvent.RAW)
+        self.assertEqual([packet[RawDataParticleKey.PAYLOAD] for packet in decode_raw_frame(frame)],
+                         ['abcd', 'efgh', 'ijkl'])
+
+        # the rest after max_interval
+        time.sleep(0.3)
+        self.assertEqual(len(self.events), 2)
+        self.assertEqual([packet[RawDataParticleKey.PAYLOAD] for packet in decode_raw_frame(self.events[1][1])],
+                         ['mn'])
+
+        # reconfiguring publishes the batch
+        self.publisher.publish(make_packet('op'))
+        self.publisher.configure(None)
+        self.assertEqual(len(self.events), 3)
+        self.assertEqual(self.publisher.get_stats(), {RawStreamStatKey.PACKETS: 5,
+                                                      RawStreamStatKey.BYTES: 16,
+                                                      RawStreamStatKey.PUBLISHED_PACKETS: 5,
+                                                      RawStreamStatKey.FRAMES: 3})
+
+    def test_config(self):
+        self.assertRaises(InstrumentParameterException, self.publisher.configure, 'batched')
+        self.assertRaises(InstrumentParameterException, self.publisher.configure,
+                          {RawStreamConfigKey.MODE: 'unknown'})
+        self.assertRaises(InstrumentParameterException, self.publisher.configure,
+                          {RawStreamConfigKey.MODE: RawStreamMode.SAMPLED, RawStreamConfigKey.SAMPLE_EVERY: 0})
+        self.assertRaises(InstrumentParameterException, self.publisher.configure,
+                          {RawStreamConfigKey.MODE: RawStreamMode.BATCHED, RawStreamConfigKey.MAX_BYTES: 'x'})
+        self.assertEqual(self.publisher.get_mode(), RawStreamMode.PARTICLE)
+
+
+@attr('PERF', group='mi')
+class RawPublisherBenchmark(MiUnitTest):
+    """
+    Compare the time and published bytes of a raw data particle per packet
+    with binary frames of 64k
+    """
+    PACKETS = 5000
+    SIZE = 256
+
+    def _publish(self, config):
+        published = []
+        publisher = RawPublisher(lambda event_type, value: published.append(value), config)
+        start = time.time()
+        for packet in self.packets:
+            publisher.publish(packet)
+        publisher.flush()
+        return time.time() - start, sum(len(value) for value in published)
+
+    def test_benchmark(self):
+        data = random_data(self.SIZE)
+        self.packets = [make_packet(data, index) for index in xrange(self.PACKETS)]
+
+        (particle_time, particle_bytes) = self._publish(None)
+        (batched_time, batched_bytes) = self._publish({RawStreamConfigKey.MODE: RawStreamMode.BATCHED})
+        log.info('%d packets of %d bytes: particles %.3fs, %d bytes, binary frames %.3fs, %d bytes (%.1fx)',
+                 self.PACKETS, self.SIZE, particle_time, particle_bytes, batched_time, batched_bytes,
+                 particle_time / batched_time)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_zmq_transport
+@file mi/core/instrument/test/test_zmq_transport.py
+@brief Test cases and a latency and throughput benchmark for the ZMQ driver
+process transport. The driver process and client run in this process, on
+their own threads, with a stand in driver.
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import tempfile
+import threading
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.driver_codec import PICKLE_CODEC, codec_names
+from mi.core.instrument.zmq_driver_client import ZmqDriverClient
+from mi.core.instrument.zmq_driver_process import ZmqDriverProcess
+
+# seconds to wait for the transport before failing a test
+TIMEOUT = 10
+
+NANO_SAMPLE = 'NANO,V,2013/08/22 22:48:36.013,13.888533,26.147947328'
+
+# the highest BOTPT NANO output rate, in Hz
+NANO_MAX_RATE = 40
+
+
+class EchoDriver(object):
+    """
+    A stand in driver that echoes commands and publishes sample events
+    """
+    def __init__(self, evt_callback):
+        self._send_event = evt_callback
+
+    def echo(self, value):
+        return value
+
+    def fail(self):
+        raise ValueError('failed')
+
+    def publish(self, count, size=0):
+        """
+        Publish count sample events with a value of size bytes
+        """
+        value = 'x' * size
+        for index in xrange(count):
+            self._send_event({'type': 'DRIVER_ASYNC_EVENT_SAMPLE', 'index': index, 'value': value})
+        return count
+
+    def publish_nano(self, count):
+        """
+        Publish count sample events of BOTPT NANO particles, as the BOTPT
+        driver does
+        """
+        from mi.instrument.noaa.botpt.ooicore.particles import NanoSampleParticle
+        for index in xrange(count):
+            particle = NanoSampleParticle(NANO_SAMPLE, port_timestamp=3586200516.0 + index)
+            self._send_event({'type': DriverAsyncEvent.SAMPLE, 'value': particle.generate(), 'time': time.time()})
+        return count
+
+
+class LocalDriverTransport(object):
+    """
+    A driver process running the EchoDriver and a client connected to it
+    """
+    def __init__(self, max_event_batch=None, codec=None):
+        """
+        @param max_event_batch The most events per message, or None for
+           the default
+        @param codec The client codec, or None to negotiate it
+        """
+        self.events = []
+        self.received = threading.Event()
+        self.expected = None
+
+        self.process = ZmqDriverProcess(__name__, 'EchoDriver',
+                                        tempfile.mktemp(prefix='dvr_cmd_port_'),
+                                        tempfile.mktemp(prefix='dvr_evt_port_'), None)
+        if max_event_batch:
+            self.process.max_event_batch = max_event_batch
+        assert self.process.construct_driver()
+        self.process.start_messaging()
+
+        start = time.time()
+        while self.process.cmd_port is None or self.process.evt_port is None:
+            if time.time() - start > TIMEOUT:
+                raise Exception('Driver process did not bind its ports')
+            time.sleep(.01)
+
+        self.client = ZmqDriverClient('localhost', self.process.cmd_port, self.process.evt_port)
+        self.client.codec = codec
+        self.client.start_messaging(self.event_received)
+        self._subscribe()
+
+    def _subscribe(self):
+        """
+        Publish test events until the client receives one, so no events are
+        lost while the subscription is set up
+        """
+        start = time.time()
+        while not self.events:
+            if time.time() - start > TIMEOUT:
+                raise Exception('Client did not subscribe to driver events')
+            self.client.cmd_dvr('test_events', events=['subscribed'])
+            time.sleep(.01)
+        time.sleep(.1)
+        self.events = []
+
+    def event_received(self, evt):
+        self.events.append(evt)
+        if self.expected is not None and len(self.events) >= self.expected:
+            self.received.set()
+
+    def expect_events(self, count):
+        """
+        Clear the received events and set how many are expected
+        """
+        self.events = []
+        self.received.clear()
+        self.expected = count
+
+    def wait_for_events(self):
+        """
+        @retval True if the expected events were received in time
+        """
+        return self.received.wait(TIMEOUT) or self.received.is_set()
+
+    def stop(self):
+        self.client.done()
+        self.process.cmd_thread.join(TIMEOUT)
+        self.process.evt_thread.join(TIMEOUT)
+        for fname in [self.process.cmd_port_fname, self.process.evt_port_fname]:
+            if os.path.exists(fname):
+                os.remove(fname)
+
+
+@attr('UNIT', group='mi')
+class ZmqTransportUnitTestCase(MiUnitTest):
+    """
+    Verify commands and events through the ZMQ driver transport
+    """
+    def setUp(self):
+        self.transport = LocalDriverTransport(max_event_batch=10)
+        self.client = self.transport.client
+
+    def tearDown(self):
+        self.transport.stop()
+
+    def test_commands(self):
+        self.assertEqual(self.client.cmd_dvr('echo', 'test 1 2 3'), 'test 1 2 3')
+        self.assertEqual(self.client.cmd_dvr('echo', value={'a': 1}), {'a': 1})
+        self.assertTrue(self.client.cmd_dvr('process_echo').startswith('ping from resource'))
+
+        # exceptions are returned encoded
+        reply = self.client.cmd_dvr('fail')
+        self.assertIsInstance(reply, tuple)
+        self.assertIn('ValueError', reply[1])
+
+        self.assertIsInstance(self.client.cmd_dvr('unknown_command'), tuple)
+
+    def test_codec(self):
+        """
+        Verify both ends use the preferred codec after the first command
+        """
+        self.assertEqual(self.client.codec.name, codec_names()[0])
+        self.assertEqual(self.transport.process.codec.name, codec_names()[0])
+
+        # tuples and objects msgpack can't hold survive every codec
+        self.assertEqual(self.client.cmd_dvr('echo', (1, 'a', [2.5, None])), (1, 'a', [2.5, None]))
+        self.assertEqual(self.client.cmd_dvr('echo', {'a': (1, 2)}), {'a': (1, 2)})
+        self.assertEqual(self.client.cmd_dvr('echo', set([1, 2])), set([1, 2]))
+
+    def test_sample_events(self):
+        """
+        Verify sample events holding particles arrive unchanged
+        """
+        self.transport.expect_events(3)
+        self.client.cmd_dvr('publish_nano', 3)
+        self.assertTrue(self.transport.wait_for_events())
+        for evt in self.transport.events:
+            self.assertEqual(evt['type'], DriverAsyncEvent.SAMPLE)
+            self.assertIsInstance(evt['value'], str)
+            self.assertIn('botpt_nano_sample', evt['value'])
+            self.assertIsInstance(evt['time'], float)
+
+    def test_events(self):
+        events = ['I am event number 1!', 'And I am event number 2!']
+        self.transport.expect_events(len(events))
+        self.assertEqual(self.client.cmd_dvr('test_events', events=events), 'test_events')
+        self.assertTrue(self.transport.wait_for_events())
+        self.assertEqual(self.transport.events, events)
+
+    def test_event_batches(self):
+        """
+        Verify events published in several batches arrive in order
+        """
+        self.transport.expect_events(95)
+        self.assertEqual(self.client.cmd_dvr('publish', 95), 95)
+        self.assertTrue(self.transport.wait_for_events())
+        self.assertEqual([evt['index'] for evt in self.transport.events], range(95))
+
+
+@attr('PERF', group='mi')
+class ZmqTransportBenchmark(MiUnitTest):
+    """
+    Measure the command round trip time and the sample event throughput of
+    the ZMQ driver transport
+    """
+    COMMANDS = 1000
+    EVENTS = 20000
+    EVENT_SIZE = 200
+    NANO_EVENTS = 20000
+
+    def setUp(self):
+        self.transport = LocalDriverTransport()
+        self.client = self.transport.client
+
+    def tearDown(self):
+        self.transport.stop()
+
+    def test_command_latency(self):
+        times = []
+        for index in xrange(self.COMMANDS):
+            start = time.time()
+            self.client.cmd_dvr('echo', index)
+            times.append(time.time() - start)
+
+        times.sort()
+        log.info('%d commands: mean %.3fms, median %.3fms, max %.3fms',
+                 self.COMMANDS, 1000 * sum(times) / len(times),
+                 1000 * times[len(times) / 2], 1000 * times[-1])
+
+    def test_event_throughput(self):
+        self.transport.expect_events(self.EVENTS)
+        start = time.time()
+        self.client.cmd_dvr('publish', self.EVENTS, self.EVENT_SIZE)
+        self.assertTrue(self.transport.wait_for_events())
+        elapsed = time.time() - start
+
+        self.assertEqual(len(self.transport.events), self.EVENTS)
+        log.info('%d events of %d bytes in %.3fs: %.0f events/s',
+                 self.EVENTS, self.EVENT_SIZE, elapsed, self.EVENTS / elapsed)
+
+    def test_nano_throughput(self):
+        """
+        Compare the BOTPT NANO sample event rate of the codecs with the
+        highest NANO output rate
+        """
+        for codec in [PICKLE_CODEC, None]:
+            transport = LocalDriverTransport(codec=codec)
+            try:
+                transport.expect_events(self.NANO_EVENTS)
+                start = time.time()
+                transport.client.cmd_dvr('publish_nano', self.NANO_EVENTS)
+                codec_name = transport.client.codec.name
+                self.assertTrue(transport.wait_for_events())
+                elapsed = time.time() - start
+                self.assertEqual(len(transport.events), self.NANO_EVENTS)
+            finally:
+                transport.stop()
+
+            log.info('%s: %d NANO samples in %.3fs: %.0f events/s, %.0f times the %d Hz NANO rate',
+                     codec_name, self.NANO_EVENTS, elapsed, self.NANO_EVENTS / elapsed,
+                     self.NANO_EVENTS / elapsed / NANO_MAX_RATE, NANO_MAX_RATE)
@@ -27,13 +27,23 @@ import time
 import zmq
 
 from mi.core.instrument.driver_client import DriverClient
+from mi.core.instrument.driver_codec import PICKLE_CODEC, decode_frame, codec_names, get_codec
 from mi.core.log import get_logger ; log = get_logger()
 
+# Milliseconds the event thread waits for an event before checking its stop
+# flag.
+EVENT_POLL_TIMEOUT = 100
+
+# Milliseconds of each wait for a command reply. The wait is repeated until
+# the reply arrives, yielding between waits so cooperative threads can run.
+REPLY_POLL_TIMEOUT = 10
+
  
 class ZmqDriverClient(DriverClient):
     """
     A class for communicating with a ZMQ-based driver process using python
-    thread for catching asynchronous driver events.
+    thread for catching asynchronous driver events. The message codec is
+    negotiated with the driver process by the first command.
     """
     
     def __init__(self, host, cmd_port, event_port):
@@ -51,8 +61,10 @@ class ZmqDriverClient(DriverClient):
         self.event_host_string = 'tcp://%s:%i' % (self.host, self.event_port)
         self.zmq_context = None
         self.zmq_cmd_socket = None
+        self.zmq_cmd_poller = None
         self.event_thread = None
         self.stop_event_thread = True
+        self.codec = None
         
     def start_messaging(self, evt_callback=None):
         """
@@ -64,6 +76,8 @@ class ZmqDriverClient(DriverClient):
         self.zmq_context = zmq.Context()
         self.zmq_cmd_socket = self.zmq_context.socket(zmq.REQ)
         self.zmq_cmd_socket.connect(self.cmd_host_string)
+        self.zmq_cmd_poller = zmq.Poller()
+        self.zmq_cmd_poller.register(self.zmq_cmd_socket, zmq.POLLIN)
         log.info('Driver client cmd socket connected to %s.' %
                        self.cmd_host_string)        
         self.evt_callback = evt_callback
@@ -81,20 +95,25 @@ class ZmqDriverClient(DriverClient):
             log.info('Driver client event thread connected to %s.' %
                   driver_client.event_host_string)
 
+            poller = zmq.Poller()
+            poller.register(sock, zmq.POLLIN)
+
             driver_client.stop_event_thread = False
-            #last_time = time.time()
             while not driver_client.stop_event_thread:
-                try:
-                    evt = sock.recv_pyobj(flags=zmq.NOBLOCK)
-                    log.debug('got event: %s' % str(evt))
-                    if driver_client.evt_callback:
-                        driver_client.evt_callback(evt)
-                except zmq.ZMQError:
-                    time.sleep(.5)
-                #cur_time = time.time()
-                #if cur_time - last_time > 5:
-                #    log.info('event thread listening')
-                #    last_time = cur_time
+                if not poller.poll(EVENT_POLL_TIMEOUT):
+                    continue
+                # Drain every message that has arrived. A message carries one
+                # encoded event per frame.
+                while True:
+                    try:
+                        frames = sock.recv_multipart(flags=zmq.NOBLOCK)
+                    except zmq.ZMQError:
+                        break
+                    for frame in frames:
+                        evt = decode_frame(frame)
+                        log.debug('got event: %s', evt)
+                        if driver_client.evt_callback:
+                            driver_client.evt_callback(evt)
             sock.close()
             context.term()
             log.info('Client event socket closed.')
@@ -109,6 +128,7 @@ class ZmqDriverClient(DriverClient):
         Await event thread completion and return.
         """
         
+        self.zmq_cmd_poller = None
         self.zmq_cmd_socket.close()
         self.zmq_cmd_socket = None
         self.zmq_context.term()
@@ -117,49 +137,57 @@ class ZmqDriverClient(DriverClient):
         #self.event_thread.join()
         self.event_thread = None
         self.evt_callback = None
+        self.codec = None
         log.info('Driver client messaging closed.')        
+
+    def _request(self, msg):
+        """
+        Send a request on the command socket and wait for the reply.
+        @param msg The request message.
+        @retval The decoded reply.
+        """
+        # The REQ socket is always ready to send a request after the
+        # previous reply.
+        self.zmq_cmd_socket.send(self.codec.encode(msg))
+
+        log.debug('Awaiting reply.')
+        while not self.zmq_cmd_poller.poll(REPLY_POLL_TIMEOUT):
+            time.sleep(0)
+        return decode_frame(self.zmq_cmd_socket.recv())
+
+    def _negotiate_codec(self):
+        """
+        Offer the codecs available here to the driver process and use the
+        one it chooses. Driver processes that don't negotiate reply with an
+        error, and the client keeps to pickle.
+        """
+        self.codec = PICKLE_CODEC
+        names = codec_names()
+        reply = self._request({'cmd': 'negotiate_codec', 'args': names, 'kwargs': {}})
+        if reply in names:
+            self.codec = get_codec([reply])
+        log.info('Driver client messaging with codec %s.', self.codec.name)
     
     def cmd_dvr(self, cmd, *args, **kwargs):
         """
         Command a driver by request-reply messaging. Package command
-        message and send on blocking command socket. Block on same socket
-        to receive the reply. Return the driver reply.
+        message and send on blocking command socket. Poll the same socket
+        until the reply arrives. Return the driver reply.
         @param cmd The driver command identifier.
         @param args Positional arguments of the command.
         @param kwargs Keyword arguments of the command.
         @retval Command result.
         """
+        if self.codec is None:
+            self._negotiate_codec()
+
         # Package command dictionary.
         msg = {'cmd':cmd,'args':args,'kwargs':kwargs}
         
-        log.debug('Sending command %s.' % str(msg))
-        while True:
-            try:
-                # Attempt command send. Retry if necessary.
-                self.zmq_cmd_socket.send_pyobj(msg)
-                if msg == 'stop_driver_process':
-                    return 'driver stopping'
-
-                # Command sent, break out and wait for reply.
-                break    
-
-            except zmq.ZMQError:
-                # Socket not ready to accept send. Sleep and retry later.
-                time.sleep(.5)
-            
-        log.debug('Awaiting reply.')
-        while True:
-            try:
-                # Attempt reply recv. Retry if necessary.
-                reply = self.zmq_cmd_socket.recv_pyobj(flags=zmq.NOBLOCK)
-                # Reply recieved, break and return.
-                break
-
-            except zmq.ZMQError:
-                # Socket not ready with the reply. Sleep and retry later.
-                time.sleep(.5)
-                
-        log.debug('Reply: %s.' % str(reply))
+        log.debug('Sending command %s.', msg)
+        reply = self._request(msg)
+
+        log.debug('Reply: %s.', reply)
         
         if isinstance(reply, Exception):
             raise reply
@@ -29,11 +29,19 @@ import zmq
 
 from ooi.exception import ApplicationException
 from mi.core.exceptions import InstrumentException, UnexpectedError
+from mi.core.instrument.driver_codec import PICKLE_CODEC, decode_frame, get_codec
 
 import mi.core.instrument.driver_process as driver_process
 from mi.core.log import get_logger
 log = get_logger()
 
+# Milliseconds the messaging threads wait for a command or an event before
+# checking their stop flags.
+POLL_TIMEOUT = 100
+
+# The most events published in one multipart message.
+MAX_EVENT_BATCH = 100
+
 def _encode_exception(reply):
     if isinstance(reply, InstrumentException):
         # InstrumentExceptions have corresponding IonException error code built-in
@@ -49,6 +57,9 @@ class ZmqDriverProcess(driver_process.DriverProcess):
     Command-REP and event-PUB sockets monitor and react to comms
     needs in separate threads, which can be signaled to end
     by setting boolean flags stop_cmd_thread and stop_evt_thread.
+    Queued events are published in multipart messages of up to
+    max_event_batch events, one event per frame. Replies and events are
+    encoded with the codec the client negotiates, pickle until it does.
     """
     
     @classmethod
@@ -122,14 +133,17 @@ class ZmqDriverProcess(driver_process.DriverProcess):
         self.stop_evt_thread = True
         self.cmd_thread = None
         self.stop_cmd_thread = True
+        self.max_event_batch = MAX_EVENT_BATCH
+        self.codec = PICKLE_CODEC
         
     def start_messaging(self):
         """
         Initialize and start messaging resources for the driver, blocking
         until messaging terminates. This ZMQ implementation starts and
-        joins command and event threads, managing nonblocking send/recv calls
-        on REP and PUB sockets, respectively. Terminate loops and close
-        sockets when stop flag is set in driver process.
+        joins command and event threads, polling the REP socket and waiting
+        on the event queue with timeouts, so commands and events are handled
+        as soon as they arrive. Terminate loops and close sockets when stop
+        flag is set in driver process.
         """
         def recv_cmd_msg(zmq_driver_process):
             """
@@ -143,27 +157,28 @@ class ZmqDriverProcess(driver_process.DriverProcess):
                            zmq_driver_process.cmd_port)
             file(zmq_driver_process.cmd_port_fname,'w+').write(str(zmq_driver_process.cmd_port)+'\n')
 
+            poller = zmq.Poller()
+            poller.register(sock, zmq.POLLIN)
+
             zmq_driver_process.stop_cmd_thread = False
             while not zmq_driver_process.stop_cmd_thread:
+                # The timeout only bounds how long a stop takes to notice.
+                if not poller.poll(POLL_TIMEOUT):
+                    continue
                 try:
-                    msg = sock.recv_pyobj(flags=zmq.NOBLOCK)
-                    #log.trace('Processing message %s', msg)
-                    reply = zmq_driver_process.cmd_driver(msg)
-                    # if operation raised exception, encode as triple
-                    if isinstance(reply, Exception):
-                        reply = _encode_exception(reply)
-                    # send, send, and resend
-                    while True:
-                        try:
-                            sock.send_pyobj(reply, flags=zmq.NOBLOCK)
-                            break
-                        except zmq.ZMQError:
-                            time.sleep(.1)
-                            if zmq_driver_process.stop_cmd_thread:
-                                break
+                    msg = decode_frame(sock.recv(flags=zmq.NOBLOCK))
                 except zmq.ZMQError:
-                    time.sleep(.1)
-                
+                    continue
+
+                #log.trace('Processing message %s', msg)
+                reply = zmq_driver_process.cmd_driver(msg)
+                # if operation raised exception, encode as triple
+                if isinstance(reply, Exception):
+                    reply = _encode_exception(reply)
+                # a REP socket can always send the reply to the request
+                # it just received
+                sock.send(zmq_driver_process.codec.encode(reply))
+
             sock.close()
             context.term()
             log.info('Driver process cmd socket closed.')
@@ -171,7 +186,9 @@ class ZmqDriverProcess(driver_process.DriverProcess):
         def send_evt_msg(zmq_driver_process):
             """
             Await events on the driver process event queue and publish them
-            on a ZMQ PUB socket to the driver process client.
+            on a ZMQ PUB socket to the driver process client. Events waiting
+            in the queue are published together, one pickled event per
+            frame of a multipart message.
             """
             context = zmq.Context()
             sock = context.socket(zmq.PUB)
@@ -181,22 +198,22 @@ class ZmqDriverProcess(driver_process.DriverProcess):
 
             zmq_driver_process.stop_evt_thread = False
             while not zmq_driver_process.stop_evt_thread:
+                events = zmq_driver_process.next_events(zmq_driver_process.max_event_batch,
+                                                        POLL_TIMEOUT / 1000.0)
+                if not events:
+                    continue
+
+                #log.trace('Event thread sending %d events', len(events))
+                codec = zmq_driver_process.codec
+                frames = [codec.encode(_encode_exception(evt) if isinstance(evt, Exception) else evt)
+                          for evt in events]
                 try:
-                    evt = zmq_driver_process.events.pop(0)
-                    #log.trace('Event thread sending event %s',evt)
-                    while evt:
-                        try:
-                            if isinstance(evt, Exception):
-                                evt = _encode_exception(evt)
-                            sock.send_pyobj(evt, flags=zmq.NOBLOCK)
-                            evt = None
-                            log.trace('Event sent!')
-                        except zmq.ZMQError:
-                            time.sleep(.1)
-                            if zmq_driver_process.stop_evt_thread:
-                                break
-                except IndexError:
-                    time.sleep(.1)
+                    # A PUB socket drops messages rather than block once
+                    # the subscriber queue is full.
+                    sock.send_multipart(frames)
+                    log.trace('%d events sent!', len(frames))
+                except zmq.ZMQError as e:
+                    log.error('Driver process could not publish %d events: %s', len(frames), e)
 
             sock.close()
             context.term()
@@ -208,6 +225,23 @@ class ZmqDriverProcess(driver_process.DriverProcess):
         self.evt_thread.start()
         self.messaging_started = True
     
+    def cmd_driver(self, msg):
+        """
+        Process a command message, handling codec negotiation here as it
+        belongs to the transport:
+        'negotiate_codec' - choose the first of the client codecs available
+        here, replying with its name. Replies and events are encoded with it
+        from this reply on.
+        @param msg A driver command message.
+        @retval The driver command result.
+        """
+        if msg.get('cmd', None) == 'negotiate_codec':
+            self.codec = get_codec(msg.get('args', None))
+            log.info('Driver process messaging with codec %s', self.codec.name)
+            return self.codec.name
+
+        return driver_process.DriverProcess.cmd_driver(self, msg)
+
     def stop_messaging(self):
         """
         Close messaging resource for the driver. Set flags to cause
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.latency
+@file mi/core/latency.py
+@brief Latency histograms for measuring driver round trip times
+"""
+
+__license__ = 'Apache 2.0'
+
+from threading import Lock
+
+from mi.core.common import BaseEnum
+
+# Upper bucket bounds in milliseconds, anything slower lands in the last bucket
+DEFAULT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class LatencyHistogramKey(BaseEnum):
+    """
+    Keys in the dict produced by LatencyHistogram.as_dict
+    """
+    COUNT = 'count'
+    TOTAL = 'total'
+    MIN = 'min'
+    MAX = 'max'
+    MEAN = 'mean'
+    BUCKETS = 'buckets'
+
+
+class LatencyHistogram(object):
+    """
+    A thread safe histogram of latencies with fixed millisecond buckets.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        @param buckets Sorted list of upper bucket bounds in milliseconds
+        """
+        self._bounds = list(buckets)
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all recorded latencies
+        """
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._count = 0
+            self._total = 0.0
+            self._min = None
+            self._max = None
+
+    def record(self, seconds):
+        """
+        Add a latency to the histogram
+        @param seconds The latency in seconds
+        """
+        millis = seconds * 1000.0
+        index = 0
+        for bound in self._bounds:
+            if millis <= bound:
+                break
+            index += 1
+
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._total += seconds
+            if self._min is None or seconds < self._min:
+                self._min = seconds
+            if self._max is None or seconds > self._max:
+                self._max = seconds
+
+    def as_dict(self):
+        """
+        @retval A dict with the count, total, min, max and mean latency in
+            seconds and the bucket counts keyed by their bound, such as
+            '<=10ms', with '>10000ms' for the overflow bucket.
+        """
+        with self._lock:
+            labels = ['<=%sms' % bound for bound in self._bounds]
+            labels.append('>%sms' % self._bounds[-1])
+
+            return {
+                LatencyHistogramKey.COUNT: self._count,
+                LatencyHistogramKey.TOTAL: self._total,
+                LatencyHistogramKey.MIN: self._min,
+                LatencyHistogramKey.MAX: self._max,
+                LatencyHistogramKey.MEAN: self._total / self._count if self._count else None,
+                LatencyHistogramKey.BUCKETS: dict(zip(labels, self._counts)),
+            }
@@ -22,17 +22,26 @@ to create a logger automatically scoped with the calling package and ready to us
 
     from ooi.logging import log    # no longer need get_logger at all
 
+to log a value that is expensive to compute only when the record is emitted, pass
+the function and its arguments instead of the value, and format with %s or %r:
+
+    log.debug("particle: %s", lazy(particle.generate_dict))
+
+blocks that only prepare debug output are guarded with log.isEnabledFor(logging.DEBUG).
 """
+from __future__ import absolute_import
+
 import inspect
 import logging
 import os
 import sys
+import time
 import yaml
 import pkg_resources
 from types import FunctionType
 from functools import wraps
 
-from mi.core.common import Singleton
+from mi.core.common import BaseEnum, Singleton
 from ooi.logging import config, log
 
 LOGGING_CONFIG_ENVIRONMENT_VARIABLE="MI_LOGGING_CONFIG"
@@ -77,17 +86,206 @@ class LoggerManager(Singleton):
             if debug:
                 print >> sys.stderr, str(os.getpid()) + ' supplemented logging from ' + LOGGING_CONTAINER_OVERRIDE
 
+        # trace the classes whose loggers are now enabled
+        refresh_method_tracing()
+
+
+class LazyLogValue(object):
+    """
+    A log message argument computed when the message is formatted. Log calls
+    format their arguments only for records that are emitted, so the function
+    isn't called at all when the level is disabled.
+    """
+    __slots__ = ('_func', '_args', '_kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+    def value(self):
+        return self._func(*self._args, **self._kwargs)
+
+    def __str__(self):
+        return str(self.value())
+
+    def __repr__(self):
+        return repr(self.value())
+
+
+def lazy(func, *args, **kwargs):
+    """
+    @param func The function computing the logged value
+    @param args The arguments it is called with
+    @retval A LazyLogValue to pass to a log call in place of the value
+    """
+    return LazyLogValue(func, *args, **kwargs)
+
+
+class MethodProfileKey(BaseEnum):
+    CALLS = 'calls'
+    TIME = 'time'
+
+
+def _level_number(log_level):
+    level = logging.getLevelName(log_level.upper())
+    if isinstance(level, int):
+        return level
+    # TRACE is added by ooi.logging
+    return getattr(logging, 'TRACE', 5)
+
+
+class MethodTracer(object):
+    """
+    Logs the calls of the methods of classes built by get_logging_metaclass,
+    and can record a profile of their call counts and cumulative time. The
+    methods are only wrapped while their class is traced or profiled, so
+    the methods of other classes are called directly.
+
+    A class is traced when its module's logger is enabled for the class's
+    log level, unless tracing was switched on or off for every class. When
+    switched on, calls are logged at the logger's level if the class's level
+    is disabled.
+    Wrappers are installed and removed when the logging configuration is
+    loaded and when tracing is switched, so after changing a log level at
+    runtime call refresh(). Bound methods that were looked up before a
+    switch, e.g. state machine handlers, keep the version they were bound to.
+    """
+    def __init__(self):
+        # (class, logger, level number, {method name: original function})
+        self._classes = []
+        self._enabled = None
+        self._profiling = False
+        # 'Class.method': {MethodProfileKey: value}
+        self._profile = {}
+
+    def register(self, cls, logger, level, functions):
+        """
+        @param cls A class built by a logging metaclass
+        @param logger The logger of the class's module
+        @param level The level number calls are logged at
+        @param functions A dict of the functions defined by the class
+        """
+        entry = (cls, logger, level, functions)
+        self._classes.append(entry)
+        self._install(*entry)
+
+    def set_tracing(self, enabled=None, profile=None):
+        """
+        @param enabled True to trace every class, False to trace none, or
+           None to trace the classes whose logger is enabled
+        @param profile True to record call counts and times, False to stop,
+           or None to leave profiling as it is
+        """
+        self._enabled = enabled
+        if profile is not None:
+            self._profiling = profile
+        self.refresh()
+
+    def refresh(self):
+        """
+        Install or remove the wrappers of every class
+        """
+        for entry in self._classes:
+            self._install(*entry)
+
+    def get_profile(self):
+        """
+        @retval A dict of 'Class.method': {MethodProfileKey: value} of the
+           methods called while profiling
+        """
+        return dict((name, dict(stats)) for (name, stats) in self._profile.iteritems()
+                    if stats[MethodProfileKey.CALLS])
+
+    def reset_profile(self):
+        for stats in self._profile.itervalues():
+            stats[MethodProfileKey.CALLS] = 0
+            stats[MethodProfileKey.TIME] = 0.0
+
+    def _install(self, cls, logger, level, functions):
+        log_calls = logger.isEnabledFor(level)
+        if self._enabled is not None:
+            # when switched on, log at a level the logger emits
+            if self._enabled and not log_calls:
+                level = logger.getEffectiveLevel()
+            log_calls = self._enabled
+
+        for (name, func) in functions.iteritems():
+            if log_calls or self._profiling:
+                func = self._wrap('%s.%s' % (cls.__name__, name), func, logger, level, log_calls)
+            setattr(cls, name, func)
+
+    def _wrap(self, func_name, func, logger, level, log_calls):
+        stats = None
+        if self._profiling:
+            stats = self._profile.setdefault(func_name, {MethodProfileKey.CALLS: 0, MethodProfileKey.TIME: 0.0})
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            if log_calls:
+                logger.log(level, 'entered %s | args: %r | kwargs: %r', func_name, args, kwargs)
+            if stats is None:
+                r = func(*args, **kwargs)
+            else:
+                start = time.time()
+                try:
+                    r = func(*args, **kwargs)
+                finally:
+                    stats[MethodProfileKey.CALLS] += 1
+                    stats[MethodProfileKey.TIME] += time.time() - start
+            if log_calls:
+                logger.log(level, 'exiting %s | returning %r', func_name, r)
+            return r
+        return inner
+
+
+method_tracer = MethodTracer()
+
+
+def set_method_tracing(enabled=None, profile=None):
+    """
+    Switch the method tracing of the classes built by get_logging_metaclass
+    @param enabled True to trace every class, False to trace none, or None
+       to trace the classes whose logger is enabled for their level
+    @param profile True to record call counts and times, False to stop, or
+       None to leave profiling as it is
+    """
+    method_tracer.set_tracing(enabled, profile)
+
+
+def refresh_method_tracing():
+    """
+    Trace the classes whose logger is enabled, after log levels changed
+    """
+    method_tracer.refresh()
+
+
+def get_method_profile():
+    """
+    @retval A dict of 'Class.method': {MethodProfileKey: value}
+    """
+    return method_tracer.get_profile()
+
+
+def reset_method_profile():
+    method_tracer.reset_profile()
+
 
 def get_logging_metaclass(log_level='trace'):
+    """
+    @param log_level The level method calls are logged at
+    @retval A metaclass registering its classes with the method tracer
+    """
+    level = _level_number(log_level)
+
     class LoggingMetaClass(type):
         def __new__(mcs, class_name, bases, class_dict):
-            wrapper = log_method(class_name=class_name, log_level=log_level)
-            new_class_dict = {}
-            for attributeName, attribute in class_dict.items():
-                if type(attribute) == FunctionType:
-                    attribute = wrapper(attribute)
-                new_class_dict[attributeName] = attribute
-            return type.__new__(mcs, class_name, bases, new_class_dict)
+            cls = type.__new__(mcs, class_name, bases, class_dict)
+            functions = dict((name, attribute) for (name, attribute) in class_dict.items()
+                             if type(attribute) == FunctionType)
+            logger = logging.getLogger(class_dict.get('__module__', 'UNKNOWN_MODULE_NAME'))
+            method_tracer.register(cls, logger, level, functions)
+            return cls
     return LoggingMetaClass
 
 
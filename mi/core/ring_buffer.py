@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.ring_buffer
+@file mi/core/ring_buffer.py
+@brief Fixed capacity byte buffer that keeps only the most recent data
+"""
+
+__license__ = 'Apache 2.0'
+
+import re
+import sre_parse
+import sre_constants
+
+# Regex syntax that looks at bytes outside of its match: lookarounds,
+# backreferences and end of string or word boundary assertions
+LOOKAROUND_RE = re.compile(r'\(\?[=!<]|\(\?P=|\$|\\[ZbB1-9]')
+
+
+def match_width(regex):
+    """
+    The most bytes a match of a regex can span. Only matches of at most that
+    many bytes can end in new data, so a search can skip older data.
+    @param regex A compiled regex
+    @retval The width, or None if matches are unbounded or depend on bytes
+       outside of the match
+    """
+    if LOOKAROUND_RE.search(regex.pattern):
+        return None
+    (low, high) = sre_parse.parse(regex.pattern, regex.flags).getwidth()
+    if high >= sre_constants.MAXREPEAT:
+        return None
+    return high
+
+
+class RingBuffer(object):
+    """
+    A byte buffer holding at most capacity bytes, the oldest bytes are
+    dropped as new data is written.
+
+    Positions are absolute offsets into everything ever written to the
+    buffer, so a reader can remember where it stopped looking and only
+    search the data that arrived since. The retained data is the range
+    [start, end).
+
+    Dropped bytes are only released once they outnumber the retained
+    capacity, so writes cost amortized O(1) rather than a copy of the whole
+    buffer each time.
+    """
+    def __init__(self, capacity):
+        """
+        @param capacity The maximum number of bytes retained
+        """
+        self._capacity = capacity
+        self._data = bytearray()
+        # absolute offset of self._data[0]
+        self._offset = 0
+        self._start = 0
+        self._end = 0
+
+    def _get_capacity(self):
+        return self._capacity
+
+    def _set_capacity(self, capacity):
+        self._capacity = capacity
+        self._trim()
+
+    capacity = property(_get_capacity, _set_capacity)
+
+    @property
+    def start(self):
+        """
+        Absolute offset of the oldest retained byte
+        """
+        return self._start
+
+    @property
+    def end(self):
+        """
+        Absolute offset just past the newest byte
+        """
+        return self._end
+
+    def __len__(self):
+        return self._end - self._start
+
+    def write(self, data):
+        """
+        Append data, dropping the oldest bytes beyond the capacity
+        @param data The bytes to append
+        """
+        self._data.extend(data)
+        self._end += len(data)
+        self._trim()
+
+    def clear(self):
+        """
+        Drop all retained data. Offsets keep counting up from the current end.
+        """
+        self._start = self._end
+        self._compact()
+
+    def getvalue(self):
+        """
+        @retval The retained data as a string
+        """
+        return str(buffer(self._data, self._start - self._offset))
+
+    def slice(self, begin, end=None):
+        """
+        @param begin Absolute offset of the first byte, clipped to start
+        @param end Absolute offset past the last byte, defaults to end
+        @retval The data in [begin, end) as a string
+        """
+        if end is None or end > self._end:
+            end = self._end
+        begin = max(begin, self._start)
+        if begin >= end:
+            return ''
+        return str(buffer(self._data, begin - self._offset, end - begin))
+
+    def find(self, sub, since=None):
+        """
+        Find a string in the retained data. When since is given only matches
+        ending after that offset are considered, which lets a caller skip the
+        data it has already searched.
+        @param sub The string to look for
+        @param since Absolute offset of the first byte not yet searched
+        @retval Absolute offset of the first match or -1 if not found
+        """
+        begin = self._start
+        if since is not None:
+            begin = max(begin, since - len(sub) + 1)
+        index = self._data.find(sub, begin - self._offset)
+        if index < 0:
+            return -1
+        return index + self._offset
+
+    def endswith(self, suffix, strip_chars=''):
+        """
+        Check the end of the retained data without copying it
+        @param suffix The string to look for
+        @param strip_chars Characters ignored at the end of the data, as
+           rstrip would remove them
+        @retval True if the data, without trailing strip_chars, ends with suffix
+        """
+        data = self._data
+        begin = self._start - self._offset
+        end = self._end - self._offset
+        while end > begin and chr(data[end - 1]) in strip_chars:
+            end -= 1
+        return end - begin >= len(suffix) and data[end - len(suffix):end] == suffix
+
+    def search(self, regex, since=None, width=None):
+        """
+        Search the retained data with a compiled regex. When since and width
+        are given only matches ending after since are looked for, as in find.
+        The match refers to the buffer contents, so read its groups before
+        writing more data.
+        @param regex The compiled regex
+        @param since Absolute offset of the first byte not yet searched
+        @param width The most bytes a match can span, from match_width. None
+           searches all of the retained data.
+        @retval The match object or None
+        """
+        pos = 0
+        if since is not None and width is not None:
+            pos = max(0, since - width + 1 - self._start)
+        return regex.search(buffer(self._data, self._start - self._offset), pos)
+
+    def _trim(self):
+        if self._end - self._start > self._capacity:
+            self._start = self._end - self._capacity
+        if self._start - self._offset > self._capacity:
+            self._compact()
+
+    def _compact(self):
+        del self._data[:self._start - self._offset]
+        self._offset = self._start
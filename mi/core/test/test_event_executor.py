@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_event_executor
+@file mi/core/test/test_event_executor.py
+@brief Test cases for the serial event executor
+"""
+
+__license__ = 'Apache 2.0'
+
+import time
+from threading import Event
+from threading import current_thread
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.core.event_executor import SerialEventExecutor
+from mi.core.event_executor import EventExecutorKey
+from mi.core.latency import LatencyHistogramKey
+
+
+@attr('UNIT', group='mi')
+class TestSerialEventExecutor(MiUnitTest):
+    """
+    Test the serial event executor
+    """
+    def setUp(self):
+        self.handled = []
+        self.threads = set()
+        self.errors = []
+        self.release = Event()
+        self.release.set()
+
+    def handler(self, event, *args):
+        self.release.wait(5)
+        self.threads.add(current_thread().name)
+        if event == 'fail':
+            raise ValueError(event)
+        self.handled.append((event, args))
+
+    def executor(self, **kwargs):
+        return SerialEventExecutor(self.handler, error_callback=self.errors.append, **kwargs)
+
+    def test_order(self):
+        """
+        Verify events run one at a time on one thread in submit order
+        """
+        executor = self.executor(name='test-events')
+        events = [('event', (index, )) for index in range(100)]
+        for (event, args) in events:
+            self.assertTrue(executor.submit(event, *args))
+
+        self.assertTrue(executor.wait_idle(5))
+        self.assertEqual(self.handled, events)
+        self.assertEqual(self.threads, set(['test-events']))
+
+        stats = executor.get_stats()
+        self.assertEqual(stats[EventExecutorKey.DEPTH], 0)
+        self.assertEqual(stats[EventExecutorKey.SUBMITTED], 100)
+        self.assertEqual(stats[EventExecutorKey.COMPLETED], 100)
+        self.assertEqual(stats[EventExecutorKey.WAIT_LATENCY][LatencyHistogramKey.COUNT], 100)
+        self.assertEqual(stats[EventExecutorKey.RUN_LATENCY][LatencyHistogramKey.COUNT], 100)
+
+    def test_coalesce(self):
+        """
+        Verify an event equal to a waiting one is dropped
+        """
+        executor = self.executor()
+        self.release.clear()
+        executor.submit('running')
+        # wait for the worker to take the first event
+        while executor.depth():
+            time.sleep(.01)
+
+        self.assertTrue(executor.submit('level'))
+        self.assertFalse(executor.submit('level'))
+        self.assertTrue(executor.submit('level', 1))
+        self.assertTrue(executor.submit('sync'))
+        # the running event isn't waiting
+        self.assertTrue(executor.submit('running'))
+        self.assertEqual(executor.depth(), 4)
+        self.assertEqual(executor.get_stats()[EventExecutorKey.MAX_DEPTH], 4)
+
+        self.release.set()
+        self.assertTrue(executor.wait_idle(5))
+        self.assertEqual(self.handled, [('running', ()), ('level', ()), ('level', (1, )),
+                                        ('sync', ()), ('running', ())])
+        self.assertEqual(executor.get_stats()[EventExecutorKey.COALESCED], 1)
+
+        # without coalescing every event runs
+        self.handled = []
+        executor = self.executor(coalesce=False)
+        self.release.clear()
+        executor.submit('level')
+        executor.submit('level')
+        self.release.set()
+        self.assertTrue(executor.wait_idle(5))
+        self.assertEqual(self.handled, [('level', ()), ('level', ())])
+
+    def test_errors(self):
+        """
+        Verify a failed event is reported and later events still run
+        """
+        executor = self.executor()
+        executor.submit('fail')
+        executor.submit('after')
+        self.assertTrue(executor.wait_idle(5))
+
+        self.assertEqual(len(self.errors), 1)
+        self.assertIsInstance(self.errors[0], ValueError)
+        self.assertEqual(self.handled, [('after', ())])
+        stats = executor.get_stats()
+        self.assertEqual(stats[EventExecutorKey.FAILED], 1)
+        self.assertEqual(stats[EventExecutorKey.COMPLETED], 1)
+
+        executor.reset_stats()
+        self.assertEqual(executor.get_stats()[EventExecutorKey.SUBMITTED], 0)
+
+    def test_idle(self):
+        """
+        Verify the worker exits when idle and restarts for the next event
+        """
+        executor = self.executor(idle_timeout=.1)
+        executor.submit('first')
+        self.assertTrue(executor.wait_idle(5))
+        time.sleep(.5)
+        self.assertIsNone(executor._worker)
+
+        executor.submit('second')
+        self.assertTrue(executor.wait_idle(5))
+        self.assertEqual(self.handled, [('first', ()), ('second', ())])
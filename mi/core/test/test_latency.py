@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_latency
+@file mi/core/test/test_latency.py
+@brief Test cases for the latency histogram
+"""
+
+__license__ = 'Apache 2.0'
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.core.latency import LatencyHistogram
+from mi.core.latency import LatencyHistogramKey
+
+
+@attr('UNIT', group='mi')
+class TestLatencyHistogram(MiUnitTest):
+    """
+    Test the latency histogram
+    """
+    def test_empty(self):
+        result = LatencyHistogram().as_dict()
+        self.assertEqual(result[LatencyHistogramKey.COUNT], 0)
+        self.assertEqual(result[LatencyHistogramKey.MEAN], None)
+        self.assertEqual(sum(result[LatencyHistogramKey.BUCKETS].values()), 0)
+
+    def test_record(self):
+        histogram = LatencyHistogram(buckets=[1, 10])
+        histogram.record(.0005)
+        histogram.record(.001)
+        histogram.record(.005)
+        histogram.record(2)
+
+        result = histogram.as_dict()
+        self.assertEqual(result[LatencyHistogramKey.COUNT], 4)
+        self.assertEqual(result[LatencyHistogramKey.MIN], .0005)
+        self.assertEqual(result[LatencyHistogramKey.MAX], 2)
+        self.assertAlmostEqual(result[LatencyHistogramKey.TOTAL], 2.0065)
+        self.assertEqual(result[LatencyHistogramKey.BUCKETS],
+                         {'<=1ms': 2, '<=10ms': 1, '>10ms': 1})
+
+        histogram.reset()
+        self.assertEqual(histogram.as_dict()[LatencyHistogramKey.COUNT], 0)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_lazy_log
+@file mi/core/test/test_lazy_log.py
+@brief Test code for lazy log arguments, and a lint test that flags debug and
+trace messages formatted or computed before the log call in the instrument
+and dataset parser code
+"""
+
+__license__ = 'Apache 2.0'
+
+import ast
+import logging
+import os
+from StringIO import StringIO
+
+from nose.plugins.attrib import attr
+
+import mi
+from mi.core.unit_test import MiUnitTest
+from mi.core.log import lazy
+
+# the code run for every packet, sample or record
+HOT_PATHS = ['core/instrument', 'dataset/parser', 'dataset/dataset_parser.py']
+LAZY_LEVELS = ['debug', 'trace']
+# calls cheap enough to pass to a log call directly
+CHEAP_FUNCTIONS = ['len', 'type', 'id']
+CHEAP_METHODS = ['group', 'start', 'end', 'tell']
+
+
+def _is_eager(node):
+    """
+    @retval True if evaluating the expression calls a function that isn't
+       known to be cheap, other than the function passed to lazy()
+    """
+    if isinstance(node, ast.Call):
+        if isinstance(node.func, ast.Name):
+            if node.func.id == 'lazy':
+                return any(_is_eager(child) for child in node.args[1:] + [k.value for k in node.keywords])
+            if node.func.id not in CHEAP_FUNCTIONS:
+                return True
+        elif not (isinstance(node.func, ast.Attribute) and node.func.attr in CHEAP_METHODS):
+            return True
+    return any(_is_eager(child) for child in ast.iter_child_nodes(node))
+
+
+def eager_log_calls(source, filename='<source>'):
+    """
+    @param source Python source code
+    @retval A list of (line, reason) of the debug and trace log calls whose
+       message is formatted with % or +, or whose arguments call a function
+       that isn't known to be cheap
+    """
+    result = []
+    for node in ast.walk(ast.parse(source, filename)):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and
+                node.func.attr in LAZY_LEVELS and isinstance(node.func.value, ast.Name) and
+                node.func.value.id == 'log' and node.args):
+            continue
+
+        message = node.args[0]
+        if isinstance(message, ast.BinOp) and isinstance(message.op, (ast.Mod, ast.Add)):
+            result.append((node.lineno, 'message formatted before the call'))
+
+        if any(_is_eager(argument) for argument in node.args[1:]):
+            result.append((node.lineno, 'argument computed before the call'))
+    return result
+
+
+def hot_path_files():
+    root = os.path.dirname(mi.__file__)
+    for path in HOT_PATHS:
+        path = os.path.join(root, path)
+        if os.path.isfile(path):
+            yield path
+            continue
+        for (directory, directories, files) in os.walk(path):
+            directories[:] = [name for name in directories if name != 'test']
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    yield os.path.join(directory, name)
+
+
+@attr('UNIT', group='mi')
+class LazyLogUnitTestCase(MiUnitTest):
+    """
+    Verify lazy arguments are only computed for messages that are emitted
+    """
+    def setUp(self):
+        self.stream = StringIO()
+        handler = logging.StreamHandler(self.stream)
+        self.logger = logging.getLogger('mi.core.test.test_lazy_log')
+        self.logger.propagate = False
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+        self.calls = []
+
+    def _value(self, value):
+        self.calls.append(value)
+        return value
+
+    def test_disabled(self):
+        self.logger.setLevel(logging.INFO)
+        self.logger.debug('value %s', lazy(self._value, 'a'))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.stream.getvalue(), '')
+
+    def test_enabled(self):
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.debug('value %s %r', lazy(self._value, 'a'), lazy(self._value, value='b'))
+        self.assertEqual(self.calls, ['a', 'b'])
+        self.assertEqual(self.stream.getvalue(), "value a 'b'\n")
+
+    def test_eager_log_calls(self):
+        source = '\n'.join([
+            'log.debug("a %s" % value)',
+            'log.trace("a " + str(value))',
+            'log.debug("a %s", particle.generate_dict())',
+            'log.debug("a %s", str(particle.generate_dict()))',
+            'log.debug("a %s %d %s", value, len(value), match.group(1))',
+            'log.debug("a %s", lazy(particle.generate_dict))',
+            'log.debug("a %s", lazy(binascii.hexlify, match.group(0)))',
+            'log.debug("a %s", lazy(binascii.hexlify, chunk.strip()))',
+            'log.info("a %s" % value)',
+            'log.error("a %s", particle.generate_dict())'])
+        self.assertEqual([line for (line, reason) in eager_log_calls(source)], [1, 2, 3, 4, 8])
+
+    def test_hot_paths(self):
+        """
+        Verify the instrument and dataset parser code has no eager debug or
+        trace log calls
+        """
+        found = []
+        for path in hot_path_files():
+            with open(path) as filehandle:
+                source = filehandle.read()
+            found.extend('%s:%d %s' % (path, line, reason) for (line, reason) in eager_log_calls(source, path))
+        self.assertEqual(found, [], '\n'.join(found))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_method_tracing
+@file mi/core/test/test_method_tracing.py
+@brief Test code for the method tracing of classes built by
+get_logging_metaclass, and a benchmark comparing calls to methods that are
+always wrapped with calls to methods wrapped only while traced
+"""
+
+__license__ = 'Apache 2.0'
+
+import logging
+import time
+from functools import wraps
+from types import FunctionType
+from StringIO import StringIO
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.log import get_logging_metaclass, set_method_tracing, refresh_method_tracing
+from mi.core.log import get_method_profile, reset_method_profile, MethodProfileKey
+
+logger = logging.getLogger(__name__)
+
+
+class Traced(object):
+    __metaclass__ = get_logging_metaclass('debug')
+
+    def add(self, a, b=1):
+        return a + b
+
+    def fail(self):
+        raise ValueError('fail')
+
+    @staticmethod
+    def static():
+        return 'static'
+
+
+class TracedChild(Traced):
+    def add(self, a, b=1):
+        return super(TracedChild, self).add(a, b) * 2
+
+
+def legacy_logging_metaclass(log_level='trace'):
+    """
+    The logging metaclass that always wrapped every method
+    """
+    class LoggingMetaClass(type):
+        def __new__(mcs, class_name, bases, class_dict):
+            new_class_dict = {}
+            for attribute_name, attribute in class_dict.items():
+                if type(attribute) == FunctionType:
+                    attribute = legacy_log_method(class_name, log_level)(attribute)
+                new_class_dict[attribute_name] = attribute
+            return type.__new__(mcs, class_name, bases, new_class_dict)
+    return LoggingMetaClass
+
+
+def legacy_log_method(class_name, log_level):
+    def wrapper(func):
+        func_name = '%s.%s' % (class_name, func.__name__)
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            getattr(logger, log_level)('entered %s | args: %r | kwargs: %r', func_name, args, kwargs)
+            r = func(*args, **kwargs)
+            getattr(logger, log_level)('exiting %s | returning %r', func_name, r)
+            return r
+        return inner
+    return wrapper
+
+
+@attr('UNIT', group='mi')
+class MethodTracingUnitTestCase(MiUnitTest):
+    """
+    Verify methods are wrapped only while traced or profiled
+    """
+    def setUp(self):
+        self.stream = StringIO()
+        handler = logging.StreamHandler(self.stream)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+        self.addCleanup(logger.setLevel, logger.level)
+        self.addCleanup(set_method_tracing, None, False)
+        reset_method_profile()
+
+    def _set_level(self, level):
+        logger.setLevel(level)
+        refresh_method_tracing()
+
+    def assert_wrapped(self, wrapped):
+        method = Traced.__dict__['add']
+        self.assertEqual(method.__name__, 'add')
+        self.assertEqual(method.func_code.co_name == 'inner', wrapped)
+
+    def test_level(self):
+        self._set_level(logging.INFO)
+        self.assert_wrapped(False)
+        self.assertEqual(Traced().add(1), 2)
+        self.assertEqual(self.stream.getvalue(), '')
+
+        self._set_level(logging.DEBUG)
+        self.assert_wrapped(True)
+        self.assertEqual(Traced().add(1, b=2), 3)
+        (entered, exiting) = self.stream.getvalue().splitlines()
+        self.assertRegexpMatches(entered, r"^entered Traced.add \| args: \(<.*>, 1\) \| kwargs: \{'b': 2\}$")
+        self.assertEqual(exiting, 'exiting Traced.add | returning 3')
+
+        # static methods aren't wrapped
+        self.assertEqual(Traced.static(), 'static')
+
+    def test_switch(self):
+        self._set_level(logging.INFO)
+        set_method_tracing(True)
+        self.assert_wrapped(True)
+        self.assertEqual(TracedChild().add(1), 4)
+        self.assertEqual([line.split(' |')[0] for line in self.stream.getvalue().splitlines()], [
+            'entered TracedChild.add', 'entered Traced.add', 'exiting Traced.add', 'exiting TracedChild.add'])
+
+        self._set_level(logging.DEBUG)
+        set_method_tracing(False)
+        self.assert_wrapped(False)
+
+    def test_profile(self):
+        self._set_level(logging.INFO)
+        set_method_tracing(profile=True)
+        self.assert_wrapped(True)
+
+        traced = TracedChild()
+        for _ in range(3):
+            traced.add(1)
+        self.assertRaises(ValueError, traced.fail)
+        self.assertEqual(self.stream.getvalue(), '')
+
+        profile = get_method_profile()
+        self.assertEqual(sorted(profile), ['Traced.add', 'Traced.fail', 'TracedChild.add'])
+        self.assertEqual(profile['TracedChild.add'][MethodProfileKey.CALLS], 3)
+        self.assertEqual(profile['Traced.fail'][MethodProfileKey.CALLS], 1)
+        self.assertGreaterEqual(profile['TracedChild.add'][MethodProfileKey.TIME],
+                                profile['Traced.add'][MethodProfileKey.TIME])
+
+        reset_method_profile()
+        self.assertEqual(get_method_profile(), {})
+
+        set_method_tracing(profile=False)
+        self.assert_wrapped(False)
+        traced.add(1)
+        self.assertEqual(get_method_profile(), {})
+
+
+@attr('PERF', group='mi')
+class MethodTracingBenchmark(MiUnitTest):
+    """
+    Compare calling a method of a class whose methods are always wrapped with
+    a class whose methods are only wrapped while traced, with tracing off
+    """
+    CALLS = 200000
+
+    def _time(self, cls):
+        instance = cls()
+        start = time.time()
+        for index in xrange(self.CALLS):
+            instance.add(index)
+        return time.time() - start
+
+    def test_benchmark(self):
+        logger.setLevel(logging.INFO)
+        refresh_method_tracing()
+
+        class Legacy(object):
+            __metaclass__ = legacy_logging_metaclass('debug')
+
+            def add(self, a, b=1):
+                return a + b
+
+        legacy_time = self._time(Legacy)
+        traced_time = self._time(Traced)
+        log.info('%d calls with tracing off: always wrapped %.3fs, wrapped while traced %.3fs (%.1fx)',
+                 self.CALLS, legacy_time, traced_time, legacy_time / traced_time)
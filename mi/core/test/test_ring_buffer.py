@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_ring_buffer
+@file mi/core/test/test_ring_buffer.py
+@brief Test cases for the fixed capacity ring buffer
+"""
+
+__license__ = 'Apache 2.0'
+
+import re
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.core.ring_buffer import RingBuffer, match_width
+
+
+@attr('UNIT', group='mi')
+class TestRingBuffer(MiUnitTest):
+    """
+    Test the ring buffer
+    """
+    def test_write(self):
+        ring = RingBuffer(5)
+        ring.write("abc")
+        self.assertEqual(ring.getvalue(), "abc")
+        self.assertEqual(len(ring), 3)
+
+        ring.write("defg")
+        self.assertEqual(ring.getvalue(), "cdefg")
+        self.assertEqual((ring.start, ring.end), (2, 7))
+
+        ring.write("0123456789")
+        self.assertEqual(ring.getvalue(), "56789")
+        self.assertEqual((ring.start, ring.end), (12, 17))
+
+    def test_storage_bounded(self):
+        ring = RingBuffer(10)
+        for i in xrange(1000):
+            ring.write("%03d" % i)
+            self.assertTrue(len(ring._data) <= 2 * ring.capacity + 3)
+        self.assertEqual(ring.getvalue(), "6997998999")
+
+    def test_clear(self):
+        ring = RingBuffer(10)
+        ring.write("abc")
+        ring.clear()
+        self.assertEqual(ring.getvalue(), "")
+        self.assertEqual((ring.start, ring.end), (3, 3))
+
+        ring.write("de")
+        self.assertEqual(ring.getvalue(), "de")
+        self.assertEqual(ring.slice(3, 4), "d")
+
+    def test_capacity(self):
+        ring = RingBuffer(10)
+        ring.write("0123456789")
+        ring.capacity = 4
+        self.assertEqual(ring.getvalue(), "6789")
+
+    def test_slice(self):
+        ring = RingBuffer(5)
+        ring.write("0123456")
+        self.assertEqual(ring.slice(0), "23456")
+        self.assertEqual(ring.slice(3, 5), "34")
+        self.assertEqual(ring.slice(5, 100), "56")
+        self.assertEqual(ring.slice(6, 4), "")
+
+    def test_find(self):
+        ring = RingBuffer(100)
+        ring.write("S>abc")
+        self.assertEqual(ring.find("S>"), 0)
+        self.assertEqual(ring.find("S>", since=ring.end), -1)
+
+        # a match split across writes is still found from the last offset
+        since = ring.end
+        ring.write("S")
+        self.assertEqual(ring.find("S>", since), -1)
+        since = ring.end
+        ring.write(">")
+        self.assertEqual(ring.find("S>", since), 5)
+
+    def test_find_after_trim(self):
+        ring = RingBuffer(4)
+        ring.write("ab>cdefgh")
+        self.assertEqual(ring.find(">"), -1)
+        self.assertEqual(ring.find("fg", since=0), 6)
+
+    def test_search(self):
+        ring = RingBuffer(100)
+        ring.write("junk\r\nVALUE=42\r\n")
+        match = ring.search(re.compile(r'VALUE=(\d+)'))
+        self.assertEqual(match.groups(), ('42',))
+        self.assertEqual(ring.search(re.compile(r'MISSING')), None)
+
+    def test_search_since(self):
+        regex = re.compile(r'V=(\d\d)')
+        width = match_width(regex)
+        self.assertEqual(width, 4)
+
+        ring = RingBuffer(100)
+        ring.write("V=12 V=3")
+        since = ring.end
+        ring.write("4")
+        # only a match ending in the new data is found
+        match = ring.search(regex, since, width)
+        self.assertEqual(match.groups(), ('34',))
+        self.assertEqual(ring.search(regex, ring.end, width), None)
+        # without a width all of the data is searched
+        self.assertEqual(ring.search(regex, ring.end).groups(), ('12',))
+
+        # an anchor still refers to the start of the data
+        ring = RingBuffer(100)
+        ring.write("V=1")
+        since = ring.end
+        ring.write("2")
+        self.assertEqual(ring.search(re.compile(r'^V=(\d\d)'), since, width).groups(), ('12',))
+
+    def test_match_width(self):
+        self.assertEqual(match_width(re.compile(r'abc')), 3)
+        self.assertEqual(match_width(re.compile(r'(a|bcd)x?')), 4)
+        self.assertEqual(match_width(re.compile(r'S>.{2,10}\r\n')), 14)
+        # unbounded
+        self.assertEqual(match_width(re.compile(r'S>.*\r\n')), None)
+        self.assertEqual(match_width(re.compile(r'a+')), None)
+        # looks outside of the match
+        self.assertEqual(match_width(re.compile(r'abc$')), None)
+        self.assertEqual(match_width(re.compile(r'abc(?=d)')), None)
+        self.assertEqual(match_width(re.compile(r'(a)\1')), None)
+
+    def test_endswith(self):
+        ring = RingBuffer(6)
+        ring.write("prompt>  \t")
+        self.assertTrue(ring.endswith(">", " \t"))
+        self.assertTrue(ring.endswith("t>", " \t"))
+        self.assertFalse(ring.endswith(">"))
+        # only the retained data is compared
+        self.assertTrue(ring.endswith("pt>", " \t"))
+        self.assertFalse(ring.endswith("mpt>", " \t"))
+        self.assertTrue(ring.endswith("", " \t"))
+
+        ring = RingBuffer(6)
+        ring.write("   ")
+        self.assertFalse(ring.endswith(">", " "))
+        self.assertTrue(ring.endswith("", " "))
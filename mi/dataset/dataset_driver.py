@@ -13,7 +13,6 @@ __license__ = 'Apache 2.0'
 import os
 import gevent
 import shutil
-import hashlib
 import copy
 import traceback
 
@@ -34,6 +33,10 @@ from mi.core.instrument.protocol_cmd_dict import ProtocolCommandDict
 from mi.core.instrument.driver_dict import DriverDict
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 from mi.core.instrument.protocol_param_dict import Parameter
+from mi.core.instrument.particle_batch import expand_particle_batches
+from mi.dataset.fingerprint import file_checksum
+from mi.dataset.driver_state import DriverStateKey, DriverStateStore, expand_state
+from mi.dataset.parallel_ingest import ParallelIngester, IngestMessage, portable_particle, rebuild_exception
 from mi.core.common import BaseEnum
 
 class DataSourceConfigKey(BaseEnum):
@@ -41,16 +44,9 @@ class DataSourceConfigKey(BaseEnum):
     PARSER = 'parser'
     DRIVER = 'driver'
     RESOURCE_ID = 'resource_id'
-
-class DriverStateKey(BaseEnum):
-    VERSION = 'version'
-    FILE_NAME = 'file_name'
-    FILE_SIZE = 'file_size'
-    FILE_MOD_DATE = 'file_mod_date'
-    FILE_CHECKSUM = 'file_checksum'
-    INGESTED = 'ingested'
-    PARSER_STATE = 'parser_state'
-    MODIFIED_STATE = 'modified_state'
+    PUBLISH_BATCHES = 'publish_batches'
+    CHECKPOINT = 'checkpoint'
+    INGEST_PROCESSES = 'ingest_processes'
 
 # Driver parameters.
 class DriverParameter(BaseEnum):
@@ -104,11 +100,13 @@ class DataSetDriverConfigKeys(BaseEnum):
     PARTICLE_MODULE = "particle_module"
     PARTICLE_CLASS = "particle_class"
     PARTICLE_CLASSES_DICT = "particle_classes_dict"
+    PARTICLE_BATCHES = "particle_batches"
     DIRECTORY = "directory"
     STORAGE_DIRECTORY = "storage_directory"
     PATTERN = "pattern"
     FREQUENCY = "frequency"
     FILE_MOD_WAIT_TIME = "file_mod_wait_time"
+    INOTIFY = "inotify"
     HARVESTER = "harvester"
     PARSER = "parser"
     MODULE = "module"
@@ -141,6 +139,12 @@ class DataSetDriver(object):
             'file_mod_wait_time': 30,
         },
         'parser': {}
+        'publish_batches': False,
+        'checkpoint': {
+            'records': 100,
+            'interval': 10,
+            'compact': True,
+        },
         'driver': {
             'records_per_second'
             'harvester_polling_interval'
@@ -150,8 +154,17 @@ class DataSetDriver(object):
     """
     def __init__(self, config, memento, data_callback, state_callback, event_callback, exception_callback):
         self._config = copy.deepcopy(config)
-        self._data_callback = data_callback
-        self._state_callback = state_callback
+        # parsers publish through _publish_samples, which hands the samples
+        # to the agent's data callback
+        self._agent_data_callback = data_callback
+        self._data_callback = self._publish_samples
+        self._publish_batches = self._config.get(DataSourceConfigKey.PUBLISH_BATCHES, False)
+        # the driver state is saved through _state_callback, parser progress
+        # through _state_store.update, which checkpoint it to the agent's
+        # state callback as the checkpoint config allows
+        self._state_store = DriverStateStore.from_config(state_callback,
+                                                         self._config.get(DataSourceConfigKey.CHECKPOINT))
+        self._state_callback = self._state_store.save
         self._event_callback = event_callback
         self._exception_callback = exception_callback
         self._memento = memento
@@ -191,6 +204,7 @@ class DataSetDriver(object):
 
         self._stop_sampling()
         self._stop_publisher_thread()
+        self._state_store.flush()
 
     def _start_sampling(self):
         raise NotImplementedException('virtual method needs to be specialized')
@@ -427,6 +441,7 @@ class DataSetDriver(object):
         try:
             while(not self._publisher_shutdown):
                 self._poll()
+                self._state_store.flush_expired()
                 gevent.sleep(self._polling_interval)
         except Exception as e:
             log.error("Exception in publisher thread (resource id: %s): %s", self._resource_id, traceback.format_exc(e))
@@ -437,6 +452,17 @@ class DataSetDriver(object):
     def _poll(self):
         raise NotImplementedException('virtual methond needs to be specialized')
 
+    def _publish_samples(self, samples):
+        """
+        Publish the samples from a parser to the agent. Particle batches are
+        forwarded whole if the publish_batches config is set, otherwise they
+        are expanded to data particles.
+        @param samples A list of data particles and particle batches
+        """
+        if not self._publish_batches:
+            samples = expand_particle_batches(samples)
+        self._agent_data_callback(samples)
+
     def _new_file_exception(self):
         raise NotImplementedException('virtual methond needs to be specialized')
 
@@ -453,9 +479,7 @@ class DataSetDriver(object):
         to the payload of the event.
         """
         s = os.stat(name)
-        checksum = ""
-        with open(name, 'rb') as filehandle:
-            checksum = hashlib.md5(filehandle.read()).hexdigest()
+        checksum = file_checksum(name)
 
         stats = {
             'name': name,
@@ -670,7 +694,9 @@ class SimpleDataSetDriver(DataSetDriver):
         if file_ingested:
             log.debug("File %s fully parsed", self._file_in_process)
             self._driver_state[self._file_in_process][DriverStateKey.INGESTED] = True
-        self._state_callback(self._driver_state)
+            self._state_callback(self._driver_state)
+        else:
+            self._state_store.update(self._driver_state)
 
     def _save_parser_state_after_error(self):
         """
@@ -689,7 +715,7 @@ class SimpleDataSetDriver(DataSetDriver):
         if memento != None:
             if not isinstance(memento, dict): raise TypeError("memento must be a dict.")
 
-            self._driver_state = memento
+            self._driver_state = expand_state(memento)
             if not self._driver_state:
                 # if the state is empty, add a version
                 self._driver_state = {DriverStateKey.VERSION: 0.1}
@@ -710,8 +736,7 @@ class SimpleDataSetDriver(DataSetDriver):
             full_file_path = os.path.join(self._harvester_config[DataSetDriverConfigKeys.DIRECTORY], file_name)
             mod_time = os.path.getmtime(full_file_path)
             file_size = os.path.getsize(full_file_path)
-            with open(full_file_path, 'rb') as filehandle:
-                md5_checksum = hashlib.md5(filehandle.read()).hexdigest()
+            md5_checksum = file_checksum(full_file_path)
             self._driver_state[file_name] = {
                 DriverStateKey.FILE_SIZE: file_size,
                 DriverStateKey.FILE_MOD_DATE: mod_time,
@@ -784,7 +809,7 @@ class SingleFileDataSetDriver(SimpleDataSetDriver):
         if memento != None:
             if not isinstance(memento, dict): raise TypeError("memento must be a dict.")
 
-            self._driver_state = memento
+            self._driver_state = expand_state(memento)
             if not self._driver_state:
                 # if the state is empty, add a version
                 self._driver_state = {DriverStateKey.VERSION: 0.1,
@@ -864,7 +889,7 @@ class SingleFileDataSetDriver(SimpleDataSetDriver):
         log.trace("saving parser state: %r", state)
         # this is for the single file harvester, which does not use file name keys
         self._driver_state[self._filename][DriverStateKey.PARSER_STATE] = state
-        self._state_callback(self._driver_state)
+        self._state_store.update(self._driver_state)
 
     def _file_changed_callback(self, new_state):
         """
@@ -930,6 +955,13 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
         self._publisher_shutdown = {}
         self._init_queues()
 
+        # with the ingest_processes config, files found by directory harvesters
+        # are parsed in that many worker processes
+        self._ingester = None
+        processes = self._config.get(DataSourceConfigKey.INGEST_PROCESSES)
+        if processes:
+            self._ingester = ParallelIngester(processes)
+
     def _init_queues(self):
         """
         Initialize the queues which hold the either the newly found files (for single
@@ -960,7 +992,7 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
         if memento != None:
             if not isinstance(memento, dict): raise TypeError("memento must be a dict.")
 
-            self._driver_state = memento
+            self._driver_state = expand_state(memento)
             if not self._driver_state:
                 # if the state is empty, add a version
                 self._driver_state = {DriverStateKey.VERSION: 0.1}
@@ -1022,6 +1054,7 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
         try:
             while(not self._publisher_shutdown[data_key]):
                 self._poll(data_key)
+                self._state_store.flush_expired()
                 gevent.sleep(self._polling_interval)
         except Exception as e:
             log.error("Exception in publisher thread (resource id: %s): %s", self._resource_id, traceback.format_exc(e))
@@ -1040,6 +1073,7 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
             filename = self._harvester_config[data_key].get(DataSetDriverConfigKeys.PATTERN)
             while(not self._publisher_shutdown[data_key]):
                 self._poll_single_file(data_key, filename)
+                self._state_store.flush_expired()
                 gevent.sleep(self._polling_interval)
         except Exception as e:
             log.error("Exception in publisher thread (resource id: %s): %s", self._resource_id, traceback.format_exc(e))
@@ -1052,6 +1086,10 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
         Main loop to listen for new files to parse.  Parse them and move on.
         @param data_key The data key to index into the queues
         """
+        if self._ingester:
+            self._poll_parallel(data_key)
+            return
+
         # If we have files, grab the first and process it.
         count = len(self._new_file_queue[data_key])
         log.trace("Checking for new files in %s queue, count: %d", data_key, count)
@@ -1060,6 +1098,115 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
                       id(self._new_file_queue[data_key]))
             self._got_file(self._new_file_queue[data_key].pop(0), data_key)
 
+    def _poll_parallel(self, data_key):
+        """
+        Parse the queued files of a data key in ingest worker processes until
+        the queue is empty and every file is done. The particles of the files
+        are published and their parser state saved in the order the files
+        were queued, so the driver state is the same as parsing them one at a
+        time. The records_per_second throttle isn't applied.
+        @param data_key The data key to index into the queues
+        """
+        queue = self._new_file_queue[data_key]
+        while queue or self._ingester.has_jobs(data_key):
+            while queue and self._ingester.has_capacity():
+                self._start_ingest_worker(queue.pop(0), data_key)
+            for (file_name, message) in self._ingester.results(data_key, self._polling_interval):
+                self._apply_ingest_message(file_name, data_key, message)
+
+    def _start_ingest_worker(self, file_name, data_key):
+        """
+        Do any optional pre-parsing, then start a worker process parsing a file
+        @param file_name name of the file to parse
+        @param data_key The key to index into the harvester and parser
+        """
+        log.debug('starting ingest worker, resource_id: %s, file %s', self._resource_id, file_name)
+        try:
+            self._file_in_process[data_key] = file_name
+            self.pre_parse(filename=file_name, data_key=data_key)
+        except SampleException as e:
+            self._ingest_failed(file_name, data_key, e)
+            return
+        finally:
+            self._file_in_process[data_key] = None
+
+        directory = self._harvester_config[data_key].get(DataSetDriverConfigKeys.DIRECTORY)
+        path = os.path.join(directory, file_name)
+        self._raise_new_file_event(path)
+        self._ingester.start(data_key, file_name, self._ingest_worker, (file_name, data_key, path))
+
+    def _ingest_worker(self, worker, file_name, data_key, path):
+        """
+        Parse a file in an ingest worker process, a fork of the driver. The
+        parser's callbacks are redirected to send the particles, with the
+        parser state that follows them, and sample exceptions to the driver.
+        The particles are sent without their raw data, which can't always be
+        pickled.
+        @param worker The IngestWorker to send the results through
+        @param file_name name of the file to parse
+        @param data_key The key to index into the harvester and parser
+        @param path The path of the file
+        """
+        samples = []
+
+        def save_parser_state(state, data_key, file_ingested=None):
+            worker.send_records(samples[:], state, file_ingested)
+            del samples[:]
+
+        def publish(particles):
+            samples.extend(portable_particle(particle) for particle in particles)
+
+        self._data_callback = publish
+        self._save_parser_state = save_parser_state
+        self._sample_exception_callback = worker.send_sample_exception
+
+        count = self._generate_particle_count or 1
+        handle = open(path)
+        parser = self._build_parser(self._driver_state[data_key][file_name][DriverStateKey.PARSER_STATE], handle, data_key)
+        while parser.get_records(count):
+            pass
+        if samples:
+            worker.send_records(samples[:], None, None)
+
+    def _apply_ingest_message(self, file_name, data_key, message):
+        """
+        Publish the particles and save the parser state an ingest worker sent
+        @param file_name name of the file the worker parsed
+        @param data_key The key to index into the harvester and parser
+        @param message An IngestMessage tuple
+        @throws The exception that stopped the parser, other than a sample
+           exception
+        """
+        if message[0] == IngestMessage.RECORDS:
+            (_, samples, state, file_ingested) = message
+            if samples:
+                self._data_callback(samples)
+            if state is not None:
+                self._file_in_process[data_key] = file_name
+                try:
+                    self._save_parser_state(state, data_key, file_ingested)
+                finally:
+                    self._file_in_process[data_key] = None
+
+        elif message[0] == IngestMessage.SAMPLE_EXCEPTION:
+            self._sample_exception_callback(rebuild_exception(message[1]))
+
+        elif message[0] == IngestMessage.ERROR:
+            exception = rebuild_exception(message[1])
+            if not isinstance(exception, SampleException):
+                raise exception
+            self._ingest_failed(file_name, data_key, exception)
+
+    def _ingest_failed(self, file_name, data_key, exception):
+        """
+        Mark a file that failed with a sample exception as ingested, so it
+        isn't ingested again
+        """
+        log.debug("File %s fully parsed", file_name)
+        self._driver_state[data_key][file_name][DriverStateKey.INGESTED] = True
+        self._state_callback(self._driver_state)
+        self._sample_exception_callback(exception)
+
     def _poll_single_file(self, data_key, filename):
         """
         Main loop to listen for if the file has changed to parse.  Parse them and move on.
@@ -1098,6 +1245,8 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
             self._harvester = None
         else:
             log.debug("poller not running. no need to shutdown")
+        if self._ingester:
+            self._ingester.stop()
 
     def _got_file(self, file_name, data_key):
         """
@@ -1225,7 +1374,9 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
         if file_ingested:
             log.debug("File %s fully parsed", file_name)
             self._driver_state[data_key][file_name][DriverStateKey.INGESTED] = True
-        self._state_callback(self._driver_state)
+            self._state_callback(self._driver_state)
+        else:
+            self._state_store.update(self._driver_state)
 
     def _file_changed_callback(self, new_state, data_key):
         """
@@ -1252,8 +1403,7 @@ class MultipleHarvesterDataSetDriver(SimpleDataSetDriver):
             full_file_path = os.path.join(self._harvester_config[data_key][DataSetDriverConfigKeys.DIRECTORY], file_name)
             mod_time = os.path.getmtime(full_file_path)
             file_size = os.path.getsize(full_file_path)
-            with open(full_file_path, 'rb') as filehandle:
-                md5_checksum = hashlib.md5(filehandle.read()).hexdigest()
+            md5_checksum = file_checksum(full_file_path)
             self._driver_state[data_key][file_name] = {
                 DriverStateKey.FILE_SIZE: file_size,
                 DriverStateKey.FILE_MOD_DATE: mod_time,
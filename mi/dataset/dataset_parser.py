@@ -18,6 +18,7 @@ from mi.core.log import get_logger
 log = get_logger()
 from mi.core.instrument.chunker import StringChunker
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.particle_batch import ParticleBatch
 from mi.core.exceptions import RecoverableSampleException, SampleEncodingException
 from mi.core.exceptions import NotImplementedException, UnexpectedDataException
 from mi.dataset.dataset_driver import DataSetDriverConfigKeys
@@ -143,6 +144,26 @@ class Parser(object):
 
         return particle
 
+    def _extract_batch(self, stream_name, columns, timestamps, raw_data=None):
+        """
+        Build a columnar batch of particles for parsers that publish whole
+        tables of records at once. The batch is published like a particle
+        and expanded to particles for consumers that don't take batches.
+
+        @param stream_name The stream of the particles in the batch
+        @param columns A list of (value_id, values) pairs in particle order
+        @param timestamps The internal timestamp of each row
+        @param raw_data The raw data of each row, or None
+        @retval A ParticleBatch
+        """
+        batch = ParticleBatch(stream_name, columns, internal_timestamp=timestamps,
+                              preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP,
+                              new_sequence=self._new_sequence, raw_data=raw_data)
+        if self._new_sequence and len(batch) > 0:
+            self._new_sequence = False
+
+        return batch
+
 
 class BufferLoadingParser(Parser):
     """
@@ -191,7 +212,7 @@ class BufferLoadingParser(Parser):
         if num_records <= 0:
             return []
         try:
-            while len(self._record_buffer) < num_records:
+            while self._buffered_record_count() < num_records:
                 self._load_particle_buffer()        
         except EOFError:
             self._process_end_of_file()
@@ -210,6 +231,42 @@ class BufferLoadingParser(Parser):
             log.warn("Have extra unexplained data chunk bytes at the end of the file:%s", chunk)
             raise UnexpectedDataException("Have extra unexplained data chunk bytes at the end of the file:%s" % chunk)
 
+    def _buffered_record_count(self):
+        """
+        @retval The number of records in the record buffer, counting each row
+           of a particle batch as a record
+        """
+        count = len(self._record_buffer)
+        for record in self._record_buffer:
+            # parsers that override _yank_particles may buffer bare particles
+            if isinstance(record, tuple) and isinstance(record[0], ParticleBatch):
+                count += len(record[0]) - 1
+        return count
+
+    def _split_record_buffer(self, num_records):
+        """
+        Find the record buffer entries that hold the next num_records
+        records. A particle batch with more rows than are needed is split in
+        two, so the rest of its rows stay in the buffer with their states.
+        @param num_records The number of records to take
+        @retval The number of record buffer entries to take
+        """
+        count = 0
+        index = 0
+        while index < len(self._record_buffer) and count < num_records:
+            (sample, state) = self._record_buffer[index]
+            if isinstance(sample, ParticleBatch):
+                rows = min(len(sample), num_records - count)
+                if rows < len(sample):
+                    self._record_buffer[index:index + 1] = [(sample.rows(0, rows), state[:rows]),
+                                                            (sample.rows(rows, len(sample)), state[rows:])]
+                count += rows
+            else:
+                count += 1
+            index += 1
+
+        return index
+
     def _yank_particles(self, num_records):
         """
         Get particles out of the buffer and publish them. Update the state
@@ -217,13 +274,11 @@ class BufferLoadingParser(Parser):
         @param num_records The number of particles to remove from the buffer
         @retval A list with num_records elements from the buffer. If num_records
         cannot be collected (perhaps due to an EOF), the list will have the
-        elements it was able to collect.
+        elements it was able to collect. A particle batch is split if only
+        some of its rows are needed.
         """
-        if len(self._record_buffer) < num_records:
-            num_to_fetch = len(self._record_buffer)
-        else:
-            num_to_fetch = num_records
-        log.trace("Yanking %s records of %s requested",
+        num_to_fetch = self._split_record_buffer(num_records)
+        log.trace("Yanking %s buffer entries for %s records requested",
                   num_to_fetch,
                   num_records)
 
@@ -231,11 +286,14 @@ class BufferLoadingParser(Parser):
         records_to_return = self._record_buffer[:num_to_fetch]
         self._record_buffer = self._record_buffer[num_to_fetch:]
         if len(records_to_return) > 0:
-            self._state = records_to_return[-1][1]  # state side of tuple of last entry
-            # strip the state info off of them now that we have what we need
-            for item in records_to_return:
-                log.debug("Record to return: %s", item)
-                return_list.append(item[0])
+            # strip the state info off of them now that we have what we need,
+            # a batch comes with the state after each of its rows
+            for (sample, state) in records_to_return:
+                log.debug("Record to return: %s", sample)
+                if isinstance(sample, ParticleBatch):
+                    state = state[-1]
+                self._state = state
+                return_list.append(sample)
             self._publish_sample(return_list)
             log.trace("Sending parser state [%s] to driver", self._state)
             file_ingested = False
@@ -278,6 +336,8 @@ class BufferLoadingParser(Parser):
         timestamp. Go until the chunker has no more valid data.
         @retval a list of tuples with sample particles encountered in this
             parsing, plus the state (ie "(sample, state)"). An empty list of
-            nothing was parsed.
+            nothing was parsed. A sample can also be a non-empty
+            ParticleBatch, paired with a list of the parser state after each
+            of its rows. Each row counts as a record.
         """            
         raise NotImplementedException("Must write parse_chunks()!")
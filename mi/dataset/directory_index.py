@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.directory_index
+@file mi/dataset/directory_index.py
+@brief Indexes of the files in a harvested directory, which report only the
+files that appeared or changed since they were last reported. The polling
+index lists the directory and stats each file on every refresh. On Linux the
+inotify index stats only the files the kernel reports events for, and lists
+the directory only when it starts or the kernel dropped events.
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import errno
+import fnmatch
+import struct
+import time
+import ctypes
+import ctypes.util
+
+from mi.core.log import get_logger ; log = get_logger()
+
+# inotify event masks, from sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+# Events after which the directory is listed again
+RESCAN_MASK = IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF
+
+# struct inotify_event, followed by a name of len bytes
+EVENT_STRUCT = struct.Struct('iIII')
+
+EVENT_BUFFER_SIZE = 64 * 1024
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _libc.inotify_init1
+    _libc.inotify_add_watch
+except (OSError, AttributeError, TypeError):
+    _libc = None
+
+
+def inotify_available():
+    """
+    @retval True if the C library has inotify
+    """
+    return _libc is not None
+
+
+class DirectoryIndex(object):
+    """
+    The modification time and size of the files in a directory matching a
+    pattern, found by listing the directory. Files are matched as glob does.
+    """
+    def __init__(self, directory, pattern):
+        """
+        @param directory The directory
+        @param pattern A glob pattern of the file names
+        """
+        self._directory = directory
+        self._pattern = pattern
+        self._include_hidden = pattern.startswith('.')
+        # file name: (modification time, size)
+        self._files = {}
+        # names of files that appeared or changed and haven't been reported
+        self._changed = set()
+
+    def _matches(self, name):
+        if not self._include_hidden and name.startswith('.'):
+            return False
+        return fnmatch.fnmatch(name, self._pattern)
+
+    def _update(self, name):
+        """
+        Stat a file, and mark it changed if it is new or its modification
+        time or size changed
+        """
+        try:
+            stat = os.stat(os.path.join(self._directory, name))
+        except OSError:
+            self._files.pop(name, None)
+            self._changed.discard(name)
+            return
+
+        state = (stat.st_mtime, stat.st_size)
+        if self._files.get(name) != state:
+            self._files[name] = state
+            self._changed.add(name)
+
+    def scan(self):
+        """
+        List the directory and stat every matching file
+        """
+        try:
+            names = set(name for name in os.listdir(self._directory) if self._matches(name))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            names = set()
+
+        for name in set(self._files) - names:
+            del self._files[name]
+            self._changed.discard(name)
+        for name in names:
+            self._update(name)
+
+    def refresh(self):
+        """
+        Bring the index up to date with the directory
+        """
+        self.scan()
+
+    def ready(self, file_mod_wait, now=None):
+        """
+        Get the files that appeared or changed and haven't been modified for
+        file_mod_wait seconds. Each change of a file is returned once, unless
+        the file is marked changed again, files that were modified more
+        recently are returned by a later call.
+        @param file_mod_wait Seconds since a file was modified
+        @param now The current time, or None for time.time()
+        @retval A dict of file name: (modification time, size)
+        """
+        self.refresh()
+        if now is None:
+            now = time.time()
+
+        result = {}
+        for name in self._changed:
+            state = self._files[name]
+            if state[0] + file_mod_wait < now:
+                result[name] = state
+        self._changed.difference_update(result)
+        return result
+
+    def mark_changed(self, name):
+        """
+        Return a file from ready again, as if it had changed, if it is still
+        in the directory
+        @param name The file name
+        """
+        if name in self._files:
+            self._changed.add(name)
+
+    def close(self):
+        """
+        Release the resources of the index
+        """
+        pass
+
+
+class InotifyDirectoryIndex(DirectoryIndex):
+    """
+    A directory index kept up to date with inotify events
+    """
+    def __init__(self, directory, pattern):
+        """
+        @throws OSError if inotify isn't available or the directory can't be
+           watched
+        """
+        super(InotifyDirectoryIndex, self).__init__(directory, pattern)
+        if _libc is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        if _libc.inotify_add_watch(self._fd, directory, WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            self._fd = None
+            raise OSError(error, '%s: %s' % (os.strerror(error), directory))
+
+        # the first refresh lists the directory
+        self._rescan = True
+        # without a watch, which is removed if the directory is, every
+        # refresh lists the directory
+        self._watching = True
+
+    def refresh(self):
+        names = self._read_events()
+        if self._rescan or not self._watching:
+            self._rescan = False
+            self.scan()
+        else:
+            for name in names:
+                if self._matches(name):
+                    self._update(name)
+
+    def _read_events(self):
+        """
+        @retval The names of the files with events since the last read
+        """
+        names = set()
+        while self._fd is not None:
+            try:
+                data = os.read(self._fd, EVENT_BUFFER_SIZE)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    break
+                raise
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                (_, mask, _, length) = EVENT_STRUCT.unpack_from(data, offset)
+                offset += EVENT_STRUCT.size
+                if mask & RESCAN_MASK:
+                    log.debug('inotify event %x for %s, listing the directory', mask, self._directory)
+                    self._rescan = True
+                if mask & IN_IGNORED:
+                    self._watching = False
+                if length:
+                    names.add(data[offset:offset + length].rstrip('\0'))
+                offset += length
+        return names
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def directory_index(directory, pattern, inotify=False):
+    """
+    Create the index of a directory
+    @param directory The directory
+    @param pattern A glob pattern of the file names
+    @param inotify True for an inotify index, if inotify is available
+    @retval An InotifyDirectoryIndex or a DirectoryIndex
+    """
+    if inotify:
+        try:
+            return InotifyDirectoryIndex(directory, pattern)
+        except OSError as e:
+            log.warn('Polling %s, inotify is not available: %s', directory, e)
+    return DirectoryIndex(directory, pattern)
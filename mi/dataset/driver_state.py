@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.driver_state
+@file mi/dataset/driver_state.py
+@brief The keys of the dataset driver state, and a store that checkpoints the
+driver state through the agent's state callback. The store can limit how often
+the state is persisted while a file is parsed, and can persist the files that
+were fully ingested as a compact table instead of their full state.
+"""
+
+__license__ = 'Apache 2.0'
+
+import time
+
+from mi.core.common import BaseEnum
+from mi.core.log import get_logger ; log = get_logger()
+
+
+class DriverStateKey(BaseEnum):
+    VERSION = 'version'
+    FILE_NAME = 'file_name'
+    FILE_SIZE = 'file_size'
+    FILE_MOD_DATE = 'file_mod_date'
+    FILE_CHECKSUM = 'file_checksum'
+    INGESTED = 'ingested'
+    PARSER_STATE = 'parser_state'
+    MODIFIED_STATE = 'modified_state'
+    INGESTED_FILES = 'ingested_files'
+
+
+class CheckpointConfigKey(BaseEnum):
+    """
+    Keys of the 'checkpoint' driver config
+    """
+    # persist after this many parser state updates
+    RECORDS = 'records'
+    # or when this many seconds have passed since the last checkpoint
+    INTERVAL = 'interval'
+    # persist ingested files as a table of fingerprints
+    COMPACT = 'compact'
+
+
+class DriverStateStatKey(BaseEnum):
+    UPDATES = 'updates'
+    CHECKPOINTS = 'checkpoints'
+    COMPACTED_FILES = 'compacted_files'
+
+
+def _is_file_state(value):
+    return isinstance(value, dict) and (DriverStateKey.PARSER_STATE in value or
+                                        DriverStateKey.INGESTED in value)
+
+
+def compact_state(state):
+    """
+    Build a memento with the files that were fully ingested, and not modified
+    since, replaced by a table of [name, size, modification date, checksum]
+    rows sorted by name. Their parser state isn't needed again, the harvester
+    only compares the rest to find modified files. The file states of the
+    driver state are shared, not copied.
+    @param state The driver state, with file states at the top level or in a
+       dict for each data key
+    @retval The compacted memento
+    """
+    memento = {}
+    table = []
+    for (key, value) in state.iteritems():
+        if _is_file_state(value):
+            if value.get(DriverStateKey.INGESTED) and DriverStateKey.MODIFIED_STATE not in value:
+                table.append([key,
+                              value.get(DriverStateKey.FILE_SIZE),
+                              value.get(DriverStateKey.FILE_MOD_DATE),
+                              value.get(DriverStateKey.FILE_CHECKSUM)])
+            else:
+                memento[key] = value
+        elif isinstance(value, dict) and key != DriverStateKey.INGESTED_FILES:
+            memento[key] = compact_state(value)
+        else:
+            memento[key] = value
+
+    if table:
+        table.sort()
+        memento[DriverStateKey.INGESTED_FILES] = table
+    return memento
+
+
+def expand_state(memento):
+    """
+    Restore the file states of a memento built by compact_state. A memento
+    that wasn't compacted is returned as it is.
+    @param memento The persisted memento, which is expanded in place
+    @retval The driver state
+    """
+    table = memento.pop(DriverStateKey.INGESTED_FILES, None)
+    for (name, size, mod_date, checksum) in table or []:
+        memento[name] = {
+            DriverStateKey.FILE_SIZE: size,
+            DriverStateKey.FILE_MOD_DATE: mod_date,
+            DriverStateKey.FILE_CHECKSUM: checksum,
+            DriverStateKey.INGESTED: True,
+            DriverStateKey.PARSER_STATE: None
+        }
+
+    for value in memento.itervalues():
+        if isinstance(value, dict) and not _is_file_state(value):
+            expand_state(value)
+    return memento
+
+
+class DriverStateStore(object):
+    """
+    Checkpoints the driver state through the agent's state callback. By
+    default every update is persisted as it is. With a records count or an
+    interval, parser state updates are persisted every records updates or
+    interval seconds, so after a restart at most that much of a file is
+    parsed again. Updates that are forced, when a file is found, fully
+    ingested or fails, are always persisted with any earlier updates.
+    """
+    def __init__(self, state_callback, records=1, interval=None, compact=False):
+        """
+        @param state_callback The agent's state callback
+        @param records Persist after this many updates
+        @param interval Persist updates this many seconds after the last
+           checkpoint, or None to persist only by records
+        @param compact True to persist ingested files as a compact table
+        """
+        self._state_callback = state_callback
+        self._records = max(records or 1, 1)
+        self._interval = interval
+        self._compact = compact
+
+        self._state = None
+        self._pending = 0
+        self._last_checkpoint = time.time()
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, state_callback, config):
+        """
+        @param state_callback The agent's state callback
+        @param config The 'checkpoint' driver config, or None
+        @retval A store configured by the CheckpointConfigKey keys
+        """
+        config = config or {}
+        return cls(state_callback,
+                   records=config.get(CheckpointConfigKey.RECORDS, 1),
+                   interval=config.get(CheckpointConfigKey.INTERVAL),
+                   compact=config.get(CheckpointConfigKey.COMPACT, False))
+
+    def memento(self, state):
+        """
+        @param state The driver state
+        @retval The memento persisted for the driver state
+        """
+        if self._compact:
+            return compact_state(state)
+        return state
+
+    def update(self, state, force=False):
+        """
+        Record a change of the driver state, and persist it if a checkpoint is
+        due
+        @param state The driver state
+        @param force True to persist it now
+        """
+        self._state = state
+        self._pending += 1
+        self._stats[DriverStateStatKey.UPDATES] += 1
+        if force or self._pending >= self._records or self._expired():
+            self.flush()
+
+    def save(self, state):
+        """
+        Persist the driver state now, with any updates not yet persisted
+        @param state The driver state
+        """
+        self.update(state, force=True)
+
+    def _expired(self):
+        return self._interval is not None and time.time() - self._last_checkpoint >= self._interval
+
+    def flush_expired(self):
+        """
+        Persist the updates recorded more than interval seconds after the last
+        checkpoint, for when the parser stops updating the state
+        """
+        if self._pending and self._expired():
+            self.flush()
+
+    def flush(self):
+        """
+        Persist the updates that haven't been persisted
+        """
+        if not self._pending:
+            return
+
+        memento = self.memento(self._state)
+        if memento is not self._state:
+            self._stats[DriverStateStatKey.COMPACTED_FILES] = self._count_compacted(memento)
+        self._pending = 0
+        self._last_checkpoint = time.time()
+        self._stats[DriverStateStatKey.CHECKPOINTS] += 1
+        self._state_callback(memento)
+
+    def _count_compacted(self, memento):
+        count = len(memento.get(DriverStateKey.INGESTED_FILES, []))
+        for value in memento.itervalues():
+            if isinstance(value, dict) and not _is_file_state(value):
+                count += self._count_compacted(value)
+        return count
+
+    def get_stats(self):
+        """
+        @retval A dict of DriverStateStatKey counts
+        """
+        return dict(self._stats)
+
+    def reset_stats(self):
+        """
+        Clear the counts
+        """
+        self._stats = dict((key, 0) for key in DriverStateStatKey.list())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.fingerprint
+@file mi/dataset/fingerprint.py
+@brief A cache of the md5 checksums of harvested files. A file is hashed in
+chunks once per version, so the harvester and the driver share one read of
+a new file instead of each loading the whole file. A file that grew since it
+was hashed has only its new bytes hashed.
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from mi.core.log import get_logger ; log = get_logger()
+
+# Bytes read at a time while hashing
+CHUNK_SIZE = 1024 * 1024
+
+# Bytes kept from the end of the hashed part of a file, to check that a file
+# that grew was only appended to before hashing just the new bytes
+TAIL_SIZE = 4096
+
+# Files the shared cache remembers, least recently used are dropped first
+DEFAULT_MAX_FILES = 1000
+
+
+class FileFingerprint(object):
+    """
+    The checksum of one version of a file, and the state needed to extend
+    it if the file grows
+    """
+    def __init__(self, size, mod_time, inode, md5, tail):
+        """
+        @param size The number of bytes hashed
+        @param mod_time The modification time of the file when it was hashed
+        @param inode The inode of the file
+        @param md5 The md5 hash of the first size bytes
+        @param tail The last bytes hashed
+        """
+        self.size = size
+        self.mod_time = mod_time
+        self.inode = inode
+        self.md5 = md5
+        self.tail = tail
+        self.checksum = md5.hexdigest()
+
+    def matches(self, stat):
+        """
+        @param stat The os.stat of the file
+        @retval True if the file is the version that was hashed
+        """
+        return (self.size == stat.st_size and self.mod_time == stat.st_mtime and
+                self.inode == stat.st_ino)
+
+
+class FingerprintCache(object):
+    """
+    The md5 checksums of files, keyed on the path and checked against the
+    size, modification time and inode of the file
+    """
+    def __init__(self, max_files=DEFAULT_MAX_FILES, chunk_size=CHUNK_SIZE):
+        """
+        @param max_files The most files to remember
+        @param chunk_size Bytes read at a time while hashing
+        """
+        self._max_files = max_files
+        self._chunk_size = chunk_size
+        self._files = OrderedDict()
+        self._lock = Lock()
+
+        # counts of checksums found in the cache, extended from a previous
+        # version and hashed from the start, and the bytes read to hash
+        self.hits = 0
+        self.extended = 0
+        self.hashed = 0
+        self.bytes_hashed = 0
+
+    def checksum(self, path):
+        """
+        Get the md5 checksum of a file, the same as
+        hashlib.md5(open(path, 'rb').read()).hexdigest()
+        @param path The path of the file
+        @retval The hex digest of the file
+        @throws OSError, IOError if the file can't be read
+        """
+        stat = os.stat(path)
+        with self._lock:
+            previous = self._files.pop(path, None)
+            if previous is not None and previous.matches(stat):
+                self._files[path] = previous
+                self.hits += 1
+                return previous.checksum
+
+        with open(path, 'rb') as filehandle:
+            if self._appended(filehandle, previous, stat):
+                md5 = previous.md5.copy()
+                size = previous.size
+                tail = previous.tail
+                filehandle.seek(size)
+                extended = True
+            else:
+                md5 = hashlib.md5()
+                size = 0
+                tail = ''
+                filehandle.seek(0)
+                extended = False
+
+            start = size
+            while True:
+                chunk = filehandle.read(self._chunk_size)
+                if not chunk:
+                    break
+                md5.update(chunk)
+                size += len(chunk)
+                tail = (tail + chunk[-TAIL_SIZE:])[-TAIL_SIZE:]
+
+        fingerprint = FileFingerprint(size, stat.st_mtime, stat.st_ino, md5, tail)
+        with self._lock:
+            if extended:
+                self.extended += 1
+            else:
+                self.hashed += 1
+            self.bytes_hashed += size - start
+
+            self._files[path] = fingerprint
+            while len(self._files) > self._max_files:
+                self._files.popitem(last=False)
+
+        log.trace('fingerprint %s: %s, %d bytes, %d hashed', path, fingerprint.checksum, size, size - start)
+        return fingerprint.checksum
+
+    def _appended(self, filehandle, previous, stat):
+        """
+        @retval True if the file is the previous version with bytes appended,
+           judging by its inode, size and the bytes at the end of the previous
+           version
+        """
+        if previous is None or previous.inode != stat.st_ino or previous.size >= stat.st_size:
+            return False
+        filehandle.seek(previous.size - len(previous.tail))
+        return filehandle.read(len(previous.tail)) == previous.tail
+
+    def forget(self, path):
+        """
+        Drop a file from the cache
+        @param path The path of the file
+        """
+        with self._lock:
+            self._files.pop(path, None)
+
+    def clear(self):
+        """
+        Drop every file from the cache
+        """
+        with self._lock:
+            self._files.clear()
+
+
+FINGERPRINT_CACHE = FingerprintCache()
+
+
+def file_checksum(path):
+    """
+    Get the md5 checksum of a file from the shared cache
+    @param path The path of the file
+    @retval The hex digest of the file
+    @throws OSError, IOError if the file can't be read
+    """
+    return FINGERPRINT_CACHE.checksum(path)
@@ -13,9 +13,6 @@ __author__ = 'Christopher Mueller, Jonathan Newbrough, Steve Foley'
 __license__ = 'Apache 2.0'
 
 import os
-import glob
-import hashlib
-import time
 import re
 
 from threading import Thread
@@ -24,7 +21,9 @@ from gevent.event import Event
 from mi.core.log import get_logger ; log = get_logger()
 from mi.core.poller import DirectoryPoller, ConditionPoller
 from mi.core.common import BaseEnum
-from mi.dataset.dataset_driver import DriverStateKey
+from mi.dataset.dataset_driver import DriverStateKey, DataSetDriverConfigKeys
+from mi.dataset.fingerprint import file_checksum
+from mi.dataset.directory_index import directory_index
 
 
 class Harvester(object):
@@ -55,6 +54,9 @@ class SingleDirectoryPoller(ConditionPoller):
     """
     Monitor a single directory to see if new files have appeared or if files have changed.
     When a change is found this information will be returned through the callback.
+    Only files that are new or changed since they were last checked are checked again.
+    If the inotify config value is True and inotify is available, the directory is
+    watched with inotify instead of being listed on every poll.
     @param config - harvester configuration dictionary
     @param file_mod_wait - integer time to wait after files have been modified
     @param memento - previous harvester state dictionary
@@ -74,24 +76,37 @@ class SingleDirectoryPoller(ConditionPoller):
         log.debug("Start directory poller path: %s, pattern: %s", directory, wildcard)
         self._found_file_state = memento
         # driver state is not a new instance of memento, it is the same here as in the driver
+        self._directory = directory
         self._path = directory + '/' + wildcard
         log.debug("Starting harvester with directory pattern: %s", self._path)
+        self._index = directory_index(directory, wildcard, config.get(DataSetDriverConfigKeys.INOTIFY, False))
 
         # this queue holds the names of the files that have been sent to the driver.  Each time the harvester
         # restarts, the queue is emptied so all files that have not been ingested can be added and sent again,
         # but this keeps the harvester from sending the same files over and over to not be put in the driver queue
-        self.sent_to_driver_queue = []
+        self.sent_to_driver_queue = set()
         super(SingleDirectoryPoller,self).__init__(self._check_for_files, callback,
                                                    exception_callback, interval)
 
+    def shutdown(self):
+        super(SingleDirectoryPoller, self).shutdown()
+        if not self.is_alive():
+            self._index.close()
+
+    def run(self):
+        try:
+            super(SingleDirectoryPoller, self).run()
+        finally:
+            self._index.close()
+
     def _check_for_files(self):
         """
         Find any new or modified files and update the harvester state
         """
-        filenames = []
-
-        if os.path.exists(os.path.dirname(self._path)):
-            filenames = glob.glob(self._path)
+        # the files that are new or changed since they were last checked and
+        # have not been modified in the last X seconds
+        ready_files = self._index.ready(self.file_mod_wait)
+        filenames = [os.path.join(self._directory, file_name) for file_name in ready_files]
 
         # if there are underscores in the filename, sort by ascii rather than 
         if len(filenames) > 0:
@@ -102,51 +117,50 @@ class SingleDirectoryPoller(ConditionPoller):
 
         new_files = []
         modified_state = {}
-        # loop over all files in the directory and compare their state to that in the harvester state dictionary
+        # loop over the files and compare their state to that in the harvester state dictionary
         for i_file in filenames:
-            mod_time = os.path.getmtime(i_file)
-            # check if the file has not been modified in the last X seconds
-            if (mod_time + self.file_mod_wait) < time.time():
-                file_name = os.path.basename(i_file)
-                # find if this file already exists in the found files
-                if file_name in self._found_file_state and self._found_file_state[file_name][DriverStateKey.INGESTED]:
-                    # this file has been ingested (file size and date will only be available for ingested files)
-                    file_size = os.path.getsize(i_file)
-                    if self._found_file_state[file_name][DriverStateKey.FILE_SIZE] != file_size or \
-                    self._found_file_state[file_name][DriverStateKey.FILE_MOD_DATE] != mod_time:
-                       # this file has been ingested, but the file size and times don't match, confirm that
-                       # the checksum is different
-                        with open(i_file, 'rb') as filehandle:
-                            md5_checksum = hashlib.md5(filehandle.read()).hexdigest()
-                        if self._found_file_state[file_name][DriverStateKey.FILE_CHECKSUM] != md5_checksum:
-                            # ingested file has been modified!
-                            if DriverStateKey.MODIFIED_STATE in self._found_file_state[file_name]:
-                                # this file has been modified before
-                                old_state = self._found_file_state[file_name][DriverStateKey.MODIFIED_STATE]
-                                if old_state[DriverStateKey.FILE_SIZE] != file_size or \
-                                old_state[DriverStateKey.FILE_MOD_DATE] != mod_time or \
-                                old_state[DriverStateKey.FILE_CHECKSUM] != md5_checksum:
-                                    # this file has changed since its previous modification, update the
-                                    # modified state
-                                    modified_state[file_name] = {
-                                        DriverStateKey.FILE_SIZE: file_size,
-                                        DriverStateKey.FILE_MOD_DATE: mod_time,
-                                        DriverStateKey.FILE_CHECKSUM: md5_checksum,
-                                    }
-                            else:
-                                # this is the first time this file has been modified
+            file_name = os.path.basename(i_file)
+            (mod_time, file_size) = ready_files[file_name]
+            # find if this file already exists in the found files
+            if file_name in self._found_file_state and self._found_file_state[file_name][DriverStateKey.INGESTED]:
+                # this file has been ingested (file size and date will only be available for ingested files)
+                if self._found_file_state[file_name][DriverStateKey.FILE_SIZE] != file_size or \
+                self._found_file_state[file_name][DriverStateKey.FILE_MOD_DATE] != mod_time:
+                   # this file has been ingested, but the file size and times don't match, confirm that
+                   # the checksum is different
+                    md5_checksum = file_checksum(i_file)
+                    if self._found_file_state[file_name][DriverStateKey.FILE_CHECKSUM] != md5_checksum:
+                        # ingested file has been modified!
+                        if DriverStateKey.MODIFIED_STATE in self._found_file_state[file_name]:
+                            # this file has been modified before
+                            old_state = self._found_file_state[file_name][DriverStateKey.MODIFIED_STATE]
+                            if old_state[DriverStateKey.FILE_SIZE] != file_size or \
+                            old_state[DriverStateKey.FILE_MOD_DATE] != mod_time or \
+                            old_state[DriverStateKey.FILE_CHECKSUM] != md5_checksum:
+                                # this file has changed since its previous modification, update the
+                                # modified state
                                 modified_state[file_name] = {
                                     DriverStateKey.FILE_SIZE: file_size,
                                     DriverStateKey.FILE_MOD_DATE: mod_time,
                                     DriverStateKey.FILE_CHECKSUM: md5_checksum,
                                 }
-                else:
-                    # send all files that have not been ingested yet, but keep track in a queue so
-                    # duplicates are not sent
-                    if file_name not in self.sent_to_driver_queue:
-                        # only send this file once
-                        self.sent_to_driver_queue.append(file_name)
-                        new_files.append(file_name)
+                        else:
+                            # this is the first time this file has been modified
+                            modified_state[file_name] = {
+                                DriverStateKey.FILE_SIZE: file_size,
+                                DriverStateKey.FILE_MOD_DATE: mod_time,
+                                DriverStateKey.FILE_CHECKSUM: md5_checksum,
+                            }
+            else:
+                # keep reporting files until they are ingested, so a change made while a file is
+                # queued or being parsed is compared with the driver state once it is ingested
+                self._index.mark_changed(file_name)
+                # send all files that have not been ingested yet, but keep track in a queue so
+                # duplicates are not sent
+                if file_name not in self.sent_to_driver_queue:
+                    # only send this file once
+                    self.sent_to_driver_queue.add(file_name)
+                    new_files.append(file_name)
 
         log.debug('found new files: %r, modified_files: %r', new_files, modified_state)
         return (new_files, modified_state)
@@ -161,23 +175,11 @@ class SingleDirectoryPoller(ConditionPoller):
         if not filenames or len(filenames) < 2:
             return filenames
 
-        # this assumes all files have the same extension
-        file_extension = filenames[0].split('.')
-        split_names = ()
-        for fn in filenames:
-            split_name = self.ascii_to_int_list(fn)
-            # append this split up name as a tuple
-            split_names = split_names + (split_name, ) 
         # now sort all the int formatted names
-        sorted_tuple = sorted(split_names)
-        # put the filenames back to string format
-        sorted_filenames = []
-        
-        for fn in sorted_tuple:
-            # Retrieve original name from end of sorted component list
-            sorted_filenames.append(fn[len(fn) - 1])
-
-        return sorted_filenames
+        split_names = sorted(self.ascii_to_int_list(fn) for fn in filenames)
+        # put the filenames back to string format, retrieving the original name from
+        # the end of each sorted component list
+        return [fn[-1] for fn in split_names]
 
     @staticmethod
     def ascii_to_int_list(filename):
@@ -288,8 +290,7 @@ class SingleFilePoller(ConditionPoller):
                     if self._found_file_state[DriverStateKey.FILE_SIZE] != file_size or \
                         self._found_file_state[DriverStateKey.FILE_MOD_DATE] != mod_time:
                         # size or time is different, confirm with checksum
-                        with open(self._path, 'rb') as filehandle:
-                            md5_checksum = hashlib.md5(filehandle.read()).hexdigest()
+                        md5_checksum = file_checksum(self._path)
                         if self._found_file_state[DriverStateKey.FILE_CHECKSUM] != md5_checksum:
                             # file is different, update the state
                             self._found_file_state[DriverStateKey.FILE_SIZE] = file_size
@@ -305,8 +306,7 @@ class SingleFilePoller(ConditionPoller):
                             }
                 else:
                     # no driver state yet, first time opening this file
-                    with open(self._path, 'rb') as filehandle:
-                        md5_checksum = hashlib.md5(filehandle.read()).hexdigest()
+                    md5_checksum = file_checksum(self._path)
 
                     self._found_file_state[DriverStateKey.FILE_SIZE] = file_size
                     self._found_file_state[DriverStateKey.FILE_MOD_DATE] = mod_time
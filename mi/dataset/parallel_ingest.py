@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.parallel_ingest
+@file mi/dataset/parallel_ingest.py
+@brief Parse dataset files in worker processes. Each file is parsed in a
+forked process, which sends the particles and parser states back through a
+pipe as the parser produces them. The results of the files of a data key are
+returned in the order the files were started, so the driver publishes the
+particles and saves the parser state of its files in order.
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import traceback
+import multiprocessing
+from collections import deque
+
+from gevent.select import select
+
+from mi.core.common import BaseEnum
+from mi.core.exceptions import DatasetParserException
+from mi.core.instrument.particle_batch import ParticleBatch
+from mi.core.log import get_logger ; log = get_logger()
+
+
+class IngestMessage(BaseEnum):
+    # particles and the parser state after them: (RECORDS, samples, state, ingested)
+    RECORDS = 'records'
+    # a sample exception passed to the exception callback: (SAMPLE_EXCEPTION, exception)
+    SAMPLE_EXCEPTION = 'sample_exception'
+    # an exception that stopped the parser: (ERROR, exception)
+    ERROR = 'error'
+    # the worker finished: (DONE,)
+    DONE = 'done'
+
+
+def portable_exception(exception):
+    """
+    Instrument exceptions don't survive pickling, their args are in a
+    different order than their constructor takes them
+    @param exception An exception raised in a worker
+    @retval A picklable (module, class name, message) tuple
+    """
+    message = getattr(exception, 'msg', None)
+    if message is None:
+        message = str(exception)
+    return (type(exception).__module__, type(exception).__name__, message)
+
+
+def portable_particle(particle):
+    """
+    Particles keep the raw data they were built from, which often can't be
+    pickled, like the regex match of a CSPP particle. The values are built
+    before the raw data is dropped, so the particle generates the same in
+    the driver. A particle batch already holds its values.
+    @param particle A DataParticle or ParticleBatch built in a worker
+    @retval The particle, without its raw data
+    """
+    if not isinstance(particle, ParticleBatch):
+        particle.get_parsed_values()
+    particle.raw_data = None
+    return particle
+
+
+def rebuild_exception(portable):
+    """
+    @param portable A tuple from portable_exception
+    @retval An exception of the original class if it can be constructed from
+       the message, otherwise a DatasetParserException
+    """
+    (module_name, class_name, message) = portable
+    try:
+        module = __import__(module_name, fromlist=[class_name])
+        return getattr(module, class_name)(message)
+    except Exception:
+        return DatasetParserException("%s: %s" % (class_name, message))
+
+
+class IngestWorker(object):
+    """
+    The end of the pipe in a worker process
+    """
+    def __init__(self, connection):
+        self._connection = connection
+
+    def send_records(self, samples, state, ingested):
+        self._connection.send((IngestMessage.RECORDS, samples, state, ingested))
+
+    def send_sample_exception(self, exception):
+        self._connection.send((IngestMessage.SAMPLE_EXCEPTION, portable_exception(exception)))
+
+    def _run(self, target, args):
+        try:
+            target(self, *args)
+        except Exception as e:
+            log.debug('ingest worker failed: %s', traceback.format_exc())
+            self._connection.send((IngestMessage.ERROR, portable_exception(e)))
+        self._connection.send((IngestMessage.DONE,))
+        self._connection.close()
+
+
+def _worker_main(connection, target, args):
+    IngestWorker(connection)._run(target, args)
+    # skip the exit handlers inherited from the driver's process
+    os._exit(0)
+
+
+class IngestJob(object):
+    """
+    A file being parsed by a worker process, and the messages it sent that
+    haven't been returned
+    """
+    def __init__(self, name, process, connection):
+        self.name = name
+        self.process = process
+        self.connection = connection
+        self.messages = deque()
+        self.finished = False
+
+    def read(self):
+        """
+        Read the messages the worker sent
+        """
+        try:
+            while not self.finished and self.connection.poll():
+                message = self.connection.recv()
+                self.messages.append(message)
+                if message[0] == IngestMessage.DONE:
+                    self._finish()
+        except (EOFError, IOError) as e:
+            # the worker died without finishing
+            self.messages.append((IngestMessage.ERROR, portable_exception(
+                DatasetParserException("ingest worker for %s exited: %s" % (self.name, e)))))
+            self.messages.append((IngestMessage.DONE,))
+            self._finish()
+
+    def _finish(self):
+        self.finished = True
+        self.connection.close()
+        self.process.join()
+
+    def stop(self):
+        if not self.finished:
+            self.process.terminate()
+            self._finish()
+
+
+class ParallelIngester(object):
+    """
+    Runs up to a number of worker processes, each parsing one file. Files
+    are grouped by a key, and the results of the files of each key are
+    returned in the order the files were started.
+    """
+    def __init__(self, processes):
+        """
+        @param processes The most worker processes to run at once
+        """
+        self._processes = processes
+        # key: deque of IngestJob, in the order they were started
+        self._jobs = {}
+
+    def has_capacity(self):
+        """
+        @retval True if another worker can be started
+        """
+        return self._running() < self._processes
+
+    def _running(self):
+        return sum(1 for jobs in self._jobs.itervalues() for job in jobs if not job.finished)
+
+    def has_jobs(self, key):
+        """
+        @retval True if files of a key are being parsed or have results that
+           haven't been returned
+        """
+        return bool(self._jobs.get(key))
+
+    def start(self, key, name, target, args=()):
+        """
+        Start a worker process
+        @param key The key the file is grouped by
+        @param name The name of the file
+        @param target A function called in the worker as target(worker, *args),
+           where worker is an IngestWorker for sending results
+        @param args The rest of the arguments
+        """
+        (receiver, sender) = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_worker_main, args=(sender, target, args),
+                                          name='ingest %s' % name)
+        process.daemon = True
+        process.start()
+        sender.close()
+        log.debug('started ingest worker %s for %s', process.pid, name)
+        self._jobs.setdefault(key, deque()).append(IngestJob(name, process, receiver))
+
+    def results(self, key, timeout=None):
+        """
+        Wait for workers to send results, and return the results of a key
+        that are next in order. Every worker is read, so none blocks on a
+        full pipe.
+        @param key The key
+        @param timeout Seconds to wait for results, None to wait until a
+           worker sends results
+        @retval A list of (file name, message) tuples
+        """
+        running = [job for jobs in self._jobs.itervalues() for job in jobs if not job.finished]
+        if running and not self._ready(key):
+            select([job.connection for job in running], [], [], timeout)
+        for job in running:
+            job.read()
+
+        results = []
+        jobs = self._jobs.get(key, deque())
+        while jobs:
+            job = jobs[0]
+            while job.messages:
+                results.append((job.name, job.messages.popleft()))
+            if not job.finished:
+                break
+            jobs.popleft()
+        return results
+
+    def _ready(self, key):
+        jobs = self._jobs.get(key)
+        return bool(jobs) and (bool(jobs[0].messages) or jobs[0].finished)
+
+    def stop(self):
+        """
+        Terminate the workers and drop their results
+        """
+        for jobs in self._jobs.itervalues():
+            for job in jobs:
+                job.stop()
+        self._jobs.clear()
@@ -172,6 +172,15 @@ class DatasetParameterDict(ProtocolParameterDict):
                 log.error("Dataset parameter dict error encoding Name:%s, set to None", name)
                 self._encoding_errors.append({name: None})
 
+    def get_parameter(self, name):
+        """
+        Return the parameter object of a name, with its compiled regex and
+        value function
+        @param name The parameter name.
+        @raise KeyError on invalid parameter name
+        """
+        return self._param_dict[name]
+
     def get_encoding_errors(self):
         """
         Return the encoding errors list
@@ -27,6 +27,7 @@ log = get_logger()
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import \
     DataParticle, DataParticleKey, DataParticleValue
+from mi.core.instrument.pd0 import pd0_checksum_valid, unpack_cells, VELOCITY_CELL, BYTE_CELL
 from mi.core.exceptions import SampleException, RecoverableSampleException, \
     DatasetParserException, UnexpectedDataException
 from mi.dataset.dataset_parser import BufferLoadingParser
@@ -767,20 +768,8 @@ class AdcpPd0DataParticle(DataParticle):
         """
         Parse the velocity portion of the particle
         """
-        num_cells = self.num_depth_cells
-        offset = ID_BYTES
-
-        water_velocity_east = []
-        water_velocity_north = []
-        water_velocity_up = []
-        error_velocity = []
-        for row in range(0, num_cells):
-            (a, b, c, d) = struct.unpack_from('<4h', data, offset)
-            water_velocity_east.append(a)
-            water_velocity_north.append(b)
-            water_velocity_up.append(c)
-            error_velocity.append(d)
-            offset += VELOCITY_BYTES_PER_CELL
+        (water_velocity_east, water_velocity_north, water_velocity_up, error_velocity) = \
+            unpack_cells(data, VELOCITY_CELL, self.num_depth_cells, ID_BYTES)
 
         self.final_result.append(self._encode_value(AdcpPd0ParserDataParticleKey.WATER_VELOCITY_EAST,
                                                     water_velocity_east, list))
@@ -795,20 +784,9 @@ class AdcpPd0DataParticle(DataParticle):
         """
         Parse the correlation magnitude portion of the particle
         """
-        num_cells = self.num_depth_cells
-        offset = ID_BYTES
-
-        correlation_magnitude_beam1 = []
-        correlation_magnitude_beam2 = []
-        correlation_magnitude_beam3 = []
-        correlation_magnitude_beam4 = []
-        for row in range(0, num_cells):
-            (a, b, c, d) = struct.unpack_from('<4B', data, offset)
-            correlation_magnitude_beam1.append(a)
-            correlation_magnitude_beam2.append(b)
-            correlation_magnitude_beam3.append(c)
-            correlation_magnitude_beam4.append(d)
-            offset += CORRELATION_BYTES_PER_CELL
+        (correlation_magnitude_beam1, correlation_magnitude_beam2,
+         correlation_magnitude_beam3, correlation_magnitude_beam4) = \
+            unpack_cells(data, BYTE_CELL, self.num_depth_cells, ID_BYTES)
 
         self.final_result.append(self._encode_value(AdcpPd0ParserDataParticleKey.CORRELATION_MAGNITUDE_BEAM1,
                                                     correlation_magnitude_beam1, list))
@@ -823,20 +801,8 @@ class AdcpPd0DataParticle(DataParticle):
         """
         Parse the echo intensity portion of the particle
         """
-        num_cells = self.num_depth_cells
-        offset = ID_BYTES
-
-        echo_intesity_beam1 = []
-        echo_intesity_beam2 = []
-        echo_intesity_beam3 = []
-        echo_intesity_beam4 = []
-        for row in range(0, num_cells):
-            (a, b, c, d) = struct.unpack_from('<4B', data, offset)
-            echo_intesity_beam1.append(a)
-            echo_intesity_beam2.append(b)
-            echo_intesity_beam3.append(c)
-            echo_intesity_beam4.append(d)
-            offset += ECHO_INTENSITY_BYTES_PER_CELL
+        (echo_intesity_beam1, echo_intesity_beam2, echo_intesity_beam3, echo_intesity_beam4) = \
+            unpack_cells(data, BYTE_CELL, self.num_depth_cells, ID_BYTES)
 
         self.final_result.append(self._encode_value(AdcpPd0ParserDataParticleKey.ECHO_INTENSITY_BEAM1,
                                                     echo_intesity_beam1, list))
@@ -853,20 +819,8 @@ class AdcpPd0DataParticle(DataParticle):
 
         @throws RecoverableSampleException If there is a problem with sample creation
         """
-        num_cells = self.num_depth_cells
-        offset = ID_BYTES
-
-        percent_good_3beam = []
-        percent_transforms_reject = []
-        percent_bad_beams = []
-        percent_good_4beam = []
-        for row in range(0, num_cells):
-            (a, b, c, d) = struct.unpack_from('<4B', data, offset)
-            percent_good_3beam.append(a)
-            percent_transforms_reject.append(b)
-            percent_bad_beams.append(c)
-            percent_good_4beam.append(d)
-            offset += PERCENT_GOOD_BYTES_PER_CELL
+        (percent_good_3beam, percent_transforms_reject, percent_bad_beams, percent_good_4beam) = \
+            unpack_cells(data, BYTE_CELL, self.num_depth_cells, ID_BYTES)
 
         self.final_result.append(self._encode_value(AdcpPd0ParserDataParticleKey.PERCENT_GOOD_3BEAM,
                                                     percent_good_3beam, list))
@@ -1131,6 +1085,7 @@ class AdcpPd0Parser(BufferLoadingParser):
         header_iter = ADCPS_PD0_HEADER_MATCHER.finditer(input_buffer[0: -CHECKSUM_BYTES])
         #find all occurrences of the record header sentinel
         #don't look in the last 2 bytes because you will not have num bytes
+        buffer_end = max(len(input_buffer) - CHECKSUM_BYTES, 0)
 
         for match in header_iter:
 
@@ -1147,20 +1102,11 @@ class AdcpPd0Parser(BufferLoadingParser):
             #log.debug("sieve function number of bytes= %d , record end is %d", num_bytes, record_end)
 
             #if there is enough in the buffer check the record
-            if record_end <= len(input_buffer[0: -CHECKSUM_BYTES]):
+            if record_end <= buffer_end:
                 #make sure the checksum bytes are in the buffer too
 
-                total = 0
-                for i in range(record_start, record_end):
-                    total += ord(input_buffer[i])
-                #add up all the bytes in the record
-
-                checksum = total & CHECKSUM_MODULO  # bitwise and with 65535 or mod vs 65536
-
-                #log.debug("sieve checksum & total = %d %d ", checksum, total)
-
-                if checksum == struct.unpack("<H", input_buffer[record_end: record_end + CHECKSUM_BYTES])[0]:
-                    #verify the checksum
+                if pd0_checksum_valid(input_buffer, record_start, record_end):
+                    #verify the checksum, the sum of all the bytes in the record
                     indices_list.append((record_start, record_end + CHECKSUM_BYTES))
                     #include the 2 checksum bytes in the chunk
 
@@ -291,9 +291,9 @@ class ADCPA_PD0_PARSED_DataParticle(DataParticle):
 
         checksum = total & 65535    # bitwise and with 65535 or mod vs 65536
 
-        if checksum != unpack("<H", self.raw_data[length: length+2])[0]:
-            log.debug("Checksum mismatch " + str(checksum) + " != "
-                      + str(unpack("<H", self.raw_data[length: length+2])[0]))
+        expected_checksum = unpack("<H", self.raw_data[length: length+2])[0]
+        if checksum != expected_checksum:
+            log.debug("Checksum mismatch %s != %s", checksum, expected_checksum)
             raise SampleException("Checksum mismatch")
 
         # save the checksum and process the remainder of the ensemble
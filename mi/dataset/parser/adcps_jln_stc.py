@@ -22,7 +22,7 @@ import binascii
 import calendar
 from dateutil import parser
 
-from mi.core.log import get_logger
+from mi.core.log import get_logger, lazy
 log = get_logger()
 
 from mi.core.common import BaseEnum
@@ -417,12 +417,12 @@ class AdcpsJlnStcParser(BufferLoadingParser):
                     else:
                         if len(data_match.group(2)) < MIN_DATA_BYTES:
                             log.debug("Found record with not enough bytes 0x%s",
-                                      binascii.hexlify(data_match.group(0)))
+                                      lazy(binascii.hexlify, data_match.group(0)))
                             self._exception_callback(SampleException("Found record with not enough bytes 0x%s"
                                                                      % binascii.hexlify(data_match.group(0))))
                         else:
                             log.debug("Found record whose checksum doesn't match 0x%s",
-                                      binascii.hexlify(data_match.group(0)))
+                                      lazy(binascii.hexlify, data_match.group(0)))
                             self._exception_callback(SampleException("Found record whose checksum doesn't match 0x%s"
                                                                      % binascii.hexlify(data_match.group(0))))
             else:
@@ -442,7 +442,7 @@ class AdcpsJlnStcParser(BufferLoadingParser):
         if non_data is not None and non_end <= start:
             # this non-data is an error, send an UnexpectedDataException and increment the state
             self._increment_state(len(non_data))
-            log.debug("Found %d bytes of unexpected non-data" % len(non_data))
+            log.debug("Found %d bytes of unexpected non-data", len(non_data))
             # if non-data is a fatal error, directly call the exception, if it is not use the _exception_callback
             self._exception_callback(UnexpectedDataException("Found %d bytes of un-expected non-data %s"
                                                              % (len(non_data), non_data)))
@@ -273,10 +273,10 @@ class AntelopeOrbParser(Parser):
             self._publish_sample(particle)
             # TODO rate limit state updates?
             self._state[StateKey.TAFTER] = orbtimestamp
-            log.debug("State: ", self._state)
+            log.debug("State: %s", self._state)
             self._state_callback(self._state, False) # push new state to driver
         except (Timeout, NoData), e:
-            log.debug("orbreapthr.get exception %r" % type(e))
+            log.debug("orbreapthr.get exception %r", type(e))
             return None
         return get_r
 
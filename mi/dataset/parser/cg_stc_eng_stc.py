@@ -339,12 +339,35 @@ class CgStcEngStcParserDataParticleKey(BaseEnum):
     CG_ENG_DMGRSTATUS_UPDATE = 'cg_eng_dmgrstatus_update'
 
 
+# The 'Name.sub' key of the line a parameter regex matches
+PARAM_KEY_REGEX = re.compile(r'([\w\\.]+)=')
+
+
+def tokenize_eng_lines(data):
+    """
+    Split an engineering file into its 'Name.sub=value' lines in one pass
+    @param data The engineering file contents
+    @retval A dict of the text before the first '=' of each line to the whole
+       line with its line ending, for the first line of each name
+    """
+    lines = {}
+    for line in data.splitlines(True):
+        index = line.find('=')
+        if index > 0:
+            lines.setdefault(line[:index], line)
+    return lines
+
+
 class CgStcEngStcParserDataAbstractParticle(DataParticle):
     """
     Abstract Class for parsing data from the cg_stc_eng_stc data set
     """
     _data_particle_type = None
 
+    # (name, line key, compiled regex, value function) of each parameter,
+    # built from the parameter dict by the first particle
+    _param_table = None
+
     def _build_parsed_values(self):
         """
         Take something in the data format and turn it into
@@ -352,19 +375,62 @@ class CgStcEngStcParserDataAbstractParticle(DataParticle):
         @throws SampleException If there is a problem with sample creation
         """
         result = []
-        # Instantiate the param_dict 
-        params = self._build_param_dict()
-        
-        # Go through the param_dict dictionary for every definition
-        params.update(self.raw_data)
-        encoding_errors = params.get_encoding_errors()
-        self._encoding_errors = encoding_errors
-        all_params = params.get_all()
-        for (key, value) in all_params.iteritems():
-            result.append({DataParticleKey.VALUE_ID: key, DataParticleKey.VALUE: value})
+        data = self.raw_data if isinstance(self.raw_data, str) else str(self.raw_data)
+        lines = tokenize_eng_lines(data)
+
+        # parameters sharing a regex take different groups of one match
+        matches = {}
+        for (name, key, regex, f_getval) in self._get_param_table():
+            if regex.pattern not in matches:
+                matches[regex.pattern] = self._match(regex, lines.get(key), data)
+            match = matches[regex.pattern]
+
+            value = None
+            if match:
+                try:
+                    value = f_getval(match)
+                except Exception:
+                    log.error("Dataset parameter dict error encoding Name:%s, set to None", name)
+                    self._encoding_errors.append({name: None})
+            result.append({DataParticleKey.VALUE_ID: name, DataParticleKey.VALUE: value})
         log.debug("CgStcEngStcParserDataParticle %s", result)
         return result
 
+    def _get_param_table(self):
+        """
+        Build the parameter table from the parameter dict, once for all
+        particles
+        @retval A list of (name, line key, compiled regex, value function)
+        """
+        table = CgStcEngStcParserDataAbstractParticle._param_table
+        if table is None:
+            table = []
+            params = self._build_param_dict()
+            for name in params.get_keys():
+                param = params.get_parameter(name)
+                key_match = PARAM_KEY_REGEX.match(param.pattern)
+                key = key_match.group(1).replace('\\', '') if key_match else None
+                table.append((name, key, param.regex, param.f_getval))
+            CgStcEngStcParserDataAbstractParticle._param_table = table
+        return table
+
+    @staticmethod
+    def _match(regex, line, data):
+        """
+        Match a parameter regex against the line of its key, searching the
+        whole file as the parameter dict did if the line is missing or
+        doesn't match
+        @param regex The compiled parameter regex
+        @param line The line of the parameter key, or None
+        @param data The engineering file contents
+        @retval The match, or None
+        """
+        if line is not None:
+            match = regex.match(line)
+            if match:
+                return match
+        return regex.search(data)
+
     def _build_param_dict(self):
         """
         Populate the parameter dictionary with cg_stc_eng_stc parameters.
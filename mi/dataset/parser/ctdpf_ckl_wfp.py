@@ -64,3 +64,13 @@ class CtdpfCklWfpParser(WfpCFileCommonParser):
         """
         sample = self._extract_sample(self._instrument_data_particle_class, None, raw_data, timestamp)
         return sample
+
+    def extract_data_batch(self, records, timestamps):
+        """
+        Class for extracting a particle batch of data sample records
+        @param records the raw data of each record
+        @param timestamps the timestamp of each record in NTP64
+        """
+        return self._extract_batch(self._instrument_data_particle_class.type(),
+                                   self._instrument_data_particle_class.build_columns(records),
+                                   timestamps, records)
@@ -14,6 +14,7 @@ __author__ = 'cgoodrich'
 __license__ = 'Apache 2.0'
 
 import struct
+import numpy
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -60,6 +61,27 @@ class CtdpfCklWfpDataParticle(DataParticle):
 
         return result
 
+    @staticmethod
+    def build_columns(records):
+        """
+        Decode a run of data records at once, for a particle batch
+        @param records A list of raw data records
+        @retval A list of (value_id, values) pairs in particle order
+        @throws SampleException If a record is the wrong size
+        """
+        data = ''.join(records)
+        if len(data) != len(records) * DATA_RECORD_BYTES:
+            raise SampleException("CtdpfCklWfpDataParticle: Received unexpected number of bytes %d"
+                                  " for %d records" % (len(data), len(records)))
+
+        # each field is a 24 bit big endian unsigned int
+        rows = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, DATA_RECORD_BYTES).astype(numpy.uint32)
+        fields = [(rows[:, i] << 16) | (rows[:, i + 1] << 8) | rows[:, i + 2] for i in (0, 3, 6)]
+
+        return [(CtdpfCklWfpDataParticleKey.CONDUCTIVITY, fields[0]),
+                (CtdpfCklWfpDataParticleKey.TEMPERATURE, fields[1]),
+                (CtdpfCklWfpDataParticleKey.PRESSURE, fields[2])]
+
 class CtdpfCklWfpRecoveredDataParticle(CtdpfCklWfpDataParticle):
     """
     Class for the recovered ctdpf_ckl_wfp instrument particle
@@ -19,7 +19,7 @@ import ntplib
 import struct
 import binascii
 
-from mi.core.log import get_logger
+from mi.core.log import get_logger, lazy
 log = get_logger()
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle
@@ -233,7 +233,7 @@ class DostaLnWfpParser(WfpEFileParser):
                                               self._timestamp)
                 if sample:
                     # create particle
-                    log.trace("Extracting sample chunk 0x%s with read_state: %s", binascii.b2a_hex(chunk),
+                    log.trace("Extracting sample chunk 0x%s with read_state: %s", lazy(binascii.b2a_hex, chunk),
                               self._read_state)
                     self._increment_state(len(chunk))
                     result_particles.append((sample, copy.copy(self._read_state)))
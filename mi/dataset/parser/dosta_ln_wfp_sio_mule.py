@@ -17,7 +17,7 @@ import re
 import struct
 import ntplib
 
-from mi.core.log import get_logger; log = get_logger()
+from mi.core.log import get_logger, lazy; log = get_logger()
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.exceptions import SampleException, DatasetParserException, UnexpectedDataException
@@ -133,7 +133,7 @@ class DostaLnWfpSioMuleParser(SioMuleParser):
                 if e_header_match:
 		    
 		    log.debug('******************************* HEADER MATCH WAS:')
-		    log.debug('%s', ":".join("{:02x}".format(ord(c)) for c in chunk[SIO_HEADER_BYTES:SIO_HEADER_BYTES+HEADER_BYTES+1]))				   
+		    log.debug('%s', lazy(lambda: ":".join("{:02x}".format(ord(c)) for c in chunk[SIO_HEADER_BYTES:SIO_HEADER_BYTES+HEADER_BYTES+1])))				   
 		    payload = chunk[SIO_HEADER_BYTES+HEADER_BYTES+1:]
 		     
                     data_split = self.we_split_function(payload)
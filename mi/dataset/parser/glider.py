@@ -22,7 +22,7 @@ import sys
 from math import copysign
 from functools import partial
 
-from mi.core.log import get_logger
+from mi.core.log import get_logger, lazy
 from mi.core.common import BaseEnum
 from mi.core.exceptions import SampleException, DatasetParserException, UnexpectedDataException, RecoverableSampleException
 from mi.core.instrument.chunker import StringChunker
@@ -80,6 +80,192 @@ class GliderParticleKey(BaseEnum):
         return result
 
 
+NAN = float('nan')
+
+
+def _is_nan(value):
+    # NaN is the only value not equal to itself
+    return value != value
+
+
+def string_to_ddegrees(pos_str):
+    """
+    Converts the given string from this data stream into a more
+    standard latitude/longitude value in decimal degrees.
+    @param pos_str The position (latitude or longitude) string in the
+       format "DDMM.MMMM" for latitude and "DDDMM.MMMM" for longitude. A
+       positive or negative sign to the string indicates northern/southern
+       or eastern/western hemispheres, respectively.
+    @retval The position in decimal degrees
+    @throws SampleException if the string is not a position
+    """
+
+    # If NaN then return NaN
+    if np.isnan(float(pos_str)):
+        return float(pos_str)
+
+    # As a stop gap fix add a .0 to integers that don't contain a decimal.  This
+    # should only affect the engineering stream as the science data streams shouldn't
+    # contain lat lon
+    if not "." in pos_str:
+        pos_str += ".0"
+
+    # if there are not enough numbers to fill in DDMM, prepend zeros
+    str_words = pos_str.split('.')
+    adj_zeros = 4 - len(str_words[0])
+    if adj_zeros > 0:
+        for i in range(0, adj_zeros):
+            pos_str = '0' + pos_str
+
+    regex = r'(-*\d{2,3})(\d{2}.\d+)'
+    regex_matcher = re.compile(regex)
+    latlon_match = regex_matcher.match(pos_str)
+
+    if latlon_match is None:
+        log.error("Failed to parse lat/lon value: '%s'", pos_str)
+        raise SampleException("string_to_ddegrees(): Failed to parse lat/lon value: '%s'" % pos_str)
+
+    degrees = float(latlon_match.group(1))
+    minutes = float(latlon_match.group(2))
+    return copysign((abs(degrees) + minutes / 60.), degrees)
+
+
+class GliderColumnPlan(object):
+    """
+    The columns of a glider file, compiled once per file from the column
+    labels and byte sizes in its header: the converter of each column and
+    the column index of each label. Particles project the values of a row by
+    column index instead of looking up each label. The converters are module
+    level functions or builtins, so the rows and the particles built from
+    them can be pickled.
+    """
+    def __init__(self, labels, converters=None):
+        """
+        @param labels The column labels
+        @param converters A function converting the string value of each
+           column, or None for rows that are built from values
+        """
+        self.labels = labels
+        self.converters = tuple(converters) if converters is not None else None
+        self.index = dict((label, index) for (index, label) in enumerate(labels))
+        # id of a key list: (key list, projection)
+        self._projections = {}
+
+    @classmethod
+    def from_header(cls, labels, num_of_bytes, latlon_converter=string_to_ddegrees):
+        """
+        Compile the plan of a glider file. Columns of 1 or 2 bytes are ints,
+        4 or 8 bytes are floats and others are left as strings, except lat and
+        lon columns which are converted to decimal degrees.
+        @param labels The column labels
+        @param num_of_bytes The number of bytes of each column
+        @param latlon_converter Converts a lat or lon string to decimal degrees
+        """
+        converters = []
+        for (label, size) in zip(labels, num_of_bytes):
+            if '_lat' in label or '_lon' in label:
+                converters.append(latlon_converter)
+            elif size in (1, 2):
+                converters.append(int)
+            elif size in (4, 8):
+                converters.append(float)
+            else:
+                converters.append(str)
+        return cls(labels, converters)
+
+    def read_row(self, data_record, exception_callback=None):
+        """
+        Convert a row of a glider file
+        @param data_record The row, whitespace separated values
+        @param exception_callback Called with the SampleException of a value
+           that can't be converted, which is then None
+        @retval A GliderRow
+        @throws SampleException if the row doesn't have a value for each column
+        """
+        data = data_record.split()
+        if len(data) != len(self.labels):
+            log.error("GliderParser._read_data(): Num Of Columns NOT EQUAL to Num of Data items: "
+                      "Expected Columns= %s vs Actual Data= %s", len(self.labels), len(data))
+
+            raise SampleException('Glider data file does not have the ' +
+                                  'same number of columns as described ' +
+                                  'in the header.\n' +
+                                  'Described: %d, Actual: %d' %
+                                  (len(self.labels), len(data)))
+
+        try:
+            values = [NAN if item == 'NaN' else convert(item) for (item, convert) in zip(data, self.converters)]
+        except SampleException:
+            values = [self._convert(item, convert, exception_callback) for (item, convert) in zip(data, self.converters)]
+        return GliderRow(self, values)
+
+    @staticmethod
+    def _convert(item, convert, exception_callback):
+        """
+        Convert one value, reporting a SampleException instead of raising it
+        """
+        if item == 'NaN':
+            return NAN
+        try:
+            return convert(item)
+        except SampleException as e:
+            if exception_callback:
+                exception_callback(e)
+            return None
+
+    def projection(self, keys):
+        """
+        @param keys A list of labels, usually a particle class attribute
+        @retval A list of (label, column index) for each of the keys, where
+           the index is None for labels the file doesn't have
+        """
+        cached = self._projections.get(id(keys))
+        if cached is None or cached[0] is not keys:
+            cached = (keys, [(key, self.index.get(key)) for key in keys])
+            self._projections[id(keys)] = cached
+        return cached[1]
+
+
+class GliderRow(object):
+    """
+    The values of a row of a glider file, in the columns of its plan
+    """
+    def __init__(self, plan, values):
+        self.plan = plan
+        self.values = values
+
+    def __contains__(self, label):
+        return label in self.plan.index
+
+    def __getitem__(self, label):
+        """
+        @retval The value of a label
+        @throws KeyError if the file has no such column
+        """
+        return self.values[self.plan.index[label]]
+
+    def keys(self):
+        return list(self.plan.labels)
+
+    def has_data(self, keys):
+        """
+        @param keys A list of labels
+        @retval True if any of the labels has a value that isn't NaN
+        """
+        values = self.values
+        for (key, index) in self.plan.projection(keys):
+            if index is not None and not _is_nan(values[index]):
+                return True
+        return False
+
+    def __repr__(self):
+        return repr(dict(zip(self.plan.labels, self.values)))
+
+
+# The file information attributes of the engineering metadata particle
+HEADER_INFO_PLAN = GliderColumnPlan(['glider_eng_filename', 'glider_mission_name', 'glider_eng_fileopen_time'])
+
+
 class GliderParticle(DataParticle):
     """
     Base particle for glider data. Glider files are
@@ -97,74 +283,48 @@ class GliderParticle(DataParticle):
     common_parameters = GliderParticleKey.list()
 
     def _parsed_values(self, key_list):
-
+        """
+        Project the values of the particle parameters out of the row of data.
+        Parameters the file has no column for are None, as are NaN values.
+        @param key_list The list of particle parameter names
+        @retval The list of value dictionaries, parameters found in the row
+           first
+        @throws SampleException if the raw data is not a GliderRow, or none
+           of the parameters are in it
+        """
         log.debug(" @@@ GliderParticle._parsed_values(): Build a particle with keys: %s", key_list)
 
-        if not isinstance(self.raw_data, dict):
+        if not isinstance(self.raw_data, GliderRow):
             raise SampleException(
                 "%s: Object Instance is not a Glider Parsed Data \
                  dictionary" % self._data_particle_type)
 
-        result = []
-
         list_of_found_particle_parameters = []
 
         list_of_missing_particle_parameters = []
 
-        #use this logger when debugging
-        #log.debug(" @@@ @@@ GliderParticle._parsed_values(): raw_data %s", self.raw_data)
-
-        # find if any of the variables from the particle key list are in
-        # the data_dict and keep it
-        #
-        # "key_list" is a list of particle parameter names
-        for key in key_list:
-
-            log.trace("GliderParticle._parsed_values(): About to check if key %s is in raw_data", key)
-
-            # if the item from the particle is in the raw_data (row) we just sampled...
-            if key in self.raw_data:
-                # read the value of the item from the dictionary
-                value = self.raw_data[key]['Data']
-
-                log.trace("GliderParticle._parsed_values(): Found particle item in row of Raw Data: key %s, value: %s", key, value)
-                # check if this value is a string, implying it is one of the three
-                # file info data items in the particle (filename,fileopen time & mission name)
-                # - don't need to perform a NaN check on a string
-                if isinstance(value, str):
-                    # add the value to the record
-                    list_of_found_particle_parameters.append({DataParticleKey.VALUE_ID: key,
-                                   DataParticleKey.VALUE: value})
-                    log.trace("GliderParticle._parsed_values(): Adding Key: %s, value: %s to particle", key, value)
-                else:
-                    # check to see that the value is not a 'NaN'
-                    if np.isnan(value):
-                        log.trace("GliderParticle._parsed_values(): NaN Value: %s", key)
-                        value = None
-
-                    # add the value to the record
-                    list_of_found_particle_parameters.append({DataParticleKey.VALUE_ID: key,
-                                   DataParticleKey.VALUE: value})
-                    log.trace("GliderParticle._parsed_values(): Adding Key: %s, value: %s to particle", key, value)
-
-            # if the item from the particle is NOT the raw_data (row) we just sampled...
-            else:
-                # This parameter was not in the row of data (raw_data), but at least one other parameter from the particle
-                # was found in the raw data (row). A None value must be included for this parameter in the particle.
-                value = None
-                # add the None value to the result
+        values = self.raw_data.values
+        for (key, index) in self.raw_data.plan.projection(key_list):
+            if index is None:
+                # This parameter was not in the row of data (raw_data), a None value must be included for it
                 list_of_missing_particle_parameters.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: value})
-                log.trace("GliderParticle._parsed_values(): NO DATA in parsed row for particle, using NONE as value for key %s", key)
+                                                            DataParticleKey.VALUE: None})
+            else:
+                value = values[index]
+                # strings, the file info data items, are never NaN
+                if _is_nan(value):
+                    value = None
+                list_of_found_particle_parameters.append({DataParticleKey.VALUE_ID: key,
+                                                          DataParticleKey.VALUE: value})
 
         # if there is at lease ONE parameter from the particle found in the raw_data (row), publish the particle with
         # parameter data that has been found and NONEs for paramters that were not found
-        if len(list_of_found_particle_parameters) > 0:
-            result = list_of_found_particle_parameters + list_of_missing_particle_parameters
-        else:
+        if not list_of_found_particle_parameters:
             log.error("No parameters from particle found in input row of Raw Data, particle cannot be created!")
             raise SampleException("No data for particle found")
 
+        result = list_of_found_particle_parameters + list_of_missing_particle_parameters
+
         log.debug(" ### GliderParticle._parsed_values(): ### result = %s", result)
 
         return result
@@ -181,6 +341,7 @@ class CtdgvParticleKey(GliderParticleKey):
 class CtdgvTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.CTDGV_M_GLIDER_INSTRUMENT
     science_parameters = CtdgvParticleKey.science_parameter_list()
+    parameter_keys = CtdgvParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -190,12 +351,13 @@ class CtdgvTelemeteredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(CtdgvParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class CtdgvRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.CTDGV_M_GLIDER_INSTRUMENT_RECOVERED
     science_parameters = CtdgvParticleKey.science_parameter_list()
+    parameter_keys = CtdgvParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -205,7 +367,7 @@ class CtdgvRecoveredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(CtdgvParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class DostaTelemeteredParticleKey(GliderParticleKey):
@@ -235,6 +397,7 @@ class DostaRecoveredParticleKey(GliderParticleKey):
 class DostaTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.DOSTA_ABCDJM_GLIDER_INSTRUMENT
     science_parameters = DostaTelemeteredParticleKey.science_parameter_list()
+    parameter_keys = DostaTelemeteredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -244,12 +407,13 @@ class DostaTelemeteredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(DostaTelemeteredParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class DostaRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.DOSTA_ABCDJM_GLIDER_RECOVERED
     science_parameters = DostaRecoveredParticleKey.science_parameter_list()
+    parameter_keys = DostaRecoveredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -259,7 +423,7 @@ class DostaRecoveredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(DostaRecoveredParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class FlordParticleKey(GliderParticleKey):
@@ -277,6 +441,7 @@ class FlordParticleKey(GliderParticleKey):
 class FlordTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORD_M_GLIDER_INSTRUMENT
     science_parameters = FlordParticleKey.science_parameter_list()
+    parameter_keys = FlordParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -286,12 +451,13 @@ class FlordTelemeteredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(FlordParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class FlordRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORD_M_GLIDER_INSTRUMENT_RECOVERED
     science_parameters = FlordParticleKey.science_parameter_list()
+    parameter_keys = FlordParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -301,7 +467,7 @@ class FlordRecoveredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(FlordParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class FlortTelemeteredParticleKey(GliderParticleKey):
@@ -329,6 +495,7 @@ class FlortRecoveredParticleKey(GliderParticleKey):
 class FlortTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORT_M_GLIDER_INSTRUMENT
     science_parameters = FlortTelemeteredParticleKey.science_parameter_list()
+    parameter_keys = FlortTelemeteredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -338,12 +505,13 @@ class FlortTelemeteredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(FlortTelemeteredParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class FlortRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORT_M_GLIDER_RECOVERED
     science_parameters = FlortRecoveredParticleKey.science_parameter_list()
+    parameter_keys = FlortRecoveredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -353,7 +521,7 @@ class FlortRecoveredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(FlortRecoveredParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class ParadTelemeteredParticleKey(GliderParticleKey):
@@ -372,6 +540,7 @@ class ParadRecoveredParticleKey(GliderParticleKey):
 class ParadTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.PARAD_M_GLIDER_INSTRUMENT
     science_parameters = ParadTelemeteredParticleKey.science_parameter_list()
+    parameter_keys = ParadTelemeteredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -381,12 +550,13 @@ class ParadTelemeteredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(ParadTelemeteredParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class ParadRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.PARAD_M_GLIDER_RECOVERED
     science_parameters = ParadRecoveredParticleKey.science_parameter_list()
+    parameter_keys = ParadRecoveredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -396,7 +566,7 @@ class ParadRecoveredDataParticle(GliderParticle):
         @returns result a list of dictionaries of particle data
         @throws SampleException if the data is not a glider data dictionary
         """
-        return self._parsed_values(ParadRecoveredParticleKey.list())
+        return self._parsed_values(self.parameter_keys)
 
 
 class EngineeringRecoveredParticleKey(GliderParticleKey):
@@ -1028,6 +1198,9 @@ class GliderParser(BufferLoadingParser):
             num_of_bytes_list = map(int, num_of_bytes_list)
             self._header_dict['num_of_bytes'] = num_of_bytes_list
 
+        self._column_plan = GliderColumnPlan.from_header(self._header_dict['labels'],
+                                                         self._header_dict['num_of_bytes'])
+
         log.debug("Label count: %d", len(self._header_dict['labels']))
         log.trace("Labels: %s", self._header_dict['labels'])
         log.trace("Data units: %s", self._header_dict['data_units'])
@@ -1078,70 +1251,12 @@ class GliderParser(BufferLoadingParser):
 
     def _read_data(self, data_record):
         """
-        Read in the column labels, data type, number of bytes of each
-        data type, and the data from an ASCII glider data file.
+        Convert a row of an ASCII glider data file with the column plan
+        compiled from the header.
+        @retval A GliderRow of the values
+        @throws SampleException if the row doesn't match the header
         """
-
-        data_dict = {}
-        num_columns = self._header_dict['sensors_per_cycle']
-        data_labels = self._header_dict['labels']
-        num_bytes = self._header_dict['num_of_bytes']
-
-        data = data_record.strip().split()
-
-        log.trace("GliderParser._read_data(): Split data: %s", data)
-
-        if num_columns != len(data):
-
-            log.error("GliderParser._read_data(): Num Of Columns NOT EQUAL to Num of Data items: "
-                      "Expected Columns= %s vs Actual Data= %s", num_columns, len(data))
-
-            raise SampleException('Glider data file does not have the ' +
-                                  'same number of columns as described ' +
-                                  'in the header.\n' +
-                                  'Described: %d, Actual: %d' %
-                                  (num_columns, len(data)))
-
-        # extract record to dictionary
-        for ii in range(0, num_columns, 1):
-            log.trace("GliderParser._read_data(): index: %d label: %s, value: %s", ii, data_labels[ii], data[ii])
-
-            valuePreConversion = data[ii]
-
-            # Check if this data value is a NaN...
-            if valuePreConversion == "NaN":
-                # data is NaN, convert it to a float
-                value = float(valuePreConversion)
-            # Determine what type of data the value is - int or float, or neither
-            else:
-
-                # determine what type of data the value is, based on the number of bytes attribute
-                if (num_bytes[ii] == 1) or (num_bytes[ii] == 2):
-                        stringConverter = int
-                elif (num_bytes[ii] == 4) or (num_bytes[ii] == 8):
-                        stringConverter = float
-                else:
-                        stringConverter = None
-
-                # check to see if this is a latitude/longitude string
-                if ('_lat' in data_labels[ii]) or ('_lon' in data_labels[ii]):
-                    # convert latitude/longitude strings to decimal degrees
-                    value = self._string_to_ddegrees(data[ii])
-
-                    log.trace("GliderParser._read_data(): converted lat/lon %s from %s to %10.5f", data_labels[ii], data[ii], value)
-
-                else:
-                    # convert the string to and int or float, or leave it as a string
-                    if stringConverter is not None:
-                        value = stringConverter(data[ii])
-                    else:
-                        log.trace("GliderParser._read_data(): data value %s was not an int or a float", data[ii])
-                        value = data[ii]
-
-            data_dict[data_labels[ii]] = {
-                'Name': data_labels[ii],
-                'Data': value
-            }
+        data_dict = self._column_plan.read_row(data_record, self._exception_callback)
 
         log.trace("Data dict parsed: %s", data_dict)
 
@@ -1195,7 +1310,7 @@ class GliderParser(BufferLoadingParser):
                 try:
                     # create the dictionary of key/value pairs composed of the labels and the values from the
                     # record being parsed
-                    # ex: data_dict = {'sci_bsipar_temp': {'Data': 10.67, 'Name': 'sci_bsipar_temp'}, n1, n2, nn}
+                    # ex: data_dict = {'sci_bsipar_temp': 10.67, n1, n2, nn}
                     data_dict = self._read_data(data_record)
 
                     log.debug("  GliderParser.parse_chunks(): ### ## #### ## ####  data_dict = %s", data_dict)
@@ -1207,8 +1322,8 @@ class GliderParser(BufferLoadingParser):
                 # from the parsed data, m_present_time is the unix timestamp per IDD
                 try:
                     if not exception_detected:
-                        record_time = data_dict['m_present_time']['Data']
-                        timestamp = ntplib.system_to_ntp_time(data_dict['m_present_time']['Data'])
+                        record_time = data_dict['m_present_time']
+                        timestamp = ntplib.system_to_ntp_time(record_time)
                         log.debug("## GliderParser.parse_chunks(): Converting record timestamp %f to ntp timestamp %f", record_time, timestamp)
                 except KeyError:
                     exception_detected = True
@@ -1223,7 +1338,7 @@ class GliderParser(BufferLoadingParser):
                     # create the particle
                     particle = self._extract_sample(self._particle_class, None, data_dict, timestamp)
                     log.debug("===> ## ## ## GliderParser.parse_chunks(): PARTICLE NAMED %s CREATED ", particle._data_particle_type)
-                    log.debug("===> ## ## ## Particle Params = %s", particle.generate_dict())
+                    log.debug("===> ## ## ## Particle Params = %s", lazy(particle.generate_dict))
 
                     result_particles.append((particle, copy.copy(self._read_state)))
                 else:
@@ -1260,62 +1375,12 @@ class GliderParser(BufferLoadingParser):
         Examine the data_dict to see if it contains particle parameters
         """
         log.trace("## ## ## GliderParser._has_science_data(): _particle_class is %s", self._particle_class)
-        log.trace("## ## ## GliderParser._has_science_data(): Looking for data in science parameters: %s", self._particle_class.science_parameters)
-        for key in data_dict.keys():
-            if key in self._particle_class.science_parameters:
-                value = data_dict[key]['Data']
-                if not np.isnan(value):
-                    log.debug("Found science value for key: %s, value: %s", key, value)
-                    return True
-                else:
-                    log.debug("Science data value is nan: %s %s", key, value)
+        if data_dict.has_data(self._particle_class.science_parameters):
+            return True
 
         log.debug("No science data found!")
         return False
 
-    def _string_to_ddegrees(self, pos_str):
-        """
-        Converts the given string from this data stream into a more
-        standard latitude/longitude value in decimal degrees.
-        @param pos_str The position (latitude or longitude) string in the
-           format "DDMM.MMMM" for latitude and "DDDMM.MMMM" for longitude. A
-           positive or negative sign to the string indicates northern/southern
-           or eastern/western hemispheres, respectively.
-        @retval The position in decimal degrees
-        """
-
-        # If NaN then return NaN
-        if np.isnan(float(pos_str)):
-            return float(pos_str)
-
-        # As a stop gap fix add a .0 to integers that don't contain a decimal.  This
-        # should only affect the engineering stream as the science data streams shouldn't
-        # contain lat lon
-        if not "." in pos_str:
-            pos_str += ".0"
-
-        # if there are not enough numbers to fill in DDMM, prepend zeros
-        str_words = pos_str.split('.')
-        adj_zeros = 4 - len(str_words[0])
-        if adj_zeros > 0:
-            for i in range(0, adj_zeros):
-                pos_str = '0' + pos_str
-
-        regex = r'(-*\d{2,3})(\d{2}.\d+)'
-        regex_matcher = re.compile(regex)
-        latlon_match = regex_matcher.match(pos_str)
-
-        if latlon_match is None:
-            log.error("Failed to parse lat/lon value: '%s'", pos_str)
-            self._exception_callback(SampleException("GliderParser._string_to_ddegrees(): Failed to parse lat/lon value: '%s'" % pos_str))
-            ddegrees = None
-        else:
-            degrees = float(latlon_match.group(1))
-            minutes = float(latlon_match.group(2))
-            ddegrees = copysign((abs(degrees) + minutes / 60.), degrees)
-
-        return ddegrees
-
 
 class GliderEngineeringParser(GliderParser):
 
@@ -1415,13 +1480,13 @@ class GliderEngineeringParser(GliderParser):
                     self._exception_callback(e)
                     log.warn("GliderEngineeringParser.parse_chunks(): "
                              "Sample Exception, problem creating data dict from raw data %s", e)
-                    data_dict = {}
+                    data_dict = GliderRow(GliderColumnPlan([]), [])
 
                 # from the parsed data, m_present_time is the unix timestamp
                 try:
                     if not exception_detected:
-                        record_time = data_dict['m_present_time']['Data']
-                        timestamp = ntplib.system_to_ntp_time(data_dict['m_present_time']['Data'])
+                        record_time = data_dict['m_present_time']
+                        timestamp = ntplib.system_to_ntp_time(record_time)
                         log.debug(" ## ## ## GliderEngineeringParser.parse_chunks(): "
                                   "Converting record timestamp %f to ntp timestamp %f", record_time, timestamp)
                 except KeyError:
@@ -1543,14 +1608,6 @@ class GliderEngineeringParser(GliderParser):
         Add the three file information attributes to the data dictionary (file name,
         mission name, time the file was opened)
         """
-
-        # data_dict holds key, value pairs where
-        # key = particle attribute name
-        # value = dictionary of 2 key value pairs:
-        #         K                 V
-        #       'Data':  value of particle data item
-        #       'Name':  name of the particle data item (same as top level data_dict key)
-        #
         filename_label_value = self._header_dict.get('filename_label')
         mission_name_value = self._header_dict.get('mission_name')
         fileopen_time_value = self._header_dict.get('fileopen_time')
@@ -1558,13 +1615,7 @@ class GliderEngineeringParser(GliderParser):
         log.debug("GliderENGINEEERINGParser.get_header_info_dict(): Adding filename= %s, missionname= %s, fileopentime= %s",
                   filename_label_value, filename_label_value, filename_label_value)
 
-        # ADD the three dicts to the data dict
-        header_data_dict = {}
-        header_data_dict['glider_eng_filename'] = {'Data': filename_label_value, 'Name': 'glider_eng_filename'}
-        header_data_dict['glider_mission_name'] = {'Data': mission_name_value, 'Name': 'glider_mission_name'}
-        header_data_dict['glider_eng_fileopen_time'] = {'Data': fileopen_time_value, 'Name': 'glider_eng_fileopen_time'}
-
-        return header_data_dict
+        return GliderRow(HEADER_INFO_PLAN, [filename_label_value, mission_name_value, fileopen_time_value])
 
     def fileopen_str_to_timestamp(self, fileopen_str):
         """
@@ -1587,15 +1638,9 @@ class GliderEngineeringParser(GliderParser):
         """
         Examine the data_dict to see if it contains data from the engineering telemetered particle being worked on
         """
-
-        for key in data_dict.keys():
-
-            # only check for particle params that do not include the two m_ time oriented attributes
-            if key in particle_class.science_parameters:
-                # return true as soon as the first particle non-NaN attribute from the data dict
-                value = data_dict[key]['Data']
-                if not np.isnan(value):
-                    return True
+        # only check for particle params that do not include the two m_ time oriented attributes
+        if data_dict.has_data(particle_class.science_parameters):
+            return True
 
         log.debug("No engineering attributes in the particle found!")
-        return False
\ No newline at end of file
+        return False
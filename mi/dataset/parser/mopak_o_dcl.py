@@ -20,7 +20,7 @@ import binascii
 from datetime import datetime
 import time
 
-from mi.core.log import get_logger
+from mi.core.log import get_logger, lazy
 log = get_logger()
 
 from mi.core.common import BaseEnum
@@ -245,7 +245,7 @@ class MopakODclParser(BufferLoadingParser):
                         data_index += ACCEL_BYTES
                     else:
                         log.debug('checking accel for ID in 0x%s since checksums didnt match',
-                                  binascii.hexlify(raw_data[data_index:data_index+ACCEL_BYTES]))
+                                  lazy(binascii.hexlify, raw_data[data_index:data_index+ACCEL_BYTES]))
                         another_accel = raw_data[data_index+1:data_index+ACCEL_BYTES].find(ACCEL_ID)
                         another_rate = raw_data[data_index+1:data_index+ACCEL_BYTES].find(RATE_ID)
                         if another_accel == -1 and another_rate == -1:
@@ -267,7 +267,7 @@ class MopakODclParser(BufferLoadingParser):
                         data_index += RATE_BYTES
                     else:
                         log.debug('checking rate for ID in 0x%s since checksums didnt match',
-                                  binascii.hexlify(raw_data[data_index:data_index+RATE_BYTES]))
+                                  lazy(binascii.hexlify, raw_data[data_index:data_index+RATE_BYTES]))
                         another_accel = raw_data[data_index+1:data_index+RATE_BYTES].find(ACCEL_ID)
                         another_rate = raw_data[data_index+1:data_index+RATE_BYTES].find(RATE_ID)
                         if another_accel == -1 and another_rate == -1:
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.parser.sio_crc
+@file mi/dataset/parser/sio_crc.py
+@brief Table driven CRC used to verify the data portion of SIO blocks.
+The CRC is a reflected 16 bit CRC with polynomial 0x8408, an initial value
+of 0xFFFF and the result inverted. The header carries it as 4 upper case
+hex digits.
+"""
+
+__license__ = 'Apache 2.0'
+
+import numpy
+
+SIO_CRC_POLYNOMIAL = 0x8408
+SIO_CRC_INIT = 0xFFFF
+
+
+def _build_table():
+    """
+    Build the table of the CRC contribution of each byte value
+    """
+    table = []
+    for value in range(256):
+        crc = value
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ SIO_CRC_POLYNOMIAL
+            else:
+                crc >>= 1
+        table.append(crc)
+    return table
+
+SIO_CRC_TABLE = _build_table()
+_NUMPY_CRC_TABLE = numpy.array(SIO_CRC_TABLE, dtype=numpy.uint16)
+
+
+def sio_crc(data):
+    """
+    Calculate the SIO CRC of a block of data
+    @param data A string, bytearray, buffer or memoryview
+    @retval The CRC as an int
+    """
+    table = SIO_CRC_TABLE
+    crc = SIO_CRC_INIT
+    for byte in bytearray(data):
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc ^ 0xFFFF
+
+
+def sio_crc_hex(data):
+    """
+    Calculate the SIO CRC of a block of data in the format of the SIO header
+    @param data A string, bytearray, buffer or memoryview
+    @retval The CRC as 4 upper case hex digits, '0000' for no data
+    """
+    if len(data) == 0:
+        return '0000'
+    return '%04X' % sio_crc(data)
+
+
+def sio_crc_batch(data, blocks):
+    """
+    Calculate the SIO CRC of many blocks of one buffer at once. All blocks
+    advance a byte at a time together, so the cost is one numpy step per byte
+    of the longest block rather than a python step per byte of every block.
+    @param data A string, bytearray, buffer or memoryview holding the blocks
+    @param blocks A list of (start, end) indices of the blocks within data
+    @retval A list of the CRC of each block as an int, in the order of blocks
+    """
+    if not blocks:
+        return []
+
+    if isinstance(data, memoryview):
+        # python 2 numpy only reads memoryviews through the new buffer protocol
+        raw = numpy.asarray(data).view(numpy.uint8)
+    else:
+        raw = numpy.frombuffer(data, dtype=numpy.uint8)
+    starts = numpy.array([start for start, _ in blocks], dtype=numpy.intp)
+    lengths = numpy.array([end - start for start, end in blocks], dtype=numpy.intp)
+
+    # Longest blocks first so the blocks still running are always a prefix
+    order = numpy.argsort(-lengths, kind='mergesort')
+    starts = starts[order]
+    lengths = lengths[order]
+    # Number of blocks longer than each byte offset
+    running = numpy.searchsorted(-lengths, -numpy.arange(lengths[0]), side='left')
+
+    crcs = numpy.empty(len(blocks), dtype=numpy.uint16)
+    crcs.fill(SIO_CRC_INIT)
+    for offset in xrange(lengths[0]):
+        count = running[offset]
+        active = crcs[:count]
+        byte = raw[starts[:count] + offset]
+        active[:] = (active >> 8) ^ _NUMPY_CRC_TABLE[(active ^ byte) & 0xFF]
+
+    result = numpy.empty(len(blocks), dtype=numpy.uint16)
+    result[order] = crcs ^ 0xFFFF
+    return result.tolist()
+
+
+def sio_crc_hex_batch(data, blocks):
+    """
+    Calculate the SIO CRC of many blocks of one buffer in the format of the
+    SIO header
+    @param data A string, bytearray, buffer or memoryview holding the blocks
+    @param blocks A list of (start, end) indices of the blocks within data
+    @retval A list of the CRC of each block as 4 upper case hex digits, '0000'
+    for empty blocks
+    """
+    return ['%04X' % crc if end > start else '0000'
+            for crc, (start, end) in zip(sio_crc_batch(data, blocks), blocks)]
@@ -18,7 +18,7 @@ import ntplib
 
 from datetime import datetime
 
-from mi.core.log import get_logger
+from mi.core.log import get_logger, lazy
 
 log = get_logger()
 
@@ -132,7 +132,7 @@ class SioEngSioCommonParser(Parser):
                 if data_match:
                     # put timestamp from hex string to float:
                     posix_time = int(header_match.group(SIO_HEADER_GROUP_TIMESTAMP), 16)
-                    log.debug('utc timestamp %s', datetime.utcfromtimestamp(posix_time))
+                    log.debug('utc timestamp %s', lazy(datetime.utcfromtimestamp, posix_time))
                     timestamp = ntplib.system_to_ntp_time(float(posix_time))
                     # particle-ize the data block received, return the record
                     sample = self._extract_sample(self._particle_class, None, data_match, timestamp)
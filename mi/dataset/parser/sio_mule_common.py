@@ -14,7 +14,8 @@ __author__ = 'Emily Hahn'
 __license__ = 'Apache 2.0'
 
 import re
-import struct
+import mmap
+from bisect import bisect_right
 import gevent
 import time
 import ntplib
@@ -23,6 +24,7 @@ from mi.core.common import BaseEnum
 from mi.core.log import get_logger; log = get_logger()
 from mi.core.exceptions import DatasetParserException
 from mi.dataset.dataset_parser import BufferLoadingParser
+from mi.dataset.parser.sio_crc import sio_crc_hex, sio_crc_hex_batch
 
 # SIO Main controller header (ascii) and data (binary):
 #   Start of header
@@ -62,6 +64,16 @@ SIO_HEADER_GROUP_TIMESTAMP = 3      # POSIX timestamp
 SIO_HEADER_GROUP_BLOCK_NUMBER = 4   # Block Number
 SIO_HEADER_GROUP_CHECKSUM = 5       # checksum
 
+# Verify checksums with one numpy pass once a sieve finds at least this many
+# blocks, below this the per byte numpy overhead is slower than the table
+SIO_CRC_BATCH_MIN_BLOCKS = 128
+
+# Size of the reads used when a file cannot be memory mapped
+SIO_READ_BLOCK_SIZE = 1048576
+
+# Seconds of reading between cooperative yields to other greenlets
+SIO_READ_YIELD_INTERVAL = 0.1
+
 # blocks can be uniquely identified a combination of block number and timestamp,
 # since block numbers roll over after 255
 # each block may contain multiple data samples
@@ -78,6 +90,86 @@ END_IDX = 1
 SAMPLES_PARSED = 2
 SAMPLES_RETURNED = 3
 
+class SioFileSource(object):
+    """
+    Random access to the entire contents of an SIO file. Files are memory
+    mapped where possible so the contents are not copied onto the heap,
+    otherwise they are read in a single pass of large blocks. Slices are
+    read only buffers which do not copy the data. A mapped source should be
+    closed once its data is no longer needed, or used as a context manager.
+    """
+    def __init__(self, data):
+        """
+        @param data The file contents as a string or mmap
+        """
+        self._data = data
+
+    @classmethod
+    def from_stream(cls, stream_handle):
+        """
+        Read the remainder of an open file, yielding to other greenlets every
+        SIO_READ_YIELD_INTERVAL seconds while reading
+        @param stream_handle An open file-like file handle
+        @retval A SioFileSource holding the file contents
+        """
+        try:
+            if stream_handle.tell() == 0:
+                return cls(mmap.mmap(stream_handle.fileno(), 0, access=mmap.ACCESS_READ))
+        except (AttributeError, EnvironmentError, ValueError):
+            # not a real file, or an empty one, which can't be mapped
+            pass
+
+        blocks = []
+        yield_time = time.time() + SIO_READ_YIELD_INTERVAL
+        while True:
+            next_data = stream_handle.read(SIO_READ_BLOCK_SIZE)
+            if next_data == '':
+                break
+            blocks.append(next_data)
+            if time.time() >= yield_time:
+                gevent.sleep(0)
+                yield_time = time.time() + SIO_READ_YIELD_INTERVAL
+
+        return cls(''.join(blocks))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def is_mapped(self):
+        """
+        @retval True if the contents are memory mapped from the file
+        """
+        return isinstance(self._data, mmap.mmap)
+
+    def close(self):
+        """
+        Unmap the file if it was mapped, the source is empty afterwards
+        """
+        if self.is_mapped():
+            self._data.close()
+        self._data = ''
+
+    def slice(self, start, end):
+        """
+        @param start The index of the first byte
+        @param end The index after the last byte
+        @retval A read only buffer of the data from start to end
+        """
+        return buffer(self._data, start, end - start)
+
+    def getvalue(self):
+        """
+        @retval The entire contents as a string
+        """
+        return self._data[:]
+
+
 class SioParser(BufferLoadingParser):
 
     def __init__(self, config, stream_handle, state, sieve_fn,
@@ -132,32 +224,7 @@ class SioParser(BufferLoadingParser):
         """
         Calculate SIO header checksum of data
         """
-        crc = 65535
-        if len(data) == 0:
-            return '0000'
-        for iData in range(0, len(data)):
-            short = struct.unpack('H', data[iData] + '\x00')
-            point = 255 & short[0]
-            crc = crc ^ point
-            for i in range(7, -1, -1):
-                if crc & 1:
-                    crc = (crc >> 1) ^ 33800
-                else:
-                    crc >>= 1
-        crc = ~crc
-        # convert to unsigned
-        if crc < 0:
-            crc += 65536
-        # get rid of the '0x' from the hex string
-        crc = "%s" % hex(crc)[2:].upper()
-        # make sure we have the right format for comparing, must be 4 hex digits
-        if len(crc) == 3:
-            crc = '0' + crc
-        elif len(crc) == 2:
-            crc = '00' + crc
-        elif len(crc) == 1:
-            crc = '000' + crc
-        return crc
+        return sio_crc_hex(data)
 
     def _combine_adjacent_packets(self, packets):
         """
@@ -196,7 +263,7 @@ class SioParser(BufferLoadingParser):
             next_idx += 1
 
         if len(unproc) > next_idx:
-            data = self.all_data[unproc[next_idx][START_IDX]:unproc[next_idx][END_IDX]]
+            data = self.all_data.slice(unproc[next_idx][START_IDX], unproc[next_idx][END_IDX])
             self._position = unproc[next_idx]
         else:
             data = []
@@ -216,8 +283,11 @@ class SioParser(BufferLoadingParser):
 
             # need to replace escape chars if telemetered data
             if not self.recovered:
-                self.all_data = self.all_data.replace(b'\x18\x6b', b'\x2b')
-                self.all_data = self.all_data.replace(b'\x18\x58', b'\x18')
+                with self.all_data as source:
+                    all_data = source.getvalue()
+                all_data = all_data.replace(b'\x18\x6b', b'\x2b')
+                all_data = all_data.replace(b'\x18\x58', b'\x18')
+                self.all_data = SioFileSource(all_data)
 
         # if unprocessed data has not been initialized yet, set it to the entire file
         if self._read_state[StateKey.UNPROCESSED_DATA] is None:
@@ -234,8 +304,9 @@ class SioParser(BufferLoadingParser):
                 data = self._get_next_unprocessed_data(self._read_state[StateKey.UNPROCESSED_DATA])
 
             if data and len(self._record_buffer) < num_records:
-                # there is more data, add it to the chunker
-                self._chunker.add_chunk(data, ntplib.system_to_ntp_time(time.time()))
+                # there is more data, add it to the chunker, which copies
+                # the buffer into a string
+                self._chunker.add_chunk(str(data), ntplib.system_to_ntp_time(time.time()))
 
                 # parse the chunks now that there is new data in the chunker
                 result = self.parse_chunks()
@@ -254,6 +325,8 @@ class SioParser(BufferLoadingParser):
                 self._record_buffer.extend(result)
             else:
                  # if there is no more data, it is the end of the file, stop looping
+                if not self._read_state[StateKey.IN_PROCESS_DATA]:
+                    self._release_file()
                 break
             # sleep in case this is a long loop
             gevent.sleep(0)
@@ -313,97 +386,140 @@ class SioParser(BufferLoadingParser):
         @param returned_records Number of records to return
         """
 
-        while self._mid_sample_packets > 0 and len(self._chunk_sample_count) > 0:
-            # if we were in the middle of processing, we need to drop the parsed
-            # packets sample count because that in process packet already exists
-            self._chunk_sample_count.pop(0)
-            # decrease the mid sample number remaining
-            self._mid_sample_packets -= 1
+        # drop the sample counts of packets parsed while in the middle of
+        # processing, those in process packets already exist
+        dropped = min(self._mid_sample_packets, len(self._chunk_sample_count))
+        del self._chunk_sample_count[:dropped]
+        self._mid_sample_packets -= dropped
 
-        for packet_idx in range(0, len(self._read_state[StateKey.IN_PROCESS_DATA])):
-            if self._read_state[StateKey.IN_PROCESS_DATA][packet_idx][SAMPLES_PARSED] is None \
-                    and len(self._chunk_sample_count) > 0:
-                self._read_state[StateKey.IN_PROCESS_DATA][packet_idx][SAMPLES_PARSED] = self._chunk_sample_count.pop(0)
+        in_process = self._read_state[StateKey.IN_PROCESS_DATA]
+
+        n_counts = 0
+        for packet in in_process:
+            if n_counts == len(self._chunk_sample_count):
+                break
+            if packet[SAMPLES_PARSED] is None:
+                packet[SAMPLES_PARSED] = self._chunk_sample_count[n_counts]
+                n_counts += 1
                 # adjust for current file position, only do this once when filling in sample count
-                self._read_state[StateKey.IN_PROCESS_DATA][packet_idx][START_IDX] += self._position[START_IDX]
-                self._read_state[StateKey.IN_PROCESS_DATA][packet_idx][END_IDX] += self._position[START_IDX]
+                packet[START_IDX] += self._position[START_IDX]
+                packet[END_IDX] += self._position[START_IDX]
+        del self._chunk_sample_count[:n_counts]
 
-        n_removed = 0
         # need to adjust position to be relative to the entire file, not just the
         # currently read section, so add the initial position to the in process packets
         total_remain = returned_records
         adj_packets = []
-        for packet_idx in range(0, len(self._read_state[StateKey.IN_PROCESS_DATA])):
-            adj_packet_idx = packet_idx - n_removed
-            this_packet = self._read_state[StateKey.IN_PROCESS_DATA][adj_packet_idx]
+        remaining_packets = []
+        for this_packet in in_process:
             if this_packet[SAMPLES_PARSED] > 0:
                 # this packet has data samples in it
                 this_packet_remain = this_packet[SAMPLES_PARSED] - this_packet[SAMPLES_RETURNED]
                 # increase the number of samples that have been pulled out
-                self._read_state[StateKey.IN_PROCESS_DATA][adj_packet_idx][SAMPLES_RETURNED] += total_remain
+                this_packet[SAMPLES_RETURNED] += total_remain
                 # find out if packet is done, if so remove it
                 if this_packet[SAMPLES_RETURNED] >= this_packet[SAMPLES_PARSED]:
                     # this packet has had all the samples pulled out from it, remove it from in process
                     adj_packets.append([this_packet[START_IDX], this_packet[END_IDX]])
-                    self._read_state[StateKey.IN_PROCESS_DATA].pop(adj_packet_idx)
-                    n_removed += 1
-                elif this_packet[SAMPLES_RETURNED] < 0:
-                    self._read_state[StateKey.IN_PROCESS_DATA][adj_packet_idx][SAMPLES_RETURNED] = 0
+                else:
+                    if this_packet[SAMPLES_RETURNED] < 0:
+                        this_packet[SAMPLES_RETURNED] = 0
+                    remaining_packets.append(this_packet)
 
                 total_remain -= this_packet_remain
 
             else:
                 # this packet has no samples, no need to process further
                 adj_packets.append([this_packet[START_IDX], this_packet[END_IDX]])
-                self._read_state[StateKey.IN_PROCESS_DATA].pop(adj_packet_idx)
-                n_removed += 1
 
-        if len(adj_packets) > 0 and self._read_state[StateKey.IN_PROCESS_DATA] == []:
+        # rebuild the list in one pass rather than popping each finished packet
+        in_process[:] = remaining_packets
+
+        if len(adj_packets) > 0 and in_process == []:
             # this is the last of the in process data, now process unprocessed data, so
             # go back to the beginning of the file
             self._position = [0, 0]
             # clear out the chunker so we don't wrap around data
             self._chunker.clean_all_chunks()
 
-        # first combine the in process data packet indices
-        combined_packets = self._combine_adjacent_packets(adj_packets)
-        # loop over combined packets and remove them from unprocessed data
-        for packet in combined_packets:
+        # first combine the in process data packet indices, then remove them
+        # from unprocessed data
+        self._remove_unprocessed(self._combine_adjacent_packets(adj_packets))
+
+    def _remove_unprocessed(self, packets):
+        """
+        Remove packets from the UNPROCESSED_DATA state. Unprocessed data is
+        kept sorted with no overlapping or adjacent ranges, so the range
+        holding each packet is found with a binary search.
+        @param packets An array of packets, with the form [[start, end], ...]
+        """
+        ordered = self._is_sorted_disjoint(self._read_state[StateKey.UNPROCESSED_DATA])
+
+        for packet in packets:
+            unprocessed = self._read_state[StateKey.UNPROCESSED_DATA]
+
+            if ordered and packet[START_IDX] < packet[END_IDX]:
+                # the last unprocessed section starting at or before this packet
+                idx = bisect_right(unprocessed, [packet[START_IDX], float('inf')]) - 1
+                if idx >= 0 and packet[END_IDX] <= unprocessed[idx][END_IDX]:
+                    unproc = unprocessed[idx]
+                    # replace it with any data still unprocessed on either side
+                    remains = []
+                    if packet[START_IDX] > unproc[START_IDX]:
+                        remains.append([unproc[START_IDX], packet[START_IDX]])
+                    if packet[END_IDX] < unproc[END_IDX]:
+                        remains.append([packet[END_IDX], unproc[END_IDX]])
+                    unprocessed[idx:idx + 1] = remains
+                continue
+
             # find which unprocessed section this packet is in
-            for unproc in self._read_state[StateKey.UNPROCESSED_DATA]:
+            for unproc in unprocessed:
                 if packet[START_IDX] >= unproc[START_IDX] and packet[END_IDX] <= unproc[END_IDX]:
                     # packet is within this unprocessed data, remove it
-                    self._read_state[StateKey.UNPROCESSED_DATA].remove(unproc)
+                    unprocessed.remove(unproc)
                     # add back any data still unprocessed on either side
                     if packet[START_IDX] > unproc[START_IDX]:
-                        self._read_state[StateKey.UNPROCESSED_DATA].append([unproc[START_IDX], packet[START_IDX]])
+                        unprocessed.append([unproc[START_IDX], packet[START_IDX]])
                     if packet[END_IDX] < unproc[END_IDX]:
-                        self._read_state[StateKey.UNPROCESSED_DATA].append([packet[END_IDX], unproc[END_IDX]])
+                        unprocessed.append([packet[END_IDX], unproc[END_IDX]])
                     # once we have found which unprocessed section this packet is in,
                     # move on to next packet
                     break
-            self._read_state[StateKey.UNPROCESSED_DATA] = sorted(self._read_state[StateKey.UNPROCESSED_DATA])
+            self._read_state[StateKey.UNPROCESSED_DATA] = sorted(unprocessed)
             self._read_state[StateKey.UNPROCESSED_DATA] = self._combine_adjacent_packets(
                 self._read_state[StateKey.UNPROCESSED_DATA])
+            ordered = self._is_sorted_disjoint(self._read_state[StateKey.UNPROCESSED_DATA])
+
+    @staticmethod
+    def _is_sorted_disjoint(packets):
+        """
+        @param packets An array of packets, with the form [[start, end], ...]
+        @retval True if the packets are in order with gaps between them
+        """
+        for idx in xrange(len(packets)):
+            if packets[idx][START_IDX] > packets[idx][END_IDX]:
+                return False
+            if idx > 0 and packets[idx - 1][END_IDX] >= packets[idx][START_IDX]:
+                return False
+        return True
 
     def read_file(self):
         """
         This function reads the entire input file.
         Returns:
-            A string containing the contents of the entire file.
+            A SioFileSource with the contents of the entire file.
         """
-        input_buffer = ''
-
-        while True:
-            # read data in small blocks in order to not block processing
-            next_data = self._stream_handle.read(1024)
-            if next_data != '':
-                input_buffer = input_buffer + next_data
-                gevent.sleep(0)
-            else:
-                break
+        return SioFileSource.from_stream(self._stream_handle)
 
-        return input_buffer
+    def _release_file(self):
+        """
+        Unmap the file once all of its data has been parsed, so long running
+        drivers don't hold a mapping per file. If a later state needs the
+        data again the file is mapped again.
+        """
+        if self.all_data is not None and self.all_data.is_mapped():
+            self.all_data.close()
+            self.all_data = None
 
     def packet_exists(self, start, end):
         """
@@ -469,6 +585,7 @@ class SioParser(BufferLoadingParser):
         @retval list of matched start,end index found in raw_data
         """
         return_list = []
+        candidates = []
 
         #
         # Search the entire input buffer to find all possible SIO headers.
@@ -490,37 +607,47 @@ class SioParser(BufferLoadingParser):
                 #
                 end_packet = raw_data[end_packet_idx]
                 if end_packet == SIO_BLOCK_END:
-                    #
-                    # Calculate the checksum on the data portion of the
-                    # SIO block (excludes start of header, header,
-                    # and end of header).
-                    #
-                    actual_checksum = self.calc_checksum(
-                        raw_data[match.end(0):end_packet_idx])
-
-                    expected_checksum = match.group(SIO_HEADER_GROUP_CHECKSUM)
-
-                    #
-                    # If the checksums match, add the start,end indices to
-                    # the return list.  The end of SIO block byte is included.
-                    #
-                    if actual_checksum == expected_checksum:
-                        # even if this is not the right instrument, keep track that
-                        # this packet was processed
-                        if not self.packet_exists(match.start(0), end_packet_idx+1):
-                            self._read_state[StateKey.IN_PROCESS_DATA].append([match.start(0),
-                                                                               end_packet_idx+1,
-                                                                               None, 0])
-                        return_list.append((match.start(0), end_packet_idx+1))
-                    else:
-                        log.debug("Calculated checksum %s != received checksum %s for header %s and packet %d to %d",
-                                  actual_checksum, expected_checksum,
-                                  match.group(0)[1:32],
-                                  match.end(0), end_packet_idx)
+                    candidates.append((match, end_packet_idx))
                 else:
                     log.debug('End packet at %d is not x03 for header %s',
                               end_packet_idx, match.group(0)[1:32])
 
+        #
+        # Calculate the checksum on the data portion of each SIO block
+        # (excludes start of header, header, and end of header).
+        #
+        blocks = [(match.end(0), end_packet_idx) for match, end_packet_idx in candidates]
+        if len(blocks) >= SIO_CRC_BATCH_MIN_BLOCKS:
+            actual_checksums = sio_crc_hex_batch(raw_data, blocks)
+        else:
+            actual_checksums = [self.calc_checksum(buffer(raw_data, start, end - start))
+                                for start, end in blocks]
+
+        # index the in process packets once rather than scanning them for each block
+        in_process = self._read_state[StateKey.IN_PROCESS_DATA]
+        known_packets = set((packet[START_IDX], packet[END_IDX]) for packet in in_process)
+        offset = self._position[START_IDX]
+
+        for (match, end_packet_idx), actual_checksum in zip(candidates, actual_checksums):
+            expected_checksum = match.group(SIO_HEADER_GROUP_CHECKSUM)
+
+            #
+            # If the checksums match, add the start,end indices to
+            # the return list.  The end of SIO block byte is included.
+            #
+            if actual_checksum == expected_checksum:
+                # even if this is not the right instrument, keep track that
+                # this packet was processed
+                if (match.start(0) + offset, end_packet_idx + 1 + offset) not in known_packets:
+                    in_process.append([match.start(0), end_packet_idx+1, None, 0])
+                    known_packets.add((match.start(0), end_packet_idx+1))
+                return_list.append((match.start(0), end_packet_idx+1))
+            else:
+                log.debug("Calculated checksum %s != received checksum %s for header %s and packet %d to %d",
+                          actual_checksum, expected_checksum,
+                          match.group(0)[1:32],
+                          match.end(0), end_packet_idx)
+
         return return_list
 
     def _yank_particles(self, num_to_fetch):
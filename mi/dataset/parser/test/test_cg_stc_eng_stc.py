@@ -8,6 +8,8 @@
 """
 import os
 import re
+import time
+import glob
 import ntplib
 
 from nose.plugins.attrib import attr
@@ -20,12 +22,30 @@ from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 from mi.dataset.parser.cg_stc_eng_stc import CgStcEngStcParser, CgStcEngStcParserDataParticle
 from mi.dataset.parser.cg_stc_eng_stc import CgStcEngStcParserDataParticleKey
+from mi.dataset.parser.cg_stc_eng_stc import CgStcEngStcParserRecoveredDataParticle, tokenize_eng_lines
 
 from mi.idk.config import Config
 RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi',
 			     'dataset', 'driver', 'cg_stc_eng',
 			     'stc', 'resource')
 
+
+def legacy_parsed_values(particle):
+    """
+    Parse a particle by searching the whole file with a newly built
+    parameter dict, as the particle used to
+    @retval A dict of value id to value, and the encoding errors
+    """
+    params = particle._build_param_dict()
+    params.update(particle.raw_data)
+    return params.get_all(), params.get_encoding_errors()
+
+
+def parsed_values(particle):
+    values = particle._build_parsed_values()
+    return (dict((value[DataParticleKey.VALUE_ID], value[DataParticleKey.VALUE]) for value in values),
+            particle.get_encoding_errors())
+
 @attr('UNIT', group='mi')
 class CgParserUnitTestCase(ParserUnitTestCase):
     """
@@ -272,4 +292,54 @@ class CgParserUnitTestCase(ParserUnitTestCase):
 	res_dict = result[0].generate_dict()
 	errors = result[0].get_encoding_errors()
 	log.debug("encoding errors: %s", errors)
-	self.assertNotEqual(errors, [])
\ No newline at end of file
+	self.assertNotEqual(errors, [])
+
+    def test_tokenize(self):
+        lines = tokenize_eng_lines('Platform.time=2013/10/04\r\nno value\nGPS.lat=41.1\nGPS.lat=41.2\n=x\nCPU.uptime=1 day')
+        self.assertEqual(lines, {'Platform.time': 'Platform.time=2013/10/04\r\n',
+                                 'GPS.lat': 'GPS.lat=41.1\n',
+                                 'CPU.uptime': 'CPU.uptime=1 day'})
+
+    def test_legacy_param_dict(self):
+        """
+        Verify the parameters found by key are the ones the parameter dict
+        found by searching the whole file
+        """
+        for path in sorted(glob.glob(os.path.join(RESOURCE_PATH, 'stc_status*.txt'))):
+            with open(path) as filehandle:
+                data = filehandle.read()
+            for particle_class in [CgStcEngStcParserDataParticle, CgStcEngStcParserRecoveredDataParticle]:
+                self.assertEqual(parsed_values(particle_class(data)),
+                                 legacy_parsed_values(particle_class(data)), path)
+
+        # a line of a key that doesn't match, and a parameter split over lines
+        with open(os.path.join(RESOURCE_PATH, 'stc_status.txt')) as filehandle:
+            data = filehandle.read()
+        data = 'GPS.lat=unknown\n' + data.replace('\n', '\r\n')
+        data = re.sub(r'(DLOGP1=.*ld: \S+)\s+', r'\1\r\n', data)
+        values = parsed_values(CgStcEngStcParserDataParticle(data))
+        self.assertEqual(values, legacy_parsed_values(CgStcEngStcParserDataParticle(data)))
+        self.assertEqual(values[0][CgStcEngStcParserDataParticleKey.CG_ENG_GPS_LAT], 41.535588)
+
+
+@attr('PERF', group='mi')
+class CgStcEngStcBenchmark(ParserUnitTestCase):
+    """
+    Compare the time to parse an engineering file by searching it with a
+    newly built parameter dict with looking up the parameters by key
+    """
+    FILES = 200
+
+    def _time(self, parse, data):
+        start = time.time()
+        for _ in xrange(self.FILES):
+            parse(CgStcEngStcParserDataParticle(data))
+        return time.time() - start
+
+    def test_benchmark(self):
+        with open(os.path.join(RESOURCE_PATH, 'stc_status_all.txt')) as filehandle:
+            data = filehandle.read()
+        legacy_time = self._time(legacy_parsed_values, data)
+        lookup_time = self._time(parsed_values, data)
+        log.info('%d files: parameter dict %.3fs, key lookup %.3fs (%.1fx)',
+                 self.FILES, legacy_time, lookup_time, legacy_time / lookup_time)
@@ -7,6 +7,7 @@
 @brief Test code for a ctdpf_ckl_wfp data parser
 """
 import os
+import copy
 import struct
 import ntplib
 from StringIO import StringIO
@@ -17,6 +18,8 @@ from nose.plugins.attrib import attr
 from mi.core.log import get_logger
 log = get_logger()
 from mi.core.exceptions import SampleException
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.particle_batch import ParticleBatch, expand_particle_batches
 from mi.idk.config import Config
 
 from mi.dataset.test.test_parser import ParserUnitTestCase
@@ -397,6 +400,86 @@ class CtdpfCklWfpParserUnitTestCase(ParserUnitTestCase):
         self.assertEqual(self.state_callback_value[StateKey.RECORDS_READ], 270)
         self.assertEqual(self.publish_callback_value[-1], self.particle_last)
 
+    def batch_config(self, data_key):
+        """
+        @retval The parser config of a data key with particle batches on
+        """
+        config = copy.copy(self.config.get(data_key))
+        config[DataSetDriverConfigKeys.PARTICLE_BATCHES] = True
+        return config
+
+    def test_particle_batches(self):
+        """
+        Read the data records as particle batches, counting each row as a
+        record, and restart from the state of a row part way through a batch
+        """
+        stream_handle = StringIO(CtdpfCklWfpParserUnitTestCase.TEST_DATA)
+        self.parser = CtdpfCklWfpParser(
+            self.batch_config(DataTypeKey.CTDPF_CKL_WFP_RECOVERED), self.recovered_start_state, stream_handle,
+            self.state_callback, self.pub_callback, self.exception_callback,
+            len(CtdpfCklWfpParserUnitTestCase.TEST_DATA))
+
+        result = self.parser.get_records(2)
+        self.assertEqual(result[0], self.particle_meta)
+        self.assertIsInstance(result[1], ParticleBatch)
+        self.assertEqual(len(result[1]), 1)
+        self.assertEqual(expand_particle_batches(result)[1:], [self.particle_a])
+        self.assertEqual(self.parser._state[StateKey.POSITION], 11)
+        self.assertEqual(self.state_callback_value[StateKey.RECORDS_READ], 1)
+        self.assertEqual(self.file_ingested_value, False)
+
+        result = self.parser.get_records(5)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(expand_particle_batches(result), [self.particle_b, self.particle_c])
+        self.assertEqual(self.publish_callback_value, result)
+        self.assertEqual(self.state_callback_value[StateKey.POSITION], 33)
+        self.assertEqual(self.state_callback_value[StateKey.RECORDS_READ], 3)
+        self.assertEqual(self.file_ingested_value, True)
+
+        # the batch values are the same as the particle values
+        self.assertEqual(result[0].generate_dicts()[1][DataParticleKey.VALUES],
+                         self.particle_c.generate_dict()[DataParticleKey.VALUES])
+
+        stream_handle = StringIO(CtdpfCklWfpParserUnitTestCase.TEST_DATA)
+        self.parser = CtdpfCklWfpParser(
+            self.batch_config(DataTypeKey.CTDPF_CKL_WFP_RECOVERED),
+            {StateKey.POSITION: 22, StateKey.RECORDS_READ: 2, StateKey.METADATA_SENT: True},
+            stream_handle, self.state_callback, self.pub_callback, self.exception_callback,
+            len(CtdpfCklWfpParserUnitTestCase.TEST_DATA))
+        result = self.parser.get_records(1)
+        self.assertEqual(expand_particle_batches(result), [self.particle_c])
+        self.assertEqual(self.state_callback_value[StateKey.POSITION], 33)
+
+    def test_long_stream_batches(self):
+        """
+        Verify a long stream read as particle batches gives the same
+        particles and states as one read record by record
+        """
+        filepath = os.path.join(RESOURCE_PATH, 'C0000038.DAT')
+        filesize = os.path.getsize(filepath)
+        results = []
+        for config in (self.config.get(DataTypeKey.CTDPF_CKL_WFP_TELEMETERED),
+                       self.batch_config(DataTypeKey.CTDPF_CKL_WFP_TELEMETERED)):
+            particles = []
+            states = []
+            with open(filepath) as stream_handle:
+                parser = CtdpfCklWfpParser(config, copy.copy(self.telemetered_start_state), stream_handle,
+                                           self.state_callback, self.pub_callback, self.exception_callback,
+                                           filesize)
+                result = parser.get_records(25)
+                while result:
+                    particles.extend(expand_particle_batches(result))
+                    states.append(copy.copy(self.state_callback_value))
+                    result = parser.get_records(25)
+            results.append((particles, states))
+
+        ((particles, states), (batch_particles, batch_states)) = results
+        self.assertEqual(len(batch_particles), 271)
+        self.assertEqual(batch_particles, particles)
+        self.assertEqual([particle.generate_dict()[DataParticleKey.VALUES] for particle in batch_particles],
+                         [particle.generate_dict()[DataParticleKey.VALUES] for particle in particles])
+        self.assertEqual(batch_states, states)
+
     def test_mid_state_start(self):
         """
         Test starting the parser in a state in the middle of processing
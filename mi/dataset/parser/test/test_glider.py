@@ -7,6 +7,10 @@
 @brief Test code for a Glider data parser.
 """
 
+import glob
+import os
+import pickle
+import time
 from StringIO import StringIO
 
 import numpy as np
@@ -18,6 +22,7 @@ log = get_logger()
 from nose.plugins.attrib import attr
 
 from mi.core.exceptions import SampleException
+from mi.core.unit_test import MiUnitTest
 from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 from mi.dataset.parser.glider import GliderParser, GliderEngineeringParser, StateKey
@@ -40,6 +45,7 @@ from mi.dataset.parser.glider import EngineeringRecoveredParticleKey
 from mi.dataset.parser.glider import EngineeringRecoveredDataParticle
 from mi.dataset.parser.glider import EngineeringScienceRecoveredParticleKey
 from mi.dataset.parser.glider import EngineeringScienceRecoveredDataParticle
+from mi.dataset.parser.glider import GliderColumnPlan, _is_nan
 
 
 
@@ -767,6 +773,35 @@ class ENGGliderTest(GliderParserUnitTestCase):
         self.assert_generate_particle(EngineeringScienceTelemeteredDataParticle, record_sci_2, 12479)
         self.assert_no_more_data()
 
+    def test_pickle(self):
+        """
+        Verify particles built from a file with lat and lon columns can be
+        pickled, as they are to be sent between processes
+        """
+        self.set_data(HEADER4, ENGSCI_RECORD)
+        self.reset_eng_parser()
+
+        particles = self.parser.get_records(5)
+        self.assertEqual(len(particles), 5)
+        for particle in particles:
+            copied = pickle.loads(pickle.dumps(particle, pickle.HIGHEST_PROTOCOL))
+            self.assertEqual(copied.generate_dict(), particle.generate_dict())
+
+    def test_bad_position(self):
+        """
+        Verify a lat or lon value that isn't a position is reported and
+        left out, and the rest of the row is converted
+        """
+        plan = GliderColumnPlan.from_header(['m_lat', 'm_lon', 'm_depth'], [8, 8, 4])
+        errors = []
+        row = plan.read_row('-1e5 -7032.6234 1.5', errors.append)
+
+        self.assertIsNone(row['m_lat'])
+        self.assertAlmostEqual(row['m_lon'], -70.54372333)
+        self.assertEqual(row['m_depth'], 1.5)
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], SampleException)
+
 @attr('UNIT', group='mi')
 class ENGRecoveredGliderTest(GliderParserUnitTestCase):
     """
@@ -815,4 +850,121 @@ class ENGRecoveredGliderTest(GliderParserUnitTestCase):
         self.reset_eng_parser({StateKey.POSITION: 10795, StateKey.SENT_METADATA: True})
         self.assert_generate_particle(EngineeringRecoveredDataParticle, record_2, 10795)
         self.assert_generate_particle(EngineeringScienceRecoveredDataParticle, record_sci_2, 12479)
-        self.assert_no_more_data()
\ No newline at end of file
+        self.assert_no_more_data()
+
+
+def read_mrg_file(path):
+    """
+    @retval (labels, num_of_bytes, data rows) of a glider .mrg file
+    """
+    with open(path) as filehandle:
+        lines = filehandle.read().splitlines()
+    num_ascii_tags = int(lines[2].split(':')[1])
+    labels = lines[num_ascii_tags].split()
+    num_of_bytes = map(int, lines[num_ascii_tags + 2].split())
+    return labels, num_of_bytes, [line for line in lines[num_ascii_tags + 3:] if line.strip()]
+
+
+def legacy_read_row(labels, num_of_bytes, data_record):
+    """
+    The row dictionary the parser built before the column plan, which
+    decided the converter of every column in every row
+    """
+    data_dict = {}
+    data = data_record.strip().split()
+    for ii in range(len(labels)):
+        if data[ii] == "NaN":
+            value = float(data[ii])
+        elif ('_lat' in labels[ii]) or ('_lon' in labels[ii]):
+            value = float(data[ii])
+        elif num_of_bytes[ii] in (1, 2):
+            value = int(data[ii])
+        elif num_of_bytes[ii] in (4, 8):
+            value = float(data[ii])
+        else:
+            value = data[ii]
+        data_dict[labels[ii]] = {'Name': labels[ii], 'Data': value}
+    return data_dict
+
+
+def legacy_values(data_dict, key_list):
+    """
+    The particle values the parser built from a row dictionary
+    """
+    found = []
+    missing = []
+    for key in key_list:
+        if key in data_dict:
+            value = data_dict[key]['Data']
+            if isinstance(value, str) or not np.isnan(value):
+                found.append((key, value))
+            else:
+                found.append((key, None))
+        else:
+            missing.append((key, None))
+    return found + missing
+
+
+def plan_values(row, key_list):
+    """
+    The particle values projected from a row by column index
+    """
+    found = []
+    missing = []
+    for (key, index) in row.plan.projection(key_list):
+        if index is None:
+            missing.append((key, None))
+        else:
+            value = row.values[index]
+            found.append((key, None if _is_nan(value) else value))
+    return found + missing
+
+
+@attr('PERF', group='mi')
+class GliderColumnPlanBenchmark(MiUnitTest):
+    """
+    Compare converting the rows of the glider test files to particle values
+    through a dictionary per row with the column plan and index projection
+    """
+    ROUNDS = 5
+    PARTICLE_CLASSES = [CtdgvTelemeteredDataParticle, DostaTelemeteredDataParticle,
+                        FlordTelemeteredDataParticle, FlortTelemeteredDataParticle,
+                        ParadTelemeteredDataParticle, EngineeringTelemeteredDataParticle]
+
+    def setUp(self):
+        resource = os.path.join(os.path.dirname(__file__), '..', '..', 'driver', 'moas', 'gl', '*', 'resource')
+        self.files = [read_mrg_file(path) for path in sorted(glob.glob(os.path.join(resource, '*.mrg')))]
+        self.key_lists = [particle_class.keys_exclude_sci_times if hasattr(particle_class, 'keys_exclude_sci_times')
+                          else particle_class.parameter_keys for particle_class in self.PARTICLE_CLASSES]
+
+    def _legacy(self):
+        results = []
+        for (labels, num_of_bytes, rows) in self.files:
+            for data_record in rows:
+                data_dict = legacy_read_row(labels, num_of_bytes, data_record)
+                results.extend(legacy_values(data_dict, key_list) for key_list in self.key_lists)
+        return results
+
+    def _plan(self):
+        results = []
+        for (labels, num_of_bytes, rows) in self.files:
+            plan = GliderColumnPlan.from_header(labels, num_of_bytes, float)
+            for data_record in rows:
+                row = plan.read_row(data_record)
+                results.extend(plan_values(row, key_list) for key_list in self.key_lists)
+        return results
+
+    def _time(self, function):
+        start = time.time()
+        for _ in range(self.ROUNDS):
+            results = function()
+        return time.time() - start, results
+
+    def test_benchmark(self):
+        (legacy_time, legacy_results) = self._time(self._legacy)
+        (plan_time, plan_results) = self._time(self._plan)
+        self.assertEqual(plan_results, legacy_results)
+
+        rows = sum(len(rows) for (labels, num_of_bytes, rows) in self.files)
+        log.info('%d files, %d rows: row dictionaries %.3fs, column plan %.3fs (%.1fx)', len(self.files),
+                 rows * self.ROUNDS, legacy_time, plan_time, legacy_time / plan_time)
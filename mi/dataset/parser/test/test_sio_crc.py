@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.parser.test.test_sio_crc
+@file mi/dataset/parser/test/test_sio_crc.py
+@brief Test code for the SIO CRC, comparing it with the original bitwise
+implementation on the SIO mule test resources
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import struct
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.idk.config import Config
+
+from mi.dataset.parser.sio_mule_common import SIO_HEADER_MATCHER, \
+    SIO_HEADER_GROUP_DATA_LENGTH, SIO_HEADER_GROUP_CHECKSUM
+from mi.dataset.parser.sio_crc import sio_crc, sio_crc_hex, sio_crc_batch, sio_crc_hex_batch
+
+RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver')
+
+SIO_RESOURCES = [
+    os.path.join(RESOURCE_PATH, 'dosta_ln', 'wfp_sio_mule', 'resource', 'node58p1.dat'),
+    os.path.join(RESOURCE_PATH, 'sio_eng', 'sio_mule', 'resource', 'node58p1.dat'),
+    os.path.join(RESOURCE_PATH, 'mflm', 'ctd', 'resource', 'node59p1.dat'),
+]
+
+
+def bitwise_checksum(data):
+    """
+    The original SioParser.calc_checksum, one byte and one bit at a time
+    """
+    crc = 65535
+    if len(data) == 0:
+        return '0000'
+    for iData in range(0, len(data)):
+        short = struct.unpack('H', data[iData] + '\x00')
+        point = 255 & short[0]
+        crc = crc ^ point
+        for i in range(7, -1, -1):
+            if crc & 1:
+                crc = (crc >> 1) ^ 33800
+            else:
+                crc >>= 1
+    crc = ~crc
+    # convert to unsigned
+    if crc < 0:
+        crc += 65536
+    return '%04X' % crc
+
+
+def find_sio_blocks(data):
+    """
+    @retval A list of the (start, end) of the data portion and the header
+    checksum of every complete SIO block in data
+    """
+    blocks = []
+    for match in SIO_HEADER_MATCHER.finditer(data):
+        end = match.end(0) + int(match.group(SIO_HEADER_GROUP_DATA_LENGTH), 16)
+        if end < len(data):
+            blocks.append(((match.end(0), end), match.group(SIO_HEADER_GROUP_CHECKSUM)))
+    return blocks
+
+
+def read_resource(path):
+    """
+    Read a telemetered SIO mule resource and replace its escape sequences
+    """
+    with open(path, 'rb') as resource:
+        data = resource.read()
+    return data.replace(b'\x18\x6b', b'\x2b').replace(b'\x18\x58', b'\x18')
+
+
+@attr('UNIT', group='mi')
+class SioCrcUnitTestCase(MiUnitTest):
+    """
+    SIO CRC unit test suite
+    """
+    def test_known_values(self):
+        self.assertEqual(sio_crc_hex(''), '0000')
+        self.assertEqual(sio_crc('123456789'), 0x906E)
+        self.assertEqual(sio_crc_hex('123456789'), '906E')
+        self.assertEqual(sio_crc_hex('\x00'), bitwise_checksum('\x00'))
+
+    def test_buffer_types(self):
+        data = ''.join(chr(i) for i in range(256)) * 4
+        expected = bitwise_checksum(data[10:900])
+        self.assertEqual(sio_crc_hex(data[10:900]), expected)
+        self.assertEqual(sio_crc_hex(bytearray(data)[10:900]), expected)
+        self.assertEqual(sio_crc_hex(buffer(data, 10, 890)), expected)
+        self.assertEqual(sio_crc_hex(memoryview(data)[10:900]), expected)
+
+    def test_batch(self):
+        data = ''.join(chr((i * 7) % 256) for i in range(5000))
+        blocks = [(0, 10), (5, 5), (100, 4000), (3000, 3001), (4990, 5000)]
+        expected = [bitwise_checksum(data[start:end]) for start, end in blocks]
+
+        self.assertEqual(sio_crc_hex_batch(data, blocks), expected)
+        self.assertEqual(sio_crc_hex_batch(bytearray(data), blocks), expected)
+        self.assertEqual(sio_crc_hex_batch(memoryview(data), blocks), expected)
+        self.assertEqual(sio_crc_batch(data, blocks)[2], int(expected[2], 16))
+        self.assertEqual(sio_crc_batch(data, []), [])
+
+    def test_resources(self):
+        """
+        Every block in the test resources gets the same checksum from the
+        table, the batch and the original implementation
+        """
+        for path in SIO_RESOURCES:
+            data = read_resource(path)
+            blocks = find_sio_blocks(data)
+            self.assertTrue(blocks)
+
+            indices = [index for index, _ in blocks]
+            expected = [bitwise_checksum(data[start:end]) for start, end in indices]
+            self.assertEqual([sio_crc_hex(buffer(data, start, end - start)) for start, end in indices],
+                             expected)
+            self.assertEqual(sio_crc_hex_batch(data, indices), expected)
+
+            # the resources are mostly good blocks
+            matched = sum(1 for (_, header), crc in zip(blocks, expected) if header == crc)
+            self.assertTrue(matched > len(blocks) / 2)
+
+
+@attr('PERF', group='mi')
+class SioCrcBenchmark(MiUnitTest):
+    """
+    Compare the time to verify every block of the SIO test resources with the
+    original, table and batch checksums
+    """
+    def _time(self, function, *args):
+        start = time.time()
+        result = function(*args)
+        return time.time() - start, result
+
+    def test_benchmark(self):
+        for path in SIO_RESOURCES:
+            data = read_resource(path)
+            indices = [index for index, _ in find_sio_blocks(data)]
+            total = sum(end - start for start, end in indices)
+
+            bitwise_time, expected = self._time(
+                lambda: [bitwise_checksum(data[start:end]) for start, end in indices])
+            table_time, table = self._time(
+                lambda: [sio_crc_hex(buffer(data, start, end - start)) for start, end in indices])
+            batch_time, batch = self._time(sio_crc_hex_batch, data, indices)
+
+            self.assertEqual(table, expected)
+            self.assertEqual(batch, expected)
+
+            log.info('%s: %d blocks, %d bytes: bitwise %.3fs, table %.3fs (%.1fx), batch %.3fs (%.1fx)',
+                     os.path.relpath(path, RESOURCE_PATH), len(indices), total,
+                     bitwise_time, table_time, bitwise_time / table_time,
+                     batch_time, bitwise_time / batch_time)
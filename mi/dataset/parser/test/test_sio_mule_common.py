@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.parser.test.test_sio_mule_common
+@file mi/dataset/parser/test/test_sio_mule_common.py
+@brief Test code for the common SIO parser classes
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import mmap
+import tempfile
+from StringIO import StringIO
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.dataset_driver import DataSetDriverConfigKeys
+from mi.dataset.parser.sio_mule_common import SioFileSource, SioParser, StateKey
+from mi.dataset.parser.ctdmo import CtdmoRecoveredCoParser, CtdmoStateKey
+from mi.dataset.parser.dosta_ln_wfp_sio_mule import DostaLnWfpSioMuleParser
+
+from mi.idk.config import Config
+
+RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver')
+
+
+@attr('UNIT', group='mi')
+class SioFileSourceUnitTestCase(MiUnitTest):
+    """
+    SioFileSource unit test suite
+    """
+    def setUp(self):
+        self.contents = ''.join(chr(i) for i in range(256)) * 10
+        handle, self.path = tempfile.mkstemp()
+        os.write(handle, self.contents)
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def assert_source(self, source):
+        self.assertEqual(len(source), len(self.contents))
+        self.assertEqual(source.getvalue(), self.contents)
+        self.assertEqual(str(source.slice(10, 300)), self.contents[10:300])
+        self.assertEqual(len(source.slice(5, 5)), 0)
+
+    def test_mapped_file(self):
+        with open(self.path, 'rb') as stream_handle:
+            source = SioFileSource.from_stream(stream_handle)
+            self.assertIsInstance(source._data, mmap.mmap)
+            self.assert_source(source)
+
+    def test_close(self):
+        with open(self.path, 'rb') as stream_handle:
+            with SioFileSource.from_stream(stream_handle) as source:
+                mapped = source._data
+                self.assertTrue(source.is_mapped())
+            self.assertFalse(source.is_mapped())
+            self.assertEqual(len(source), 0)
+            self.assertRaises(ValueError, mapped.read, 1)
+
+        # closing a read source just empties it
+        source = SioFileSource.from_stream(StringIO(self.contents))
+        source.close()
+        source.close()
+        self.assertEqual(len(source), 0)
+
+    def test_read_stream(self):
+        source = SioFileSource.from_stream(StringIO(self.contents))
+        self.assertIsInstance(source._data, str)
+        self.assert_source(source)
+
+    def test_partly_read_file(self):
+        with open(self.path, 'rb') as stream_handle:
+            stream_handle.read(256)
+            source = SioFileSource.from_stream(stream_handle)
+            self.assertEqual(source.getvalue(), self.contents[256:])
+
+    def test_empty_file(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            with open(path, 'rb') as stream_handle:
+                source = SioFileSource.from_stream(stream_handle)
+                self.assertEqual(len(source), 0)
+                self.assertEqual(source.getvalue(), '')
+        finally:
+            os.remove(path)
+
+
+@attr('UNIT', group='mi')
+class SioParserStateUnitTestCase(MiUnitTest):
+    """
+    SioParser in process and unprocessed data bookkeeping unit test suite
+    """
+    def setUp(self):
+        self.parser = SioParser({}, StringIO(''), None, None,
+                                self.callback, self.callback, self.callback)
+
+    def callback(self, *args):
+        pass
+
+    def set_state(self, unprocessed, in_process):
+        self.parser._read_state = {
+            StateKey.UNPROCESSED_DATA: unprocessed,
+            StateKey.IN_PROCESS_DATA: in_process,
+            StateKey.FILE_SIZE: 1000
+        }
+
+    def test_remove_unprocessed(self):
+        self.set_state([[0, 100], [200, 300], [400, 500]], [])
+        self.parser._remove_unprocessed([[0, 10], [220, 250], [450, 500], [600, 700]])
+        self.assertEqual(self.parser._read_state[StateKey.UNPROCESSED_DATA],
+                         [[10, 100], [200, 220], [250, 300], [400, 450]])
+
+    def test_remove_unprocessed_unordered(self):
+        """
+        State that is out of order or has adjacent ranges is sorted and
+        combined as packets are removed
+        """
+        self.set_state([[400, 500], [0, 100], [100, 150]], [])
+        self.parser._remove_unprocessed([[420, 430], [50, 120]])
+        self.assertEqual(self.parser._read_state[StateKey.UNPROCESSED_DATA],
+                         [[0, 50], [120, 150], [400, 420], [430, 500]])
+
+    def test_increment_state(self):
+        self.set_state([[0, 1000]], [[0, 100, None, 0], [100, 180, None, 0], [300, 400, None, 0]])
+        self.parser._position = [200, 200]
+        self.parser._chunk_sample_count = [2, 0]
+
+        self.parser._increment_state(1)
+
+        # the second packet had no samples and the third no sample count
+        self.assertEqual(self.parser._read_state[StateKey.IN_PROCESS_DATA], [[200, 300, 2, 1]])
+        self.assertEqual(self.parser._read_state[StateKey.UNPROCESSED_DATA], [[0, 300], [380, 1000]])
+        self.assertEqual(self.parser._chunk_sample_count, [])
+
+        self.parser._increment_state(1)
+        self.assertEqual(self.parser._read_state[StateKey.IN_PROCESS_DATA], [])
+        self.assertEqual(self.parser._read_state[StateKey.UNPROCESSED_DATA], [[0, 200], [380, 1000]])
+        self.assertEqual(self.parser._position, [0, 0])
+
+
+@attr('UNIT', group='mi')
+class SioParserMappingUnitTestCase(MiUnitTest):
+    """
+    Verify parsers don't keep the file mapped once it has been parsed
+    """
+    def _open(self, path):
+        stream_handle = open(os.path.join(RESOURCE_PATH, path), 'rb')
+        self.addCleanup(stream_handle.close)
+        return stream_handle
+
+    def test_recovered(self):
+        config = {DataSetDriverConfigKeys.PARTICLE_MODULE: 'mi.dataset.parser.ctdmo',
+                  DataSetDriverConfigKeys.PARTICLE_CLASS: 'CtdmoRecoveredOffsetDataParticle',
+                  CtdmoStateKey.INDUCTIVE_ID: 55}
+        parser = CtdmoRecoveredCoParser(config, self._open('mflm/ctd/resource/CTD02004.DAT'), None,
+                                        lambda *args: None, lambda particles: None, self.fail)
+
+        result = parser.get_records(1)
+        self.assertEqual(len(result), 1)
+        self.assertTrue(parser.all_data.is_mapped())
+
+        # parsing to the end unmaps the file
+        result.extend(parser.get_records(1000))
+        self.assertIsNone(parser.all_data)
+
+        # a state that needs the data again maps it again
+        parser._read_state[StateKey.IN_PROCESS_DATA] = []
+        parser._read_state[StateKey.UNPROCESSED_DATA] = [[0, parser._read_state[StateKey.FILE_SIZE]]]
+        parser._position = [0, 0]
+        self.assertEqual(parser.get_records(1000), result)
+        self.assertIsNone(parser.all_data)
+
+    def test_telemetered(self):
+        config = {DataSetDriverConfigKeys.PARTICLE_MODULE: 'mi.dataset.parser.dosta_ln_wfp_sio_mule',
+                  DataSetDriverConfigKeys.PARTICLE_CLASS: 'DostaLnWfpSioMuleParserDataParticle'}
+        parser = DostaLnWfpSioMuleParser(config, None, self._open('dosta_ln/wfp_sio_mule/resource/node58p1.dat'),
+                                         lambda *args: None, lambda particles: None, self.fail)
+
+        # the mapping is closed once the escape sequences are replaced in a copy
+        self.assertTrue(parser.get_records(1))
+        self.assertFalse(parser.all_data.is_mapped())
@@ -25,6 +25,7 @@ from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.exceptions import SampleException, DatasetParserException
 
 from mi.dataset.dataset_parser import BufferLoadingParser
+from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 
 EOP_ONLY_MATCHER = re.compile(b'\xFF{11}')
 EOP_REGEX = b'\xFF{11}([\x00-\xFF]{8})'
@@ -63,6 +64,8 @@ class WfpCFileCommonParser(BufferLoadingParser):
         self._read_state = {StateKey.POSITION: 0,
                             StateKey.RECORDS_READ: 0,
                             StateKey.METADATA_SENT: False}
+        # publish the data records as particle batches rather than particles
+        self._particle_batches = config.get(DataSetDriverConfigKeys.PARTICLE_BATCHES, False)
         super(WfpCFileCommonParser, self).__init__(config,
                                                    stream_handle,
                                                    state,
@@ -125,6 +128,15 @@ class WfpCFileCommonParser(BufferLoadingParser):
         #return sample
         raise NotImplementedError("extract_data_particle must be overridden")
 
+    def extract_data_batch(self, records, timestamps):
+        """
+        Class for extracting a particle batch of data sample records, need to override this
+        to use particle batches
+        """
+        ##something like this:
+        #return self._extract_batch(DofstKWfpParserDataParticle.type(), columns, timestamps, records)
+        raise NotImplementedError("extract_data_batch must be overridden")
+
     def read_footer(self):
         """
         Read the footer of the file including the end of profile marker (a record filled with \xFF), and
@@ -209,9 +221,14 @@ class WfpCFileCommonParser(BufferLoadingParser):
         it is a valid data piece, build a particle, update the position and
         timestamp. Go until the chunker has no more valid data.
         @retval a list of tuples with sample particles encountered in this
-            parsing, plus the state. An empty list of nothing was parsed.
+            parsing, plus the state. An empty list of nothing was parsed. If
+            particle batches are configured the data records are returned as
+            one batch, with the state after each record.
         """     
         result_particles = []
+        batch_records = []
+        batch_timestamps = []
+        batch_states = []
 
         if not self._read_state[StateKey.METADATA_SENT] and not self.footer_data is None:
             timestamp = float(ntplib.system_to_ntp_time(self._start_time))
@@ -226,6 +243,11 @@ class WfpCFileCommonParser(BufferLoadingParser):
             if EOP_MATCHER.match(chunk):
                 # this is the end of profile matcher, just increment the state
                 self._increment_state(DATA_RECORD_BYTES + TIME_RECORD_BYTES, 0)
+            elif self._particle_batches:
+                batch_timestamps.append(self.calc_timestamp(self._read_state[StateKey.RECORDS_READ]))
+                batch_records.append(chunk)
+                self._increment_state(DATA_RECORD_BYTES, 1)
+                batch_states.append(copy.copy(self._read_state))
             else:
                 timestamp = self.calc_timestamp(self._read_state[StateKey.RECORDS_READ])
                 sample = self.extract_data_particle(chunk, timestamp)
@@ -236,4 +258,8 @@ class WfpCFileCommonParser(BufferLoadingParser):
 
             (timestamp, chunk) = self._chunker.get_next_data()
 
+        if batch_records:
+            batch = self.extract_data_batch(batch_records, batch_timestamps)
+            result_particles.append((batch, batch_states))
+
         return result_particles
\ No newline at end of file
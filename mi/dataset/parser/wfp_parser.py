@@ -108,7 +108,7 @@ class WfpParticle(DataParticle):
         """
         Convert passed in zulu timestamp string to a ntp timestamp float
         """
-        log.trace("ts_string = " + ts_string)
+        log.trace("ts_string = %s", ts_string)
 
         TS_REGEX = r'(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\s*(\d{1,2}):(\d{1,2}):(\d{1,2})'
         TS_MATCHER = re.compile(TS_REGEX, re.DOTALL)
@@ -162,10 +162,10 @@ class WfpParadkDataParticle(WfpParticle):
         for item in super(WfpParadkDataParticle, self)._build_parsed_values():
 
             if item[DataParticleKey.VALUE_ID] in WfpParadkDataParticleKey.list():
-                log.trace("MATCH " + repr(item[DataParticleKey.VALUE_ID]))
+                log.trace("MATCH %r", item[DataParticleKey.VALUE_ID])
                 result.append(item)
 
-        log.trace("WfpParadkDataParticle RETURNING " + repr(result))
+        log.trace("WfpParadkDataParticle RETURNING %r", result)
         return result
 
 
@@ -268,7 +268,7 @@ class WfpParser(BufferLoadingParser):
 
         # sieve looks for timestamp, update and increment position
         while (chunk != None):
-            log.trace("got A chunk -> " + str(chunk))
+            log.trace("got A chunk -> %s", chunk)
             data_match = DATA_MATCHER.match(chunk)
 
             if data_match:
@@ -326,7 +326,7 @@ class WfpParser(BufferLoadingParser):
                   self._read_state, increment)
 
         self._read_state[StateKey.POSITION] += increment
-        log.trace("to new value of = " + str(self._read_state))
+        log.trace("to new value of = %s", self._read_state)
 
 #
 # ParadkParserDataParticle
@@ -521,7 +521,7 @@ class Vel3dkParser(WfpParser):
 
         # sieve looks for timestamp, update and increment position
         while (chunk != None):
-            log.trace("got A chunk -> " + str(chunk))
+            log.trace("got A chunk -> %s", chunk)
             data_match = VEL_DATA_MATCHER.match(chunk)
 
             if data_match:
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.file_test_mixin
+@file mi/dataset/test/file_test_mixin.py
+@brief A test case mixin for tests that write files into a temporary
+directory
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import shutil
+import tempfile
+
+
+class FileTestMixin(object):
+    """
+    Creates a temporary directory for a test case, removed when the test
+    finishes, and writes files into it
+    """
+    def make_dir(self, prefix='dataset_test_'):
+        """
+        Create the temporary directory as self.directory
+        @param prefix The prefix of the directory name
+        """
+        self.directory = tempfile.mkdtemp(prefix=prefix)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def write(self, name, data, mode='wb', mod_time=None):
+        """
+        Write a file in the temporary directory
+        @param name The file name
+        @param data The data to write
+        @param mode The mode to open the file in, 'ab' to append
+        @param mod_time The modification time to give the file, or None to
+           leave it as it was written
+        @retval The path of the file
+        """
+        path = os.path.join(self.directory, name)
+        with open(path, mode) as filehandle:
+            filehandle.write(data)
+        if mod_time is not None:
+            os.utime(path, (mod_time, mod_time))
+        return path
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_directory_index
+@file mi/dataset/test/test_directory_index.py
+@brief Test code for the polling and inotify directory indexes, and a
+benchmark comparing them with globbing and stating the whole directory on
+every poll
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import glob
+import shutil
+import time
+import unittest
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.directory_index import DirectoryIndex, InotifyDirectoryIndex
+from mi.dataset.directory_index import directory_index, inotify_available
+from mi.dataset.test.file_test_mixin import FileTestMixin
+
+# a modification time old enough for any file_mod_wait
+OLD = 1000000000
+
+
+class DirectoryIndexTestMixin(FileTestMixin):
+    index_class = DirectoryIndex
+
+    def make_index(self, pattern='*.txt'):
+        index = self.index_class(self.directory, pattern)
+        self.addCleanup(index.close)
+        return index
+
+    def write(self, name, data='data', mode='wb', mod_time=OLD):
+        return super(DirectoryIndexTestMixin, self).write(name, data, mode, mod_time)
+
+
+@attr('UNIT', group='mi')
+class DirectoryIndexUnitTestCase(MiUnitTest, DirectoryIndexTestMixin):
+    """
+    Verify the index reports each new or changed file once
+    """
+    def setUp(self):
+        self.make_dir('directory_index_')
+
+    def test_new_files(self):
+        self.write('a.txt', 'a')
+        self.write('b.txt', 'bb')
+        self.write('c.dat')
+        self.write('.hidden.txt')
+        index = self.make_index()
+
+        self.assertEqual(index.ready(0), {'a.txt': (OLD, 1), 'b.txt': (OLD, 2)})
+        self.assertEqual(index.ready(0), {})
+
+        self.write('d.txt')
+        self.assertEqual(index.ready(0).keys(), ['d.txt'])
+        self.assertEqual(index.ready(0), {})
+
+        # names are matched as glob matches them
+        names = set(os.path.basename(path) for path in glob.glob(os.path.join(self.directory, '*.txt')))
+        self.assertEqual(set(index._files), names)
+
+    def test_changed_files(self):
+        self.write('a.txt')
+        self.write('b.txt')
+        index = self.make_index()
+        index.ready(0)
+
+        self.write('a.txt', 'more', mode='ab', mod_time=OLD + 1)
+        self.assertEqual(index.ready(0), {'a.txt': (OLD + 1, 8)})
+
+        # only the modification time changed
+        self.write('b.txt', mode='r+b', mod_time=OLD + 2)
+        self.assertEqual(index.ready(0), {'b.txt': (OLD + 2, 4)})
+
+        # removed and written again
+        os.remove(os.path.join(self.directory, 'a.txt'))
+        self.assertEqual(index.ready(0), {})
+        self.write('a.txt', 'again', mod_time=OLD + 1)
+        self.assertEqual(index.ready(0), {'a.txt': (OLD + 1, 5)})
+
+    def test_file_mod_wait(self):
+        """
+        Verify files modified within file_mod_wait seconds are reported
+        after the wait
+        """
+        now = int(time.time())
+        self.write('a.txt', mod_time=now - 5)
+        self.write('b.txt', mod_time=now - 20)
+        index = self.make_index()
+
+        self.assertEqual(index.ready(10, now).keys(), ['b.txt'])
+        self.assertEqual(index.ready(10, now + 1), {})
+        self.assertEqual(index.ready(10, now + 6).keys(), ['a.txt'])
+        self.assertEqual(index.ready(10, now + 20), {})
+
+        # modified again while waiting
+        self.write('a.txt', 'more', mode='ab', mod_time=now)
+        self.assertEqual(index.ready(10, now + 5), {})
+        self.write('a.txt', 'more', mode='ab', mod_time=now + 3)
+        self.assertEqual(index.ready(10, now + 12), {})
+        self.assertEqual(index.ready(10, now + 14), {'a.txt': (now + 3, 12)})
+
+    def test_mark_changed(self):
+        index = self.make_index()
+        self.write('a.txt')
+        self.assertEqual(index.ready(0).keys(), ['a.txt'])
+        self.assertEqual(index.ready(0), {})
+
+        index.mark_changed('a.txt')
+        index.mark_changed('missing.txt')
+        self.assertEqual(index.ready(0).keys(), ['a.txt'])
+        self.assertEqual(index.ready(0), {})
+
+    def test_missing_directory(self):
+        index = self.make_index()
+        self.write('a.txt')
+        self.assertEqual(index.ready(0).keys(), ['a.txt'])
+
+        shutil.rmtree(self.directory)
+        self.assertEqual(index.ready(0), {})
+
+        os.mkdir(self.directory)
+        self.write('a.txt')
+        self.assertEqual(index.ready(0).keys(), ['a.txt'])
+
+
+@attr('UNIT', group='mi')
+class InotifyDirectoryIndexUnitTestCase(DirectoryIndexUnitTestCase):
+    """
+    Verify the inotify index reports the same files as the polling index
+    """
+    index_class = InotifyDirectoryIndex
+
+    def setUp(self):
+        if not inotify_available():
+            raise unittest.SkipTest('inotify is not available')
+        super(InotifyDirectoryIndexUnitTestCase, self).setUp()
+
+    def test_events(self):
+        """
+        Verify only files with events are stated after the first refresh
+        """
+        self.write('a.txt')
+        index = self.make_index()
+        self.assertEqual(index.ready(0).keys(), ['a.txt'])
+
+        scans = []
+        index.scan = lambda: scans.append(True)
+        self.write('b.txt')
+        self.write('c.dat')
+        self.assertEqual(index.ready(0).keys(), ['b.txt'])
+        self.assertEqual(scans, [])
+
+        os.rename(os.path.join(self.directory, 'c.dat'), os.path.join(self.directory, 'c.txt'))
+        self.assertEqual(index.ready(0).keys(), ['c.txt'])
+
+        # the directory is listed after dropped events
+        index._rescan = True
+        index.ready(0)
+        self.assertEqual(scans, [True])
+
+    def test_directory_index(self):
+        index = directory_index(self.directory, '*.txt', inotify=True)
+        self.addCleanup(index.close)
+        self.assertIsInstance(index, InotifyDirectoryIndex)
+
+        self.assertIsInstance(directory_index(self.directory, '*.txt'), DirectoryIndex)
+
+        # falls back to polling a directory that can't be watched
+        missing = os.path.join(self.directory, 'missing')
+        index = directory_index(missing, '*.txt', inotify=True)
+        self.assertNotIsInstance(index, InotifyDirectoryIndex)
+
+
+@attr('PERF', group='mi')
+class DirectoryIndexBenchmark(MiUnitTest, DirectoryIndexTestMixin):
+    """
+    Compare the time to poll a directory of many files for a few new ones by
+    globbing and stating every file, with the polling and inotify indexes
+    """
+    FILES = 20000
+    POLLS = 10
+
+    def setUp(self):
+        self.make_dir('directory_index_')
+        for index in xrange(self.FILES):
+            self.write('unit_363_2013_%d_%d.txt' % (index / 100, index % 100), mod_time=None)
+
+    def _glob_poll(self):
+        result = {}
+        for path in glob.glob(os.path.join(self.directory, '*.txt')):
+            mod_time = os.path.getmtime(path)
+            if mod_time < time.time():
+                result[os.path.basename(path)] = (mod_time, os.path.getsize(path))
+        return result
+
+    def _time_polls(self, poll):
+        poll()
+        start = time.time()
+        for count in xrange(self.POLLS):
+            self.write('new_%d.txt' % count, mod_time=None)
+            poll()
+        return time.time() - start
+
+    def test_benchmark(self):
+        glob_time = self._time_polls(self._glob_poll)
+        log.info('%d files, %d polls: glob %.3fs', self.FILES, self.POLLS, glob_time)
+
+        for index in [DirectoryIndex(self.directory, '*.txt'), directory_index(self.directory, '*.txt', True)]:
+            try:
+                index_time = self._time_polls(lambda: index.ready(0, time.time() + 1))
+            finally:
+                index.close()
+            log.info('%d files, %d polls: %s %.3fs (%.1fx)', self.FILES, self.POLLS,
+                     type(index).__name__, index_time, glob_time / index_time)
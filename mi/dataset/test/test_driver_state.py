@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_driver_state
+@file mi/dataset/test/test_driver_state.py
+@brief Test code for the driver state store and memento compaction, and a
+benchmark comparing persisting every update of the full driver state with
+checkpointing a compacted memento
+"""
+
+__license__ = 'Apache 2.0'
+
+import copy
+import json
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.driver_state import DriverStateKey, DriverStateStore, DriverStateStatKey
+from mi.dataset.driver_state import compact_state, expand_state
+
+
+def file_state(index, ingested=True, parser_state=None):
+    return {
+        DriverStateKey.FILE_SIZE: 1000 + index,
+        DriverStateKey.FILE_MOD_DATE: 1380000000.0 + index,
+        DriverStateKey.FILE_CHECKSUM: '%032x' % index,
+        DriverStateKey.INGESTED: ingested,
+        DriverStateKey.PARSER_STATE: parser_state
+    }
+
+
+def driver_state(files, parser_state=None):
+    state = {DriverStateKey.VERSION: 0.1}
+    for index in range(files):
+        state['file_%05d.dat' % index] = file_state(index, parser_state=parser_state)
+    return state
+
+
+@attr('UNIT', group='mi')
+class DriverStateUnitTestCase(MiUnitTest):
+    """
+    Verify compacted mementos restore the driver state, and the store
+    checkpoints as configured
+    """
+    def setUp(self):
+        self.mementos = []
+
+    def test_compact_state(self):
+        state = driver_state(3, parser_state={'position': 100})
+        state['new.dat'] = file_state(10, ingested=False, parser_state={'position': 5})
+        state['modified.dat'] = file_state(11)
+        state['modified.dat'][DriverStateKey.MODIFIED_STATE] = {DriverStateKey.FILE_SIZE: 2000}
+
+        memento = compact_state(state)
+        self.assertEqual(sorted(memento), [DriverStateKey.INGESTED_FILES, 'modified.dat', 'new.dat',
+                                           DriverStateKey.VERSION])
+        self.assertEqual(memento[DriverStateKey.INGESTED_FILES][0],
+                         ['file_00000.dat', 1000, 1380000000.0, '%032x' % 0])
+        # the driver state is unchanged
+        self.assertEqual(len(state), 6)
+
+        # ingested files lose only their parser state
+        restored = expand_state(json.loads(json.dumps(memento)))
+        for name in state:
+            if name.startswith('file_'):
+                state[name][DriverStateKey.PARSER_STATE] = None
+        self.assertEqual(restored, state)
+
+    def test_compact_data_keys(self):
+        """
+        Verify the file states of each data key of a multiple harvester
+        driver are compacted
+        """
+        state = {DriverStateKey.VERSION: 0.1,
+                 'key_a': driver_state(2),
+                 'key_b': {},
+                 'key_c': {'single.dat': {DriverStateKey.PARSER_STATE: None}}}
+        del state['key_a'][DriverStateKey.VERSION]
+
+        memento = compact_state(state)
+        self.assertEqual(memento['key_a'].keys(), [DriverStateKey.INGESTED_FILES])
+        self.assertEqual(memento['key_b'], {})
+        self.assertEqual(memento['key_c'], state['key_c'])
+        self.assertEqual(expand_state(copy.deepcopy(memento)), state)
+
+        # mementos that weren't compacted are unchanged
+        self.assertEqual(expand_state(copy.deepcopy(state)), state)
+
+    def test_default_store(self):
+        """
+        Verify every update is persisted as it is by default
+        """
+        store = DriverStateStore.from_config(self.mementos.append, None)
+        state = driver_state(2)
+        store.update(state)
+        store.update(state)
+        store.save(state)
+        self.assertEqual(len(self.mementos), 3)
+        self.assertIs(self.mementos[0], state)
+
+    def test_records(self):
+        store = DriverStateStore(self.mementos.append, records=3, compact=True)
+        state = driver_state(2)
+        store.update(state)
+        store.update(state)
+        self.assertEqual(self.mementos, [])
+        store.update(state)
+        self.assertEqual(self.mementos, [compact_state(state)])
+
+        # saves persist pending updates
+        store.update(state)
+        store.save(state)
+        store.flush()
+        self.assertEqual(len(self.mementos), 2)
+
+        # stopping persists pending updates
+        store.update(state)
+        store.flush()
+        self.assertEqual(len(self.mementos), 3)
+
+        self.assertEqual(store.get_stats(), {DriverStateStatKey.UPDATES: 6,
+                                             DriverStateStatKey.CHECKPOINTS: 3,
+                                             DriverStateStatKey.COMPACTED_FILES: 2})
+
+    def test_interval(self):
+        store = DriverStateStore(self.mementos.append, records=1000, interval=0.05)
+        state = driver_state(1)
+        store.update(state)
+        store.flush_expired()
+        self.assertEqual(self.mementos, [])
+
+        time.sleep(0.06)
+        store.flush_expired()
+        self.assertEqual(len(self.mementos), 1)
+        store.flush_expired()
+        self.assertEqual(len(self.mementos), 1)
+
+        time.sleep(0.06)
+        store.update(state)
+        self.assertEqual(len(self.mementos), 2)
+
+
+@attr('PERF', group='mi')
+class DriverStateStoreBenchmark(MiUnitTest):
+    """
+    Compare persisting every parser state update of the full driver state with
+    checkpointing every 100 updates of a compacted memento, while a file is
+    parsed after many were ingested. The agent's persistence is stood in for
+    by encoding the memento as json.
+    """
+    FILES = 2000
+    UPDATES = 500
+
+    def _time(self, store):
+        state = driver_state(self.FILES, parser_state={'position': 100000,
+                                                       'in_process_data': [[0, 100, 1, 0]] * 5,
+                                                       'unprocessed_data': [[0, 100]] * 5})
+        state['new.dat'] = file_state(self.FILES, ingested=False)
+        start = time.time()
+        for position in xrange(self.UPDATES):
+            state['new.dat'][DriverStateKey.PARSER_STATE] = {'position': position}
+            store.update(state)
+        store.flush()
+        return time.time() - start
+
+    def test_benchmark(self):
+        sizes = []
+        persist = lambda memento: sizes.append(len(json.dumps(memento)))
+
+        full_time = self._time(DriverStateStore(persist))
+        full_size = sizes[-1]
+        compact_time = self._time(DriverStateStore(persist, records=100, compact=True))
+        compact_size = sizes[-1]
+
+        log.info('%d ingested files, %d updates: full %.3fs, %d bytes, compacted every 100 updates %.3fs, '
+                 '%d bytes (%.1fx)', self.FILES, self.UPDATES, full_time, full_size,
+                 compact_time, compact_size, full_time / compact_time)
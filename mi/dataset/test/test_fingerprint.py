@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_fingerprint
+@file mi/dataset/test/test_fingerprint.py
+@brief Test code for the file fingerprint cache, and a benchmark comparing
+it with reading and hashing a new file each time its checksum is needed
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import time
+import hashlib
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.fingerprint import FingerprintCache, TAIL_SIZE
+from mi.dataset.test.file_test_mixin import FileTestMixin
+
+
+def md5_checksum(path):
+    """
+    The original checksum, reading the whole file
+    """
+    with open(path, 'rb') as filehandle:
+        return hashlib.md5(filehandle.read()).hexdigest()
+
+
+@attr('UNIT', group='mi')
+class FingerprintCacheUnitTestCase(MiUnitTest, FileTestMixin):
+    """
+    Verify the cache gives the same checksums as hashing the whole file,
+    reading each version of a file once
+    """
+    def setUp(self):
+        self.make_dir('fingerprint_')
+        self.cache = FingerprintCache(max_files=3, chunk_size=1000)
+
+    def test_checksum(self):
+        path = self.write('file.dat', os.urandom(10500))
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+        self.assertEqual((self.cache.hashed, self.cache.hits, self.cache.bytes_hashed), (1, 1, 10500))
+
+        path = self.write('empty.dat', '')
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+
+        with self.assertRaises(OSError):
+            self.cache.checksum(os.path.join(self.directory, 'missing.dat'))
+
+    def test_appended(self):
+        """
+        Verify only the new bytes of a file that grew are hashed
+        """
+        path = self.write('growing.dat', os.urandom(5000), mod_time=1000)
+        self.cache.checksum(path)
+
+        for count in range(1, 4):
+            self.write('growing.dat', os.urandom(2500), mode='ab', mod_time=1000 + count)
+            self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+        self.assertEqual((self.cache.hashed, self.cache.extended), (1, 3))
+        self.assertEqual(self.cache.bytes_hashed, 12500)
+
+        # a short file, with less than the tail size hashed
+        path = self.write('short.dat', 'abc', mod_time=1000)
+        self.cache.checksum(path)
+        self.write('short.dat', 'def', mode='ab', mod_time=1001)
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+        self.assertEqual(self.cache.extended, 4)
+
+    def test_modified(self):
+        """
+        Verify a file that was rewritten is hashed again
+        """
+        data = os.urandom(3 * TAIL_SIZE)
+        path = self.write('modified.dat', data, mod_time=1000)
+        self.cache.checksum(path)
+
+        # the same size, only the modification time changed
+        self.write('modified.dat', data[:10] + 'x' + data[11:], mode='r+b', mod_time=1001)
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+
+        # grew, but the end of the previous version changed
+        self.write('modified.dat', data[:-1] + 'x' + 'more', mod_time=1002)
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+
+        # shrank
+        self.write('modified.dat', data[:100], mod_time=1003)
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+
+        # replaced by a new file with the same size and time
+        os.rename(self.write('new.dat', data[:99] + 'y', mod_time=1003), path)
+        self.assertEqual(self.cache.checksum(path), md5_checksum(path))
+
+        self.assertEqual((self.cache.hashed, self.cache.extended), (5, 0))
+
+    def test_max_files(self):
+        paths = [self.write('file%d.dat' % index, os.urandom(100)) for index in range(4)]
+        for path in paths:
+            self.cache.checksum(path)
+        self.cache.checksum(paths[3])
+        self.cache.checksum(paths[0])
+        self.assertEqual((self.cache.hashed, self.cache.hits), (5, 1))
+
+        self.cache.forget(paths[0])
+        self.cache.checksum(paths[0])
+        self.cache.clear()
+        self.cache.checksum(paths[3])
+        self.assertEqual(self.cache.hashed, 7)
+
+
+@attr('PERF', group='mi')
+class FingerprintCacheBenchmark(MiUnitTest, FileTestMixin):
+    """
+    Compare the time to get the checksum of a new file three times, as the
+    harvester and driver do, and of a file growing in steps, with the
+    original hashing and the cache
+    """
+    FILE_SIZE = 100 * 1024 * 1024
+    STEPS = 10
+
+    def setUp(self):
+        self.make_dir('fingerprint_')
+
+    def _time(self, function):
+        start = time.time()
+        result = function()
+        return time.time() - start, result
+
+    def test_new_file(self):
+        path = self.write('new.dat', os.urandom(self.FILE_SIZE))
+        cache = FingerprintCache()
+
+        original_time, expected = self._time(lambda: [md5_checksum(path) for _ in range(3)])
+        cache_time, result = self._time(lambda: [cache.checksum(path) for _ in range(3)])
+        self.assertEqual(result, expected)
+
+        log.info('new file of %d bytes checked 3 times: original %.3fs, cache %.3fs (%.1fx)',
+                 self.FILE_SIZE, original_time, cache_time, original_time / cache_time)
+
+    def test_growing_file(self):
+        step = self.FILE_SIZE / self.STEPS
+        path = self.write('growing.dat', '')
+        cache = FingerprintCache()
+        original_time = cache_time = 0
+        for count in range(self.STEPS):
+            self.write('growing.dat', os.urandom(step), mode='ab', mod_time=1000 + count)
+            elapsed, expected = self._time(lambda: md5_checksum(path))
+            original_time += elapsed
+            elapsed, result = self._time(lambda: cache.checksum(path))
+            cache_time += elapsed
+            self.assertEqual(result, expected)
+
+        log.info('file growing to %d bytes in %d steps: original %.3fs, cache %.3fs (%.1fx)',
+                 self.FILE_SIZE, self.STEPS, original_time, cache_time, original_time / cache_time)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_parallel_ingest
+@file mi/dataset/test/test_parallel_ingest.py
+@brief Test code for parsing files in ingest worker processes, and a
+benchmark comparing parsing a backlog of files one at a time with parsing
+them in workers
+"""
+
+__license__ = 'Apache 2.0'
+
+import os
+import time
+import hashlib
+import multiprocessing
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import SampleException, DatasetParserException
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.idk.config import Config
+from mi.dataset.dataset_driver import DataSourceConfigKey, DataSetDriverConfigKeys, DriverParameter
+from mi.dataset.parallel_ingest import ParallelIngester, IngestMessage
+from mi.dataset.parallel_ingest import portable_exception, rebuild_exception
+from mi.dataset.driver.ctdpf_j.cspp.driver import CtdpfJCsppDataSetDriver, DataTypeKey
+
+RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver', 'ctdpf_j', 'cspp', 'resource')
+
+# a file of each data key
+CSPP_FILES = {
+    DataTypeKey.CTDPF_J_CSPP_TELEMETERED: '11079364_PPD_CTD.txt',
+    DataTypeKey.CTDPF_J_CSPP_RECOVERED: '11079364_PPB_CTD.txt',
+}
+
+
+def parse_file(worker, records, delay=0):
+    """
+    A worker sending a record and parser state at a time
+    """
+    for index in range(records):
+        time.sleep(delay)
+        worker.send_records(['record %d' % index], {'position': index + 1}, index + 1 == records)
+
+
+def fail_file(worker, exception):
+    worker.send_records(['record 0'], {'position': 1}, False)
+    worker.send_sample_exception(SampleException('bad record'))
+    raise exception
+
+
+def exit_file(worker):
+    os._exit(1)
+
+
+def hash_file(worker, rounds):
+    """
+    A worker standing in for a CPU bound parser
+    """
+    digest = ''
+    for index in range(rounds):
+        digest = hashlib.md5(digest + str(index)).hexdigest()
+    worker.send_records([digest], {'position': rounds}, True)
+
+
+def collect(ingester, key, timeout=5):
+    results = []
+    end = time.time() + timeout
+    while ingester.has_jobs(key) and time.time() < end:
+        results.extend(ingester.results(key, 0.1))
+    return results
+
+
+@attr('UNIT', group='mi')
+class ParallelIngesterUnitTestCase(MiUnitTest):
+    """
+    Verify the results of each key are returned in the order its files were
+    started
+    """
+    def setUp(self):
+        self.ingester = ParallelIngester(3)
+        self.addCleanup(self.ingester.stop)
+
+    def test_order(self):
+        # the later files finish first
+        self.ingester.start('a', 'a1', parse_file, (2, 0.1))
+        self.ingester.start('a', 'a2', parse_file, (1,))
+        self.ingester.start('b', 'b1', parse_file, (1,))
+        self.assertFalse(self.ingester.has_capacity())
+
+        results = collect(self.ingester, 'a')
+        self.assertEqual(results, [
+            ('a1', (IngestMessage.RECORDS, ['record 0'], {'position': 1}, False)),
+            ('a1', (IngestMessage.RECORDS, ['record 1'], {'position': 2}, True)),
+            ('a1', (IngestMessage.DONE,)),
+            ('a2', (IngestMessage.RECORDS, ['record 0'], {'position': 1}, True)),
+            ('a2', (IngestMessage.DONE,))])
+        self.assertTrue(self.ingester.has_capacity())
+
+        # b's results were read while waiting for a
+        self.assertEqual([name for (name, message) in self.ingester.results('b', 0)], ['b1', 'b1'])
+        self.assertFalse(self.ingester.has_jobs('b'))
+        self.assertEqual(self.ingester.results('c', 0), [])
+
+    def test_errors(self):
+        self.ingester.start('a', 'a1', fail_file, (SampleException('bad file'),))
+        self.ingester.start('a', 'a2', fail_file, (ValueError('bug'),))
+        self.ingester.start('a', 'a3', exit_file)
+
+        messages = [message for (name, message) in collect(self.ingester, 'a')]
+        kinds = [message[0] for message in messages]
+        self.assertEqual(kinds, [IngestMessage.RECORDS, IngestMessage.SAMPLE_EXCEPTION, IngestMessage.ERROR,
+                                 IngestMessage.DONE] * 2 + [IngestMessage.ERROR, IngestMessage.DONE])
+
+        exception = rebuild_exception(messages[1][1])
+        self.assertIsInstance(exception, SampleException)
+        self.assertEqual(exception.msg, 'bad record')
+        self.assertIsInstance(rebuild_exception(messages[6][1]), ValueError)
+        self.assertIsInstance(rebuild_exception(messages[8][1]), DatasetParserException)
+
+    def test_portable_exception(self):
+        exception = rebuild_exception(portable_exception(SampleException('bad')))
+        self.assertEqual((type(exception), exception.msg), (SampleException, 'bad'))
+
+        # exceptions that can't be rebuilt from a message
+        exception = rebuild_exception(('mi.core.exceptions', 'Missing', 'message'))
+        self.assertIsInstance(exception, DatasetParserException)
+
+    def test_stop(self):
+        self.ingester.start('a', 'a1', parse_file, (100, 0.1))
+        self.ingester.stop()
+        self.assertFalse(self.ingester.has_jobs('a'))
+        self.assertTrue(self.ingester.has_capacity())
+
+
+@attr('UNIT', group='mi')
+class ParallelIngestDriverUnitTestCase(MiUnitTest):
+    """
+    Verify a driver parsing CSPP files in ingest workers publishes the same
+    particles and saves the same parser state as parsing them itself. The
+    raw data of CSPP particles is a regex match, which can't be pickled.
+    """
+    def _ingest(self, processes=None):
+        """
+        @param processes The ingest_processes config, None to parse in the
+           driver
+        @retval The particles, the last driver state and the exceptions
+        """
+        config = {
+            DataSourceConfigKey.HARVESTER: dict(
+                (data_key, {DataSetDriverConfigKeys.DIRECTORY: RESOURCE_PATH,
+                            DataSetDriverConfigKeys.PATTERN: file_name})
+                for (data_key, file_name) in CSPP_FILES.iteritems()),
+            DataSourceConfigKey.PARSER: dict((data_key, {}) for data_key in CSPP_FILES),
+        }
+        if processes:
+            config[DataSourceConfigKey.INGEST_PROCESSES] = processes
+
+        particles = []
+        states = []
+        exceptions = []
+        driver = CtdpfJCsppDataSetDriver(config, {}, particles.extend, states.append,
+                                         lambda **kwargs: None, exceptions.append)
+        # don't throttle parsing in the driver
+        driver.set_resource({DriverParameter.RECORDS_PER_SECOND: 100000,
+                             DriverParameter.BATCHED_PARTICLE_COUNT: 100})
+        for (data_key, file_name) in sorted(CSPP_FILES.iteritems()):
+            driver._new_file_callback(file_name, data_key)
+            driver._poll(data_key)
+        return particles, states[-1], exceptions
+
+    def _values(self, particles):
+        values = []
+        for particle in particles:
+            particle_dict = particle.generate_dict()
+            del particle_dict[DataParticleKey.DRIVER_TIMESTAMP]
+            values.append(particle_dict)
+        return values
+
+    def test_cspp(self):
+        (particles, state, exceptions) = self._ingest()
+        (parallel_particles, parallel_state, parallel_exceptions) = self._ingest(2)
+
+        self.assertGreater(len(particles), 2)
+        self.assertEqual(self._values(parallel_particles), self._values(particles))
+        self.assertEqual(parallel_state, state)
+        self.assertEqual(parallel_exceptions, exceptions)
+        self.assertTrue(all(particle.raw_data is None for particle in parallel_particles))
+
+
+@attr('PERF', group='mi')
+class ParallelIngesterBenchmark(MiUnitTest):
+    """
+    Compare the time to parse a backlog of files one at a time with parsing
+    them in a worker process per CPU
+    """
+    FILES = 32
+    ROUNDS = 100000
+
+    def test_benchmark(self):
+        results = []
+
+        class Worker(object):
+            def send_records(self, samples, state, ingested):
+                results.append(samples)
+
+        start = time.time()
+        for _ in range(self.FILES):
+            hash_file(Worker(), self.ROUNDS)
+        serial_time = time.time() - start
+
+        processes = multiprocessing.cpu_count()
+        ingester = ParallelIngester(processes)
+        start = time.time()
+        files = range(self.FILES)
+        parallel = []
+        while files or ingester.has_jobs('key'):
+            while files and ingester.has_capacity():
+                ingester.start('key', 'file %d' % files.pop(0), hash_file, (self.ROUNDS,))
+            parallel.extend(message[1] for (name, message) in ingester.results('key', 1)
+                            if message[0] == IngestMessage.RECORDS)
+        parallel_time = time.time() - start
+        self.assertEqual(parallel, results)
+
+        log.info('%d files: serial %.3fs, %d processes %.3fs (%.1fx)', self.FILES, serial_time,
+                 processes, parallel_time, serial_time / parallel_time)
+
@@ -12,12 +12,16 @@ import gevent
 import time
 import shutil
 import hashlib
+import unittest
 
 from mi.core.log import get_logger ; log = get_logger()
 from nose.plugins.attrib import attr
 from mi.core.unit_test import MiUnitTest
-from mi.dataset.harvester import SingleDirectoryHarvester
+from mi.dataset.harvester import SingleDirectoryHarvester, SingleDirectoryPoller
 from mi.dataset.dataset_driver import DriverStateKey, DataSetDriverConfigKeys
+from mi.dataset.directory_index import inotify_available
+from mi.dataset.fingerprint import file_checksum
+from mi.dataset.test.file_test_mixin import FileTestMixin
 
 TESTDIR = '/tmp/dsatest'
 STOREDIR = '/tmp/stored_dsatest'
@@ -482,6 +486,70 @@ class TestSingleDirHarvester(MiUnitTest):
             if end_time > timeout:
                 raise Exception("Timeout waiting to find files")
 
-    
 
+@attr('UNIT', group='mi')
+class SingleDirectoryPollerUnitTestCase(MiUnitTest, FileTestMixin):
+    """
+    Call the poller's file check directly, acting as the driver in between
+    """
+    inotify = False
+    # a modification time old enough for any file_mod_wait
+    OLD = 1000000000
 
+    def setUp(self):
+        self.make_dir('single_dir_poller_')
+        self.driver_state = {}
+        config = {DataSetDriverConfigKeys.DIRECTORY: self.directory,
+                  DataSetDriverConfigKeys.PATTERN: '*.txt',
+                  DataSetDriverConfigKeys.INOTIFY: self.inotify}
+        self.poller = SingleDirectoryPoller(config, self.driver_state, None, file_mod_wait=0)
+        self.addCleanup(self.poller._index.close)
+
+    def queue_file(self, name):
+        """
+        Record the file state as the driver's _new_file_callback does
+        """
+        path = os.path.join(self.directory, name)
+        self.driver_state[name] = {
+            DriverStateKey.FILE_SIZE: os.path.getsize(path),
+            DriverStateKey.FILE_MOD_DATE: os.path.getmtime(path),
+            DriverStateKey.FILE_CHECKSUM: file_checksum(path),
+            DriverStateKey.INGESTED: False,
+            DriverStateKey.PARSER_STATE: None
+        }
+
+    def test_modified_before_ingested(self):
+        """
+        Verify a file modified after it was queued and before it was
+        ingested is reported as modified once it is ingested
+        """
+        self.write('a.txt', 'first', mod_time=self.OLD)
+        self.write('b.txt', 'unchanged', mod_time=self.OLD)
+        self.assertEqual(self.poller._check_for_files(), (['a.txt', 'b.txt'], {}))
+        self.queue_file('a.txt')
+        self.queue_file('b.txt')
+
+        path = self.write('a.txt', 'second version', mod_time=self.OLD + 10)
+        self.assertEqual(self.poller._check_for_files(), ([], {}))
+        self.assertEqual(self.poller._check_for_files(), ([], {}))
+
+        self.driver_state['a.txt'][DriverStateKey.INGESTED] = True
+        self.driver_state['b.txt'][DriverStateKey.INGESTED] = True
+        self.assertEqual(self.poller._check_for_files(),
+                         ([], {'a.txt': {DriverStateKey.FILE_SIZE: 14,
+                                         DriverStateKey.FILE_MOD_DATE: self.OLD + 10,
+                                         DriverStateKey.FILE_CHECKSUM: file_checksum(path)}}))
+        self.assertEqual(self.poller._check_for_files(), ([], {}))
+
+
+@attr('UNIT', group='mi')
+class InotifySingleDirectoryPollerUnitTestCase(SingleDirectoryPollerUnitTestCase):
+    """
+    Run the poller tests with an inotify directory index
+    """
+    inotify = True
+
+    def setUp(self):
+        if not inotify_available():
+            raise unittest.SkipTest('inotify is not available')
+        super(InotifySingleDirectoryPollerUnitTestCase, self).setUp()
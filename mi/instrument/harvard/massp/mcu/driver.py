@@ -703,7 +703,7 @@ class Protocol(CommandResponseInstrumentProtocol):
         """
         event = None
         exception = None
-        sample = self._extract_sample(McuDataParticle, McuDataParticle.regex_compiled(), chunk, ts)
+        sample = self._extract_particle(McuDataParticle, McuDataParticle.regex_compiled(), chunk, ts)
         if sample:
             return
 
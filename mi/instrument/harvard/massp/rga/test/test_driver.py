@@ -35,6 +35,7 @@ from mi.core.exceptions import InstrumentProtocolException
 from mi.core.instrument.data_particle import RawDataParticle, CommonDataParticleType
 from mi.core.instrument.instrument_driver import DriverConfigKey, ResourceAgentState
 from mi.core.instrument.port_agent_client import PortAgentPacket
+from mi.core.event_executor import EventExecutorKey
 from mi.instrument.harvard.massp.rga.driver import InstrumentDriver
 from mi.instrument.harvard.massp.rga.driver import RGAStatusParticleKey
 from mi.instrument.harvard.massp.rga.driver import RGASampleParticleKey
@@ -359,6 +360,38 @@ class DriverUnitTest(InstrumentDriverUnitTestCase, DriverTestMixinSub):
             else:
                 self.assert_rga_sample_particle(p, True)
 
+    def test_scan_stop_scan(self):
+        """
+        Verify the scan loop keeps running on the protocol's event worker, which raises each
+        TAKE_SCAN queued by the previous scan, and that STOP_SCAN stops it without waiting
+        behind queued events.
+        """
+        driver = self.test_connect()
+        protocol = driver._protocol
+        protocol._protocol_fsm.on_event(Capability.START_SCAN)
+        self.assertEqual(protocol.get_current_state(), ProtocolState.SCAN)
+
+        # wait for a few scans
+        end = time.time() + 15
+        while time.time() < end and protocol.get_fsm_event_stats()[EventExecutorKey.COMPLETED] < 3:
+            time.sleep(0.1)
+        stats = protocol.get_fsm_event_stats()
+        self.assertGreaterEqual(stats[EventExecutorKey.COMPLETED], 3)
+        self.assertLessEqual(stats[EventExecutorKey.MAX_DEPTH], 1)
+
+        start = time.time()
+        protocol._protocol_fsm.on_event(Capability.STOP_SCAN)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(protocol.get_current_state(), ProtocolState.COMMAND)
+
+        # the worker drains and no scan is started once stopped
+        self.assertTrue(protocol._fsm_event_executor.wait_idle(5))
+        scans = [args for (args, kwargs) in driver._connection.send.call_args_list if args[0].startswith('SC1')]
+        time.sleep(2)
+        self.assertEqual(len(scans), len([args for (args, kwargs) in driver._connection.send.call_args_list
+                                          if args[0].startswith('SC1')]))
+        self.assertEqual(protocol.get_current_state(), ProtocolState.COMMAND)
+
     def test_sample_missing_data(self):
         """
         Send a start scan event to the driver, but don't return enough data.  Verify that no
@@ -496,7 +496,7 @@ class Protocol(CommandResponseInstrumentProtocol):
         @param chunk: data to be processed
         @param ts: timestamp
         """
-        self._extract_sample(TurboStatusParticle, TurboStatusParticle.regex_compiled(), chunk, ts)
+        self._extract_particle(TurboStatusParticle, TurboStatusParticle.regex_compiled(), chunk, ts)
 
     def _filter_capabilities(self, events):
         """
@@ -5,7 +5,6 @@
 @brief BOTPT
 Release notes:
 """
-import json
 import re
 import time
 import datetime
@@ -364,7 +363,7 @@ class Protocol(CommandResponseInstrumentProtocol):
         Process chunk output by the chunker.  Generate samples and (possibly) react
         @param chunk: data
         @param ts: ntp timestamp
-        @return sample
+        @return particle
         @throws InstrumentProtocolException
         """
         possible_particles = [
@@ -376,15 +375,15 @@ class Protocol(CommandResponseInstrumentProtocol):
         ]
 
         for particle_type, func in possible_particles:
-            sample = self._extract_sample(particle_type, particle_type.regex_compiled(), chunk, ts)
-            if sample:
+            particle = self._extract_particle(particle_type, particle_type.regex_compiled(), chunk, ts)
+            if particle:
                 if func:
-                    func(sample)
-                return sample
+                    func(particle.get_value_dict())
+                return particle
 
         raise InstrumentProtocolException(u'unhandled chunk received by _got_chunk: [{0!r:s}]'.format(chunk))
 
-    def _extract_sample(self, particle_class, regex, line, timestamp, publish=True):
+    def _extract_particle(self, particle_class, regex, line, timestamp, publish=True):
         """
         Overridden to set the quality flag for LILY particles that are out of range.
         @param particle_class: Class type for particle
@@ -392,22 +391,19 @@ class Protocol(CommandResponseInstrumentProtocol):
         @param line: data
         @param timestamp: ntp timestamp
         @param publish: boolean to indicate if sample should be published
-        @return: extracted sample
+        @return: extracted particle
         """
-        sample = None
+        particle = None
         if regex.match(line):
             if particle_class == particles.LilySampleParticle and self._param_dict.get(Parameter.LEVELING_FAILED):
                 particle = particle_class(line, port_timestamp=timestamp, quality_flag=DataParticleValue.OUT_OF_RANGE)
             else:
                 particle = particle_class(line, port_timestamp=timestamp)
-            parsed_sample = particle.generate()
 
             if publish and self._driver_event:
-                self._driver_event(DriverAsyncEvent.SAMPLE, parsed_sample)
+                self._driver_event(DriverAsyncEvent.SAMPLE, particle.generate())
 
-            sample = json.loads(parsed_sample)
-
-        return sample
+        return particle
 
     def _filter_capabilities(self, events):
         """
@@ -598,27 +594,6 @@ class Protocol(CommandResponseInstrumentProtocol):
         Overriding _wakeup; does not apply to this instrument
         """
 
-    def add_to_buffer(self, data):
-        """
-        Overriding base class to reduce logging due to NANO high data rate
-        @param data: data to be added to buffers
-        """
-        # Update the line and prompt buffers.
-        self._linebuf += data
-        self._promptbuf += data
-        self._last_data_timestamp = time.time()
-
-        # If our buffer exceeds the max allowable size then drop the leading
-        # characters on the floor.
-        max_size = self._max_buffer_size()
-        if len(self._linebuf) > max_size:
-            self._linebuf = self._linebuf[max_size * -1:]
-
-        # If our buffer exceeds the max allowable size then drop the leading
-        # characters on the floor.
-        if len(self._promptbuf) > max_size:
-            self._promptbuf = self._linebuf[max_size * -1:]
-
     def _max_buffer_size(self):
         """
         Overriding base class to increase max buffer size
@@ -705,18 +680,6 @@ class Protocol(CommandResponseInstrumentProtocol):
         """
         return resp, prompt
 
-    def _particle_to_dict(self, sample):
-        """
-        Convert a particle to a dictionary of value_id:value
-        @param sample: particle to be parsed
-        @return: dictionary representing the particle
-        """
-        sample_dict = {}
-        values = sample.get(DataParticleKey.VALUES, [])
-        for each in values:
-            sample_dict[each[DataParticleKey.VALUE_ID]] = each[DataParticleKey.VALUE]
-        return sample_dict
-
     def _check_for_autolevel(self, sample):
         """
         Check this sample, kick off a leveling event if out of range
@@ -726,7 +689,6 @@ class Protocol(CommandResponseInstrumentProtocol):
             # Find the current X and Y tilt values
             # If they exceed the trigger parameters, begin autolevel
             relevel = False
-            sample = self._particle_to_dict(sample)
             x_tilt = abs(sample[particles.LilySampleParticleKey.X_TILT])
             y_tilt = abs(sample[particles.LilySampleParticleKey.Y_TILT])
             x_trig = int(self._param_dict.get(Parameter.XTILT_TRIGGER))
@@ -751,7 +713,6 @@ class Protocol(CommandResponseInstrumentProtocol):
         Check this sample if leveling is complete or failed
         @param sample: Sample to be checked
         """
-        sample = self._particle_to_dict(sample)
         status = sample[particles.LilyLevelingParticleKey.STATUS]
         if status is not None:
             # Leveling status update received
@@ -776,7 +737,6 @@ class Protocol(CommandResponseInstrumentProtocol):
         Check if PPS sync status has changed.  Update driver flag and, if appropriate, trigger a time sync
         @param sample: sample to be checked
         """
-        sample = self._particle_to_dict(sample)
         pps_sync = sample[particles.NanoSampleParticleKey.PPS_SYNC] == 'P'
         if pps_sync and not self.has_pps:
             # pps sync regained, sync the time
@@ -591,7 +591,7 @@ class SBE16NOProtocol(SBE19Protocol):
         """
         for particle_class in SBE16NOHardwareParticle, SBE16NODataParticle, SBE16NOCalibrationParticle, \
                               SBE16NOConfigurationParticle, SBE16NOStatusParticle, SBE16NOOptodeSettingsParticle:
-            if self._extract_sample(particle_class, particle_class.regex_compiled(), chunk, timestamp):
+            if self._extract_particle(particle_class, particle_class.regex_compiled(), chunk, timestamp):
                 return
 
         raise InstrumentProtocolException("Unhandled chunk %s" % chunk)
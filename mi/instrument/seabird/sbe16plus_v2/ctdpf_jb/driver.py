@@ -2134,7 +2134,7 @@ class SBE19Protocol(SBE16Protocol):
         """
         for particle_class in SBE19HardwareParticle, SBE19DataParticle, SBE19CalibrationParticle, \
                               SBE19ConfigurationParticle, SBE19StatusParticle, OptodeSettingsParticle:
-            if self._extract_sample(particle_class, particle_class.regex_compiled(), chunk, timestamp):
+            if self._extract_particle(particle_class, particle_class.regex_compiled(), chunk, timestamp):
                 return
 
         raise InstrumentProtocolException("Unhandled chunk %s" % chunk)
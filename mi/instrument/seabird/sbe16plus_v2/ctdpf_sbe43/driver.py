@@ -704,7 +704,7 @@ class SBE43Protocol(SBE19Protocol):
         """
         for particle_class in SBE43HardwareParticle, SBE43DataParticle, SBE43CalibrationParticle, \
                               SBE43ConfigurationParticle, SBE43StatusParticle:
-            if self._extract_sample(particle_class, particle_class.regex_compiled(), chunk, timestamp):
+            if self._extract_particle(particle_class, particle_class.regex_compiled(), chunk, timestamp):
                 return
 
         raise InstrumentProtocolException("Unhandled chunk %s" % chunk)
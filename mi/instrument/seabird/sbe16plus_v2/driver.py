@@ -31,6 +31,7 @@ from mi.core.instrument.instrument_driver import ResourceAgentState
 from mi.core.instrument.instrument_driver import ResourceAgentEvent
 from mi.core.instrument.data_particle import DataParticleKey, CommonDataParticleType
 from mi.core.instrument.chunker import StringChunker
+from mi.core.instrument.chunker import RegexSieve
 from mi.core.exceptions import InstrumentParameterException
 from mi.core.exceptions import SampleException
 from mi.core.exceptions import InstrumentProtocolException
@@ -670,6 +671,10 @@ class SBE16CalibrationParticle(SeaBirdParticle):
         except ValueError as e:
             raise SampleException("ValueError while decoding status: [%s]" % e)
 
+# Particles produced by SBE16Protocol chunks, in the order they are matched
+SBE16_PARTICLES = [SBE16DataParticle, SBE16StatusParticle, SBE16CalibrationParticle]
+SBE16_SIEVE = RegexSieve([particle.regex_compiled() for particle in SBE16_PARTICLES])
+
 ###############################################################################
 # Seabird Electronics 16plus V2 MicroCAT Driver.
 ###############################################################################
@@ -807,18 +812,7 @@ class SBE16Protocol(SeaBirdProtocol):
     def sieve_function(raw_data):
         """ The method that splits samples
         """
-        matchers = []
-        return_list = []
-
-        matchers.append(SBE16DataParticle.regex_compiled())
-        matchers.append(SBE16StatusParticle.regex_compiled())
-        matchers.append(SBE16CalibrationParticle.regex_compiled())
-
-        for matcher in matchers:
-            for match in matcher.finditer(raw_data):
-                return_list.append((match.start(), match.end()))
-
-        return return_list
+        return SBE16_SIEVE(raw_data)
 
     def _filter_capabilities(self, events):
         """
@@ -1598,11 +1592,13 @@ class SBE16Protocol(SeaBirdProtocol):
         The base class got_data has gotten a chunk from the chunker.  Pass it to extract_sample
         with the appropriate particle objects and REGEXes. 
         """
-        if not (self._extract_sample(SBE16DataParticle, SBE16DataParticle.regex_compiled(), chunk, timestamp) or
-                self._extract_sample(SBE16StatusParticle, SBE16StatusParticle.regex_compiled(), chunk, timestamp) or
-                self._extract_sample(SBE16CalibrationParticle, SBE16CalibrationParticle.regex_compiled(), chunk, timestamp)):
+        index = SBE16_SIEVE.match(chunk)
+        if index is None:
             raise InstrumentProtocolException("Unhandled chunk")
 
+        particle_class = SBE16_PARTICLES[index]
+        self._extract_particle(particle_class, particle_class.regex_compiled(), chunk, timestamp)
+
     def _build_driver_dict(self):
         """
         Populate the driver dictionary with options
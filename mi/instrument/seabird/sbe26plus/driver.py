@@ -2576,7 +2576,7 @@ class Protocol(SeaBirdProtocol):
             raise InstrumentProtocolException('dc command not recognized: %s.' % response)
 
         # publish a sample
-        sample = self._extract_sample(SBE26plusDeviceCalibrationDataParticle, DC_REGEX_MATCHER, response, True)
+        sample = self._extract_particle(SBE26plusDeviceCalibrationDataParticle, DC_REGEX_MATCHER, response, True)
 
         # return the DC as text
         match = DC_REGEX_MATCHER.search(response)
@@ -2625,12 +2625,12 @@ class Protocol(SeaBirdProtocol):
         @param: chunk - byte sequence that we want to create a particle from
         @param: timestamp - port agent timestamp to include in the chunk
         """
-        if(self._extract_sample(SBE26plusTideSampleDataParticle, TS_REGEX_MATCHER, chunk, timestamp)): return
-        if(self._extract_sample(SBE26plusTideSampleDataParticle, TIDE_REGEX_MATCHER, chunk, timestamp)): return
-        if(self._extract_sample(SBE26plusWaveBurstDataParticle, WAVE_REGEX_MATCHER, chunk, timestamp)): return
-        if(self._extract_sample(SBE26plusStatisticsDataParticle, STATS_REGEX_MATCHER, chunk, timestamp)): return
-        if(self._extract_sample(SBE26plusDeviceCalibrationDataParticle, DC_REGEX_MATCHER, chunk, timestamp)): return
-        if(self._extract_sample(SBE26plusDeviceStatusDataParticle, DS_REGEX_MATCHER, chunk, timestamp)): return
+        if(self._extract_particle(SBE26plusTideSampleDataParticle, TS_REGEX_MATCHER, chunk, timestamp)): return
+        if(self._extract_particle(SBE26plusTideSampleDataParticle, TIDE_REGEX_MATCHER, chunk, timestamp)): return
+        if(self._extract_particle(SBE26plusWaveBurstDataParticle, WAVE_REGEX_MATCHER, chunk, timestamp)): return
+        if(self._extract_particle(SBE26plusStatisticsDataParticle, STATS_REGEX_MATCHER, chunk, timestamp)): return
+        if(self._extract_particle(SBE26plusDeviceCalibrationDataParticle, DC_REGEX_MATCHER, chunk, timestamp)): return
+        if(self._extract_particle(SBE26plusDeviceStatusDataParticle, DS_REGEX_MATCHER, chunk, timestamp)): return
 
     ########################################################################
     # Static helpers to format set commands.
@@ -1327,7 +1327,7 @@ class SBE37Protocol(CommandResponseInstrumentProtocol):
             log.debug("Publish Fake Reply, start: %s, end: %s, interval: %s", start, end, interval)
             for sample in sample_data:
                 log.debug("Publish fake record: %s", sample)
-                result = self._extract_sample(SBE37DataParticle, SAMPLE_PATTERN_MATCHER, sample, timestamp)
+                result = self._extract_particle(SBE37DataParticle, SAMPLE_PATTERN_MATCHER, sample, timestamp)
                 timestamp += interval
                 time.sleep(0.5)
 
@@ -1507,9 +1507,9 @@ class SBE37Protocol(CommandResponseInstrumentProtocol):
         #if self.get_current_state() == SBE37ProtocolState.AUTOSAMPLE:
         #    self._extract_sample(SBE37DataParticle, SAMPLE_PATTERN_MATCHER, chunk)
         
-        result = self._extract_sample(SBE37DataParticle, SAMPLE_PATTERN_MATCHER, chunk, timestamp)
-        result = self._extract_sample(SBE37DeviceStatusParticle, STATUS_DATA_REGEX_MATCHER, chunk, timestamp)
-        result = self._extract_sample(SBE37DeviceCalibrationParticle, CALIBRATION_DATA_REGEX_MATCHER, chunk, timestamp)
+        result = self._extract_particle(SBE37DataParticle, SAMPLE_PATTERN_MATCHER, chunk, timestamp)
+        result = self._extract_particle(SBE37DeviceStatusParticle, STATUS_DATA_REGEX_MATCHER, chunk, timestamp)
+        result = self._extract_particle(SBE37DeviceCalibrationParticle, CALIBRATION_DATA_REGEX_MATCHER, chunk, timestamp)
 
     def _build_driver_dict(self):
         """
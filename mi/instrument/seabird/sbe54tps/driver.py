@@ -1971,7 +1971,7 @@ class Protocol(SeaBirdProtocol):
         # This instrument will automatically put itself back into autosample mode after a couple minutes idle
         # in command mode.  So if we see a sample we need to figure out if we need to raise an event to adjust
         # the state machine.
-        if(self._extract_sample(SBE54tpsSampleDataParticle, SAMPLE_DATA_REGEX_MATCHER, chunk, timestamp)):
+        if(self._extract_particle(SBE54tpsSampleDataParticle, SAMPLE_DATA_REGEX_MATCHER, chunk, timestamp)):
             log.debug("Sample record detected, publish a sample")
             if(self._protocol_fsm.get_current_state() == ProtocolState.COMMAND):
                 log.debug("FSM appears out of date.  Fixing it!")
@@ -1979,11 +1979,11 @@ class Protocol(SeaBirdProtocol):
                 self._async_raise_fsm_event(ProtocolEvent.RECOVER_AUTOSAMPLE)
             return
 
-        if(self._extract_sample(SBE54tpsStatusDataParticle, STATUS_DATA_REGEX_MATCHER, chunk, timestamp)) : return
-        if(self._extract_sample(SBE54tpsConfigurationDataParticle, CONFIGURATION_DATA_REGEX_MATCHER, chunk, timestamp)) : return
-        if(self._extract_sample(SBE54tpsEventCounterDataParticle, EVENT_COUNTER_DATA_REGEX_MATCHER, chunk, timestamp)) : return
-        if(self._extract_sample(SBE54tpsHardwareDataParticle, HARDWARE_DATA_REGEX_MATCHER, chunk, timestamp)) : return
-        if(self._extract_sample(SBE54tpsSampleRefOscDataParticle, SAMPLE_REF_OSC_MATCHER, chunk, timestamp)) : return
+        if(self._extract_particle(SBE54tpsStatusDataParticle, STATUS_DATA_REGEX_MATCHER, chunk, timestamp)) : return
+        if(self._extract_particle(SBE54tpsConfigurationDataParticle, CONFIGURATION_DATA_REGEX_MATCHER, chunk, timestamp)) : return
+        if(self._extract_particle(SBE54tpsEventCounterDataParticle, EVENT_COUNTER_DATA_REGEX_MATCHER, chunk, timestamp)) : return
+        if(self._extract_particle(SBE54tpsHardwareDataParticle, HARDWARE_DATA_REGEX_MATCHER, chunk, timestamp)) : return
+        if(self._extract_particle(SBE54tpsSampleRefOscDataParticle, SAMPLE_REF_OSC_MATCHER, chunk, timestamp)) : return
 
     def _send_wakeup(self):
         """
@@ -1615,7 +1615,7 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
         """
 
         try:
-            self._extract_sample(SamiBatteryVoltageDataParticle,
+            self._extract_particle(SamiBatteryVoltageDataParticle,
                                  BATTERY_VOLTAGE_REGEX_MATCHER,
                                  response + SAMI_NEWLINE,
                                  None)
@@ -1630,7 +1630,7 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
         """
 
         try:
-            self._extract_sample(SamiThermistorVoltageDataParticle,
+            self._extract_particle(SamiThermistorVoltageDataParticle,
                                  SAMI_THERMISTOR_VOLTAGE_REGEX_MATCHER,
                                  response + SAMI_NEWLINE,
                                  None)
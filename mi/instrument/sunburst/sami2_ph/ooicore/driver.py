@@ -835,15 +835,15 @@ class Protocol(SamiProtocol):
         with the appropriate particle objects and REGEXes.
         """
 
-        if any([self._extract_sample(SamiRegularStatusDataParticle, SAMI_REGULAR_STATUS_REGEX_MATCHER,
+        if any([self._extract_particle(SamiRegularStatusDataParticle, SAMI_REGULAR_STATUS_REGEX_MATCHER,
                                      chunk, timestamp),
-                self._extract_sample(SamiControlRecordDataParticle, SAMI_CONTROL_RECORD_REGEX_MATCHER,
+                self._extract_particle(SamiControlRecordDataParticle, SAMI_CONTROL_RECORD_REGEX_MATCHER,
                                      chunk, timestamp),
-                self._extract_sample(PhsenConfigDataParticle, PHSEN_CONFIGURATION_REGEX_MATCHER,
+                self._extract_particle(PhsenConfigDataParticle, PHSEN_CONFIGURATION_REGEX_MATCHER,
                                      chunk, timestamp)]):
             return
 
-        sample = self._extract_sample(PhsenSamiSampleDataParticle, PHSEN_SAMPLE_REGEX_MATCHER, chunk, timestamp)
+        sample = self._extract_particle(PhsenSamiSampleDataParticle, PHSEN_SAMPLE_REGEX_MATCHER, chunk, timestamp)
 
         log.debug('Protocol._got_chunk(): get_current_state() == %s', self.get_current_state())
 
@@ -23,7 +23,7 @@ from mi.instrument.teledyne.driver import TeledyneProtocol
 from mi.instrument.teledyne.driver import TeledynePrompt
 from mi.instrument.teledyne.driver import TeledyneParameter
 from mi.instrument.teledyne.driver import TeledyneCapability
-from mi.core.instrument.chunker import StringChunker
+from mi.core.instrument.chunker import StreamChunker
 
 from mi.core.log import get_logger
 from struct import unpack
@@ -33,6 +33,10 @@ log = get_logger()
 # newline.
 NEWLINE = '\r\n'
 
+# largest chunk the sieve can match, a PD0 ensemble is the two id bytes
+# followed by up to 0xFFFF bytes counted by its length field
+MAX_CHUNK_SIZE = 2 + 0xFFFF
+
 
 # ##############################################################################
 # Driver
@@ -130,7 +134,7 @@ class WorkhorseProtocol(TeledyneProtocol):
         # Construct protocol superclass.
         TeledyneProtocol.__init__(self, prompts, newline, driver_event)
 
-        self._chunker = StringChunker(WorkhorseProtocol.sieve_function)
+        self._chunker = StreamChunker(WorkhorseProtocol.sieve_function, MAX_CHUNK_SIZE)
 
     def _build_command_dict(self):
         """
@@ -16,6 +16,7 @@ from mi.instrument.teledyne.particles import ADCP_COMPASS_CALIBRATION_DataPartic
 
 from mi.instrument.teledyne.workhorse.driver import WorkhorseInstrumentDriver
 from mi.instrument.teledyne.workhorse.driver import WorkhorseProtocol
+from mi.instrument.teledyne.workhorse.driver import MAX_CHUNK_SIZE
 
 from mi.instrument.teledyne.driver import TeledyneScheduledJob
 from mi.instrument.teledyne.driver import TeledyneCapability
@@ -54,7 +55,7 @@ from mi.core.exceptions import InstrumentParameterExpirationException
 from mi.core.instrument.instrument_driver import ResourceAgentState
 from mi.instrument.teledyne.driver import TeledyneParameter
 from mi.core.instrument.instrument_driver import DriverParameter
-from mi.core.instrument.chunker import StringChunker
+from mi.core.instrument.chunker import StreamChunker
 from mi.core.instrument.instrument_driver import ConfigMetadataKey
 
 # newline.
@@ -518,7 +519,7 @@ class Protocol(WorkhorseProtocol):
         # The parameter, comamnd, and driver dictionaries.
         self._param_dict2 = ProtocolParameterDict()
         self._build_param_dict2()
-        self._chunker2 = StringChunker(WorkhorseProtocol.sieve_function)
+        self._chunker2 = StreamChunker(WorkhorseProtocol.sieve_function, MAX_CHUNK_SIZE)
 
     # Overridden for dual(master/slave) instruments
     def set_init_params(self, config):